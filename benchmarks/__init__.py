@@ -0,0 +1,3 @@
+"""
+Benchmarks de Pink Autoheader (ejecutables en Linux con un Word falso)
+"""
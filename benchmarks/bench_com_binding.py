@@ -0,0 +1,120 @@
+"""
+Benchmark de la vinculación COM
+Cronometra, llamada a llamada, los accesos que hace WordProcessor al estampar
+(encabezado, fuente, párrafo, geometría de página, líneas) con vinculación
+tardía (IDispatch dinámico, GetIDsOfNames en cada acceso) y temprana (clases
+generadas de la biblioteca de tipos de Word) sobre el mismo documento abierto.
+
+Necesita Windows con Word instalado: el Word falso no tiene biblioteca de tipos.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_com_binding
+    python -m benchmarks.bench_com_binding --repeticiones 5000
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import escribir_docx
+from src.config import (
+    WD_HEADER_FOOTER_PRIMARY, WD_ALIGN_PARAGRAPH_RIGHT, HEADER_FONT_NAME, LINE_COLOR_RGB, LINE_WEIGHT
+)
+
+
+def _linea(doc):
+    """AddLine con color y grosor, y la borra para no acumular formas"""
+    section = doc.Sections(1)
+    header = section.Headers(WD_HEADER_FOOTER_PRIMARY)
+    linea = header.Shapes.AddLine(0, 10, 100, 10)
+    linea.Line.ForeColor.RGB = LINE_COLOR_RGB
+    linea.Line.Weight = LINE_WEIGHT
+    linea.Delete()
+
+
+# (nombre, función(doc, rango)) en el orden en que aparecen al estampar
+OPERACIONES = (
+    ("Sections(1).Headers(1)", lambda doc, rango: doc.Sections(1).Headers(WD_HEADER_FOOTER_PRIMARY)),
+    ("Range.Font.Name (lectura)", lambda doc, rango: rango.Font.Name),
+    ("Range.Font.Name = ...", lambda doc, rango: setattr(rango.Font, 'Name', HEADER_FONT_NAME)),
+    ("ParagraphFormat.Alignment = ...",
+     lambda doc, rango: setattr(rango.ParagraphFormat, 'Alignment', WD_ALIGN_PARAGRAPH_RIGHT)),
+    ("PageSetup.PageWidth", lambda doc, rango: doc.Sections(1).PageSetup.PageWidth),
+    ("Shapes.AddLine + Line.ForeColor.RGB", lambda doc, rango: _linea(doc)),
+)
+
+
+def medir(word, ruta, repeticiones):
+    """
+    Returns:
+        dict: nombre de la operación -> microsegundos por llamada
+    """
+    doc = word.Documents.Open(FileName=ruta, ReadOnly=True, AddToRecentFiles=False, Visible=False)
+    try:
+        rango = doc.Paragraphs(1).Range
+        resultados = {}
+        for nombre, operacion in OPERACIONES:
+            # Las formas son mucho más lentas: menos repeticiones
+            veces = repeticiones // 20 if "AddLine" in nombre else repeticiones
+            operacion(doc, rango)
+            inicio = time.perf_counter()
+            for _ in range(veces):
+                operacion(doc, rango)
+            resultados[nombre] = (time.perf_counter() - inicio) / veces * 1e6
+        return resultados
+    finally:
+        rango = None
+        doc.Close(SaveChanges=False)
+        doc = None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coste por llamada COM con vinculación tardía y temprana")
+    parser.add_argument('--repeticiones', type=int, default=2000)
+    parser.add_argument('--parrafos', type=int, default=40)
+    args = parser.parse_args(argv)
+
+    try:
+        import pythoncom
+        from src.com_binding import despachar
+    except ImportError:
+        print("Este benchmark necesita Windows con Word instalado (pywin32)")
+        return 1
+
+    trabajo = tempfile.mkdtemp(prefix="autoheader_binding_")
+    pythoncom.CoInitialize()
+    try:
+        ruta = os.path.join(trabajo, "CAL-05-Documento.docx")
+        escribir_docx(ruta, parrafos=args.parrafos)
+
+        resultados = {}
+        for vinculacion in ('late', 'early'):
+            word, usada = despachar('Word.Application', nueva_instancia=True, vinculacion=vinculacion,
+                                    ruta_cache=os.path.join(trabajo, "gen_py"), log_callback=print)
+            try:
+                word.Visible = False
+                word.DisplayAlerts = 0
+                if usada != vinculacion:
+                    print(f"No se pudo usar la vinculación {vinculacion}")
+                    return 1
+                resultados[vinculacion] = medir(word, ruta, args.repeticiones)
+            finally:
+                word.Quit()
+                word = None
+
+        print(f"{'operación':<38} {'tardía':>9} {'temprana':>9}  mejora")
+        for nombre, _ in OPERACIONES:
+            tardia = resultados['late'][nombre]
+            temprana = resultados['early'][nombre]
+            print(f"{nombre:<38} {tardia:>7.1f}µs {temprana:>7.1f}µs  x{tardia / temprana:.2f}")
+        return 0
+    finally:
+        pythoncom.CoUninitialize()
+        shutil.rmtree(trabajo, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
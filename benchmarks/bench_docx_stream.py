@@ -0,0 +1,115 @@
+"""
+Benchmark de la reescritura en streaming de word/document.xml
+Genera .docx sintéticos con un document.xml del tamaño indicado, repunta las
+referencias de encabezado/pie y mide tiempo y memoria máxima.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_docx_stream --mb 500
+    python -m benchmarks.bench_docx_stream --mb 50 200 500
+
+La memoria pico de Python (tracemalloc) debe mantenerse constante aunque crezca el documento.
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+import zipfile
+
+from benchmarks.corpus import CONTENT_TYPES_XML, TIPO_DOCX, RELS_XML
+from src.docx_stream import parchear_docx
+
+CABECERA = (
+    b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    b'<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    b' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"><w:body>'
+)
+PARRAFO = b'<w:p><w:r><w:rPr><w:b/></w:rPr><w:t xml:space="preserve">Lorem ipsum dolor sit amet, ' \
+          b'consectetur adipiscing elit. </w:t></w:r></w:p>'
+SECCION = b'<w:p><w:pPr><w:sectPr><w:headerReference w:type="default" r:id="rId8"/>' \
+          b'<w:pgSz w:w="11906" w:h="16838"/></w:sectPr></w:pPr></w:p>'
+FINAL = b'<w:sectPr><w:headerReference w:type="default" r:id="rId8"/>' \
+        b'<w:footerReference w:type="default" r:id="rId9"/><w:pgSz w:w="16838" w:h="11906" w:orient="landscape"/>' \
+        b'</w:sectPr></w:body></w:document>'
+
+
+def generar_docx_grande(ruta, megas, parrafos_por_seccion=20000):
+    """Escribe un .docx cuyo word/document.xml ocupa aproximadamente `megas` MB sin comprimir"""
+    objetivo = megas * 1024 * 1024
+    bloque = PARRAFO * 1000
+    with zipfile.ZipFile(ruta, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as z:
+        z.writestr('[Content_Types].xml', CONTENT_TYPES_XML.format(tipo=TIPO_DOCX))
+        z.writestr('_rels/.rels', RELS_XML)
+        with z.open('word/document.xml', 'w', force_zip64=True) as f:
+            escrito = f.write(CABECERA)
+            parrafos = 0
+            while escrito < objetivo:
+                escrito += f.write(bloque)
+                parrafos += 1000
+                if parrafos % parrafos_por_seccion == 0:
+                    escrito += f.write(SECCION)
+            f.write(FINAL)
+    return escrito
+
+
+def medir(megas, trabajo):
+    origen = os.path.join(trabajo, f"grande_{megas}.docx")
+    destino = os.path.join(trabajo, f"grande_{megas}_parcheado.docx")
+
+    inicio = time.perf_counter()
+    tamano_xml = generar_docx_grande(origen, megas)
+    generacion = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    secciones = parchear_docx(origen, destino, header_rid='rIdAH1', footer_rid='rIdAF1')
+    duracion = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    os.remove(origen)
+    os.remove(destino)
+    return {
+        'mb_xml': tamano_xml / (1024 * 1024),
+        'generacion_s': generacion,
+        'segundos': duracion,
+        'mb_por_segundo': tamano_xml / (1024 * 1024) / duracion,
+        'pico_python_mb': pico / (1024 * 1024),
+        'secciones': secciones,
+    }
+
+
+def _rss_maximo_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark del parcheo en streaming de document.xml")
+    parser.add_argument('--mb', type=int, nargs='+', default=[500], help="Tamaños de document.xml en MB")
+    args = parser.parse_args(argv)
+
+    trabajo = tempfile.mkdtemp(prefix="autoheader_docx_stream_")
+    try:
+        for megas in args.mb:
+            r = medir(megas, trabajo)
+            rss = _rss_maximo_mb()
+            print(
+                f"{r['mb_xml']:8.0f} MB xml  {r['secciones']:>5} sectPr  {r['segundos']:7.2f}s  "
+                f"{r['mb_por_segundo']:6.1f} MB/s  pico Python {r['pico_python_mb']:5.1f} MB"
+                + (f"  RSS máx. proceso {rss:.0f} MB" if rss else "")
+            )
+    finally:
+        shutil.rmtree(trabajo, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
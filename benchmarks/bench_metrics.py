@@ -0,0 +1,74 @@
+"""
+Benchmark de las métricas de la ejecución
+Mide lo que añaden las métricas al bucle de trabajo (un contador y una
+duración por elemento, desde varios hilos a la vez) y lo que cuesta generar
+el texto de Prometheus en cada lectura del endpoint o del archivo.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_metrics
+    python -m benchmarks.bench_metrics --operaciones 1000000 --hilos 1 4
+"""
+
+import argparse
+import random
+import sys
+import threading
+import time
+
+from src.metrics import RunMetrics
+from src.pipeline import ColaMedida
+
+ETAPAS = ("renombrado", "validación", "copia", "anticipo", "word")
+
+
+def medir_registro(operaciones, hilos):
+    """Nanosegundos por elemento: un incrementar() y un observar() como en una etapa"""
+    metricas = RunMetrics()
+    por_hilo = operaciones // hilos
+
+    def trabajar(indice):
+        etiquetas = (('etapa', ETAPAS[indice % len(ETAPAS)]),)
+        rng = random.Random(indice)
+        duraciones = [rng.expovariate(1.0) for _ in range(1000)]
+        for i in range(por_hilo):
+            metricas.incrementar('files_scanned_total')
+            metricas.observar('stage_seconds', duraciones[i % 1000], etiquetas)
+
+    trabajadores = [threading.Thread(target=trabajar, args=(i,)) for i in range(hilos)]
+    inicio = time.perf_counter()
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    segundos = time.perf_counter() - inicio
+    return segundos / (por_hilo * hilos) * 1e9, metricas
+
+
+def medir_exportacion(metricas, repeticiones=200):
+    """Milisegundos por texto() con todas las colas, etapas y un documento en curso"""
+    metricas.colas = [ColaMedida(nombre, 64) for nombre in ("directorios", "validación", "Word", "copia")]
+    metricas.indicador('documents_total', lambda: 1000)
+    metricas.empezar_documento("F:\\Cursos\\CAL-05-Geometría\\CAL-05-Teoremas.docx")
+    inicio = time.perf_counter()
+    for _ in range(repeticiones):
+        texto = metricas.texto()
+    return (time.perf_counter() - inicio) / repeticiones * 1000, texto
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coste de las métricas en el bucle de trabajo y al exportar")
+    parser.add_argument('--operaciones', type=int, default=500000)
+    parser.add_argument('--hilos', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args(argv)
+
+    metricas = None
+    for hilos in args.hilos:
+        ns, metricas = medir_registro(args.operaciones, hilos)
+        print(f"{hilos} hilo(s): {ns:.0f} ns por elemento (contador + duración)")
+    ms, texto = medir_exportacion(metricas)
+    print(f"Exportación: {ms:.2f} ms, {len(texto.splitlines())} líneas, {len(texto.encode('utf-8'))} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
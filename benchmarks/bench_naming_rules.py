@@ -0,0 +1,194 @@
+"""
+Benchmark de las reglas de nombres
+Genera nombres sintéticos de carpeta y de archivo (las dos convenciones de
+siempre, nombres sin patrón, casos límite con guiones y las convenciones
+"MAT_10_..." y "[CAL05] ...") y compara:
+
+- las funciones originales de src/utils.py (un nombre cada vez, recorriendo
+  el nombre carácter a carácter), conservadas aquí como referencia;
+- el motor de reglas compilado, analizando cada directorio en lote.
+
+Con las reglas por defecto los resultados deben coincidir exactamente con
+los originales; si no, el proceso sale con código 1.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_naming_rules
+    python -m benchmarks.bench_naming_rules --nombres 1000000 --por-directorio 50
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+
+from benchmarks.corpus import TEMAS, PREFIJOS_CODIGO
+from src.naming_rules import NamingRules
+from src.config import NAMING_RULES_DEFAULT
+
+# Convenciones de otros departamentos (ejemplos del README)
+REGLAS_EXTRA = (
+    ('guion_bajo', r'(?P<codigo>[A-Za-z]+_\d+)(?:_(?P<raiz>.+))?', '{codigo}_{raiz}'),
+    ('corchetes', r'\[(?P<codigo>[^\]]+)\]\s*(?P<raiz>.+)?', '[{codigo}] {raiz}'),
+)
+
+
+# ----------------------------------------------------------------------
+# Implementación original (referencia)
+# ----------------------------------------------------------------------
+
+def _extraer_codigo_original(nombre_carpeta):
+    if " - " in nombre_carpeta:
+        partes = nombre_carpeta.split(" - ")
+        if len(partes) >= 2:
+            return f"{partes[0]} - {partes[1]}"
+    elif "-" in nombre_carpeta:
+        partes = nombre_carpeta.split("-")
+        if len(partes) >= 2:
+            return f"{partes[0]}-{partes[1]}"
+    return nombre_carpeta
+
+
+def _extraer_raiz_original(nombre_archivo):
+    nombre_sin_ext, extension = os.path.splitext(nombre_archivo)
+    if " - " in nombre_sin_ext:
+        partes = nombre_sin_ext.split(" - ")
+        if len(partes) >= 3:
+            return (" - ".join(partes[2:]), True)
+    guiones_encontrados = 0
+    for i, char in enumerate(nombre_sin_ext):
+        if char == '-':
+            guiones_encontrados += 1
+            if guiones_encontrados == 2:
+                raiz = nombre_sin_ext[i + 1:]
+                if raiz:
+                    return (raiz, True)
+                break
+    return (None, False)
+
+
+def _construir_original(codigo, raiz, extension):
+    if " - " in codigo:
+        return f"{codigo} - {raiz}{extension}"
+    return f"{codigo}-{raiz}{extension}"
+
+
+# ----------------------------------------------------------------------
+# Nombres sintéticos
+# ----------------------------------------------------------------------
+
+def _nombre(rng, indice):
+    tema = rng.choice(TEMAS)
+    prefijo = rng.choice(PREFIJOS_CODIGO)
+    numero = rng.randint(1, 99)
+    tipo = indice % 12
+    if tipo in (0, 1, 2):
+        return f"{prefijo}-{numero:02d}-{tema} {indice}"
+    if tipo == 3:
+        return f"{prefijo}-{numero:02d} - {tema} {indice}"
+    if tipo == 4:
+        return f"{numero:02d} - {tema} - Parte {indice % 5}"
+    if tipo == 5:
+        return f"{tema} {indice}"
+    if tipo == 6:
+        return f"{prefijo}_{numero:02d}_{tema} {indice}"
+    if tipo == 7:
+        return f"[{prefijo}{numero:02d}] {tema} {indice}"
+    if tipo == 8:
+        # Casos límite: guiones seguidos, al final, sin raíz, separadores mezclados
+        return rng.choice((
+            f"{prefijo}--{tema}", f"{prefijo}-{numero}-", f"{prefijo}-{numero}", "-",
+            f"{numero} - {tema} - ", f"{numero} - - {tema}", f"{numero} - {tema}-x-y",
+            f"{prefijo} -{numero}- {tema}", f"{numero} - - - {tema}",
+        ))
+    if tipo == 9:
+        return f"{numero:02d} - {tema} - {prefijo}-{numero} - {indice}"
+    if tipo == 10:
+        return f"{tema}-{prefijo}-{numero}-{tema}-{indice}"
+    return f"{prefijo}-{numero:02d}R{indice % 7}-{tema}"
+
+
+def generar_directorios(total, por_directorio, semilla=0):
+    """Lista de (nombre de carpeta, nombres de archivo)"""
+    rng = random.Random(semilla)
+    directorios = []
+    extensiones = ('.docx', '.pdf', '.docm', '.xlsx')
+    for inicio in range(0, total, por_directorio):
+        carpeta = _nombre(rng, inicio // por_directorio)
+        archivos = [_nombre(rng, i) + extensiones[i % len(extensiones)]
+                    for i in range(inicio, min(total, inicio + por_directorio))]
+        directorios.append((carpeta, archivos))
+    return directorios
+
+
+# ----------------------------------------------------------------------
+# Medidas
+# ----------------------------------------------------------------------
+
+def medir_original(directorios):
+    inicio = time.perf_counter()
+    resultados = []
+    for carpeta, archivos in directorios:
+        codigo = _extraer_codigo_original(carpeta)
+        for f in archivos:
+            raiz, encontrado = _extraer_raiz_original(f)
+            nuevo = _construir_original(codigo, raiz, os.path.splitext(f)[1]) if encontrado else None
+            resultados.append((codigo, raiz, nuevo))
+    return time.perf_counter() - inicio, resultados
+
+
+def medir_reglas(directorios, reglas):
+    inicio = time.perf_counter()
+    resultados = []
+    for carpeta, archivos in directorios:
+        analisis_carpeta = reglas.analizar_carpeta(carpeta)
+        codigo = analisis_carpeta.codigo
+        for f, analisis in zip(archivos, reglas.analizar_archivos(archivos)):
+            raiz = analisis.raiz
+            nuevo = reglas.construir_nombre(codigo, raiz, os.path.splitext(f)[1], analisis_carpeta.regla) if raiz is not None else None
+            resultados.append((codigo, raiz, nuevo))
+    return time.perf_counter() - inicio, resultados
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Motor de reglas de nombres frente a la implementación original")
+    parser.add_argument('--nombres', type=int, default=1000000)
+    parser.add_argument('--por-directorio', type=int, default=40)
+    args = parser.parse_args(argv)
+
+    inicio = time.perf_counter()
+    reglas = NamingRules(NAMING_RULES_DEFAULT)
+    reglas_extra = NamingRules(REGLAS_EXTRA + NAMING_RULES_DEFAULT)
+    compilacion = (time.perf_counter() - inicio) / 2 * 1000
+
+    directorios = generar_directorios(args.nombres, args.por_directorio)
+    total = sum(len(archivos) for _, archivos in directorios)
+    print(f"{total} nombres de archivo en {len(directorios)} directorios (compilación de reglas {compilacion:.2f} ms)")
+
+    t_original, r_original = medir_original(directorios)
+    t_reglas, r_reglas = medir_reglas(directorios, reglas)
+    t_extra, r_extra = medir_reglas(directorios, reglas_extra)
+
+    distintos = sum(1 for a, b in zip(r_original, r_reglas) if a != b)
+    sin_patron = sum(1 for _, raiz, _ in r_reglas if raiz is None)
+    sin_patron_extra = sum(1 for _, raiz, _ in r_extra if raiz is None)
+
+    print(f"{'implementación':>24}  {'segundos':>9}  {'µs/nombre':>10}  {'sin patrón (diálogo)':>21}")
+    for nombre, segundos, manuales in (
+        ("original", t_original, sin_patron),
+        ("reglas por defecto", t_reglas, sin_patron),
+        ("reglas + MAT_ y [..]", t_extra, sin_patron_extra),
+    ):
+        print(f"{nombre:>24}  {segundos:>9.2f}  {segundos / total * 1e6:>10.2f}  {manuales:>21}")
+
+    if distintos:
+        for a, b in [(a, b) for a, b in zip(r_original, r_reglas) if a != b][:10]:
+            print(f"  ✗ original {a} · reglas {b}")
+        print(f"✗ {distintos} resultados distintos de la implementación original")
+        return 1
+    print("✓ Las reglas por defecto dan exactamente los mismos códigos, raíces y nombres")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
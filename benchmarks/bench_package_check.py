@@ -0,0 +1,131 @@
+"""
+Benchmark de la prevalidación de paquetes Word
+Genera documentos válidos y los casos que hacen que Word se quede esperando
+(truncados, protegidos con contraseña, .doc o RTF con extensión .docx,
+.docm etiquetados como .docx, archivos de bloqueo "~$" de Word...),
+comprueba que cada uno recibe el veredicto esperado y mide el coste por
+documento con 1 hilo y con varios.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_package_check
+    python -m benchmarks.bench_package_check --documentos 2000 --parrafos 2000 --hilos 1 4 8
+"""
+
+import argparse
+import os
+import shutil
+import struct
+import sys
+import tempfile
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.corpus import escribir_docx, CONTENT_TYPES_XML, RELS_XML, TIPO_DOCX
+from src.package_check import validar_paquete, FIRMA_OLE
+
+
+def _ole(ruta, cifrado):
+    """Contenedor OLE mínimo: cabecera y un sector de directorio (con EncryptionInfo si cifrado)"""
+    cabecera = bytearray(512)
+    cabecera[0:8] = FIRMA_OLE
+    struct.pack_into('<H', cabecera, 0x1E, 9)      # sectores de 512 bytes
+    struct.pack_into('<I', cabecera, 0x30, 0)      # directorio en el sector 0
+    directorio = bytearray(512)
+    nombre = ('EncryptionInfo' if cifrado else 'WordDocument').encode('utf-16-le')
+    directorio[128:128 + len(nombre)] = nombre
+    with open(ruta, 'wb') as f:
+        f.write(bytes(cabecera) + bytes(directorio))
+
+
+def _sin_documento(ruta):
+    with zipfile.ZipFile(ruta, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('[Content_Types].xml', CONTENT_TYPES_XML.format(tipo=TIPO_DOCX))
+        z.writestr('_rels/.rels', RELS_XML)
+
+
+def _truncado(ruta, parrafos):
+    escribir_docx(ruta, parrafos)
+    with open(ruta, 'r+b') as f:
+        f.truncate(os.path.getsize(ruta) * 2 // 3)
+
+
+def _escribir(ruta, datos):
+    with open(ruta, 'wb') as f:
+        f.write(datos)
+
+
+# (nombre, extensión, función que lo escribe, se espera rechazo)
+CASOS = (
+    ('válido', '.docx', lambda r, p: escribir_docx(r, p), False),
+    ('válido .docm', '.docm', lambda r, p: escribir_docx(r, p, macro=True), False),
+    ('truncado', '.docx', _truncado, True),
+    ('contraseña', '.docx', lambda r, p: _ole(r, True), True),
+    ('.doc renombrado', '.docx', lambda r, p: _ole(r, False), True),
+    ('.docm como .docx', '.docx', lambda r, p: escribir_docx(r, p, macro=True), True),
+    ('.docx como .docm', '.docm', lambda r, p: escribir_docx(r, p), True),
+    ('sin document.xml', '.docx', lambda r, p: _sin_documento(r), True),
+    ('RTF', '.docx', lambda r, p: _escribir(r, b'{\\rtf1\\ansi Hola}'), True),
+    ('vacío', '.docx', lambda r, p: _escribir(r, b''), True),
+    ('bloqueo ~$', '.docx', lambda r, p: _escribir(r, b'\x0bAyax G.' + bytes(154)), True),
+)
+
+
+def preparar(carpeta, documentos, parrafos):
+    """Lista de (ruta, caso, se espera rechazo): la mitad válidos, el resto repartido entre los casos"""
+    rutas = []
+    for i in range(documentos):
+        nombre, extension, escribir, rechazo = CASOS[0] if i % 2 else CASOS[1 + (i // 2) % (len(CASOS) - 1)]
+        ruta = os.path.join(carpeta, f"doc{i:05d}{extension}")
+        escribir(ruta, parrafos)
+        rutas.append((ruta, nombre, rechazo))
+    return rutas
+
+
+def medir(rutas, hilos):
+    inicio = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=hilos) as ejecutor:
+        motivos = list(ejecutor.map(validar_paquete, [r for r, _, _ in rutas]))
+    return time.perf_counter() - inicio, motivos
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coste y veredictos de la prevalidación de paquetes Word")
+    parser.add_argument('--documentos', type=int, default=1000)
+    parser.add_argument('--parrafos', type=int, default=500, help="Párrafos de los documentos válidos")
+    parser.add_argument('--hilos', type=int, nargs='+', default=[1, 4])
+    args = parser.parse_args(argv)
+
+    carpeta = tempfile.mkdtemp(prefix="bench_package_check_")
+    try:
+        rutas = preparar(carpeta, args.documentos, args.parrafos)
+        megas = sum(os.path.getsize(r) for r, _, _ in rutas) / 1024 / 1024
+        print(f"{len(rutas)} documentos ({megas:.1f} MB)")
+
+        motivos = None
+        for hilos in args.hilos:
+            segundos, motivos = medir(rutas, hilos)
+            print(f"{f'{hilos} hilo(s)':>18}  {segundos / len(rutas) * 1e6:>8.1f} µs/documento")
+
+        errores = 0
+        vistos = {}
+        for (ruta, nombre, rechazo), motivo in zip(rutas, motivos):
+            vistos.setdefault(nombre, motivo)
+            if (motivo is not None) != rechazo:
+                errores += 1
+                if errores <= 10:
+                    print(f"  ✗ {nombre}: {os.path.basename(ruta)} → {motivo or 'válido'}")
+        for nombre, _, _, _ in CASOS:
+            if nombre in vistos:
+                print(f"  {nombre:>18}: {vistos[nombre] or 'válido'}")
+        if errores:
+            print(f"✗ {errores} veredictos distintos de los esperados")
+            return 1
+        print("✓ Todos los documentos reciben el veredicto esperado")
+        return 0
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
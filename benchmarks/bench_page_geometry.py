@@ -0,0 +1,70 @@
+"""
+Benchmark de llamadas COM a PageSetup
+Procesa un documento con el Word falso para distinto número de secciones y
+muestra las operaciones COM totales y las que leen la geometría de página.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_page_geometry
+    python -m benchmarks.bench_page_geometry --secciones 1 3 10 50
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+
+from PIL import Image
+
+from benchmarks.corpus import escribir_docx
+from benchmarks.fake_word import ComRecorder, FakeWordApplication
+
+# Lecturas que corresponden a la geometría de página
+MIEMBROS_GEOMETRIA = ('PageSetup', 'PageWidth', 'PageHeight', 'LeftMargin', 'RightMargin', 'Orientation')
+
+OPCIONES = {
+    'add_logo': True, 'add_folder_code': True, 'add_header_line': True, 'add_footer_line': True,
+    'add_author': True, 'add_page_number': True, 'save_modified_dest': True, 'copy_as_pdf': True,
+}
+
+
+def medir(trabajo, secciones):
+    import src.word_processor as word_processor
+    word_processor.WORD_PAUSE_AFTER_EDIT = 0
+    word_processor.WORD_PAUSE_AFTER_CLOSE = 0
+
+    ruta_logo = os.path.join(trabajo, "logo.png")
+    if not os.path.exists(ruta_logo):
+        Image.new('RGB', (600, 200), (255, 105, 180)).save(ruta_logo)
+    ruta = os.path.join(trabajo, "CAL-05-Documento.docx")
+    if not os.path.exists(ruta):
+        escribir_docx(ruta, parrafos=20)
+
+    recorder = ComRecorder()
+    word = FakeWordApplication(recorder, secciones)
+    processor = word_processor.WordProcessor(ruta_logo, "Autor Benchmark", omitir_estampados=False)
+    destino = os.path.join(trabajo, "destino")
+    if not processor.procesar_docx(word, ruta, os.path.basename(ruta), "CAL-05", destino, lambda m: None, OPCIONES):
+        raise RuntimeError("El documento no se pudo procesar")
+    geometria = sum(recorder.lecturas[m] for m in MIEMBROS_GEOMETRIA)
+    return recorder.total, geometria
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Llamadas COM a PageSetup por documento")
+    parser.add_argument('--secciones', type=int, nargs='+', default=[1, 3, 10])
+    args = parser.parse_args(argv)
+
+    trabajo = tempfile.mkdtemp(prefix="autoheader_geometry_")
+    try:
+        print(f"{'secciones':>9}  {'COM total':>9}  {'geometría':>9}")
+        for secciones in args.secciones:
+            total, geometria = medir(trabajo, secciones)
+            print(f"{secciones:>9}  {total:>9}  {geometria:>9}")
+    finally:
+        shutil.rmtree(trabajo, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,88 @@
+"""
+Benchmark de escalado del estampado sin Word
+Estampa el mismo lote de documentos sintéticos con distinto número de procesos
+y muestra documentos/segundo y aceleración respecto a un proceso.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_parallel_stamp
+    python -m benchmarks.bench_parallel_stamp --documentos 400 --procesos 1 2 4 8 16
+
+La aceleración está limitada por los núcleos disponibles (se muestran al inicio).
+"""
+
+import argparse
+import os
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+from benchmarks.corpus import escribir_docx
+from src.parallel_stamper import ParallelStampRunner, TrabajoEstampado
+
+OPCIONES = {
+    'add_logo': True, 'add_folder_code': True, 'add_header_line': True,
+    'add_footer_line': True, 'add_author': True, 'add_page_number': True,
+}
+
+
+def preparar_lote(trabajo, documentos, semilla=7):
+    """Documentos de tamaños variados (la mayoría pequeños, algunos grandes) y un logo"""
+    rnd = random.Random(semilla)
+    origen = os.path.join(trabajo, "origen")
+    os.makedirs(origen)
+    ruta_logo = os.path.join(trabajo, "logo.png")
+    Image.new('RGB', (600, 200), (255, 105, 180)).save(ruta_logo)
+
+    trabajos = []
+    for i in range(documentos):
+        parrafos = rnd.choice([200, 500, 1000, 2000, 20000]) if i % 10 else 60000
+        archivo = f"CAL-05-Documento {i}.docx"
+        escribir_docx(os.path.join(origen, archivo), parrafos=parrafos)
+        trabajos.append(TrabajoEstampado(os.path.join(origen, archivo), None, archivo, "CAL-05"))
+    return ruta_logo, trabajos
+
+
+def medir(ruta_logo, trabajos, procesos, destino):
+    shutil.rmtree(destino, ignore_errors=True)
+    lote = [t._replace(carpeta_destino=destino) for t in trabajos]
+    runner = ParallelStampRunner(ruta_logo, "Autor Benchmark", OPCIONES, max_workers=procesos,
+                                 omitir_estampados=False)
+    inicio = time.perf_counter()
+    correctos = runner.ejecutar(lote)
+    duracion = time.perf_counter() - inicio
+    if correctos != len(trabajos):
+        raise RuntimeError(f"{len(trabajos) - correctos} documentos fallaron con {procesos} procesos")
+    return duracion
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Escalado del estampado sin Word")
+    parser.add_argument('--documentos', type=int, default=200)
+    parser.add_argument('--procesos', type=int, nargs='+', default=[1, 2, 4, 8, 16])
+    args = parser.parse_args(argv)
+
+    trabajo = tempfile.mkdtemp(prefix="autoheader_parallel_")
+    try:
+        ruta_logo, trabajos = preparar_lote(trabajo, args.documentos)
+        mb = sum(os.path.getsize(t.ruta_origen) for t in trabajos) / (1024 * 1024)
+        print(f"{len(trabajos)} documentos ({mb:.1f} MB comprimidos), {os.cpu_count()} núcleos")
+
+        base = None
+        for procesos in args.procesos:
+            duracion = medir(ruta_logo, trabajos, procesos, os.path.join(trabajo, "destino"))
+            base = base or duracion
+            print(
+                f"  {procesos:>3} procesos: {duracion:7.2f}s  {len(trabajos) / duracion:7.1f} docs/s  "
+                f"x{base / duracion:.2f}"
+            )
+    finally:
+        shutil.rmtree(trabajo, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,70 @@
+"""
+Benchmark del modelo de la tabla de resultados
+Registra N filas como lo haría una ejecución y mide el coste por fila, la
+memoria por fila y lo que cuesta a la tabla cada refresco: calcular la vista
+(sin filtro, filtrada y ordenada por duración) y leer las filas visibles.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_results_model
+    python -m benchmarks.bench_results_model --filas 100 10000 100000 1000000
+"""
+
+import argparse
+import random
+import sys
+import time
+import tracemalloc
+
+from src.config import RESULTS_TABLE_ROWS
+from src.results_model import ResultsModel, NOMBRES_ESTADO, PROCESADO, COPIADO, FALLIDO
+
+
+def _ms(funcion):
+    inicio = time.perf_counter()
+    resultado = funcion()
+    return (time.perf_counter() - inicio) * 1000, resultado
+
+
+def medir(filas):
+    rng = random.Random(filas)
+    rutas = [f"F:\\Cursos\\CAL-{i % 97:02d}-Curso\\Tema {i // 97}\\CAL-{i % 97:02d}-Documento {i}.docx"
+             for i in range(filas)]
+
+    tracemalloc.start()
+    modelo = ResultsModel()
+    antes = tracemalloc.get_traced_memory()[0]
+    inicio = time.perf_counter()
+    for ruta in rutas:
+        estado = rng.choice((PROCESADO, PROCESADO, PROCESADO, COPIADO, FALLIDO))
+        salida = ruta.replace("F:\\Cursos", "G:\\Destino").replace(".docx", ".pdf") if estado != FALLIDO else ''
+        modelo.registrar(ruta, estado, salida, rng.uniform(0.5, 20.0))
+    registro = (time.perf_counter() - inicio) / filas * 1e6
+    memoria = (tracemalloc.get_traced_memory()[0] - antes) / filas
+    tracemalloc.stop()
+
+    vista_ms, indices = _ms(lambda: modelo.vista())
+    filtro_ms, _ = _ms(lambda: modelo.vista(FALLIDO))
+    orden_ms, _ = _ms(lambda: modelo.vista(orden='duracion', descendente=True))
+    # Lo que pinta la tabla: la ventana visible, esté donde esté la barra de desplazamiento
+    inicio_ventana = max(0, len(indices) - RESULTS_TABLE_ROWS)
+    ventana_ms, _ = _ms(lambda: [modelo.fila(i) for i in indices[inicio_ventana:inicio_ventana + RESULTS_TABLE_ROWS]])
+    return registro, memoria, vista_ms, filtro_ms, orden_ms, ventana_ms
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coste del modelo de la tabla de resultados")
+    parser.add_argument('--filas', type=int, nargs='+', default=[100, 10000, 100000])
+    args = parser.parse_args(argv)
+
+    print(f"Estados: {', '.join(NOMBRES_ESTADO)}")
+    print(f"{'filas':>9}  {'µs/registro':>11}  {'bytes/fila':>10}  {'vista':>8}  "
+          f"{'filtrada':>8}  {'orden dur.':>10}  {'ventana':>8}")
+    for filas in args.filas:
+        registro, memoria, vista, filtro, orden, ventana = medir(filas)
+        print(f"{filas:>9}  {registro:>11.2f}  {memoria:>10.0f}  {vista:>6.2f}ms  "
+              f"{filtro:>6.1f}ms  {orden:>8.1f}ms  {ventana:>6.3f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,76 @@
+"""
+Benchmark de la traza de la ejecución
+Mide lo que cuesta un intervalo con la traza desactivada (la traza nula que
+usa la ejecución normal), activada y con muestreo, desde varios hilos a la
+vez, y cuánto ocupa y tarda en escribirse el JSON resultante.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_trace
+    python -m benchmarks.bench_trace --intervalos 1000000 --hilos 1 4 --muestreo 10
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+
+from src.trace_recorder import TraceRecorder, TRAZA_NULA
+
+PASOS = ("abrir", "encabezado", "pie", "SaveAs DOCX", "SaveAs PDF", "cerrar")
+
+
+def medir_intervalos(traza, intervalos, hilos):
+    """Nanosegundos por intervalo: un `with traza.span(...)` por paso de cada documento"""
+    por_hilo = intervalos // hilos
+    archivos = [f"F:\\Cursos\\CAL-05-Geometría\\CAL-05-Tema {i:04d}.docx" for i in range(1000)]
+
+    def trabajar(indice):
+        for i in range(por_hilo):
+            with traza.span(PASOS[i % len(PASOS)], 'word', archivos[(i // len(PASOS) + indice) % 1000]):
+                pass
+
+    trabajadores = [threading.Thread(target=trabajar, args=(i,)) for i in range(hilos)]
+    inicio = time.perf_counter()
+    for t in trabajadores:
+        t.start()
+    for t in trabajadores:
+        t.join()
+    return (time.perf_counter() - inicio) / (por_hilo * hilos) * 1e9
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Coste de la traza de la ejecución por intervalo y al guardar")
+    parser.add_argument('--intervalos', type=int, default=300000)
+    parser.add_argument('--hilos', type=int, nargs='+', default=[1, 4])
+    parser.add_argument('--muestreo', type=int, default=10, help="1 de cada N archivos en la pasada con muestreo")
+    args = parser.parse_args(argv)
+
+    carpeta = tempfile.mkdtemp(prefix="bench_trace_")
+    try:
+        for hilos in args.hilos:
+            traza = TraceRecorder(os.path.join(carpeta, "trace.json"), max_eventos=args.intervalos)
+            variantes = (
+                ("desactivada", TRAZA_NULA),
+                (f"1 de cada {args.muestreo} archivos", TraceRecorder(traza.ruta, muestreo=args.muestreo)),
+                ("todos los archivos", traza),
+            )
+            for nombre, variante in variantes:
+                ns = medir_intervalos(variante, args.intervalos, hilos)
+                print(f"{hilos} hilo(s), {nombre:<22} {ns:>7.0f} ns por intervalo")
+
+        inicio = time.perf_counter()
+        eventos = traza.guardar()
+        segundos = time.perf_counter() - inicio
+        tamano = os.path.getsize(traza.ruta)
+        print(f"Guardado: {eventos} eventos en {segundos * 1000:.0f} ms, "
+              f"{tamano / 1024 / 1024:.1f} MB ({tamano / max(1, eventos):.0f} bytes por evento)")
+        return 0
+    finally:
+        shutil.rmtree(carpeta, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""
+Benchmark del precalentado de Word
+Simula lo que hace el usuario: añade la primera carpeta, tarda unos segundos
+en terminar de configurar la ejecución y pulsa EMPEZAR. Mide el tiempo hasta
+el primer documento terminado, contado desde EMPEZAR, con el precalentado
+desactivado ('off') y activado ('first_folder').
+
+La mejora real solo se puede medir en Windows con Word instalado. Con --fake
+se usa el Word falso con un arranque simulado de --arranque segundos.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_word_prewarm --configuracion 5
+    python -m benchmarks.bench_word_prewarm --fake --arranque 3
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.bench_word_profile import preparar_documentos
+from benchmarks.fake_gui import FakeGUI
+
+
+def medir(modo, ruta_logo, carpeta, trabajo, configuracion):
+    """
+    Returns:
+        tuple: (segundos desde EMPEZAR hasta el primer documento, segundos de la ejecución completa)
+    """
+    from src.controller import AppController
+
+    destino = os.path.join(trabajo, f"destino-{modo}")
+    shutil.rmtree(destino, ignore_errors=True)
+    os.makedirs(destino)
+
+    controller = AppController()
+    controller.config_manager.set_val('WORD_SESSION', 'prewarm', modo)
+    controller.config_manager.set_val('WORD_SESSION', 'recycle_every_docs', 0)
+    gui = FakeGUI([carpeta], destino, auto_rename=False)
+    gui.var_add_logo.set(True)
+    controller.gui = gui
+    controller.ruta_logo = ruta_logo
+    controller.carpeta_destino = destino
+    try:
+        # Primera carpeta añadida; el usuario sigue eligiendo destino, logo y opciones
+        controller.carpetas_a_procesar = [carpeta]
+        controller._precalentar_word('first_folder')
+        time.sleep(configuracion)
+
+        inicio = time.perf_counter()
+        controller._lanzar_proceso([controller._trabajo_desde_gui()])
+        while controller.procesando:
+            time.sleep(0.01)
+        total = time.perf_counter() - inicio
+    finally:
+        controller.cerrar()
+
+    errores = [l for l in gui.lineas_log if 'ERROR' in l]
+    if errores or controller.segundos_primer_documento is None:
+        raise RuntimeError(f"La ejecución no terminó bien: {errores[:3] or gui.lineas_log[-5:]}")
+    return controller.segundos_primer_documento, total
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo hasta el primer documento con y sin precalentar Word")
+    parser.add_argument('--documentos', type=int, default=10)
+    parser.add_argument('--parrafos', type=int, default=40)
+    parser.add_argument('--configuracion', type=float, default=5.0,
+                        help="Segundos entre añadir la primera carpeta y pulsar EMPEZAR")
+    parser.add_argument('--fake', action='store_true', help="Usar el Word falso (sin Office)")
+    parser.add_argument('--arranque', type=float, default=3.0,
+                        help="Segundos que tarda en arrancar el Word falso (solo con --fake)")
+    args = parser.parse_args(argv)
+
+    if args.fake:
+        from benchmarks.fake_word import ComRecorder, instalar_win32com_falso
+        instalar_win32com_falso(ComRecorder())
+        client = sys.modules['win32com.client']
+        dispatch_ex = client.DispatchEx
+
+        def arranque_lento(prog_id, *a, **k):
+            time.sleep(args.arranque)
+            return dispatch_ex(prog_id, *a, **k)
+        client.DispatchEx = arranque_lento
+
+        import src.word_processor as word_processor
+        word_processor.WORD_PAUSE_AFTER_EDIT = 0
+        word_processor.WORD_PAUSE_AFTER_CLOSE = 0
+    else:
+        try:
+            import pythoncom
+            import win32com.client
+        except ImportError:
+            print("Este benchmark necesita Windows con Word instalado (pywin32); sin Office, usa --fake")
+            return 1
+
+    trabajo = tempfile.mkdtemp(prefix="autoheader_prewarm_")
+    directorio_original = os.getcwd()
+    try:
+        # El controlador crea config.ini en el directorio actual
+        os.chdir(trabajo)
+        ruta_logo, rutas = preparar_documentos(trabajo, args.documentos, args.parrafos)
+        carpeta = os.path.dirname(rutas[0])
+
+        resultados = {modo: medir(modo, ruta_logo, carpeta, trabajo, args.configuracion)
+                      for modo in ('off', 'first_folder')}
+
+        print(f"{'precalentado':>13}  {'primer documento':>17}  {'ejecución':>10}")
+        for modo, (primero, total) in resultados.items():
+            print(f"{modo:>13}  {primero:>16.2f}s  {total:>9.2f}s")
+        print(f"Primer documento {resultados['off'][0] - resultados['first_folder'][0]:.2f}s antes "
+              f"con {args.configuracion:g}s de configuración")
+    finally:
+        os.chdir(directorio_original)
+        shutil.rmtree(trabajo, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
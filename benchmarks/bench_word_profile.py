@@ -0,0 +1,133 @@
+"""
+Benchmark del perfil de la sesión de Word
+Procesa los mismos documentos con el perfil 'interactive' (Word visible,
+ajustes del usuario) y con el perfil 'batch' (invisible, sin alertas ni
+trabajo en segundo plano) y compara el tiempo por documento.
+
+La mejora real solo se puede medir en Windows con Word instalado. Con --fake
+se usa el Word falso para comprobar el flujo (y las escrituras COM de cada
+perfil) en cualquier sistema.
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.bench_word_profile --documentos 30
+    python -m benchmarks.bench_word_profile --fake
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+from PIL import Image
+
+from benchmarks.corpus import escribir_docx
+
+OPCIONES = {
+    'add_logo': True, 'add_folder_code': True, 'add_header_line': True, 'add_footer_line': True,
+    'add_author': True, 'add_page_number': True, 'save_modified_dest': True, 'copy_as_pdf': True,
+}
+
+
+def preparar_documentos(trabajo, cantidad, parrafos):
+    ruta_logo = os.path.join(trabajo, "logo.png")
+    Image.new('RGB', (600, 200), (255, 105, 180)).save(ruta_logo)
+    rutas = []
+    for i in range(cantidad):
+        ruta = os.path.join(trabajo, "origen", f"CAL-05-Documento {i + 1:03d}.docx")
+        os.makedirs(os.path.dirname(ruta), exist_ok=True)
+        escribir_docx(ruta, parrafos=parrafos)
+        rutas.append(ruta)
+    return ruta_logo, rutas
+
+
+def medir(perfil, ruta_logo, rutas, trabajo):
+    """
+    Returns:
+        tuple: (segundos de arranque de Word, lista de segundos por documento)
+    """
+    import pythoncom
+    import src.word_processor as word_processor
+    from src.word_session import WordSession
+
+    destino = os.path.join(trabajo, f"destino-{perfil}")
+    shutil.rmtree(destino, ignore_errors=True)
+
+    pythoncom.CoInitialize()
+    sesion = WordSession(max_documentos=0, max_rss_mb=0, perfil=perfil)
+    try:
+        inicio = time.perf_counter()
+        sesion.iniciar()
+        arranque = time.perf_counter() - inicio
+
+        processor = word_processor.WordProcessor(
+            ruta_logo, "Autor Benchmark", omitir_estampados=False,
+            argumentos_apertura=sesion.argumentos_apertura
+        )
+        duraciones = []
+        for ruta in rutas:
+            inicio = time.perf_counter()
+            if not processor.procesar_docx(sesion.word, ruta, os.path.basename(ruta), "CAL-05",
+                                           destino, lambda m: None, OPCIONES):
+                raise RuntimeError(f"No se pudo procesar {ruta}")
+            duraciones.append(time.perf_counter() - inicio)
+        return arranque, duraciones
+    finally:
+        sesion.cerrar()
+        pythoncom.CoUninitialize()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo por documento con cada perfil de Word")
+    parser.add_argument('--documentos', type=int, default=20)
+    parser.add_argument('--parrafos', type=int, default=40)
+    parser.add_argument('--sin-pausas', action='store_true',
+                        help="Pone a cero las pausas fijas tras editar y cerrar (solo mide Word)")
+    parser.add_argument('--fake', action='store_true', help="Usar el Word falso (sin Office)")
+    args = parser.parse_args(argv)
+
+    recorder = None
+    if args.fake:
+        from benchmarks.fake_word import ComRecorder, instalar_win32com_falso
+        recorder = ComRecorder()
+        instalar_win32com_falso(recorder)
+    else:
+        try:
+            import pythoncom
+            import win32com.client
+        except ImportError:
+            print("Este benchmark necesita Windows con Word instalado (pywin32); sin Office, usa --fake")
+            return 1
+    if args.fake or args.sin_pausas:
+        import src.word_processor as word_processor
+        word_processor.WORD_PAUSE_AFTER_EDIT = 0
+        word_processor.WORD_PAUSE_AFTER_CLOSE = 0
+
+    trabajo = tempfile.mkdtemp(prefix="autoheader_profile_")
+    try:
+        ruta_logo, rutas = preparar_documentos(trabajo, args.documentos, args.parrafos)
+        resultados = {}
+        for perfil in ('interactive', 'batch'):
+            escrituras_previas = sum(recorder.escrituras.values()) if recorder else 0
+            arranque, duraciones = medir(perfil, ruta_logo, rutas, trabajo)
+            escrituras = sum(recorder.escrituras.values()) - escrituras_previas if recorder else None
+            resultados[perfil] = (arranque, duraciones, escrituras)
+
+        print(f"{'perfil':>12}  {'arranque':>9}  {'media/doc':>10}  {'mediana':>9}  {'total':>8}")
+        for perfil, (arranque, duraciones, escrituras) in resultados.items():
+            print(f"{perfil:>12}  {arranque:>8.2f}s  {statistics.mean(duraciones):>9.3f}s  "
+                  f"{statistics.median(duraciones):>8.3f}s  {sum(duraciones):>7.2f}s"
+                  + (f"  ({escrituras} escrituras COM)" if escrituras is not None else ""))
+        base = sum(resultados['interactive'][1])
+        batch = sum(resultados['batch'][1])
+        if batch:
+            print(f"Mejora del perfil batch: x{base / batch:.2f}")
+    finally:
+        shutil.rmtree(trabajo, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,167 @@
+"""
+Generador de árboles de carpetas sintéticos para benchmarks
+Reproduce las convenciones de nombres reales (CAL-05-*, 01 - Intro - *),
+subcarpetas anidadas, anexos y nombres excluidos
+"""
+
+import os
+import random
+import zipfile
+
+
+# Exclusiones que usa el benchmark (mismo formato que config.ini)
+EXCLUSIONES_PROCESAR = "_,solución,solucion"
+EXCLUSIONES_COPIAR = "_privado"
+
+CONTENT_TYPES_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" ContentType="{tipo}"/>'
+    '</Types>'
+)
+TIPO_DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"
+TIPO_DOCM = "application/vnd.ms-word.document.macroEnabled.main+xml"
+RELS_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="word/document.xml"/>'
+    '</Relationships>'
+)
+DOCUMENT_XML = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"'
+    ' xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<w:body>{parrafos}<w:sectPr><w:pgSz w:w="11906" w:h="16838"/></w:sectPr></w:body></w:document>'
+)
+
+PREFIJOS_CODIGO = ["CAL", "MAT", "DOC", "FIS", "QUI", "HIS"]
+TEMAS = ["Geometría", "Álgebra", "Teoría", "Ejercicios", "Resumen", "Prácticas", "Examen"]
+EXTENSIONES_ANEXO = [".pdf", ".png", ".xlsx", ".txt"]
+
+
+def escribir_docx(ruta, parrafos=5, macro=False):
+    """
+    Escribe un paquete OOXML mínimo pero válido
+
+    Args:
+        ruta (str): Ruta del archivo a crear
+        parrafos (int): Número de párrafos de relleno en word/document.xml
+        macro (bool): True para el tipo de contenido de .docm
+    """
+    cuerpo = "".join(f"<w:p><w:r><w:t>Párrafo {i}</w:t></w:r></w:p>" for i in range(parrafos))
+    with zipfile.ZipFile(ruta, 'w', zipfile.ZIP_DEFLATED) as z:
+        z.writestr('[Content_Types].xml', CONTENT_TYPES_XML.format(tipo=TIPO_DOCM if macro else TIPO_DOCX))
+        z.writestr('_rels/.rels', RELS_XML)
+        z.writestr('word/document.xml', DOCUMENT_XML.format(parrafos=cuerpo))
+
+
+def contenido_pdf(paginas=1):
+    """
+    Genera un PDF mínimo válido (con tabla xref correcta)
+
+    Args:
+        paginas (int): Número de páginas en blanco
+
+    Returns:
+        bytes: Contenido del PDF
+    """
+    objetos = [
+        b"<</Type/Catalog/Pages 2 0 R>>",
+        ("<</Type/Pages/Kids[%s]/Count %d>>" % (
+            " ".join(f"{3 + i} 0 R" for i in range(paginas)), paginas)).encode('ascii'),
+    ]
+    objetos += [b"<</Type/Page/Parent 2 0 R/MediaBox[0 0 595 842]>>"] * paginas
+
+    salida = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for i, obj in enumerate(objetos, start=1):
+        offsets.append(len(salida))
+        salida += b"%d 0 obj\n" % i + obj + b"\nendobj\n"
+    inicio_xref = len(salida)
+    salida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    for offset in offsets:
+        salida += b"%010d 00000 n \n" % offset
+    salida += b"trailer\n<</Size %d/Root 1 0 R>>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, inicio_xref)
+    return bytes(salida)
+
+
+def _nombre_carpeta(rng, indice):
+    """Alterna los dos formatos de código de carpeta"""
+    tema = rng.choice(TEMAS)
+    if indice % 2 == 0:
+        return f"{rng.choice(PREFIJOS_CODIGO)}-{indice:02d}-{tema}"
+    return f"{indice:02d} - {tema} - Parte {indice % 3 + 1}"
+
+
+def _nombre_archivo(rng, indice, extension, etiqueta=""):
+    """Genera un nombre con patrón automático, sin patrón o excluido"""
+    tema = etiqueta + rng.choice(TEMAS)
+    tipo = indice % 8
+    if tipo in (0, 1, 2):
+        return f"{rng.choice(PREFIJOS_CODIGO)}-{rng.randint(1, 99):02d}-{tema} {indice}{extension}"
+    if tipo == 3:
+        return f"{rng.choice(PREFIJOS_CODIGO)}-{rng.randint(1, 99):02d} - {tema} {indice}{extension}"
+    if tipo == 4:
+        return f"01 - Intro - {tema} {indice}{extension}"
+    if tipo == 5:
+        return f"{tema} {indice}{extension}"
+    if tipo == 6:
+        return f"{tema} {indice} solución{extension}"
+    return f"_borrador {tema} {indice}{extension}"
+
+
+def generar_corpus(raiz, carpetas=10, archivos_por_carpeta=20, subcarpetas=2, profundidad=1,
+                   anexos_por_carpeta=5, semilla=0):
+    """
+    Crea un árbol sintético bajo `raiz`
+
+    Args:
+        raiz (str): Carpeta donde se crea el corpus (se crea si no existe)
+        carpetas (int): Carpetas de primer nivel
+        archivos_por_carpeta (int): Documentos Word por carpeta
+        subcarpetas (int): Subcarpetas por carpeta en cada nivel
+        profundidad (int): Niveles de anidamiento por debajo de cada carpeta
+        anexos_por_carpeta (int): Archivos que no son Word por carpeta
+        semilla (int): Semilla para que el corpus sea reproducible
+
+    Returns:
+        dict: Rutas de las carpetas de primer nivel y recuento de archivos creados
+    """
+    rng = random.Random(semilla)
+    os.makedirs(raiz, exist_ok=True)
+    stats = {'carpetas': [], 'word': 0, 'anexos': 0, 'directorios': 0}
+
+    def poblar(directorio, nivel):
+        stats['directorios'] += 1
+        for i in range(archivos_por_carpeta):
+            macro = i % 10 == 9
+            nombre = _nombre_archivo(rng, i, '.docm' if macro else '.docx')
+            escribir_docx(os.path.join(directorio, nombre), macro=macro)
+            stats['word'] += 1
+        for i in range(anexos_por_carpeta):
+            extension = EXTENSIONES_ANEXO[i % len(EXTENSIONES_ANEXO)]
+            nombre = _nombre_archivo(rng, i, extension, etiqueta="Anexo ")
+            with open(os.path.join(directorio, nombre), 'wb') as f:
+                f.write(contenido_pdf() if extension == '.pdf' else os.urandom(256))
+            stats['anexos'] += 1
+        if nivel >= profundidad:
+            return
+        for j in range(subcarpetas):
+            sub = os.path.join(directorio, _nombre_carpeta(rng, j + 1))
+            os.makedirs(sub, exist_ok=True)
+            poblar(sub, nivel + 1)
+        # Una carpeta ignorada por nivel para ejercitar el filtrado de directorios
+        privada = os.path.join(directorio, "_privado")
+        os.makedirs(privada, exist_ok=True)
+        escribir_docx(os.path.join(privada, "CAL-01-Notas internas.docx"))
+        stats['word'] += 1
+
+    for i in range(carpetas):
+        carpeta = os.path.join(raiz, _nombre_carpeta(rng, i))
+        os.makedirs(carpeta, exist_ok=True)
+        poblar(carpeta, 0)
+        stats['carpetas'].append(carpeta)
+
+    return stats
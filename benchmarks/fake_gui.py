@@ -0,0 +1,119 @@
+"""
+GUI sin ventana para ejecutar AppController en benchmarks
+Expone los mismos atributos y métodos que el controlador lee de la GUI real
+"""
+
+import os
+
+
+class FakeVar:
+    """Sustituto de tk.BooleanVar / tk.StringVar"""
+
+    def __init__(self, valor):
+        self.valor = valor
+
+    def get(self):
+        return self.valor
+
+    def set(self, valor):
+        self.valor = valor
+
+
+class FakeText:
+    """Sustituto de tk.Entry / tk.Text (ignora los índices)"""
+
+    def __init__(self, texto=""):
+        self.texto = texto
+
+    def get(self, *args):
+        return self.texto
+
+    def insert(self, indice, texto):
+        self.texto = texto + self.texto
+
+    def delete(self, *args):
+        self.texto = ""
+
+
+class FakeGUI:
+    """GUI mínima: guarda el log en memoria y acepta los diálogos automáticamente"""
+
+    def __init__(self, carpetas, destino, exclusiones_procesar="", exclusiones_copiar="",
+                 autor="Autor Benchmark", auto_rename=True):
+        self.lineas_log = []
+        self.carpetas = list(carpetas)
+
+        self.var_add_logo = FakeVar(False)
+        self.var_add_folder_code = FakeVar(True)
+        self.var_add_header_line = FakeVar(True)
+        self.var_add_footer_line = FakeVar(True)
+        self.var_add_author = FakeVar(True)
+        self.var_add_page_number = FakeVar(True)
+        self.var_respect_structure = FakeVar(True)
+        self.var_copy_attachments = FakeVar(True)
+        self.var_save_modified_dest = FakeVar(True)
+        self.var_copy_as_pdf = FakeVar(True)
+        self.var_auto_rename = FakeVar(auto_rename)
+        self.var_bundle_pdfs = FakeVar(False)
+        self.var_watch_mode = FakeVar(False)
+        self.var_process_docx = FakeVar(True)
+        self.var_process_docm = FakeVar(True)
+
+        self.entry_autor = FakeText(autor)
+        self.entry_destino = FakeText(destino)
+        self.text_no_process = FakeText(exclusiones_procesar)
+        self.text_no_copy = FakeText(exclusiones_copiar)
+
+    def log(self, mensaje):
+        self.lineas_log.append(mensaje)
+
+    def limpiar_log(self):
+        self.lineas_log = []
+
+    def actualizar_progreso(self, valor, texto=None):
+        pass
+
+    def solicitar_raiz_archivo(self, nombre_completo, nombre_sin_ext, nombre_carpeta=None):
+        return nombre_sin_ext
+
+    def mostrar_info(self, titulo, mensaje):
+        pass
+
+    def mostrar_error(self, titulo, mensaje):
+        self.lineas_log.append(f"[{titulo}] {mensaje}")
+
+    def deshabilitar_boton_empezar(self):
+        pass
+
+    def habilitar_boton_empezar(self):
+        pass
+
+    def mostrar_boton_detener(self, comando):
+        self.detener = comando
+
+    def obtener_opciones_completas(self):
+        return {
+            'add_logo': self.var_add_logo.get(),
+            'add_folder_code': self.var_add_folder_code.get(),
+            'add_header_line': self.var_add_header_line.get(),
+            'add_footer_line': self.var_add_footer_line.get(),
+            'add_author': self.var_add_author.get(),
+            'add_page_number': self.var_add_page_number.get(),
+            'autor_nombre': self.entry_autor.get(),
+            'respect_structure': self.var_respect_structure.get(),
+            'copy_attachments': self.var_copy_attachments.get(),
+            'save_modified_dest': self.var_save_modified_dest.get(),
+            'copy_as_pdf': self.var_copy_as_pdf.get(),
+            'bundle_pdfs': self.var_bundle_pdfs.get(),
+            'auto_rename': self.var_auto_rename.get(),
+            'watch_mode': self.var_watch_mode.get(),
+            'process_docx': self.var_process_docx.get(),
+            'process_docm': self.var_process_docm.get(),
+            'carpetas': list(self.carpetas),
+            'destino': self.entry_destino.get(),
+            'excepciones_procesar': self.text_no_process.get(),
+            'excepciones_copiar': self.text_no_copy.get()
+        }
+
+    def obtener_carpeta_destino(self):
+        return os.path.normpath(self.entry_destino.get())
@@ -0,0 +1,196 @@
+"""
+Modelo de objetos de Word falso para benchmarks
+Sustituye a win32com/pythoncom en Linux y registra cada llamada que hace
+WordProcessor (lecturas, escrituras y métodos) sin abrir Office
+"""
+
+import os
+import sys
+import types
+from collections import Counter
+
+from benchmarks.corpus import contenido_pdf
+
+
+# Valores numéricos que WordProcessor usa en operaciones aritméticas
+VALORES_NUMERICOS = {
+    'PageWidth': 595.3,
+    'PageHeight': 841.9,
+    'LeftMargin': 70.9,
+    'RightMargin': 70.9,
+    'TopMargin': 70.9,
+    'BottomMargin': 70.9,
+    'Orientation': 0,
+    'Width': 120.0,
+    'Height': 33.7,
+}
+
+# Contenido mínimo escrito por SaveAs según el formato de destino
+CONTENIDO_PDF = contenido_pdf(paginas=2)
+FORMATO_PDF = 17
+
+
+class ComRecorder:
+    """Cuenta las operaciones realizadas sobre el modelo de objetos falso"""
+
+    def __init__(self):
+        self.lecturas = Counter()
+        self.escrituras = Counter()
+        self.llamadas = Counter()
+
+    @property
+    def total(self):
+        return sum(self.lecturas.values()) + sum(self.escrituras.values()) + sum(self.llamadas.values())
+
+    def reiniciar(self):
+        self.lecturas.clear()
+        self.escrituras.clear()
+        self.llamadas.clear()
+
+    def como_dict(self):
+        return {
+            'lecturas': dict(self.lecturas),
+            'escrituras': dict(self.escrituras),
+            'llamadas': dict(self.llamadas),
+            'total': self.total
+        }
+
+
+class FakeComObject:
+    """
+    Objeto COM genérico: cualquier atributo devuelve otro objeto falso,
+    cualquier llamada devuelve otro objeto falso, y todo queda registrado.
+    """
+
+    def __init__(self, recorder, nombre):
+        object.__setattr__(self, '_recorder', recorder)
+        object.__setattr__(self, '_nombre', nombre)
+        object.__setattr__(self, '_valores', {})
+
+    def __getattr__(self, nombre):
+        if nombre.startswith('__'):
+            raise AttributeError(nombre)
+        self._recorder.lecturas[nombre] += 1
+        if nombre in self._valores:
+            return self._valores[nombre]
+        if nombre in VALORES_NUMERICOS:
+            return VALORES_NUMERICOS[nombre]
+        if nombre == 'Fields':
+            return FakeCollection(self._recorder, nombre, 2)
+        return FakeComObject(self._recorder, nombre)
+
+    def __setattr__(self, nombre, valor):
+        self._recorder.escrituras[nombre] += 1
+        self._valores[nombre] = valor
+
+    def __call__(self, *args, **kwargs):
+        self._recorder.llamadas[self._nombre] += 1
+        return FakeComObject(self._recorder, self._nombre)
+
+    def __iter__(self):
+        return iter(())
+
+
+class FakeCollection(FakeComObject):
+    """Colección iterable (Sections, Fields...) con un número fijo de elementos"""
+
+    def __init__(self, recorder, nombre, cantidad):
+        super().__init__(recorder, nombre)
+        object.__setattr__(self, '_cantidad', cantidad)
+
+    def __iter__(self):
+        for _ in range(self._cantidad):
+            elemento = FakeComObject(self._recorder, self._nombre)
+            # Los campos del pie se inspeccionan por su tipo
+            elemento._valores['Type'] = 33
+            yield elemento
+
+    def __len__(self):
+        return self._cantidad
+
+    @property
+    def Count(self):
+        self._recorder.lecturas['Count'] += 1
+        return self._cantidad
+
+
+class FakeDocument(FakeComObject):
+    """Documento abierto: SaveAs escribe un archivo pequeño en disco"""
+
+    def __init__(self, recorder, ruta, secciones):
+        super().__init__(recorder, 'Document')
+        object.__setattr__(self, 'ruta', ruta)
+        object.__setattr__(self, '_secciones', secciones)
+
+    @property
+    def Sections(self):
+        self._recorder.lecturas['Sections'] += 1
+        return FakeCollection(self._recorder, 'Section', self._secciones)
+
+    def SaveAs(self, ruta, FileFormat=None, **kwargs):
+        self._recorder.llamadas['SaveAs'] += 1
+        contenido = CONTENIDO_PDF if FileFormat == FORMATO_PDF else b"PK\x05\x06" + b"\x00" * 18
+        with open(ruta, 'wb') as f:
+            f.write(contenido)
+
+    def ExportAsFixedFormat(self, OutputFileName, ExportFormat=FORMATO_PDF, **kwargs):
+        self._recorder.llamadas['ExportAsFixedFormat'] += 1
+        with open(OutputFileName, 'wb') as f:
+            f.write(CONTENIDO_PDF)
+
+    def Close(self, SaveChanges=False, **kwargs):
+        self._recorder.llamadas['Close'] += 1
+
+
+class FakeDocuments(FakeComObject):
+    """Colección Documents de la aplicación"""
+
+    def __init__(self, recorder, secciones):
+        super().__init__(recorder, 'Documents')
+        object.__setattr__(self, '_secciones', secciones)
+
+    def Open(self, ruta, *args, **kwargs):
+        self._recorder.llamadas['Open'] += 1
+        if not os.path.exists(ruta):
+            raise FileNotFoundError(ruta)
+        return FakeDocument(self._recorder, ruta, self._secciones)
+
+
+class FakeWordApplication(FakeComObject):
+    """Sustituto de Word.Application"""
+
+    def __init__(self, recorder, secciones=1):
+        super().__init__(recorder, 'Application')
+        object.__setattr__(self, 'Documents', FakeDocuments(recorder, secciones))
+
+    def Quit(self, *args, **kwargs):
+        self._recorder.llamadas['Quit'] += 1
+
+
+def instalar_win32com_falso(recorder, secciones=1):
+    """
+    Registra módulos win32com, win32com.client y pythoncom falsos en sys.modules
+    para que el controlador y WordSession funcionen sin Office.
+
+    Args:
+        recorder (ComRecorder): Registro compartido de llamadas
+        secciones (int): Número de secciones de cada documento abierto
+    """
+    def dispatch(prog_id, *args, **kwargs):
+        recorder.llamadas['Dispatch'] += 1
+        return FakeWordApplication(recorder, secciones)
+
+    client = types.ModuleType('win32com.client')
+    client.Dispatch = dispatch
+    client.DispatchEx = dispatch
+    paquete = types.ModuleType('win32com')
+    paquete.client = client
+
+    pythoncom = types.ModuleType('pythoncom')
+    pythoncom.CoInitialize = lambda: None
+    pythoncom.CoUninitialize = lambda: None
+    pythoncom.CoFreeUnusedLibraries = lambda: None
+
+    sys.modules['win32com'] = paquete
+    sys.modules['win32com.client'] = client
+    sys.modules['pythoncom'] = pythoncom
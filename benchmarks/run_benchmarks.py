@@ -0,0 +1,297 @@
+"""
+Suite de benchmarks de Pink Autoheader
+Genera un corpus sintético y mide las fases de escaneo, exclusión, renombrado,
+copia y el controlador completo usando un Word falso (funciona en Linux).
+
+Uso (desde la raíz del repositorio):
+    python -m benchmarks.run_benchmarks --escala 2
+    python -m benchmarks.run_benchmarks --actualizar-baseline
+
+Los resultados se comparan con benchmarks/baseline.json, que solo se escribe con
+--actualizar-baseline. Si alguna fase es más lenta que la baseline por encima de
+la tolerancia, el proceso sale con código 1.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+from benchmarks.corpus import generar_corpus, EXCLUSIONES_PROCESAR, EXCLUSIONES_COPIAR
+from benchmarks.fake_gui import FakeGUI
+from benchmarks.fake_word import ComRecorder, instalar_win32com_falso
+
+RUTA_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+EXTENSIONES_WORD = ['.docx', '.docm']
+
+
+def _lista_exclusiones(texto):
+    return [e.strip().lower() for e in texto.replace('\n', ',').split(',') if e.strip()]
+
+
+def _parametros_corpus(escala):
+    """Tamaño del corpus para una escala dada (escala 1 ≈ 1.300 archivos)"""
+    return {
+        'carpetas': 4 * escala,
+        'archivos_por_carpeta': 40,
+        'subcarpetas': 2,
+        'profundidad': 2,
+        'anexos_por_carpeta': 10,
+    }
+
+
+def _cronometrar(funcion, repeticiones, preparar=None):
+    """Ejecuta `funcion` varias veces y devuelve (mejor tiempo, último resultado)"""
+    mejor = None
+    resultado = None
+    for _ in range(repeticiones):
+        if preparar:
+            preparar()
+        inicio = time.perf_counter()
+        resultado = funcion()
+        duracion = time.perf_counter() - inicio
+        mejor = duracion if mejor is None else min(mejor, duracion)
+    return mejor, resultado
+
+
+def _listar_archivos(carpetas):
+    rutas = []
+    for carpeta in carpetas:
+        for root, dirs, files in os.walk(carpeta):
+            for f in files:
+                rutas.append(os.path.join(root, f))
+    return rutas
+
+
+def bench_escaneo(corpus, repeticiones):
+    """Recorrido de la etapa de escaneo del controlador (lo que entra en la cola de directorios)"""
+    from src.controller import AppController
+    from src.pipeline import ContextoTrabajo
+    contexto = ContextoTrabajo(corpus['carpetas'], None)
+    contexto.exc_process = _lista_exclusiones(EXCLUSIONES_PROCESAR)
+    segundos, total = _cronometrar(
+        lambda: sum(len(d.archivos) for d in AppController._escanear_carpetas(contexto)),
+        repeticiones
+    )
+    return {'segundos': segundos, 'elementos': total}
+
+
+def bench_exclusiones(corpus, repeticiones):
+    from src.file_manager import FileManager
+    from src.utils import archivo_contiene_prohibida
+    nombres = [os.path.basename(r) for r in _listar_archivos(corpus['carpetas'])]
+    exc_procesar = _lista_exclusiones(EXCLUSIONES_PROCESAR)
+    exc_copiar = _lista_exclusiones(EXCLUSIONES_COPIAR)
+
+    def evaluar():
+        excluidos = 0
+        for nombre in nombres:
+            if archivo_contiene_prohibida(nombre, exc_procesar) or FileManager._contiene_exclusion(nombre, exc_copiar):
+                excluidos += 1
+        return excluidos
+
+    segundos, _ = _cronometrar(evaluar, repeticiones)
+    return {'segundos': segundos, 'elementos': len(nombres)}
+
+
+def bench_renombrado(corpus):
+    """Renombra el corpus en el sitio (una sola pasada: la operación no es idempotente en tiempo)"""
+    from src.utils import extraer_codigo, renombrar_archivo_con_codigo
+    exc_copiar = _lista_exclusiones(EXCLUSIONES_COPIAR)
+    pendientes = 0
+    renombrados = 0
+
+    inicio = time.perf_counter()
+    for carpeta in corpus['carpetas']:
+        for root, dirs, files in os.walk(carpeta):
+            codigo = extraer_codigo(os.path.basename(root))
+            for f in files:
+                if any(exc in f.lower() for exc in exc_copiar):
+                    continue
+                exito, _, _, necesita_input = renombrar_archivo_con_codigo(os.path.join(root, f), codigo)
+                if necesita_input:
+                    pendientes += 1
+                elif exito:
+                    renombrados += 1
+    segundos = time.perf_counter() - inicio
+    return {'segundos': segundos, 'elementos': renombrados + pendientes, 'pendientes_manual': pendientes}
+
+
+def bench_copia(corpus, destino, repeticiones):
+    from src.file_manager import FileManager
+
+    def preparar():
+        shutil.rmtree(destino, ignore_errors=True)
+
+    def copiar():
+        for carpeta in corpus['carpetas']:
+            FileManager.copiar_archivos_excepto_word(
+                carpeta, os.path.join(destino, os.path.basename(carpeta)),
+                ",".join(EXTENSIONES_WORD), EXCLUSIONES_COPIAR
+            )
+
+    segundos, _ = _cronometrar(copiar, repeticiones, preparar)
+    return {'segundos': segundos, 'elementos': corpus['anexos']}
+
+
+def bench_controlador(crear_corpus, destino, recorder, repeticiones):
+    """
+    Ejecuta AppController.procesar_archivos completo (renombrado + proceso + anexos).
+    El corpus se regenera antes de cada repetición porque el renombrado lo modifica.
+    """
+    import src.word_processor as word_processor
+    from src.controller import AppController
+
+    # Las pausas de Word no aportan nada con el backend falso
+    word_processor.WORD_PAUSE_AFTER_EDIT = 0
+    word_processor.WORD_PAUSE_AFTER_CLOSE = 0
+
+    mejor = None
+    for _ in range(repeticiones):
+        shutil.rmtree(destino, ignore_errors=True)
+        os.makedirs(destino)
+        corpus = crear_corpus()
+
+        controller = AppController()
+        gui = FakeGUI(corpus['carpetas'], destino, EXCLUSIONES_PROCESAR, EXCLUSIONES_COPIAR)
+        controller.gui = gui
+        controller.carpetas_a_procesar = list(corpus['carpetas'])
+        controller.carpeta_destino = destino
+
+        recorder.reiniciar()
+        inicio = time.perf_counter()
+        controller.procesar_archivos()
+        segundos = time.perf_counter() - inicio
+        mejor = segundos if mejor is None else min(mejor, segundos)
+
+        errores = [l for l in gui.lineas_log if 'ERROR' in l]
+        if errores:
+            raise RuntimeError(f"El controlador registró errores: {errores[:3]}")
+
+    documentos = controller.archivos_procesados
+    return {
+        'segundos': mejor,
+        'elementos': documentos,
+        'llamadas_com': recorder.total,
+        'llamadas_com_por_documento': round(recorder.total / documentos, 1) if documentos else 0,
+    }
+
+
+def ejecutar(escala, repeticiones, semilla):
+    """Ejecuta todas las fases y devuelve el diccionario de resultados"""
+    recorder = ComRecorder()
+    instalar_win32com_falso(recorder)
+
+    resultados = {}
+    trabajo = tempfile.mkdtemp(prefix="autoheader_bench_")
+    directorio_original = os.getcwd()
+    try:
+        # El controlador crea config.ini en el directorio actual
+        os.chdir(trabajo)
+        params = _parametros_corpus(escala)
+
+        inicio = time.perf_counter()
+        corpus = generar_corpus(os.path.join(trabajo, "origen"), semilla=semilla, **params)
+        print(f"Corpus: {corpus['word']} Word, {corpus['anexos']} anexos, {corpus['directorios']} carpetas "
+              f"({time.perf_counter() - inicio:.1f}s)")
+
+        resultados['escaneo'] = bench_escaneo(corpus, repeticiones)
+        resultados['exclusiones'] = bench_exclusiones(corpus, repeticiones)
+        resultados['copia'] = bench_copia(corpus, os.path.join(trabajo, "destino_copia"), repeticiones)
+        resultados['renombrado'] = bench_renombrado(corpus)
+
+        def crear_corpus_controlador():
+            origen = os.path.join(trabajo, "origen_controlador")
+            shutil.rmtree(origen, ignore_errors=True)
+            return generar_corpus(origen, semilla=semilla, **params)
+
+        resultados['controlador'] = bench_controlador(
+            crear_corpus_controlador, os.path.join(trabajo, "destino"), recorder, repeticiones
+        )
+    finally:
+        os.chdir(directorio_original)
+        shutil.rmtree(trabajo, ignore_errors=True)
+
+    for fase in resultados.values():
+        if fase['elementos']:
+            fase['us_por_elemento'] = round(fase['segundos'] / fase['elementos'] * 1e6, 1)
+    return resultados
+
+
+def comparar(resultados, baseline, tolerancia):
+    """
+    Compara el tiempo por elemento de cada fase con la baseline
+
+    Returns:
+        list: Descripciones de las regresiones encontradas
+    """
+    regresiones = []
+    for fase, actual in resultados.items():
+        previo = baseline.get('fases', {}).get(fase)
+        if not previo or not previo.get('us_por_elemento') or 'us_por_elemento' not in actual:
+            continue
+        ratio = actual['us_por_elemento'] / previo['us_por_elemento']
+        if ratio > 1 + tolerancia:
+            regresiones.append(
+                f"{fase}: {actual['us_por_elemento']} µs/elem vs {previo['us_por_elemento']} (x{ratio:.2f})"
+            )
+    return regresiones
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de Pink Autoheader con Word falso")
+    parser.add_argument('--escala', type=int, default=1, help="Multiplicador del tamaño del corpus")
+    parser.add_argument('--repeticiones', type=int, default=5, help="Repeticiones por fase (se toma la mejor)")
+    parser.add_argument('--semilla', type=int, default=0)
+    parser.add_argument('--baseline', default=RUTA_BASELINE, help="Archivo JSON de referencia")
+    parser.add_argument('--tolerancia', type=float, default=0.5, help="Empeoramiento admitido (0.5 = 50%%)")
+    parser.add_argument('--actualizar-baseline', action='store_true', help="Guardar los resultados como nueva baseline")
+    parser.add_argument('--salida', help="Guardar también los resultados en este JSON")
+    args = parser.parse_args(argv)
+
+    resultados = ejecutar(args.escala, args.repeticiones, args.semilla)
+    informe = {
+        'escala': args.escala,
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'fases': resultados,
+    }
+
+    for fase, datos in resultados.items():
+        print(f"  {fase:<12} {datos['segundos']:8.3f}s  {datos['elementos']:>7} elem  "
+              f"{datos.get('us_por_elemento', 0):>10} µs/elem")
+
+    if args.salida:
+        with open(args.salida, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+
+    if args.actualizar_baseline:
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump(informe, f, indent=2, ensure_ascii=False)
+        print(f"Baseline guardada en {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"⚠ No hay baseline en {args.baseline}; usa --actualizar-baseline para crearla")
+        return 0
+
+    with open(args.baseline, encoding='utf-8') as f:
+        baseline = json.load(f)
+    if baseline.get('escala') != args.escala:
+        print(f"⚠ La baseline es de escala {baseline.get('escala')}; no se compara")
+        return 0
+
+    regresiones = comparar(resultados, baseline, args.tolerancia)
+    for r in regresiones:
+        print(f"❌ REGRESIÓN {r}")
+    if not regresiones:
+        print("✓ Sin regresiones respecto a la baseline")
+    return 1 if regresiones else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
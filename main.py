@@ -3,9 +3,12 @@ Autopdf - Convertidor DOCX a PDF con Encabezado y Pie de Página
 Punto de entrada principal de la aplicación
 """
 
+import argparse
+import multiprocessing
 import tkinter as tk
 from src.gui import GUI
 from src.controller import AppController
+from src.config import TRACE_PATH
 
 try:
     from tkinterdnd2 import TkinterDnD
@@ -15,8 +18,19 @@ except ImportError:
     print("tkinterdnd2 no disponible - drag & drop deshabilitado")
 
 
-def main():
+def main(argv=None):
     """Inicializa y ejecuta la aplicación"""
+    parser = argparse.ArgumentParser(description="Encabezado, pie de página y PDF para documentos Word")
+    parser.add_argument(
+        '--trace', nargs='?', const=TRACE_PATH, default=None, metavar='RUTA',
+        help=f"Guardar una traza de cada ejecución para Perfetto/chrome://tracing (por defecto {TRACE_PATH})"
+    )
+    parser.add_argument(
+        '--job', action='append', default=[], metavar='RUTA',
+        help="Añadir a la cola un archivo de trabajo .ini (se puede repetir)"
+    )
+    args = parser.parse_args(argv)
+
     # Crear ventana principal (con o sin drag & drop según disponibilidad)
     if DRAG_DROP_DISPONIBLE:
         root = TkinterDnD.Tk()
@@ -24,17 +38,27 @@ def main():
         root = tk.Tk()
     
     # Crear controlador (primero, sin GUI)
-    controller = AppController()
+    controller = AppController(ruta_traza=args.trace)
     
     # Crear GUI y pasarle el controlador
     gui = GUI(root, controller)
     
     # Enlazar GUI con el controlador
     controller.set_gui(gui)
+    if args.job:
+        controller.cargar_trabajos(args.job)
     
+    # Al cerrar la ventana, cerrar también el Word precalentado que no se llegó a usar
+    def al_cerrar():
+        controller.cerrar()
+        root.destroy()
+    root.protocol("WM_DELETE_WINDOW", al_cerrar)
+
     # Iniciar loop principal
     root.mainloop()
 
 
 if __name__ == "__main__":
+    # Necesario para el estampado en varios procesos en el ejecutable empaquetado
+    multiprocessing.freeze_support()
     main()
\ No newline at end of file
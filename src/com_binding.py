@@ -0,0 +1,191 @@
+"""
+Vinculación de los objetos COM de Word
+Con vinculación tardía cada acceso a una propiedad o método (Font.Name,
+Shapes.AddLine, Line.ForeColor.RGB...) pregunta antes a Word su DISPID con
+GetIDsOfNames. Con vinculación temprana los objetos se envuelven en las clases
+que genera makepy a partir de la biblioteca de tipos de Word, que ya conocen
+los DISPID. Las clases se guardan en una carpeta propia que se puede generar
+de antemano y distribuir con la aplicación:
+
+    python -m src.com_binding                 (genera .cache/gen_py)
+    python -m src.com_binding --ruta gen_py   (en otra carpeta)
+
+Si la vinculación temprana no está disponible se usa la tardía.
+"""
+
+import argparse
+import os
+import sys
+import threading
+
+import win32com.client
+
+import src.config as config
+from src.config import COM_BINDING_DEFAULT, COM_GENCACHE_DIR, WORD_TYPELIB_CONSTANTS
+
+_lock = threading.Lock()
+_ruta_cache = None
+_avisos = set()
+
+
+def preparar_cache(ruta=COM_GENCACHE_DIR):
+    """
+    Usa `ruta` para las clases generadas en lugar de la carpeta temporal de win32com
+
+    Returns:
+        module: win32com.client.gencache ya apuntando a `ruta`
+    """
+    global _ruta_cache
+    import win32com
+    from win32com.client import gencache
+
+    ruta = os.path.abspath(ruta)
+    with _lock:
+        if _ruta_cache != ruta:
+            os.makedirs(ruta, exist_ok=True)
+            win32com.__gen_path__ = ruta
+            sys.modules['win32com.gen_py'].__path__ = [ruta]
+            # Una carpeta distribuida sin permiso de escritura solo se lee
+            gencache.is_readonly = not os.access(ruta, os.W_OK)
+            gencache.__init__()
+            _ruta_cache = ruta
+    return gencache
+
+
+def despachar(prog_id, nueva_instancia=False, vinculacion=COM_BINDING_DEFAULT, ruta_cache=COM_GENCACHE_DIR,
+              log_callback=None):
+    """
+    Crea el objeto COM con la vinculación pedida
+
+    Args:
+        prog_id (str): ProgID, p. ej. 'Word.Application'
+        nueva_instancia (bool): DispatchEx (proceso propio) en lugar de Dispatch
+        vinculacion (str): 'early' o 'late'
+        ruta_cache (str): Carpeta de las clases generadas
+        log_callback (callable): Función para escribir en el log
+
+    Returns:
+        tuple: (objeto, vinculación usada: 'early' o 'late')
+    """
+    if nueva_instancia:
+        objeto = win32com.client.DispatchEx(prog_id)
+    else:
+        objeto = win32com.client.Dispatch(prog_id)
+
+    if vinculacion != 'early':
+        return _tardio(objeto), 'late'
+    try:
+        gencache = preparar_cache(ruta_cache)
+        # Genera (solo la primera vez) las clases de las interfaces que se vayan usando
+        return gencache.EnsureDispatch(objeto._oleobj_), 'early'
+    except Exception as e:
+        _avisar_una_vez(log_callback, f"⚠ Vinculación COM temprana no disponible, se usa la tardía ({e})")
+        return objeto, 'late'
+
+
+def _tardio(objeto):
+    """
+    IDispatch dinámico aunque las clases de Word ya estén generadas (Dispatch
+    las usa en cuanto existen, también las que dejan otras aplicaciones)
+    """
+    try:
+        from win32com.client import dynamic
+    except ImportError:
+        return objeto
+    return dynamic.Dispatch(objeto._oleobj_)
+
+
+def comprobar_constantes(nombres=WORD_TYPELIB_CONSTANTS):
+    """
+    Compara las constantes WD_ de config.py con la biblioteca de tipos de Word.
+    Necesita las clases de Word generadas (tras despachar() con 'early').
+
+    Returns:
+        list: (constante, valor en config.py, nombre en Word, valor en Word o None) de las que no coinciden
+    """
+    from win32com.client import constants
+
+    diferencias = []
+    for constante, nombre_word in nombres.items():
+        valor = getattr(config, constante)
+        valor_word = getattr(constants, nombre_word, None)
+        if valor_word != valor:
+            diferencias.append((constante, valor, nombre_word, valor_word))
+    return diferencias
+
+
+def avisar_constantes(log_callback):
+    """Escribe en el log (una vez por proceso) las constantes que no coinciden con Word"""
+    if 'constantes' in _avisos:
+        return
+    _avisos.add('constantes')
+    try:
+        diferencias = comprobar_constantes()
+    except Exception as e:
+        _avisar(log_callback, f"⚠ No se pudieron comprobar las constantes de Word: {e}")
+        return
+    for linea in _lineas_diferencias(diferencias):
+        _avisar(log_callback, f"⚠ {linea}")
+
+
+def generar(ruta=COM_GENCACHE_DIR, log_callback=print):
+    """
+    Arranca Word y genera de una vez todas las clases de su biblioteca de tipos en
+    `ruta`, para que la aplicación no tenga que generar nada al arrancar
+
+    Returns:
+        list: Diferencias de comprobar_constantes()
+    """
+    import pythoncom
+
+    gencache = preparar_cache(ruta)
+    pythoncom.CoInitialize()
+    word = None
+    try:
+        word = win32com.client.DispatchEx('Word.Application')
+        biblioteca, _ = word._oleobj_.GetTypeInfo().GetContainingTypeLib()
+        atributos = biblioteca.GetLibAttr()
+        gencache.EnsureModule(atributos[0], atributos[1], atributos[3], atributos[4], bForDemand=False)
+        log_callback(f"Clases de Word {atributos[3]}.{atributos[4]} generadas en {os.path.abspath(ruta)}")
+        return comprobar_constantes()
+    finally:
+        if word is not None:
+            word.Quit()
+        word = None
+        pythoncom.CoUninitialize()
+
+
+def _lineas_diferencias(diferencias):
+    for constante, valor, nombre_word, valor_word in diferencias:
+        if valor_word is None:
+            yield f"Constante {constante} = {valor}: Word no define {nombre_word}"
+        else:
+            yield f"Constante {constante} = {valor} en config.py, pero {nombre_word} = {valor_word} en Word"
+
+
+def _avisar_una_vez(log_callback, mensaje):
+    if mensaje not in _avisos:
+        _avisos.add(mensaje)
+        _avisar(log_callback, mensaje)
+
+
+def _avisar(log_callback, mensaje):
+    if log_callback:
+        log_callback(mensaje)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Genera las clases COM de Word y comprueba las constantes de config.py")
+    parser.add_argument('--ruta', default=COM_GENCACHE_DIR, help=f"Carpeta de las clases (por defecto {COM_GENCACHE_DIR})")
+    args = parser.parse_args(argv)
+
+    diferencias = generar(args.ruta)
+    for linea in _lineas_diferencias(diferencias):
+        print(linea)
+    if not diferencias:
+        print(f"Las {len(WORD_TYPELIB_CONSTANTS)} constantes de config.py coinciden con Word")
+    return 1 if diferencias else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,201 @@
+"""
+Perfilador de llamadas COM para WordProcessor
+Envuelve los objetos de Word en proxies que cuentan y cronometran cada lectura,
+escritura y llamada a método, agrupándolas por el método de WordProcessor que las hizo
+"""
+
+import sys
+import time
+import types
+from collections import defaultdict
+
+
+# Métodos de WordProcessor que actúan como "sitio" de las llamadas
+SITIOS_PERFILADOS = (
+    '_insertar_linea_horizontal',
+    '_insertar_logo',
+    'insertar_encabezado',
+    'insertar_pie_pagina',
+    'procesar_docx',
+)
+
+# Resultados que no son objetos COM y se devuelven sin envolver
+TIPOS_SIMPLES = (int, float, str, bool, bytes, type(None), tuple)
+
+PROFUNDIDAD_MAXIMA_PILA = 12
+
+
+class ComProfiler:
+    """Acumula el número de llamadas COM y su duración por documento y para toda la ejecución"""
+
+    def __init__(self):
+        # clave (sitio, operación, miembro) -> [llamadas, segundos]
+        self.total = defaultdict(lambda: [0, 0.0])
+        self.documento = defaultdict(lambda: [0, 0.0])
+        self.documentos_perfilados = 0
+
+    def envolver(self, objeto, nombre='Application'):
+        """Devuelve un proxy que registra todo el acceso a `objeto`"""
+        return _ComProxy(objeto, self, nombre)
+
+    def registrar(self, operacion, miembro, segundos):
+        """
+        Anota una operación COM
+
+        Args:
+            operacion (str): 'get', 'set', 'call' o 'iter'
+            miembro (str): Propiedad o método accedido
+            segundos (float): Duración de la operación
+        """
+        clave = (self._sitio_actual(), operacion, miembro)
+        for tabla in (self.total, self.documento):
+            entrada = tabla[clave]
+            entrada[0] += 1
+            entrada[1] += segundos
+
+    def _sitio_actual(self):
+        """Busca en la pila el método de WordProcessor más cercano"""
+        frame = sys._getframe(2)
+        for _ in range(PROFUNDIDAD_MAXIMA_PILA):
+            if frame is None:
+                break
+            if frame.f_code.co_name in SITIOS_PERFILADOS:
+                return frame.f_code.co_name
+            frame = frame.f_back
+        return 'otros'
+
+    def empezar_documento(self):
+        self.documento.clear()
+
+    def terminar_documento(self):
+        """
+        Cierra el documento actual y devuelve su desglose por sitio
+
+        Returns:
+            list: Líneas de texto para el log
+        """
+        self.documentos_perfilados += 1
+        grupos = defaultdict(lambda: [0, 0.0])
+        for (sitio, operacion, miembro), (llamadas, segundos) in self.documento.items():
+            # En procesar_docx interesa distinguir Open / SaveAs / Close
+            grupo = miembro if sitio == 'procesar_docx' else sitio
+            grupos[grupo][0] += llamadas
+            grupos[grupo][1] += segundos
+
+        total_llamadas = sum(g[0] for g in grupos.values())
+        total_segundos = sum(g[1] for g in grupos.values())
+        detalle = ", ".join(
+            f"{grupo} {llamadas}/{segundos:.2f}s"
+            for grupo, (llamadas, segundos) in sorted(grupos.items(), key=lambda g: -g[1][1])
+        )
+        return [f"    ⏱ COM: {total_llamadas} llamadas, {total_segundos:.2f}s ({detalle})"]
+
+    def tabla_top(self, n=15):
+        """
+        Tabla de las N operaciones con más tiempo acumulado en toda la ejecución
+
+        Returns:
+            list: Líneas de texto para el log
+        """
+        if not self.total:
+            return []
+        filas = sorted(self.total.items(), key=lambda item: -item[1][1])[:n]
+        total_segundos = sum(s for _, s in self.total.values()) or 1.0
+        docs = max(self.documentos_perfilados, 1)
+
+        lineas = [
+            f"Top {len(filas)} operaciones COM ({self.documentos_perfilados} documentos):",
+            f"  {'sitio':<28}{'op':<6}{'miembro':<26}{'llamadas':>9}{'/doc':>7}{'total':>9}{'media':>10}{'%':>6}",
+        ]
+        for (sitio, operacion, miembro), (llamadas, segundos) in filas:
+            lineas.append(
+                f"  {sitio:<28}{operacion:<6}{miembro[:25]:<26}{llamadas:>9}{llamadas / docs:>7.1f}"
+                f"{segundos:>8.2f}s{segundos / llamadas * 1000:>8.2f}ms{segundos / total_segundos * 100:>5.0f}%"
+            )
+        return lineas
+
+
+class _ComProxy:
+    """Proxy transparente sobre un objeto COM que informa al perfilador"""
+
+    __slots__ = ('_obj', '_perfil', '_nombre')
+
+    def __init__(self, objeto, perfil, nombre):
+        object.__setattr__(self, '_obj', objeto)
+        object.__setattr__(self, '_perfil', perfil)
+        object.__setattr__(self, '_nombre', nombre)
+
+    def __getattr__(self, nombre):
+        inicio = time.perf_counter()
+        valor = getattr(self._obj, nombre)
+        duracion = time.perf_counter() - inicio
+
+        if isinstance(valor, types.MethodType):
+            # El coste real se mide al invocarlo
+            return _ComMethodProxy(valor, self._perfil, nombre, duracion)
+
+        self._perfil.registrar('get', nombre, duracion)
+        return _envolver_resultado(valor, self._perfil, nombre)
+
+    def __setattr__(self, nombre, valor):
+        inicio = time.perf_counter()
+        setattr(self._obj, nombre, _desenvolver(valor))
+        self._perfil.registrar('set', nombre, time.perf_counter() - inicio)
+
+    def __call__(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        valor = self._obj(*_desenvolver_args(args), **_desenvolver_kwargs(kwargs))
+        self._perfil.registrar('call', f"{self._nombre}()", time.perf_counter() - inicio)
+        return _envolver_resultado(valor, self._perfil, self._nombre)
+
+    def __iter__(self):
+        iterador = iter(self._obj)
+        while True:
+            inicio = time.perf_counter()
+            try:
+                elemento = next(iterador)
+            except StopIteration:
+                return
+            self._perfil.registrar('iter', self._nombre, time.perf_counter() - inicio)
+            yield _envolver_resultado(elemento, self._perfil, self._nombre)
+
+    def __bool__(self):
+        return bool(self._obj)
+
+
+class _ComMethodProxy:
+    """Método COM ligado: cronometra la invocación (incluida la búsqueda del nombre)"""
+
+    __slots__ = ('_metodo', '_perfil', '_nombre', '_coste_busqueda')
+
+    def __init__(self, metodo, perfil, nombre, coste_busqueda):
+        self._metodo = metodo
+        self._perfil = perfil
+        self._nombre = nombre
+        self._coste_busqueda = coste_busqueda
+
+    def __call__(self, *args, **kwargs):
+        inicio = time.perf_counter()
+        valor = self._metodo(*_desenvolver_args(args), **_desenvolver_kwargs(kwargs))
+        duracion = time.perf_counter() - inicio + self._coste_busqueda
+        self._perfil.registrar('call', self._nombre, duracion)
+        return _envolver_resultado(valor, self._perfil, self._nombre)
+
+
+def _envolver_resultado(valor, perfil, nombre):
+    if isinstance(valor, TIPOS_SIMPLES):
+        return valor
+    return _ComProxy(valor, perfil, nombre)
+
+
+def _desenvolver(valor):
+    """Los argumentos que viajan a COM deben ser los objetos reales, no los proxies"""
+    return valor._obj if isinstance(valor, _ComProxy) else valor
+
+
+def _desenvolver_args(args):
+    return tuple(_desenvolver(a) for a in args)
+
+
+def _desenvolver_kwargs(kwargs):
+    return {k: _desenvolver(v) for k, v in kwargs.items()}
@@ -13,12 +13,36 @@ WINDOW_TITLE = "Convertidor DOCX a PDF con Encabezado y Pie de Página"
 # ============================================
 PALABRAS_PROHIBIDAS_DEFAULT = ["solución", "solucion"]
 
+# ============================================
+# REGLAS DE NOMBRES (código de carpeta y raíz de archivo)
+# ============================================
+# (nombre, expresión regular, plantilla) en orden de prioridad. La expresión se
+# compara con el nombre completo (sin extensión en los archivos) y tiene los
+# grupos "codigo" y "raiz"; la plantilla construye el nombre al renombrar.
+NAMING_RULES_DEFAULT = (
+    # "01 - Introducción - Parte 1" -> código "01 - Introducción", raíz "Parte 1"
+    ('espacios', r'(?P<codigo>.*? - .*?)(?: - (?P<raiz>.*))?', '{codigo} - {raiz}'),
+    # "CAL-05-Patata" -> código "CAL-05", raíz "Patata"
+    ('guiones', r'(?P<codigo>[^-]*-[^-]*)(?:-(?P<raiz>.+)|-?)', '{codigo}-{raiz}'),
+)
+NAMING_DEFAULT_TEMPLATE = '{codigo}-{raiz}'   # Códigos que no encajan en ninguna regla
+
 # ============================================
 # CONFIGURACIÓN DE UI - PREVIEW DE LOGO
 # ============================================
 LOGO_PREVIEW_CONTAINER_HEIGHT = 120  # Altura fija del contenedor de preview en píxeles
 LOGO_PREVIEW_MAX_WIDTH = 750         # Ancho máximo para la imagen del logo
 LOGO_PREVIEW_MAX_HEIGHT = 80         # Alto máximo para la imagen del logo
+LOGO_PREVIEW_CACHE_DIR = ".cache/logo_previews"  # Miniaturas ya generadas
+LOGO_PREVIEW_CACHE_MAX_FILES = 50    # Miniaturas máximas guardadas en disco
+
+# ============================================
+# CONFIGURACIÓN DE UI - TABLA DE RESULTADOS Y LOG
+# ============================================
+RESULTS_TABLE_ROWS = 8               # Filas visibles (las únicas que existen en el Treeview)
+RESULTS_REFRESH_MS = 300             # Intervalo de refresco de la tabla con los cambios acumulados
+RESULTS_WHEEL_ROWS = 3               # Filas que avanza cada paso de la rueda del ratón
+LOG_MAX_LINES = 5000                 # Líneas que conserva el log (se borran las más antiguas)
 
 # ============================================
 # CONSTANTES DE WORD (win32com)
@@ -31,6 +55,15 @@ WD_FORMAT_XML_DOCUMENT = 16  # .docx
 WD_FORMAT_XML_DOCUMENT_MACRO = 13 # .docm
 WD_FORMAT_PDF = 17           # .pdf
 
+# Exportación a PDF (ExportAsFixedFormat)
+WD_EXPORT_FORMAT_PDF = 17
+WD_EXPORT_OPTIMIZE_FOR_PRINT = 0
+WD_EXPORT_OPTIMIZE_FOR_ON_SCREEN = 1   # Reduce la resolución de las imágenes
+WD_EXPORT_ALL_DOCUMENT = 0
+WD_EXPORT_DOCUMENT_CONTENT = 0
+WD_EXPORT_CREATE_NO_BOOKMARKS = 0
+WD_EXPORT_CREATE_HEADING_BOOKMARKS = 1
+
 # Alineación
 WD_ALIGN_PARAGRAPH_RIGHT = 2
 
@@ -48,6 +81,226 @@ WD_FIELD_NUM_PAGES = 26     # Número total de páginas
 # Collapse
 WD_COLLAPSE_START = 1
 
+# Propiedades personalizadas del documento
+MSO_PROPERTY_TYPE_STRING = 4
+
+# Alertas y seguridad de macros
+WD_ALERTS_NONE = 0
+MSO_AUTOMATION_SECURITY_FORCE_DISABLE = 3   # Las macros de .docm no se ejecutan ni preguntan
+
+# Nombre de cada constante WD_ en la biblioteca de tipos de Word, para comprobar
+# los valores copiados a mano (las MSO_ son de la biblioteca de Office y no se comprueban)
+WORD_TYPELIB_CONSTANTS = {
+    'WD_HEADER_FOOTER_PRIMARY': 'wdHeaderFooterPrimary',
+    'WD_FORMAT_XML_DOCUMENT': 'wdFormatDocumentDefault',
+    'WD_FORMAT_XML_DOCUMENT_MACRO': 'wdFormatXMLDocumentMacroEnabled',
+    'WD_FORMAT_PDF': 'wdFormatPDF',
+    'WD_EXPORT_FORMAT_PDF': 'wdExportFormatPDF',
+    'WD_EXPORT_OPTIMIZE_FOR_PRINT': 'wdExportOptimizeForPrint',
+    'WD_EXPORT_OPTIMIZE_FOR_ON_SCREEN': 'wdExportOptimizeForOnScreen',
+    'WD_EXPORT_ALL_DOCUMENT': 'wdExportAllDocument',
+    'WD_EXPORT_DOCUMENT_CONTENT': 'wdExportDocumentContent',
+    'WD_EXPORT_CREATE_NO_BOOKMARKS': 'wdExportCreateNoBookmarks',
+    'WD_EXPORT_CREATE_HEADING_BOOKMARKS': 'wdExportCreateHeadingBookmarks',
+    'WD_ALIGN_PARAGRAPH_RIGHT': 'wdAlignParagraphRight',
+    'WD_WRAP_BEHIND_TEXT': 'wdWrapBehind',
+    'WD_RELATIVE_HORIZONTAL_POSITION_MARGIN': 'wdRelativeHorizontalPositionMargin',
+    'WD_RELATIVE_VERTICAL_POSITION_PARAGRAPH': 'wdRelativeVerticalPositionParagraph',
+    'WD_FIELD_PAGE': 'wdFieldPage',
+    'WD_FIELD_NUM_PAGES': 'wdFieldNumPages',
+    'WD_COLLAPSE_START': 'wdCollapseStart',
+    'WD_ALERTS_NONE': 'wdAlertsNone',
+}
+
+# ============================================
+# VINCULACIÓN COM (clases generadas de la biblioteca de tipos)
+# ============================================
+# 'early': los objetos de Word usan las clases que genera makepy (sin GetIDsOfNames
+# en cada acceso); 'late': IDispatch dinámico. Si 'early' falla se usa 'late'.
+COM_BINDING_DEFAULT = 'early'
+COM_GENCACHE_DIR = ".cache/gen_py"   # Clases generadas (se puede distribuir con la aplicación)
+
+# ============================================
+# HUELLA DE ESTAMPADO
+# ============================================
+STAMP_PROPERTY_NAME = "PinkAutoheaderStamp"  # Propiedad personalizada con la huella
+STAMP_FORMAT_VERSION = 1   # Incrementar si cambia el diseño del encabezado/pie
+
+# Pausas para que Word termine de asentar los cambios (segundos)
+WORD_PAUSE_AFTER_EDIT = 1      # Tras insertar encabezado y pie
+WORD_PAUSE_AFTER_CLOSE = 0.5   # Tras cerrar el documento
+
+# ============================================
+# SESIÓN DE WORD (reciclado en lotes largos)
+# ============================================
+WORD_RECYCLE_EVERY_DOCS = 200    # Reiniciar Word cada N documentos (0 = nunca)
+WORD_RECYCLE_MAX_RSS_MB = 1500   # Reiniciar si WINWORD.EXE supera esta memoria (0 = sin límite)
+THROUGHPUT_WINDOW_DOCS = 50      # Documentos por bloque en el resumen de rendimiento
+
+# Perfil de la sesión: 'batch' (invisible y sin trabajo en segundo plano) o 'interactive'
+WORD_SESSION_PROFILE = 'batch'
+
+# Precalentado: arrancar Word en segundo plano mientras se configura la ejecución.
+# 'first_folder' (al añadir la primera carpeta), 'launch' (al abrir la aplicación) u 'off'
+WORD_PREWARM = 'first_folder'
+WORD_PREWARM_STOP_TIMEOUT = 10   # Segundos que se espera a Word al cerrar la aplicación
+
+# Desconectar complementos COM y plantillas globales en el perfil batch (se reconectan al cerrar)
+WORD_BATCH_DISABLE_ADDINS = True
+
+# Propiedades de Word.Application en el perfil batch (solo afectan a esta instancia)
+WORD_BATCH_APPLICATION = {
+    'Visible': False,
+    'ScreenUpdating': False,
+    'DisplayAlerts': WD_ALERTS_NONE,
+    'AutomationSecurity': MSO_AUTOMATION_SECURITY_FORCE_DISABLE,
+}
+
+# Opciones de Word.Options en el perfil batch. Word las guarda en el perfil del
+# usuario, así que se restauran los valores originales al cerrar la sesión.
+WORD_BATCH_OPTIONS = {
+    'BackgroundSave': False,
+    'Pagination': False,              # Repaginación en segundo plano
+    'CheckSpellingAsYouType': False,
+    'CheckGrammarAsYouType': False,
+    'SaveInterval': 0,                # Autorrecuperación
+}
+
+# Argumentos de Documents.Open en el perfil batch
+WORD_BATCH_OPEN_ARGS = {
+    'ReadOnly': True,
+    'AddToRecentFiles': False,
+    'ConfirmConversions': False,
+    'OpenAndRepair': False,
+    'NoEncodingDialog': True,
+    'Visible': False,
+}
+
+# ============================================
+# COLA DE TRABAJOS
+# ============================================
+JOB_FILE_TYPES = [("Trabajos", "*.ini"), ("Todos los archivos", "*.*")]
+
+# ============================================
+# MODO VIGILANCIA
+# ============================================
+WATCH_DEBOUNCE_SECONDS = 3       # Segundos sin cambios antes de procesar un archivo
+WATCH_POLL_INTERVAL = 5          # Segundos entre comprobaciones si no hay inotify
+
+# ============================================
+# PROCESO EN ETAPAS (escaneo → renombrado → Word → copia)
+# ============================================
+PIPELINE_QUEUE_SIZE = 64         # Elementos máximos en espera entre dos etapas
+PIPELINE_RENAME_WORKERS = 1      # Directorios que se renombran a la vez
+PIPELINE_COPY_WORKERS = 4        # Hilos que copian anexos
+
+# ============================================
+# PREVALIDACIÓN DE PAQUETES WORD
+# ============================================
+PACKAGE_CHECK_WORKERS = 4        # Hilos que validan documentos antes de Word
+
+# ============================================
+# MÉTRICAS (formato de texto de Prometheus)
+# ============================================
+METRICS_PORT = 9464              # Endpoint en 127.0.0.1 (0 = sin endpoint)
+METRICS_FILE = ""                # Archivo que se reescribe periódicamente (vacío = sin archivo)
+METRICS_INTERVAL_SECONDS = 15    # Segundos entre escrituras del archivo
+# Límites de los histogramas de latencia (segundos)
+METRICS_BUCKETS = (0.005, 0.025, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 300)
+
+# ============================================
+# TRAZA DE LA EJECUCIÓN (Chrome trace events / Perfetto)
+# ============================================
+TRACE_PATH = ".cache/trace.json" # Archivo de la traza (se sobrescribe en cada ejecución)
+TRACE_MAX_EVENTS = 200000        # Intervalos de archivos y pasos (~30 MB); después solo fases
+TRACE_SAMPLE_EVERY = 1           # Detalle de 1 de cada N archivos (1 = todos)
+TRACE_MIN_WAIT_SECONDS = 0.001   # Esperas en las colas más cortas no se registran
+
+# ============================================
+# ESCRITURA DIFERIDA AL DESTINO
+# ============================================
+STAGING_DIR = ".cache/staging"   # Área local donde se escriben los resultados
+STAGING_WORKERS = 2              # Hilos que mueven archivos al destino
+STAGING_QUEUE_SIZE = 256         # Archivos en espera antes de frenar a Word
+STAGING_BATCH_SIZE = 16          # Archivos que un hilo toma de la cola de una vez
+STAGING_RETRIES = 3              # Reintentos por archivo
+STAGING_RETRY_DELAY = 1.0        # Segundos antes del primer reintento (se duplica)
+
+# ============================================
+# COPIA ANTICIPADA DE DOCUMENTOS DE ORIGEN
+# ============================================
+PREFETCH_DIR = ".cache/prefetch" # Caché local de documentos que Word abrirá a continuación
+PREFETCH_DEPTH = 3               # Documentos copiados por delante del que procesa Word
+PREFETCH_MAX_MB = 512            # Tamaño máximo de la caché
+PREFETCH_WORKERS = 1             # Hilos que copian documentos
+
+# ============================================
+# PROCESO DISTRIBUIDO (servidor de trabajos y workers)
+# ============================================
+JOB_SERVER_HOST = "127.0.0.1"    # "0.0.0.0" para aceptar workers de otros equipos
+JOB_SERVER_PORT = 8765
+JOB_LEASE_SECONDS = 120          # Un trabajo sin renovar en este tiempo vuelve a la cola
+JOB_MAX_SECONDS = 900            # Tras este tiempo con un documento, el worker deja de renovar su plazo
+JOB_MAX_ATTEMPTS = 3             # Repartos de un trabajo antes de darlo por fallido
+JOB_LOCAL_WORKERS = 0            # Workers que se lanzan en este equipo
+
+# ============================================
+# HISTORIAL DE EJECUCIONES (previsión de costes)
+# ============================================
+HISTORY_DB_PATH = ".cache/run_history.sqlite"   # Relativa a la carpeta de config.ini
+HISTORY_RETENTION_DAYS = 365     # Documentos no vistos en este tiempo se olvidan (0 = nunca)
+HISTORY_MAX_ENTRIES = 100000     # Máximo de documentos guardados
+HISTORY_MAX_RUNS = 1000          # Ejecuciones guardadas
+HISTORY_DEFAULT_DOC_SECONDS = 5.0   # Previsión sin historial
+HISTORY_MIN_SAMPLES = 10         # Muestras mínimas para prever según el tamaño
+HISTORY_EWMA_ALPHA = 0.5         # Peso de la última duración frente a las anteriores
+
+# ============================================
+# PAQUETES DOCX (procesamiento sin Word)
+# ============================================
+DOCX_STREAM_CHUNK_SIZE = 1024 * 1024   # Bytes por lectura al reescribir word/document.xml
+STAMP_ENGINE_DEFAULT = 'word'          # 'word' (COM) o 'package' (sin Word, solo copia .docx)
+PARALLEL_STAMP_WORKERS = 0             # Procesos para el estampado sin Word (0 = uno por núcleo)
+PARALLEL_STAMP_CHUNK_BYTES = 4 * 1024 * 1024   # Documentos pequeños se agrupan hasta este tamaño
+PARALLEL_STAMP_CHUNK_DOCS = 32         # Máximo de documentos por lote enviado a un proceso
+
+# ============================================
+# PERFILES DE EXPORTACIÓN A PDF
+# ============================================
+# "print": máxima calidad, etiquetas de estructura y marcadores de títulos
+# "screen": imágenes a resolución de pantalla, sin etiquetas ni marcadores (PDFs más ligeros)
+PDF_EXPORT_PROFILES = {
+    'print': {
+        'OptimizeFor': WD_EXPORT_OPTIMIZE_FOR_PRINT,
+        'IncludeDocProps': True,
+        'CreateBookmarks': WD_EXPORT_CREATE_HEADING_BOOKMARKS,
+        'DocStructureTags': True,
+        'BitmapMissingFonts': True,
+        'UseISO19005_1': False,
+    },
+    'screen': {
+        'OptimizeFor': WD_EXPORT_OPTIMIZE_FOR_ON_SCREEN,
+        'IncludeDocProps': False,
+        'CreateBookmarks': WD_EXPORT_CREATE_NO_BOOKMARKS,
+        'DocStructureTags': False,
+        'BitmapMissingFonts': False,
+        'UseISO19005_1': False,
+    },
+}
+PDF_EXPORT_DEFAULT_PROFILE = 'print'
+
+# ============================================
+# PDF ÚNICO POR CARPETA
+# ============================================
+PDF_BUNDLE_SUFFIX = " - COMPLETO"   # Nombre: "<código> - COMPLETO.pdf"
+PDF_BUNDLE_WORKERS = 2              # Carpetas que se unen en paralelo
+PDF_BUNDLE_BATCH_FILES = 100        # PDFs en memoria a la vez al unir con pikepdf
+
+# ============================================
+# PERFILADO DE LLAMADAS COM
+# ============================================
+COM_PROFILER_TOP_N = 15          # Filas de la tabla final de operaciones más costosas
+
 # ============================================
 # ESTILOS DE ENCABEZADO
 # ============================================
@@ -1,11 +1,25 @@
 import configparser
 import os
 
+from src.config import (
+    WORD_RECYCLE_EVERY_DOCS, WORD_RECYCLE_MAX_RSS_MB, COM_PROFILER_TOP_N, PDF_BUNDLE_WORKERS, PDF_BUNDLE_BATCH_FILES,
+    PDF_EXPORT_DEFAULT_PROFILE, STAMP_ENGINE_DEFAULT, PARALLEL_STAMP_WORKERS,
+    PIPELINE_QUEUE_SIZE, PIPELINE_RENAME_WORKERS, PIPELINE_COPY_WORKERS, HISTORY_DB_PATH,
+    HISTORY_RETENTION_DAYS, HISTORY_MAX_ENTRIES, WATCH_DEBOUNCE_SECONDS, WATCH_POLL_INTERVAL,
+    STAGING_DIR, STAGING_WORKERS, STAGING_RETRIES, PREFETCH_DIR, PREFETCH_DEPTH, PREFETCH_MAX_MB,
+    JOB_SERVER_HOST, JOB_SERVER_PORT, JOB_LEASE_SECONDS, JOB_MAX_SECONDS, JOB_MAX_ATTEMPTS, JOB_LOCAL_WORKERS,
+    WORD_SESSION_PROFILE, WORD_PREWARM, WORD_BATCH_DISABLE_ADDINS, COM_BINDING_DEFAULT, COM_GENCACHE_DIR,
+    NAMING_RULES_DEFAULT, NAMING_DEFAULT_TEMPLATE, PACKAGE_CHECK_WORKERS,
+    METRICS_PORT, METRICS_FILE, METRICS_INTERVAL_SECONDS, TRACE_PATH, TRACE_MAX_EVENTS, TRACE_SAMPLE_EVERY
+)
+
 class ConfigManager:
     """Gestiona la lectura y escritura del archivo config.ini en inglés"""
 
     def __init__(self, config_file='config.ini'):
         self.config_file = config_file
+        # Las rutas relativas de la configuración son relativas a config.ini, no al directorio actual
+        self.directorio = os.path.dirname(os.path.abspath(config_file))
         self.config = configparser.ConfigParser()
         self._load_defaults()
         self.load()
@@ -30,7 +44,9 @@ class ConfigManager:
             'respect_structure': 'True',
             'copy_attachments': 'True',
             'save_modified_in_dest': 'True',
-            'copy_as_pdf': 'True'
+            'copy_as_pdf': 'True',
+            'bundle_pdfs': 'False',
+            'watch_mode': 'False'
         }
         self.config['PROCESS_EXTENSIONS'] = {
             'process_docx': 'True',
@@ -40,6 +56,98 @@ class ConfigManager:
             'no_process_names': '',
             'no_copy_names': ''
         }
+        reglas_nombres = {'order': ', '.join(nombre for nombre, _, _ in NAMING_RULES_DEFAULT)}
+        for nombre, patron, plantilla in NAMING_RULES_DEFAULT:
+            reglas_nombres[nombre] = patron
+            reglas_nombres[f"{nombre}_template"] = plantilla
+        reglas_nombres['default_template'] = NAMING_DEFAULT_TEMPLATE
+        self.config['NAMING_RULES'] = reglas_nombres
+        self.config['WORD_SESSION'] = {
+            'recycle_every_docs': str(WORD_RECYCLE_EVERY_DOCS),
+            'recycle_max_rss_mb': str(WORD_RECYCLE_MAX_RSS_MB),
+            'profile': WORD_SESSION_PROFILE,
+            'prewarm': WORD_PREWARM,
+            'disable_addins': str(WORD_BATCH_DISABLE_ADDINS),
+            'binding': COM_BINDING_DEFAULT,
+            'type_cache': COM_GENCACHE_DIR
+        }
+        self.config['WATCH'] = {
+            'debounce_seconds': str(WATCH_DEBOUNCE_SECONDS),
+            'poll_interval': str(WATCH_POLL_INTERVAL),
+            'use_inotify': 'True'
+        }
+        self.config['PIPELINE'] = {
+            'queue_size': str(PIPELINE_QUEUE_SIZE),
+            'rename_workers': str(PIPELINE_RENAME_WORKERS),
+            'copy_workers': str(PIPELINE_COPY_WORKERS)
+        }
+        self.config['STAGING'] = {
+            'enabled': 'auto',
+            'path': STAGING_DIR,
+            'workers': str(STAGING_WORKERS),
+            'retries': str(STAGING_RETRIES)
+        }
+        self.config['PREFETCH'] = {
+            'enabled': 'auto',
+            'path': PREFETCH_DIR,
+            'depth': str(PREFETCH_DEPTH),
+            'max_mb': str(PREFETCH_MAX_MB)
+        }
+        self.config['DISTRIBUTED'] = {
+            'enabled': 'False',
+            'host': JOB_SERVER_HOST,
+            'port': str(JOB_SERVER_PORT),
+            'token': '',
+            'lease_seconds': str(JOB_LEASE_SECONDS),
+            'max_job_seconds': str(JOB_MAX_SECONDS),
+            'max_attempts': str(JOB_MAX_ATTEMPTS),
+            'local_workers': str(JOB_LOCAL_WORKERS),
+            'local_backend': 'word'
+        }
+        self.config['HISTORY'] = {
+            'enabled': 'True',
+            'path': HISTORY_DB_PATH,
+            'longest_first': 'True',
+            'retention_days': str(HISTORY_RETENTION_DAYS),
+            'max_entries': str(HISTORY_MAX_ENTRIES)
+        }
+        self.config['STAMPING'] = {
+            'skip_already_stamped': 'True',
+            'engine': STAMP_ENGINE_DEFAULT
+        }
+        self.config['PACKAGE_CHECK'] = {
+            'enabled': 'True',
+            'workers': str(PACKAGE_CHECK_WORKERS),
+            'copy_rejected': 'True'
+        }
+        self.config['PARALLEL_STAMP'] = {
+            'workers': str(PARALLEL_STAMP_WORKERS)
+        }
+        self.config['PDF_EXPORT'] = {
+            'profile': PDF_EXPORT_DEFAULT_PROFILE,
+            'linearize': 'False'
+        }
+        self.config['PDF_BUNDLE'] = {
+            'include_attachments': 'False',
+            'workers': str(PDF_BUNDLE_WORKERS),
+            'batch_files': str(PDF_BUNDLE_BATCH_FILES)
+        }
+        self.config['METRICS'] = {
+            'enabled': 'False',
+            'port': str(METRICS_PORT),
+            'file': METRICS_FILE,
+            'interval_seconds': str(METRICS_INTERVAL_SECONDS)
+        }
+        self.config['TRACE'] = {
+            'enabled': 'False',
+            'path': TRACE_PATH,
+            'max_events': str(TRACE_MAX_EVENTS),
+            'sample_every': str(TRACE_SAMPLE_EVERY)
+        }
+        self.config['PROFILING'] = {
+            'com_profiler': 'False',
+            'com_top_n': str(COM_PROFILER_TOP_N)
+        }
 
     def load(self):
         """Carga la configuración desde el archivo"""
@@ -57,9 +165,27 @@ class ConfigManager:
     def get_bool(self, section, key, default=False):
         return self.config.getboolean(section, key, fallback=default)
 
+    def get_bool_auto(self, section, key, auto):
+        """Como get_bool, pero 'auto' (el valor por defecto) devuelve `auto`"""
+        valor = self.config.get(section, key, fallback='auto').strip().lower()
+        if valor == 'auto':
+            return auto
+        return self.config.getboolean(section, key)
+
+    def get_int(self, section, key, default=0):
+        return self.config.getint(section, key, fallback=default)
+
+    def get_float(self, section, key, default=0.0):
+        return self.config.getfloat(section, key, fallback=default)
+
     def set_val(self, section, key, value):
         self.config.set(section, key, str(value))
         self.save()
 
     def get_str(self, section, key, default=''):
-        return self.config.get(section, key, fallback=default)
\ No newline at end of file
+        return self.config.get(section, key, fallback=default)
+
+    def get_ruta(self, section, key, default=''):
+        """Como get_str, pero una ruta relativa se resuelve junto a config.ini"""
+        ruta = os.path.expanduser(self.get_str(section, key, default).strip())
+        return os.path.join(self.directorio, ruta) if ruta else ruta
\ No newline at end of file
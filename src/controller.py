@@ -4,23 +4,70 @@ Coordina la lógica de negocio entre la GUI y los procesadores
 """
 
 import os
+import queue
+import sqlite3
+import subprocess
+import sys
 import threading
+import time
 import traceback
-import win32com.client
 import psutil
+from collections import namedtuple
+from functools import partial
 from tkinter import filedialog, messagebox
 
 from src.word_processor import WordProcessor
+from src.word_session import WordSession, WordPrewarmer, ThroughputTracker
+from src.com_profiler import ComProfiler
+from src.pdf_bundler import PdfBundler, UNION_DISPONIBLE
+from src.pdf_export import PdfOutputStats, linealizacion_disponible
+from src.parallel_stamper import ParallelStampRunner, TrabajoEstampado
+from src.pipeline import FIN, Etapa, ContadorPendientes, ContextoTrabajo, trazado
+from src.run_history import RunHistory, EtaEstimator, formatear_duracion
+from src.folder_watcher import FolderWatcher, firma_archivo
+from src.staging import DirectoryCache, WriteBehindWriter, es_ruta_de_red
+from src.prefetch import SourcePrefetcher
+from src.job_server import JobServer
+from src.results_model import ResultsModel, NOMBRES_ESTADO, PROCESADO, EXCLUIDO, COPIADO, RENOMBRADO, FALLIDO, AGOTADO, RECHAZADO
+from src.package_check import validar_paquete
+from src.metrics import RunMetrics, MetricsExporter
+from src.trace_recorder import TraceRecorder, TRAZA_NULA, FASE
+from src.job_queue import TrabajoCola, nombre_por_defecto, describir_trabajo, validar_trabajo, cargar_trabajo, guardar_trabajo
 from src.file_manager import FileManager
-from src.utils import extraer_codigo, archivo_contiene_prohibida, renombrar_archivo_con_codigo, construir_nombre_con_codigo
+from src.utils import archivo_contiene_prohibida, renombrar_archivo_con_codigo
+from src.naming_rules import NamingRules, REGLAS_POR_DEFECTO
 from src.config_manager import ConfigManager
+from src.config import (
+    COM_PROFILER_TOP_N, PDF_BUNDLE_WORKERS, PDF_BUNDLE_BATCH_FILES,
+    PDF_EXPORT_PROFILES, PDF_EXPORT_DEFAULT_PROFILE, STAMP_ENGINE_DEFAULT, PARALLEL_STAMP_WORKERS,
+    PIPELINE_QUEUE_SIZE, PIPELINE_RENAME_WORKERS, PIPELINE_COPY_WORKERS, HISTORY_DB_PATH,
+    HISTORY_RETENTION_DAYS, HISTORY_MAX_ENTRIES, HISTORY_DEFAULT_DOC_SECONDS, WATCH_DEBOUNCE_SECONDS,
+    WATCH_POLL_INTERVAL, STAGING_DIR, STAGING_WORKERS, STAGING_RETRIES, PREFETCH_DIR, PREFETCH_DEPTH,
+    PREFETCH_MAX_MB, PREFETCH_WORKERS, JOB_SERVER_HOST, JOB_SERVER_PORT, JOB_LEASE_SECONDS, JOB_MAX_SECONDS, JOB_MAX_ATTEMPTS,
+    JOB_LOCAL_WORKERS, PACKAGE_CHECK_WORKERS, METRICS_PORT, METRICS_FILE,
+    METRICS_INTERVAL_SECONDS, TRACE_PATH, TRACE_MAX_EVENTS, TRACE_SAMPLE_EVERY, JOB_FILE_TYPES,
+    WORD_PREWARM
+)
+
+# Elementos que circulan entre las etapas de un trabajo
+DirectorioEscaneado = namedtuple('DirectorioEscaneado', 'carpeta_origen root archivos')
+TareaWord = namedtuple('TareaWord', 'ruta archivo codigo carpeta_destino root carpeta coste ruta_local', defaults=(None,))
+TareaCopia = namedtuple('TareaCopia', 'ruta_origen ruta_destino codigo root unir_pdf carpeta estado', defaults=(COPIADO,))
+# Resultado de cada trabajo de la cola (conteos: archivos por estado, como ResultsModel.conteos)
+ResumenTrabajo = namedtuple('ResumenTrabajo', 'nombre segundos procesados documentos conteos error')
 
 
 class AppController:
     """Controlador principal que coordina toda la lógica de la aplicación"""
 
-    def __init__(self):
-        """Inicializa el controlador"""
+    def __init__(self, ruta_traza=None):
+        """
+        Inicializa el controlador
+
+        Args:
+            ruta_traza (str): Traza de la ejecución pedida al arrancar (main.py --trace);
+                si no, se usa la sección [TRACE] de config.ini
+        """
         self.gui = None
         self.carpetas_a_procesar = []
         self.carpeta_destino = ""
@@ -28,12 +75,68 @@ class AppController:
         self.procesando = False
         self.total_archivos = 0
         self.archivos_procesados = 0
+        self.historial = None
+        self.eta = None
+        self.escritor = None
+        self._costes = {}
+        self._firmas_procesadas = {}
+        self._detener_vigilancia = threading.Event()
+        # Una fila por archivo de origen para la tabla de resultados
+        self.resultados = ResultsModel()
+        # Documentos rechazados por la prevalidación en la última ejecución: (ruta, motivo)
+        self.rechazados = []
+        # Métricas de la ejecución en curso (None si están desactivadas)
+        self.metricas = None
+        self.ruta_traza = ruta_traza
+        self.traza = TRAZA_NULA
+        self.reglas_nombres = REGLAS_POR_DEFECTO
+        # Trabajos pendientes de la cola (TrabajoCola) y recursos que comparten durante la ejecución
+        self.cola_trabajos = []
+        self.sesion_word = None
+        self.anticipador = None
+        self.directorios_destino = None
+        self._arranques_word = 0
+        self._etiqueta_trabajo = ""
+        # Word arrancado de antemano mientras se configura la ejecución (None si no se usa)
+        self.precalentador = None
+        # perf_counter al pulsar EMPEZAR y segundos hasta el primer documento terminado
+        self._inicio_ejecucion = None
+        self.segundos_primer_documento = None
+        self._salidas_activas = (True, True)
+        # Un solo diálogo de renombrado manual a la vez aunque renombren varios hilos
+        self._lock_dialogo = threading.Lock()
         self.config_manager = ConfigManager()
 
     def set_gui(self, gui):
         """Establece la referencia a la GUI e inicia la carga de configuración"""
         self.gui = gui
         self._cargar_configuracion_inicial()
+        self._precalentar_word('launch')
+
+    def _precalentar_word(self, momento):
+        """
+        Arranca Word en segundo plano si [WORD_SESSION] prewarm coincide con `momento`,
+        para que la ejecución no tenga que esperarlo al pulsar EMPEZAR
+
+        Args:
+            momento (str): 'launch' (al abrir la aplicación) o 'first_folder' (primera carpeta o trabajo)
+        """
+        if self.precalentador is not None or self.procesando:
+            return
+        modo = self.config_manager.get_str('WORD_SESSION', 'prewarm', WORD_PREWARM).strip().lower()
+        if modo != momento:
+            return
+        # En el perfil interactive Dispatch se engancha al Word del usuario; en el distribuido lo usan los workers
+        if WordSession.perfil_desde_config(self.config_manager, self.log) != 'batch' or self.config_manager.get_bool('DISTRIBUTED', 'enabled', False):
+            return
+        self.precalentador = WordPrewarmer(self._nueva_sesion_word, log_callback=self.log)
+        self.precalentador.iniciar()
+
+    def cerrar(self):
+        """Al cerrar la aplicación: cierra el Word precalentado que no llegó a usarse"""
+        if self.precalentador:
+            self.precalentador.detener()
+            self.precalentador = None
 
     def _cargar_configuracion_inicial(self):
         """Carga los valores guardados en el config.ini a la interfaz"""
@@ -67,6 +170,8 @@ class AppController:
             self.gui.var_copy_attachments.set(self.config_manager.get_bool('COPY_OPTIONS', 'copy_attachments', True))
             self.gui.var_save_modified_dest.set(self.config_manager.get_bool('COPY_OPTIONS', 'save_modified_in_dest', True))
             self.gui.var_copy_as_pdf.set(self.config_manager.get_bool('COPY_OPTIONS', 'copy_as_pdf', True))
+            self.gui.var_bundle_pdfs.set(self.config_manager.get_bool('COPY_OPTIONS', 'bundle_pdfs', False))
+            self.gui.var_watch_mode.set(self.config_manager.get_bool('COPY_OPTIONS', 'watch_mode', False))
 
             # Cargar Opciones: Extensiones
             self.gui.var_process_docx.set(self.config_manager.get_bool('PROCESS_EXTENSIONS', 'process_docx', True))
@@ -89,10 +194,11 @@ class AppController:
             self.log(f"⚠ Error al cargar configuración: {e}")
 
     def word_esta_abierto(self):
-        """Verifica si hay alguna instancia de Word abierta"""
+        """Verifica si hay alguna instancia de Word abierta (sin contar la precalentada)"""
+        propios = self.precalentador.pids_propios() if self.precalentador else set()
         try:
             for proceso in psutil.process_iter(['name']):
-                if proceso.info['name'] and proceso.info['name'].lower() == 'winword.exe':
+                if proceso.info['name'] and proceso.info['name'].lower() == 'winword.exe' and proceso.pid not in propios:
                     return True
             return False
         except Exception:
@@ -130,6 +236,7 @@ class AppController:
                 self.carpetas_a_procesar.append(ruta)
                 self.gui.agregar_carpeta_a_lista(ruta)
                 self.log(f"✓ Carpeta agregada: {ruta}")
+                self._precalentar_word('first_folder')
 
     def drop_carpeta(self, event):
         rutas = self.gui.listbox_carpetas.tk.splitlist(event.data)
@@ -139,6 +246,8 @@ class AppController:
                 self.carpetas_a_procesar.append(ruta)
                 self.gui.agregar_carpeta_a_lista(ruta)
                 self.log(f"✓ Carpeta agregada: {ruta}")
+        if self.carpetas_a_procesar:
+            self._precalentar_word('first_folder')
 
     def quitar_carpeta(self):
         index = self.gui.obtener_seleccion_carpeta()
@@ -158,57 +267,22 @@ class AppController:
     def actualizar_progreso(self, texto=None):
         if self.total_archivos > 0:
             porcentaje = (self.archivos_procesados / self.total_archivos) * 100
-            self.gui.actualizar_progreso(porcentaje, texto or f"Procesados: {self.archivos_procesados}/{self.total_archivos}")
+            if not texto:
+                texto = f"{self._etiqueta_trabajo}Procesados: {self.archivos_procesados}/{self.total_archivos}"
+                if self.eta:
+                    texto += f" · quedan ~{formatear_duracion(self.eta.restante())}"
+            self.gui.actualizar_progreso(porcentaje, texto)
 
     def empezar_proceso(self):
         """Valida, guarda configuración y lanza el proceso"""
-        
-        # Validación 1: Logo si está activado
-        if not self.ruta_logo and self.gui.var_add_logo.get():
-            self.gui.mostrar_error("Error", "Debes seleccionar un logo si la opción está activa")
-            return
-        
-        # Validación 2: Carpetas a procesar
-        if not self.carpetas_a_procesar:
-            self.gui.mostrar_error("Error", "Agrega carpetas a procesar")
-            return
-
-        # Validación 3: Carpeta destino válida
-        self.carpeta_destino = os.path.normpath(self.gui.entry_destino.get().strip())
-        if not os.path.isdir(self.carpeta_destino):
-            self.gui.mostrar_error("Error", "Carpeta destino no válida")
-            return
-
-        # ✅ Validación 4: Al menos una opción de salida debe estar activa
-        tiene_salida = (
-            self.gui.var_copy_attachments.get() or 
-            self.gui.var_save_modified_dest.get() or 
-            self.gui.var_copy_as_pdf.get()
-        )
-        
-        if not tiene_salida:
-            self.gui.mostrar_error(
-                "Sin acciones configuradas", 
-                "Debes activar al menos una opción:\n\n" +
-                "• Copiar anexos\n" +
-                "• Guardar modificado en destino\n" +
-                "• Copiar como PDF\n\n" +
-                "De lo contrario, el programa no hará nada."
-            )
+        trabajo = self._trabajo_desde_gui()
+        error = validar_trabajo(trabajo)
+        if error:
+            self.gui.mostrar_error(*error)
             return
+        self.carpeta_destino = os.path.normpath(trabajo.ajustes['destino'])
 
-        # ✅ Validación 5: Si "Añadir Autor" está activado, el campo no puede estar vacío
-        if self.gui.var_add_author.get():
-            autor_texto = self.gui.entry_autor.get().strip()
-            if not autor_texto:
-                self.gui.mostrar_error(
-                    "Campo Autor vacío",
-                    "Has activado 'Añadir Autor' pero el campo está vacío.\n\n" +
-                    "Debes escribir un nombre de autor o desactivar la opción."
-                )
-                return
-
-        # Validación 6: Word debe estar cerrado
+        # Word debe estar cerrado
         if self.word_esta_abierto():
             self.gui.mostrar_error("Word Abierto", "Cierra Word antes de empezar")
             return
@@ -229,6 +303,8 @@ class AppController:
         self.config_manager.set_val('COPY_OPTIONS', 'copy_attachments', self.gui.var_copy_attachments.get())
         self.config_manager.set_val('COPY_OPTIONS', 'save_modified_in_dest', self.gui.var_save_modified_dest.get())
         self.config_manager.set_val('COPY_OPTIONS', 'copy_as_pdf', self.gui.var_copy_as_pdf.get())
+        self.config_manager.set_val('COPY_OPTIONS', 'bundle_pdfs', self.gui.var_bundle_pdfs.get())
+        self.config_manager.set_val('COPY_OPTIONS', 'watch_mode', self.gui.var_watch_mode.get())
 
         self.config_manager.set_val('PROCESS_EXTENSIONS', 'process_docx', self.gui.var_process_docx.get())
         self.config_manager.set_val('PROCESS_EXTENSIONS', 'process_docm', self.gui.var_process_docm.get())
@@ -238,244 +314,1246 @@ class AppController:
         
         self.config_manager.set_val('COPY_OPTIONS', 'auto_rename', self.gui.var_auto_rename.get())
 
+        self._lanzar_proceso([trabajo])
+
+    def _lanzar_proceso(self, trabajos):
+        """Prepara la GUI y ejecuta los trabajos en el hilo del proceso"""
         self.procesando = True
+        self._inicio_ejecucion = time.perf_counter()
+        self._detener_vigilancia.clear()
         self.gui.deshabilitar_boton_empezar()
         self.gui.limpiar_log()
+        self.resultados.limpiar()
         self.archivos_procesados = 0
 
-        threading.Thread(target=self.procesar_archivos, daemon=True).start()
+        if self.precalentador and self.precalentador.activo:
+            # En el hilo que creó el Word precalentado: COM no deja usarlo desde otro
+            self.precalentador.ejecutar(self.procesar_archivos, trabajos)
+        else:
+            threading.Thread(target=self.procesar_archivos, args=(trabajos,), daemon=True).start()
         # self.procesar_archivos()
 
-    def procesar_archivos(self):
-        import pythoncom
-        pythoncom.CoInitialize()
+    def agregar_trabajo(self):
+        """Añade a la cola la configuración actual de la GUI"""
+        trabajo = self._trabajo_desde_gui()
+        error = validar_trabajo(trabajo)
+        if error:
+            self.gui.mostrar_error(*error)
+            return
+        self._encolar(trabajo)
+
+    def _encolar(self, trabajo):
+        self.cola_trabajos.append(trabajo)
+        self.gui.agregar_trabajo_a_lista(describir_trabajo(trabajo))
+        self.log(f"📋 En cola: {describir_trabajo(trabajo)}")
+
+    def cargar_trabajos(self, rutas=None):
+        """
+        Añade a la cola trabajos guardados en archivos. Lo que un archivo no indica
+        se toma de la configuración actual de la GUI.
+
+        Args:
+            rutas (list): Archivos .ini (None = elegirlos en un diálogo)
+        """
+        if rutas is None:
+            rutas = filedialog.askopenfilenames(title="Cargar Trabajos", filetypes=JOB_FILE_TYPES)
+        base = self._trabajo_desde_gui()
+        for ruta in rutas:
+            try:
+                trabajo = cargar_trabajo(ruta, base.ajustes, base.ruta_logo)
+            except ValueError as e:
+                self.gui.mostrar_error("Trabajo no válido", str(e))
+                continue
+            error = validar_trabajo(trabajo)
+            if error:
+                self.gui.mostrar_error(f"{error[0]} ({trabajo.nombre})", error[1])
+                continue
+            self._encolar(trabajo)
+        if self.cola_trabajos:
+            self._precalentar_word('first_folder')
+
+    def guardar_trabajo(self):
+        """Guarda la configuración actual de la GUI como archivo de trabajo"""
+        trabajo = self._trabajo_desde_gui()
+        ruta = filedialog.asksaveasfilename(
+            title="Guardar Trabajo", defaultextension=".ini", filetypes=JOB_FILE_TYPES,
+            initialfile=f"{trabajo.nombre}.ini"
+        )
+        if not ruta:
+            return
+        nombre = os.path.splitext(os.path.basename(ruta))[0]
         try:
-            self.log("=== INICIANDO PROCESO ===")
+            guardar_trabajo(trabajo._replace(nombre=nombre), ruta)
+            self.log(f"✓ Trabajo guardado: {ruta}")
+        except OSError as e:
+            self.gui.mostrar_error("Error", f"No se pudo guardar el trabajo: {e}")
 
-            # Extensiones permitidas
-            exts = []
-            if self.gui.var_process_docx.get(): exts.append('.docx')
-            if self.gui.var_process_docm.get(): exts.append('.docm')
+    def quitar_trabajo(self):
+        index = self.gui.obtener_seleccion_trabajo()
+        if index is not None:
+            self.cola_trabajos.pop(index)
+            self.gui.quitar_trabajo_de_lista(index)
 
-            if not exts:
-                self.log("⚠ No hay extensiones seleccionadas para procesar")
+    def editar_trabajo(self, event=None):
+        """Saca de la cola el trabajo seleccionado y lo pasa a la GUI para modificarlo"""
+        index = self.gui.obtener_seleccion_trabajo()
+        if index is None or self.procesando:
+            return
+        trabajo = self.cola_trabajos.pop(index)
+        self.gui.quitar_trabajo_de_lista(index)
+        self.gui.aplicar_ajustes(trabajo.ajustes)
+        self.carpetas_a_procesar = list(trabajo.ajustes['carpetas'])
+        if trabajo.ruta_logo:
+            self._establecer_logo(trabajo.ruta_logo, origen="del trabajo")
+        self.log(f"✎ Editando el trabajo {trabajo.nombre}: pulsa ➕ para volver a ponerlo en cola")
+
+    def empezar_cola(self):
+        """Ejecuta los trabajos de la cola uno tras otro con la misma sesión de Word"""
+        if not self.cola_trabajos:
+            self.gui.mostrar_error("Cola vacía", "Añade la configuración actual con ➕ o carga trabajos desde archivos")
+            return
+        # Las carpetas pueden haber cambiado desde que se pusieron en cola
+        for trabajo in self.cola_trabajos:
+            error = validar_trabajo(trabajo)
+            if error:
+                self.gui.mostrar_error(f"{error[0]} ({trabajo.nombre})", error[1])
                 return
-
-            # Exclusiones - parsear por comas Y saltos de línea
-            texto_exc_process = self.gui.text_no_process.get('1.0', 'end-1c')
-            texto_exc_copy = self.gui.text_no_copy.get('1.0', 'end-1c')
-
-            # Dividir por comas y saltos de línea, limpiar espacios
-            exc_process = []
-            for item in texto_exc_process.replace('\n', ',').split(','):
-                item = item.strip().lower()
-                if item:
-                    exc_process.append(item)
-
-            exc_copy = []
-            for item in texto_exc_copy.replace('\n', ',').split(','):
-                item = item.strip().lower()
-                if item:
-                    exc_copy.append(item)
-
-            self.log(f"Exclusiones de proceso: {exc_process}")
-            self.log(f"Exclusiones de copia: {exc_copy}")
-
-            # Contar archivos
-            self.total_archivos = 0
-            for c in self.carpetas_a_procesar:
-                for root, dirs, files in os.walk(c):
-                    # Filtrar carpetas excluidas
-                    dirs[:] = [d for d in dirs if not any(exc in d.lower() for exc in exc_process)]
-                    # Contar solo archivos Word no excluidos
-                    for f in files:
-                        if any(f.lower().endswith(e) for e in exts):
-                            if not any(exc in f.lower() for exc in exc_process):
-                                self.total_archivos += 1
-
-            self.log(f"Total archivos a procesar: {self.total_archivos}")
-
-
-            # ============================================================================
-            # ============================================================================
-            # FASE DE RENOMBRADO PREVIO (antes de procesar)
-            # ============================================================================
-
-            # Solo ejecutar si el usuario activó la opción
-            if self.gui.var_auto_rename.get():
-                self.log("\n=== FASE 1: RENOMBRADO DE ARCHIVOS ===")
-
-                # Lista para archivos que necesitan input manual
-                archivos_pendientes = []
-                archivos_renombrados = 0
-
-                # PRIMERA PASADA: Renombrar automáticamente lo que se pueda
-                for carpeta_origen in self.carpetas_a_procesar:
-                    for root, dirs, files in os.walk(carpeta_origen):
-                        # Filtrar carpetas excluidas
-                        dirs[:] = [d for d in dirs if not any(exc in d.lower() for exc in exc_process)]
-                        
-                        # Obtener código de la carpeta actual
-                        codigo = extraer_codigo(os.path.basename(root))
-                        
-                        ###
-                        for f in files:
-                            f_lower = f.lower()
-                            es_word = any(f_lower.endswith(e) for e in exts)
-                            
-                            # Verificar exclusiones
-                            excluido_proceso = any(exc in f_lower for exc in exc_process)
-                            excluido_copia = any(exc in f_lower for exc in exc_copy)
-                            
-                            # Determinar si se debe renombrar
-                            debe_renombrar = False
-                            
-                            # REGLA SIMPLE: Si NO está excluido de copia, se renombra
-                            # (independientemente de si es Word o anexo, y de si está excluido de proceso)
-                            if not excluido_copia:
-                                debe_renombrar = True
-                            
-                            if debe_renombrar:
-                                ruta_completa = os.path.join(root, f)
-                                
-                                exito, nueva_ruta, mensaje, necesita_input = renombrar_archivo_con_codigo(
-                                    ruta_completa,
-                                    codigo
-                                )
-                                
-                                if necesita_input:
-                                    archivos_pendientes.append({
-                                        'ruta': nueva_ruta,
-                                        'codigo': codigo,
-                                        'nombre': mensaje
-                                    })
-                                else:
-                                    self.log(mensaje)
-                                    if exito:
-                                        archivos_renombrados += 1
-                                        
-                                        ###
-                                        
-                                        
-                                        
-                                        
-                                        
-                                        
-
-                # SEGUNDA PASADA: Procesar archivos que necesitan input manual
-                if archivos_pendientes:
-                    self.log(f"\n📝 {len(archivos_pendientes)} archivo(s) requieren definir raíz manualmente\n")
-                    
-                    for pendiente in archivos_pendientes:
-                        nombre_completo = pendiente['nombre']
-                        nombre_sin_ext = os.path.splitext(nombre_completo)[0]
-                        nombre_carpeta = os.path.basename(os.path.dirname(pendiente['ruta']))
-                        
-                        # Llamar al diálogo desde el hilo principal
-                        raiz = self.gui.solicitar_raiz_archivo(nombre_completo, nombre_sin_ext, nombre_carpeta)
-                        
-                        if raiz:
-                            # Construir nuevo nombre y renombrar
-                            extension = os.path.splitext(nombre_completo)[1]
-                            nuevo_nombre = construir_nombre_con_codigo(pendiente['codigo'], raiz, extension)
-                            nueva_ruta = os.path.join(os.path.dirname(pendiente['ruta']), nuevo_nombre)
-                            
-                            try:
-                                # Verificar que no exista ya
-                                if os.path.exists(nueva_ruta) and os.path.abspath(pendiente['ruta']) != os.path.abspath(nueva_ruta):
-                                    self.log(f"⚠️ Ya existe: {nuevo_nombre}")
-                                else:
-                                    os.rename(pendiente['ruta'], nueva_ruta)
-                                    self.log(f"✓ Renombrado (manual): {nombre_completo} → {nuevo_nombre}")
-                                    archivos_renombrados += 1
-                            except Exception as e:
-                                self.log(f"❌ Error al renombrar {nombre_completo}: {e}")
-                        else:
-                            self.log(f"⊗ Renombrado cancelado: {nombre_completo}")
-
-                self.log(f"\n✓ Total renombrados: {archivos_renombrados}\n")
+        if self.word_esta_abierto():
+            self.gui.mostrar_error("Word Abierto", "Cierra Word antes de empezar")
+            return
+        self._lanzar_proceso(list(self.cola_trabajos))
+
+    def _rutas_salida(self, archivo, carpeta_destino):
+        """Rutas de salida de un documento en el destino, para la tabla de resultados"""
+        guardar_modificado, copiar_pdf = self._salidas_activas
+        rutas = []
+        if guardar_modificado:
+            rutas.append(WordProcessor.ruta_copia(archivo, carpeta_destino))
+        if copiar_pdf:
+            rutas.append(WordProcessor.ruta_pdf(archivo, carpeta_destino))
+        return " · ".join(rutas)
+
+    @staticmethod
+    def _primer_error(mensajes):
+        """Primera línea de error de un documento (detalle de la tabla de resultados)"""
+        for mensaje in mensajes:
+            if 'ERROR' in mensaje:
+                return mensaje.strip().lstrip('✗❌ ').strip()
+        return ''
+
+    def _resultado_sin_word(self, resultado):
+        """Vuelca al log y a la barra de progreso un documento estampado sin Word"""
+        for mensaje in resultado.mensajes:
+            self.log(mensaje)
+        trabajo = resultado.trabajo
+        carpeta_destino = self.escritor.ruta_destino(trabajo.carpeta_destino) if self.escritor else trabajo.carpeta_destino
+        if resultado.exito:
+            self.resultados.registrar(
+                trabajo.ruta_origen, PROCESADO, self._rutas_salida(trabajo.archivo, carpeta_destino),
+                resultado.duracion, "ya estampado" if resultado.omitido else ''
+            )
+        else:
+            self.resultados.registrar(
+                trabajo.ruta_origen, AGOTADO if resultado.agotado else FALLIDO,
+                duracion=resultado.duracion or None, detalle=self._primer_error(resultado.mensajes)
+            )
+        if self.eta:
+            self.eta.completar(self._costes.pop(resultado.trabajo.ruta_origen, 0.0), resultado.duracion)
+        if self.metricas and resultado.duracion:
+            self.metricas.observar('document_seconds', resultado.duracion)
+        if self.traza.incluye(trabajo.archivo) and resultado.duracion:
+            # Los procesos de estampado no escriben en la traza: el intervalo se reconstruye al recibir el resultado
+            self.traza.completo(
+                "documento sin Word", 'word', time.perf_counter() - resultado.duracion, resultado.duracion,
+                {'archivo': trabajo.archivo}, hilo="procesos de estampado"
+            )
+        if self.escritor:
+            ruta_copia = WordProcessor.ruta_copia(resultado.trabajo.archivo, resultado.trabajo.carpeta_destino)
+            if os.path.exists(ruta_copia):
+                self.escritor.enviar(ruta_copia)
+        if resultado.exito:
+            if self.historial:
+                self.historial.registrar(resultado.trabajo.ruta_origen, resultado.duracion)
+            self.archivos_procesados += 1
+            self.actualizar_progreso()
+
+    def _renombrar_directorio(self, root, archivos, codigo, exc_copy, regla=None):
+        """
+        Renombra con el código de la carpeta los archivos de un directorio
+
+        Args:
+            root (str): Directorio
+            archivos (list): Nombres de archivo del directorio
+            codigo (str): Código de la carpeta
+            exc_copy (list): Exclusiones de copia (esos archivos no se renombran)
+            regla (NamingRule): Regla de nombres de la carpeta (plantilla del nombre nuevo)
+
+        Returns:
+            tuple: (nombres finales en el mismo orden, número de renombrados)
+        """
+        finales = []
+        pendientes = []
+        renombrados = 0
+        reglas = self.reglas_nombres
+        # Todos los nombres del directorio se analizan de una vez
+        analisis = reglas.analizar_archivos(archivos)
+
+        # PRIMERA PASADA: Renombrar automáticamente lo que se pueda
+        for f, analisis_f in zip(archivos, analisis):
+            # REGLA SIMPLE: Si NO está excluido de copia, se renombra
+            # (independientemente de si es Word o anexo, y de si está excluido de proceso)
+            if any(exc in f.lower() for exc in exc_copy):
+                finales.append(f)
+                continue
+
+            exito, nueva_ruta, mensaje, necesita_input = renombrar_archivo_con_codigo(
+                os.path.join(root, f), codigo, reglas, analisis_f, regla
+            )
+            if necesita_input:
+                pendientes.append((len(finales), nueva_ruta, mensaje))
+                finales.append(f)
             else:
-                self.log("\n⊗ Renombrado automático desactivado\n")
-
-
-
-
-
-            # ============================================================================
-            # FASE DE PROCESAMIENTO (código existente)
-            # ============================================================================
-            self.log("=== FASE 2: PROCESAMIENTO DE DOCUMENTOS ===\n")
-
-            word = win32com.client.Dispatch('Word.Application')
-            word.Visible = True
-
-            processor = WordProcessor(self.ruta_logo, self.gui.entry_autor.get())
-
-            for carpeta_origen in self.carpetas_a_procesar:
-                # Obtener el nombre de la carpeta raíz que se está procesando
-                nombre_carpeta_raiz = os.path.basename(carpeta_origen)
-                
-                for root, dirs, files in os.walk(carpeta_origen):
-                    # Filtrar carpetas excluidas de proceso
-                    dirs[:] = [d for d in dirs if not any(exc in d.lower() for exc in exc_process)]
-
-                    # Calcular ruta relativa para replicar estructura
-                    rel_path = os.path.relpath(root, carpeta_origen)
-                    codigo = extraer_codigo(os.path.basename(root))
-
-                    for f in files:
-                        f_lower = f.lower()
-                        es_word = any(f_lower.endswith(e) for e in exts)
-
-                        # Determinar ruta de destino
-                        if self.gui.var_respect_structure.get():
-                            # Incluir el nombre de la carpeta raíz + estructura interna
-                            if rel_path == '.':
-                                # Estamos en la raíz de carpeta_origen
-                                ruta_dest_final = os.path.join(self.carpeta_destino, nombre_carpeta_raiz, f)
-                            else:
-                                # Estamos en una subcarpeta
-                                ruta_dest_final = os.path.join(self.carpeta_destino, nombre_carpeta_raiz, rel_path, f)
-                        else:
-                            ruta_dest_final = os.path.join(self.carpeta_destino, f)
-
-                        # 1. Si es Word y está excluido de proceso
-                        if es_word and any(exc in f_lower for exc in exc_process):
-                            self.log(f"⊗ Excluido de proceso: {f}")
-                            # ✅ FIX: Verificar AMBAS condiciones: copy_attachments Y exclusiones de copia
-                            if self.gui.var_copy_attachments.get():
-                                if not any(exc in f_lower for exc in exc_copy):
-                                    FileManager.copiar_archivo(os.path.join(root, f), ruta_dest_final, self.log)
-                                else:
-                                    self.log(f"  └─ También excluido de copia")
-                            continue
-
-                        # 2. Si es Word y NO está excluido -> PROCESAR
-                        if es_word:
-                            dest_folder_final = os.path.dirname(ruta_dest_final)
-                            if processor.procesar_docx(word, os.path.join(root, f), f, codigo, dest_folder_final, self.log, self.gui.obtener_opciones_completas()):
-                                self.archivos_procesados += 1
-                                self.actualizar_progreso()
-
-                        # 3. Si NO es Word -> es anexo
-                        else:
-                            # Verificar si está excluido de copia
-                            if any(exc in f_lower for exc in exc_copy):
-                                self.log(f"⊗ Excluido de copia: {f}")
-                            else:
-                                # Copiar si está activado
-                                if self.gui.var_copy_attachments.get():
-                                    FileManager.copiar_archivo(os.path.join(root, f), ruta_dest_final, self.log)
-                                    
-            word.Quit()
+                self.log(mensaje)
+                if exito:
+                    renombrados += 1
+                    self.resultados.registrar(nueva_ruta, RENOMBRADO, detalle=f"antes: {f}")
+                    f = os.path.basename(nueva_ruta)
+                finales.append(f)
+
+        # SEGUNDA PASADA: Archivos que necesitan input manual
+        for posicion, ruta, nombre_completo in pendientes:
+            nombre_sin_ext = os.path.splitext(nombre_completo)[0]
+            nombre_carpeta = os.path.basename(root)
+
+            # Un solo diálogo a la vez aunque haya varios hilos renombrando
+            with self._lock_dialogo:
+                raiz = self.gui.solicitar_raiz_archivo(nombre_completo, nombre_sin_ext, nombre_carpeta)
+
+            if not raiz:
+                self.log(f"⊗ Renombrado cancelado: {nombre_completo}")
+                continue
+
+            extension = os.path.splitext(nombre_completo)[1]
+            nuevo_nombre = reglas.construir_nombre(codigo, raiz, extension, regla)
+            nueva_ruta = os.path.join(root, nuevo_nombre)
+            try:
+                # Verificar que no exista ya
+                if os.path.exists(nueva_ruta) and os.path.abspath(ruta) != os.path.abspath(nueva_ruta):
+                    self.log(f"⚠️ Ya existe: {nuevo_nombre}")
+                else:
+                    os.rename(ruta, nueva_ruta)
+                    self.log(f"✓ Renombrado (manual): {nombre_completo} → {nuevo_nombre}")
+                    self.resultados.registrar(nueva_ruta, RENOMBRADO, detalle=f"antes: {nombre_completo}")
+                    finales[posicion] = nuevo_nombre
+                    renombrados += 1
+            except Exception as e:
+                self.log(f"❌ Error al renombrar {nombre_completo}: {e}")
+
+        return finales, renombrados
+
+    def _trabajo_desde_gui(self, nombre=None):
+        """Trabajo con la configuración actual de la GUI"""
+        ajustes = dict(self.gui.obtener_opciones_completas(), carpetas=list(self.carpetas_a_procesar))
+        return TrabajoCola(nombre or nombre_por_defecto(ajustes), self.ruta_logo, ajustes)
+
+    def procesar_archivos(self, trabajos=None):
+        """
+        Hilo del proceso: ejecuta los trabajos uno tras otro. La sesión de Word, la
+        copia anticipada, la caché de carpetas de destino, las reglas de nombres, la
+        traza y las métricas se crean una sola vez y las comparten todos los trabajos.
+
+        Args:
+            trabajos (list): TrabajoCola a ejecutar; None = la configuración actual de la GUI
+        """
+        import pythoncom
+        pythoncom.CoInitialize()
+        if trabajos is None:
+            trabajos = [self._trabajo_desde_gui()]
+        self.sesion_word = None
+        self.anticipador = None
+        self.directorios_destino = DirectoryCache()
+        self._arranques_word = 0
+        self.segundos_primer_documento = None
+        if self._inicio_ejecucion is None:
+            self._inicio_ejecucion = time.perf_counter()
+        exportador_metricas = None
+        traza = self.traza = TRAZA_NULA
+        inicio_traza = time.perf_counter()
+        try:
+            self.log("=== INICIANDO PROCESO ===")
+            self.reglas_nombres = NamingRules.desde_config(self.config_manager, self.log)
+
+            # Traza de la ejecución (Chrome trace events), desde config.ini o main.py --trace
+            ruta_traza = self.ruta_traza
+            if not ruta_traza and self.config_manager.get_bool('TRACE', 'enabled', False):
+                ruta_traza = self.config_manager.get_str('TRACE', 'path', TRACE_PATH).strip() or TRACE_PATH
+            if ruta_traza:
+                traza = self.traza = TraceRecorder(
+                    ruta_traza,
+                    max_eventos=self.config_manager.get_int('TRACE', 'max_events', TRACE_MAX_EVENTS),
+                    muestreo=self.config_manager.get_int('TRACE', 'sample_every', TRACE_SAMPLE_EVERY)
+                )
+
+            # Métricas para seguir la ejecución desde fuera de la GUI (endpoint local y/o archivo)
+            self.metricas = None
+            if self.config_manager.get_bool('METRICS', 'enabled', False):
+                self.metricas = metricas = RunMetrics()
+                metricas.indicador('files', lambda: [
+                    ((('estado', nombre),), cantidad) for nombre, cantidad in zip(NOMBRES_ESTADO, self.resultados.conteos)
+                ])
+                metricas.indicador('documents_total', lambda: self.total_archivos)
+                metricas.indicador('documents_processed', lambda: self.archivos_procesados)
+                metricas.indicador('eta_seconds', lambda: self.eta.restante() if self.eta else None)
+                metricas.indicador('word_restarts_total', lambda: self.sesion_word.reinicios if self.sesion_word else None)
+                metricas.indicador('time_to_first_document_seconds', lambda: self.segundos_primer_documento)
+                exportador_metricas = MetricsExporter(
+                    metricas,
+                    puerto=self.config_manager.get_int('METRICS', 'port', METRICS_PORT),
+                    ruta_archivo=self.config_manager.get_str('METRICS', 'file', METRICS_FILE).strip(),
+                    intervalo=self.config_manager.get_float('METRICS', 'interval_seconds', METRICS_INTERVAL_SECONDS),
+                    log_callback=self.log
+                )
+                exportador_metricas.iniciar()
+
+            en_cola = len(trabajos) > 1
+            if en_cola and any(t.ajustes.get('watch_mode') for t in trabajos):
+                self.log("⚠ La vigilancia no se usa en la cola de trabajos")
+            resumenes = []
+            for numero, trabajo in enumerate(trabajos, 1):
+                if en_cola:
+                    self.log(f"\n=== TRABAJO {numero}/{len(trabajos)}: {trabajo.nombre} ===")
+                    self._etiqueta_trabajo = f"Trabajo {numero}/{len(trabajos)} · "
+                    self.resultados.nuevo_trabajo()
+                    trabajo = trabajo._replace(ajustes=dict(trabajo.ajustes, watch_mode=False))
+                conteos = list(self.resultados.conteos)
+                inicio = time.perf_counter()
+                error = None
+                try:
+                    self._procesar_trabajo(trabajo)
+                except Exception as e:
+                    if not en_cola:
+                        raise
+                    # Un trabajo que falla no detiene la cola; Word se reinicia (si hay otro documento) por si quedó a medias
+                    error = str(e)
+                    self.log(f"❌ ERROR en el trabajo {trabajo.nombre}: {e}")
+                    self.log(traceback.format_exc())
+                    if self.sesion_word and self.sesion_word.word is not None:
+                        self.sesion_word.reciclar_antes_del_siguiente("error en el trabajo")
+                resumenes.append(ResumenTrabajo(
+                    trabajo.nombre, time.perf_counter() - inicio, self.archivos_procesados, self.total_archivos,
+                    [despues - antes for despues, antes in zip(self.resultados.conteos, conteos)], error
+                ))
+
+            if self.anticipador:
+                for linea in self.anticipador.resumen():
+                    self.log(linea)
+            if self.sesion_word and self.sesion_word.reinicios:
+                self.log(f"Reinicios de Word: {self.sesion_word.reinicios}")
+            if en_cola:
+                for linea in self._resumen_cola(resumenes):
+                    self.log(linea)
+
+            if self.sesion_word:
+                self.sesion_word.cerrar()
             self.log("\n=== ✅ COMPLETADO ===")
-            self.gui.mostrar_info("Completado", "Proceso finalizado con éxito")
+            fallidos = sum(1 for r in resumenes if r.error)
+            if fallidos:
+                self.gui.mostrar_error("Cola de trabajos", f"{fallidos} de {len(resumenes)} trabajos terminaron con error (ver el log)")
+            else:
+                self.gui.mostrar_info("Completado", "Proceso finalizado con éxito")
 
         except Exception as e:
             self.log(f"❌ ERROR: {e}")
             self.log(traceback.format_exc())
             self.gui.mostrar_error("Error", str(e))
         finally:
+            if self.sesion_word:
+                self.sesion_word.cerrar()
+                self.sesion_word = None
+            if self.anticipador:
+                self.anticipador.cerrar()
+                self.anticipador = None
+            if exportador_metricas:
+                exportador_metricas.detener()
+            self.metricas = None
+            if traza.activa:
+                traza.completo("ejecución", FASE, inicio_traza, time.perf_counter() - inicio_traza)
+                try:
+                    eventos = traza.guardar()
+                    descartados = f", {traza.descartados} descartados por el límite" if traza.descartados else ""
+                    self.log(f"Traza guardada en {os.path.abspath(traza.ruta)} ({eventos} eventos{descartados})")
+                except OSError as e:
+                    self.log(f"⚠ No se pudo guardar la traza: {e}")
+            self.traza = TRAZA_NULA
+            self._etiqueta_trabajo = ""
+            self._inicio_ejecucion = None
             pythoncom.CoUninitialize()
             self.procesando = False
-            self.gui.habilitar_boton_empezar()
\ No newline at end of file
+            self.gui.habilitar_boton_empezar()
+
+    def _sesion_word_activa(self):
+        """
+        Sesión de Word de la ejecución. La arranca (con la copia anticipada) el primer
+        trabajo que la necesita, o recoge la precalentada; los siguientes trabajos de
+        la cola la reutilizan.
+        """
+        precalentada = False
+        if self.sesion_word is None:
+            sesion = self.precalentador.tomar_sesion() if self.precalentador else None
+            if sesion is not None:
+                self.sesion_word = sesion
+                precalentada = True
+                self._arranques_word += 1
+                self.log(f"♨ Word precalentado: arrancó en {self.precalentador.segundos_arranque:.1f}s "
+                         f"mientras se configuraba la ejecución")
+            else:
+                self.sesion_word = self._nueva_sesion_word()
+
+            # Copia anticipada: los próximos documentos se copian a disco local mientras Word trabaja
+            profundidad_anticipo = self.config_manager.get_int('PREFETCH', 'depth', PREFETCH_DEPTH)
+            # Con 'auto' se crea aquí y cada trabajo decide si la usa según sus carpetas de origen
+            if self.config_manager.get_bool_auto('PREFETCH', 'enabled', True) and profundidad_anticipo > 0:
+                self.anticipador = SourcePrefetcher(
+                    self.config_manager.get_str('PREFETCH', 'path', PREFETCH_DIR),
+                    max_mb=self.config_manager.get_int('PREFETCH', 'max_mb', PREFETCH_MAX_MB),
+                    log_callback=self.log
+                )
+                self.anticipador.iniciar()
+
+        if self.sesion_word.word is None:
+            inicio = time.perf_counter()
+            with self.traza.span("iniciar Word", FASE):
+                self.sesion_word.iniciar()
+            self._arranques_word += 1
+            self.log(f"Word arrancado en {time.perf_counter() - inicio:.1f}s "
+                     f"(vinculación COM {self.sesion_word.vinculacion_usada})")
+        elif not precalentada:
+            self.log("♨ Se reutiliza la sesión de Word abierta")
+        return self.sesion_word
+
+    def _nueva_sesion_word(self):
+        """WordSession sin arrancar con la configuración de [WORD_SESSION]"""
+        return WordSession.desde_config(self.config_manager, self.log)
+
+    def _resumen_cola(self, resumenes):
+        """Líneas del resumen de la cola de trabajos para el log"""
+        lineas = [f"\n=== RESUMEN DE LA COLA ({len(resumenes)} trabajos) ==="]
+        for resumen in resumenes:
+            if resumen.error:
+                lineas.append(f"  ✗ {resumen.nombre}: {resumen.error} ({formatear_duracion(resumen.segundos)})")
+                continue
+            estados = ", ".join(
+                f"{cantidad} {nombre}" for nombre, cantidad in zip(NOMBRES_ESTADO, resumen.conteos)
+                if cantidad and nombre != 'procesado'
+            )
+            lineas.append(
+                f"  ✓ {resumen.nombre}: {resumen.procesados}/{resumen.documentos} documentos "
+                f"en {formatear_duracion(resumen.segundos)}" + (f" · {estados}" if estados else "")
+            )
+        if self._arranques_word:
+            veces = "1 vez" if self._arranques_word == 1 else f"{self._arranques_word} veces"
+            lineas.append(f"Word arrancado {veces} para {len(resumenes)} trabajos")
+        return lineas
+
+    def _procesar_trabajo(self, trabajo):
+        """
+        Ejecuta un trabajo con los recursos de la ejecución (sesión de Word, copia
+        anticipada, caché de carpetas de destino, traza y métricas)
+
+        Args:
+            trabajo (TrabajoCola): Carpetas, destino, logo, autor y opciones
+        """
+        ajustes = trabajo.ajustes
+        ctx = ContextoTrabajo(
+            list(ajustes['carpetas']), os.path.normpath(ajustes['destino'].strip()),
+            traza=self.traza, metricas=self.metricas
+        )
+        try:
+            if not self._preparar_trabajo(ctx, trabajo):
+                return
+
+            # La vigilancia empieza antes del recorrido para no perder lo que llegue mientras tanto
+            eventos = None
+            if ctx.vigilar:
+                eventos = queue.Queue()
+                ctx.vigilante = FolderWatcher(
+                    ctx.carpetas, eventos.put, exclusiones=ctx.exc_process,
+                    ignorar=[
+                        ctx.carpeta_destino,
+                        self.escritor.carpeta_local if self.escritor else None,
+                        ctx.anticipador.carpeta_local if ctx.anticipador else None
+                    ],
+                    debounce=self.config_manager.get_float('WATCH', 'debounce_seconds', WATCH_DEBOUNCE_SECONDS),
+                    intervalo=self.config_manager.get_float('WATCH', 'poll_interval', WATCH_POLL_INTERVAL),
+                    usar_inotify=self.config_manager.get_bool('WATCH', 'use_inotify', True),
+                    log_callback=self.log
+                )
+                ctx.vigilante.iniciar()
+
+            inicio = time.perf_counter()
+            inicio_reloj = time.time()
+            primer_documento = self._ejecutar_etapas(ctx, self._escanear_carpetas(ctx))
+            self._resumen_trabajo(ctx, inicio, inicio_reloj, primer_documento)
+
+            if ctx.vigilante:
+                self._bucle_vigilancia(ctx, eventos)
+
+            if self.escritor:
+                self.escritor.cerrar()
+                self.escritor = None
+
+        finally:
+            if ctx.vigilante:
+                ctx.vigilante.detener()
+            if self.escritor:
+                self.escritor.cerrar()
+                self.escritor = None
+            if ctx.agrupador_pdf:
+                ctx.agrupador_pdf.finalizar()
+            if ctx.servidor_trabajos:
+                ctx.servidor_trabajos.detener()
+                self._parar_workers(ctx.workers_locales)
+            self.historial = None
+            self.eta = None
+
+    def _preparar_trabajo(self, ctx, trabajo):
+        """
+        Lee los ajustes del trabajo y arranca sus recursos (motor de estampado, historial,
+        escritura diferida, servidor de trabajos, unión de PDFs). Cada recurso queda en
+        `ctx` en cuanto se crea, así que se libera aunque la preparación falle a medias.
+
+        Returns:
+            bool: False si no hay nada que procesar
+        """
+        ajustes = trabajo.ajustes
+        ruta_logo = trabajo.ruta_logo
+
+        # Extensiones permitidas
+        exts = []
+        if ajustes['process_docx']: exts.append('.docx')
+        if ajustes['process_docm']: exts.append('.docm')
+
+        if not exts:
+            self.log("⚠ No hay extensiones seleccionadas para procesar")
+            return False
+        ctx.exts = exts
+
+        # Exclusiones - parsear por comas Y saltos de línea
+        texto_exc_process = ajustes['excepciones_procesar']
+        texto_exc_copy = ajustes['excepciones_copiar']
+
+        # Dividir por comas y saltos de línea, limpiar espacios
+        exc_process = []
+        for item in texto_exc_process.replace('\n', ',').split(','):
+            item = item.strip().lower()
+            if item:
+                exc_process.append(item)
+
+        exc_copy = []
+        for item in texto_exc_copy.replace('\n', ',').split(','):
+            item = item.strip().lower()
+            if item:
+                exc_copy.append(item)
+
+        self.log(f"Exclusiones de proceso: {exc_process}")
+        self.log(f"Exclusiones de copia: {exc_copy}")
+        ctx.exc_process = exc_process
+        ctx.exc_copy = exc_copy
+
+        # Opciones leídas una sola vez: las etapas corren en otros hilos
+        ctx.opciones = opciones = ajustes
+        autor = ajustes['autor_nombre']
+        ctx.respetar_estructura = ajustes['respect_structure']
+        ctx.copiar_anexos = ajustes['copy_attachments']
+        ctx.copiar_pdf = copiar_pdf = ajustes['copy_as_pdf']
+        ctx.guardar_modificado = ajustes['save_modified_dest']
+        ctx.auto_renombrar = ajustes.get('auto_rename', False)
+        self._salidas_activas = (ctx.guardar_modificado, copiar_pdf)
+
+        # ============================================================================
+        # PREPARACIÓN DEL PROCESAMIENTO
+        # ============================================================================
+
+        # Proceso distribuido: los documentos los procesan workers conectados al servidor de trabajos
+        distribuido = self.config_manager.get_bool('DISTRIBUTED', 'enabled', False)
+
+        # Estampado sin Word: solo produce la copia .docx, así que el PDF sigue necesitando Word
+        motor = self.config_manager.get_str('STAMPING', 'engine', STAMP_ENGINE_DEFAULT).strip().lower()
+        motor_paquete = motor == 'package' and not copiar_pdf
+        if motor == 'package':
+            if copiar_pdf:
+                self.log("⚠ El estampado sin Word no genera PDF - se usa Word")
+            elif not distribuido:
+                ctx.estampado_paralelo = ParallelStampRunner(
+                    ruta_logo, autor, opciones,
+                    max_workers=self.config_manager.get_int('PARALLEL_STAMP', 'workers', PARALLEL_STAMP_WORKERS),
+                    omitir_estampados=self.config_manager.get_bool('STAMPING', 'skip_already_stamped', True)
+                )
+
+        if ctx.estampado_paralelo is None and not distribuido:
+            ctx.sesion_word = self._sesion_word_activa()
+        # La copia anticipada solo tiene sentido con Word y, con 'auto', con el origen en la red
+        anticipar_origen = self.config_manager.get_bool_auto(
+            'PREFETCH', 'enabled', any(es_ruta_de_red(c) for c in ctx.carpetas)
+        )
+        ctx.anticipador = self.anticipador if ctx.sesion_word and anticipar_origen else None
+        ctx.rendimiento = ThroughputTracker()
+
+        # Historial de duraciones: previsión de costes, los documentos largos primero y tiempo restante
+        self.historial = None
+        workers_previstos = self.config_manager.get_int('DISTRIBUTED', 'local_workers', JOB_LOCAL_WORKERS)
+        self.eta = EtaEstimator(
+            ctx.estampado_paralelo.max_workers if ctx.estampado_paralelo else (workers_previstos if distribuido else 1)
+        )
+        self._costes = {}
+        if self.config_manager.get_bool('HISTORY', 'enabled', True):
+            self.historial = RunHistory(
+                self.config_manager.get_ruta('HISTORY', 'path', HISTORY_DB_PATH),
+                motor='package' if motor_paquete else 'word',
+                retencion_dias=self.config_manager.get_int('HISTORY', 'retention_days', HISTORY_RETENTION_DAYS),
+                max_entradas=self.config_manager.get_int('HISTORY', 'max_entries', HISTORY_MAX_ENTRIES)
+            )
+            try:
+                self.log(f"Historial de ejecuciones: {self.historial.cargar()} documentos conocidos")
+            except sqlite3.Error as e:
+                self.log(f"⚠ Historial de ejecuciones no disponible: {e}")
+                self.historial = None
+        ctx.mayor_primero = self.historial is not None and self.config_manager.get_bool('HISTORY', 'longest_first', True)
+
+        # Perfilado opcional de llamadas COM (ralentiza ligeramente el proceso)
+        ctx.perfilador = ComProfiler() if self.config_manager.get_bool('PROFILING', 'com_profiler', False) else None
+
+        # Perfil de exportación a PDF y linealización opcional
+        perfil_pdf = self.config_manager.get_str('PDF_EXPORT', 'profile', PDF_EXPORT_DEFAULT_PROFILE).strip().lower()
+        if perfil_pdf not in PDF_EXPORT_PROFILES:
+            self.log(f"⚠ Perfil PDF desconocido '{perfil_pdf}', se usa '{PDF_EXPORT_DEFAULT_PROFILE}'")
+            perfil_pdf = PDF_EXPORT_DEFAULT_PROFILE
+        ctx.perfil_pdf = perfil_pdf
+        linealizar = self.config_manager.get_bool('PDF_EXPORT', 'linearize', False)
+        if linealizar and not linealizacion_disponible():
+            self.log("⚠ Ni pikepdf ni qpdf disponibles - linealización deshabilitada")
+            linealizar = False
+        ctx.estadisticas_pdf = PdfOutputStats()
+
+        ctx.processor = WordProcessor(
+            ruta_logo, autor, perfil_pdf, linealizar,
+            omitir_estampados=self.config_manager.get_bool('STAMPING', 'skip_already_stamped', True),
+            argumentos_apertura=ctx.sesion_word.argumentos_apertura if ctx.sesion_word else None
+        )
+        ctx.processor.traza = ctx.traza
+
+        # Escritura diferida: los resultados se escriben en disco local y se mueven al
+        # destino en segundo plano; cada carpeta de destino se crea una sola vez
+        self.escritor = None
+        # Con 'auto' solo si el destino está en la red: en disco local mover desde el área local es trabajo extra
+        escritura_diferida = self.config_manager.get_bool_auto('STAGING', 'enabled', es_ruta_de_red(ctx.carpeta_destino))
+        if escritura_diferida and not distribuido:
+            self.escritor = WriteBehindWriter(
+                ctx.carpeta_destino,
+                carpeta_local=self.config_manager.get_str('STAGING', 'path', STAGING_DIR),
+                hilos=self.config_manager.get_int('STAGING', 'workers', STAGING_WORKERS),
+                reintentos=self.config_manager.get_int('STAGING', 'retries', STAGING_RETRIES),
+                directorios=self.directorios_destino,
+                log_callback=self.log
+            )
+            self.escritor.iniciar()
+            self.log(f"Escritura diferida al destino (área local: {self.escritor.carpeta_local})")
+        else:
+            ctx.processor.directorios = self.directorios_destino
+
+        ctx.profundidad_anticipo = self.config_manager.get_int('PREFETCH', 'depth', PREFETCH_DEPTH)
+
+        # Servidor de trabajos: los workers (locales o en otros equipos) leen y escriben en
+        # la unidad compartida; aquí solo se reparten los trabajos y se recogen los resultados
+        if distribuido:
+            ctx.servidor_trabajos = JobServer(
+                {
+                    'motor': 'package' if motor_paquete else 'word',
+                    'ruta_logo': os.path.abspath(ruta_logo) if ruta_logo else '',
+                    'autor': autor,
+                    'opciones': opciones,
+                    'perfil_pdf': perfil_pdf,
+                    'linealizar': linealizar,
+                    'omitir_estampados': self.config_manager.get_bool('STAMPING', 'skip_already_stamped', True),
+                },
+                host=self.config_manager.get_str('DISTRIBUTED', 'host', JOB_SERVER_HOST),
+                puerto=self.config_manager.get_int('DISTRIBUTED', 'port', JOB_SERVER_PORT),
+                token=self.config_manager.get_str('DISTRIBUTED', 'token', ''),
+                lease=self.config_manager.get_int('DISTRIBUTED', 'lease_seconds', JOB_LEASE_SECONDS),
+                max_segundos=self.config_manager.get_int('DISTRIBUTED', 'max_job_seconds', JOB_MAX_SECONDS),
+                max_intentos=self.config_manager.get_int('DISTRIBUTED', 'max_attempts', JOB_MAX_ATTEMPTS),
+                log_callback=self.log
+            )
+            ctx.servidor_trabajos.iniciar()
+            self.log(f"Servidor de trabajos en {ctx.servidor_trabajos.url}")
+            ctx.workers_locales = self._lanzar_workers(ctx.servidor_trabajos, workers_previstos)
+            if not ctx.workers_locales:
+                self.log(f"  Esperando workers: python -m src.job_worker --servidor {ctx.servidor_trabajos.url}")
+
+        # PDF único por carpeta: se une en segundo plano al terminar cada carpeta
+        if ajustes['bundle_pdfs'] and copiar_pdf:
+            if UNION_DISPONIBLE:
+                ctx.agrupador_pdf = PdfBundler(
+                    max_workers=self.config_manager.get_int('PDF_BUNDLE', 'workers', PDF_BUNDLE_WORKERS),
+                    log_callback=self.log,
+                    linealizar=linealizar,
+                    archivos_por_lote=self.config_manager.get_int('PDF_BUNDLE', 'batch_files', PDF_BUNDLE_BATCH_FILES)
+                )
+            else:
+                self.log("⚠ pikepdf/pypdf no disponible - PDF único por carpeta deshabilitado")
+        ctx.unir_anexos_pdf = (
+            ctx.agrupador_pdf is not None and self.config_manager.get_bool('PDF_BUNDLE', 'include_attachments', False)
+        )
+
+        # ============================================================================
+        # ETAPAS: escaneo → renombrado → Word → copia de anexos
+        # ============================================================================
+        # Cada directorio pasa a la siguiente etapa en cuanto se lee, así que Word
+        # empieza con el primer documento sin esperar a recorrer todo el árbol.
+        # Las colas son acotadas: si Word va lento, el escaneo y el renombrado esperan.
+        self.log("\n=== PROCESAMIENTO EN ETAPAS ===\n")
+        if not ctx.auto_renombrar:
+            self.log("⊗ Renombrado automático desactivado\n")
+
+        ctx.capacidad = self.config_manager.get_int('PIPELINE', 'queue_size', PIPELINE_QUEUE_SIZE)
+        ctx.vigilar = ajustes['watch_mode']
+        self._firmas_procesadas = {}
+
+        # Prevalidación: los documentos que harían esperar a Word no llegan a abrirse
+        ctx.prevalidar = self.config_manager.get_bool('PACKAGE_CHECK', 'enabled', True)
+        ctx.copiar_rechazados = ctx.copiar_anexos and self.config_manager.get_bool('PACKAGE_CHECK', 'copy_rejected', True)
+        self.rechazados = []
+        return True
+
+    def _ejecutar_etapas(self, ctx, directorios):
+        """
+        Pasa por las etapas los directorios (DirectorioEscaneado) que produce
+        `directorios`: el recorrido completo o un lote de cambios en vigilancia.
+
+        Returns:
+            float: Segundos hasta el primer documento terminado, o None
+        """
+        self.total_archivos = 0
+        self.archivos_procesados = 0
+        ctx.nueva_pasada()
+        traza = ctx.traza
+        metricas = ctx.metricas
+
+        ctx.etapa_copia = Etapa(
+            "copia", ctx.cola_copia,
+            trazado(traza, partial(self._etapa_copiar, ctx), "copiar", 'copia', lambda t: os.path.basename(t.ruta_origen)),
+            hilos=self.config_manager.get_int('PIPELINE', 'copy_workers', PIPELINE_COPY_WORKERS),
+            log_callback=self.log, metricas=metricas
+        )
+        ctx.etapa_renombrado = Etapa(
+            "renombrado", ctx.cola_directorios,
+            trazado(traza, partial(self._etapa_repartir, ctx), "renombrar y repartir", 'renombrado', lambda d: d.root,
+                    muestrear=False),
+            hilos=self.config_manager.get_int('PIPELINE', 'rename_workers', PIPELINE_RENAME_WORKERS),
+            al_terminar=partial(self._escaneo_terminado, ctx), log_callback=self.log, metricas=metricas
+        )
+        if ctx.cola_validacion:
+            ctx.etapa_validacion = Etapa(
+                "validación", ctx.cola_validacion,
+                trazado(traza, partial(self._etapa_validar, ctx), "validar", 'validacion', lambda t: t.archivo),
+                hilos=self.config_manager.get_int('PACKAGE_CHECK', 'workers', PACKAGE_CHECK_WORKERS),
+                al_terminar=partial(self._entrada_word_terminada, ctx), log_callback=self.log, metricas=metricas
+            )
+        if ctx.anticipador:
+            ctx.etapa_anticipo = Etapa(
+                "anticipo", ctx.cola_word,
+                trazado(traza, partial(self._etapa_anticipar, ctx), "copia anticipada", 'anticipo', lambda t: t.archivo),
+                hilos=self.config_manager.get_int('PREFETCH', 'workers', PREFETCH_WORKERS),
+                al_terminar=lambda: ctx.cola_abrir.put(FIN), log_callback=self.log, metricas=metricas
+            )
+        ctx.etapa_word = Etapa(
+            "word", ctx.cola_abrir or ctx.cola_word,
+            trazado(traza, partial(self._etapa_word, ctx), "documento", 'word', lambda t: t.archivo),
+            log_callback=self.log, metricas=metricas
+        )
+
+        ctx.etapa_copia.iniciar()
+        ctx.etapa_renombrado.iniciar()
+        if ctx.etapa_validacion:
+            ctx.etapa_validacion.iniciar()
+        if ctx.etapa_anticipo:
+            ctx.etapa_anticipo.iniciar()
+        hilo_escaneo = threading.Thread(target=self._escanear, args=(ctx, directorios), name="escaneo", daemon=True)
+        hilo_escaneo.start()
+
+        try:
+            self._consumir_documentos(ctx)
+        except BaseException:
+            # Sin nadie que consuma los documentos, las etapas anteriores se quedarían
+            # bloqueadas en put() para siempre: se descarta lo que quede para que terminen
+            descartados = (ctx.cola_abrir or ctx.cola_word).descartar_hasta_fin()
+            if descartados:
+                self.log(f"⚠ {descartados} documentos pendientes descartados tras el error")
+            raise
+
+        hilo_escaneo.join()
+        ctx.etapa_renombrado.unir()
+        if ctx.etapa_validacion:
+            ctx.etapa_validacion.unir()
+        ctx.etapa_copia.unir()
+        if ctx.etapa_anticipo:
+            ctx.etapa_anticipo.unir()
+        if self.escritor:
+            # Nada se da por terminado hasta que está en el destino
+            self.escritor.esperar()
+        return ctx.primer_documento
+
+    @staticmethod
+    def _escanear_carpetas(ctx):
+        """Recorrido completo de las carpetas de origen, directorio a directorio"""
+        for carpeta_origen in ctx.carpetas:
+            for root, dirs, files in os.walk(carpeta_origen):
+                # Filtrar carpetas excluidas de proceso
+                dirs[:] = [d for d in dirs if not any(exc in d.lower() for exc in ctx.exc_process)]
+                yield DirectorioEscaneado(carpeta_origen, root, files)
+
+    def _escanear(self, ctx, directorios):
+        """Etapa de escaneo: lleva los directorios a la cola del renombrado"""
+        try:
+            inicio_directorio = time.perf_counter()
+            for directorio in directorios:
+                ctx.traza.completo("escanear", 'escaneo', inicio_directorio, time.perf_counter() - inicio_directorio,
+                                   {'carpeta': directorio.root})
+                ctx.cola_directorios.put(directorio)
+                inicio_directorio = time.perf_counter()
+        except Exception as e:
+            self.log(f"❌ ERROR escaneando: {e}")
+        finally:
+            ctx.etapa_renombrado.cerrar_entrada()
+
+    def _etapa_repartir(self, ctx, directorio):
+        """Etapa de renombrado: renombra el directorio y reparte sus archivos"""
+        root = directorio.root
+        if ctx.metricas:
+            ctx.metricas.incrementar('files_scanned_total', len(directorio.archivos))
+        carpeta_analizada = self.reglas_nombres.analizar_carpeta(os.path.basename(root))
+        codigo = carpeta_analizada.codigo
+        archivos = directorio.archivos
+        exc_process = ctx.exc_process
+        exc_copy = ctx.exc_copy
+        if ctx.auto_renombrar:
+            archivos, renombrados = self._renombrar_directorio(root, archivos, codigo, exc_copy, carpeta_analizada.regla)
+            with ctx.lock_contadores:
+                ctx.renombrados += renombrados
+        if ctx.vigilar:
+            # Lo que ya ha pasado por aquí (incluidos los renombrados) no es un cambio nuevo
+            for f in archivos:
+                self._firmas_procesadas[os.path.join(root, f)] = firma_archivo(os.path.join(root, f))
+
+        # La carpeta ya no recibirá más PDFs cuando terminen todas sus tareas
+        agrupador_pdf = ctx.agrupador_pdf
+        carpeta = ContadorPendientes(lambda: agrupador_pdf.carpeta_terminada(root)) if agrupador_pdf else None
+
+        for f in archivos:
+            f_lower = f.lower()
+            es_word = any(f_lower.endswith(e) for e in ctx.exts)
+            ruta_dest_final = ctx.destino_de(directorio.carpeta_origen, root, f)
+
+            # 1. Si es Word y está excluido de proceso
+            if es_word and any(exc in f_lower for exc in exc_process):
+                self.log(f"⊗ Excluido de proceso: {f}")
+                self.resultados.registrar(os.path.join(root, f), EXCLUIDO, detalle="excluido de proceso")
+                # ✅ FIX: Verificar AMBAS condiciones: copy_attachments Y exclusiones de copia
+                if ctx.copiar_anexos:
+                    if not any(exc in f_lower for exc in exc_copy):
+                        ctx.cola_copia.put(TareaCopia(os.path.join(root, f), ruta_dest_final, codigo, root, False, None))
+                    else:
+                        self.log(f"  └─ También excluido de copia")
+                        self.resultados.registrar(os.path.join(root, f), EXCLUIDO, detalle="excluido de proceso y de copia")
+                continue
+
+            # 2. Si es Word y NO está excluido -> PROCESAR
+            if es_word:
+                if ctx.estampado_paralelo and not ctx.guardar_modificado:
+                    continue
+                ruta = os.path.join(root, f)
+                coste = self.historial.predecir(ruta) if self.historial else HISTORY_DEFAULT_DOC_SECONDS
+                self._costes[ruta] = coste
+                self.eta.agregar(coste)
+                with ctx.lock_contadores:
+                    self.total_archivos += 1
+                if carpeta:
+                    carpeta.agregar()
+                (ctx.cola_validacion or ctx.cola_word).put(
+                    TareaWord(ruta, f, codigo, os.path.dirname(ruta_dest_final), root, carpeta, coste),
+                    prioridad=-coste
+                )
+
+            # 3. Si NO es Word -> es anexo
+            else:
+                # Verificar si está excluido de copia
+                if any(exc in f_lower for exc in exc_copy):
+                    self.log(f"⊗ Excluido de copia: {f}")
+                    self.resultados.registrar(os.path.join(root, f), EXCLUIDO, detalle="excluido de copia")
+                elif ctx.copiar_anexos:
+                    unir = ctx.unir_anexos_pdf and agrupador_pdf is not None and f_lower.endswith('.pdf')
+                    if unir:
+                        carpeta.agregar()
+                    ctx.cola_copia.put(TareaCopia(os.path.join(root, f), ruta_dest_final, codigo, root, unir, carpeta if unir else None))
+
+        if carpeta:
+            carpeta.cerrar()
+
+    def _etapa_copiar(self, ctx, tarea):
+        """Etapa de copia de anexos"""
+        try:
+            errores = []
+            inicio_copia = time.perf_counter()
+            with ctx.candado_destino(tarea.ruta_destino):
+                copiado = FileManager.copiar_archivo(tarea.ruta_origen, tarea.ruta_destino, errores.append, self.directorios_destino)
+            for mensaje in errores:
+                self.log(mensaje)
+            if copiado:
+                self.resultados.registrar(tarea.ruta_origen, tarea.estado, tarea.ruta_destino, time.perf_counter() - inicio_copia)
+                if ctx.metricas:
+                    ctx.metricas.incrementar('bytes_copied_total', os.path.getsize(tarea.ruta_destino))
+            elif errores:
+                self.resultados.registrar(tarea.ruta_origen, FALLIDO, detalle=self._primer_error(errores))
+            if copiado and tarea.unir_pdf:
+                ctx.agrupador_pdf.agregar_pdf(tarea.root, os.path.dirname(tarea.ruta_destino), tarea.codigo, tarea.ruta_destino)
+        finally:
+            if tarea.carpeta:
+                tarea.carpeta.terminar()
+
+    def _etapa_validar(self, ctx, tarea):
+        """Etapa de prevalidación: solo los paquetes válidos llegan a Word"""
+        motivo = validar_paquete(tarea.ruta)
+        if motivo is None:
+            ctx.cola_word.put(tarea, prioridad=-tarea.coste)
+            return
+        try:
+            self.log(f"⊘ Rechazado ({motivo}): {tarea.archivo}")
+            self.rechazados.append((tarea.ruta, motivo))
+            self.resultados.registrar(tarea.ruta, RECHAZADO, detalle=motivo)
+            with ctx.lock_contadores:
+                self.total_archivos -= 1
+            self.eta.descartar(self._costes.pop(tarea.ruta, tarea.coste))
+            if ctx.copiar_rechazados:
+                # Se copia sin tocar, como un anexo
+                ctx.cola_copia.put(TareaCopia(
+                    tarea.ruta, os.path.join(tarea.carpeta_destino, tarea.archivo),
+                    tarea.codigo, tarea.root, False, None, RECHAZADO
+                ))
+        finally:
+            if tarea.carpeta:
+                tarea.carpeta.terminar()
+
+    def _etapa_anticipar(self, ctx, tarea):
+        """Etapa de copia anticipada: la ruta ya es la definitiva tras el renombrado"""
+        ruta_local = None
+        try:
+            ruta_local = ctx.anticipador.traer(tarea.ruta)
+        finally:
+            ctx.cola_abrir.put(tarea._replace(ruta_local=ruta_local))
+
+    def _etapa_word(self, ctx, tarea):
+        """Etapa de Word: siempre en este hilo, que es el que tiene la sesión COM"""
+        processor = ctx.processor
+        perfilador = ctx.perfilador
+        carpeta_salida = self.escritor.ruta_local(tarea.carpeta_destino) if self.escritor else tarea.carpeta_destino
+        try:
+            inicio_sesion = time.perf_counter()
+            if ctx.sesion_word.preparar_documento():
+                ctx.traza.completo("reciclar Word", FASE, inicio_sesion, time.perf_counter() - inicio_sesion)
+            word = ctx.sesion_word.word
+            if perfilador:
+                word = perfilador.envolver(word)
+                perfilador.empezar_documento()
+            ctx.rendimiento.empezar_documento()
+            if ctx.metricas:
+                ctx.metricas.empezar_documento(tarea.ruta)
+            omitidos_antes = processor.documentos_omitidos
+            errores = []
+
+            def log_documento(mensaje):
+                self.log(mensaje)
+                if 'ERROR' in mensaje and not errores:
+                    errores.append(mensaje)
+
+            exito = processor.procesar_docx(word, tarea.ruta_local or tarea.ruta, tarea.archivo, tarea.codigo, carpeta_salida, log_documento, ctx.opciones)
+            duracion = ctx.rendimiento.terminar_documento()
+            if ctx.metricas:
+                ctx.metricas.observar('document_seconds', duracion)
+            if exito:
+                self.resultados.registrar(
+                    tarea.ruta, PROCESADO, self._rutas_salida(tarea.archivo, tarea.carpeta_destino), duracion,
+                    "ya estampado" if processor.documentos_omitidos > omitidos_antes else ''
+                )
+            else:
+                self.resultados.registrar(tarea.ruta, FALLIDO, duracion=duracion, detalle=self._primer_error(errores))
+            self.eta.completar(tarea.coste, duracion)
+            word = None
+            if perfilador:
+                for linea in perfilador.terminar_documento():
+                    self.log(linea)
+            if exito:
+                ctx.documento_terminado()
+                if self.historial:
+                    self.historial.registrar(tarea.ruta, duracion)
+                self.archivos_procesados += 1
+                self.actualizar_progreso()
+                if ctx.copiar_pdf:
+                    ctx.estadisticas_pdf.registrar(ctx.perfil_pdf, WordProcessor.ruta_pdf(tarea.archivo, carpeta_salida))
+                if ctx.agrupador_pdf and not self.escritor:
+                    ctx.agrupador_pdf.agregar_pdf(tarea.root, tarea.carpeta_destino, tarea.codigo, WordProcessor.ruta_pdf(tarea.archivo, tarea.carpeta_destino))
+            if self.escritor:
+                self._enviar_al_destino(ctx, tarea, carpeta_salida, exito)
+            ctx.sesion_word.documento_procesado()
+        finally:
+            if ctx.metricas:
+                ctx.metricas.terminar_documento(tarea.ruta)
+            if ctx.anticipador:
+                ctx.anticipador.liberar(tarea.ruta_local)
+            if ctx.vigilar:
+                # Guardar en origen también cambia el archivo: no debe volver a entrar
+                self._firmas_procesadas[tarea.ruta] = firma_archivo(tarea.ruta)
+            if tarea.carpeta:
+                tarea.carpeta.terminar()
+
+    def _enviar_al_destino(self, ctx, tarea, carpeta_salida, exito):
+        """Encola para la escritura diferida lo que Word haya dejado en el área local"""
+        if ctx.guardar_modificado:
+            ruta_copia = WordProcessor.ruta_copia(tarea.archivo, carpeta_salida)
+            if os.path.exists(ruta_copia):
+                self.escritor.enviar(ruta_copia, self._aviso_destino(tarea))
+        ruta_pdf = WordProcessor.ruta_pdf(tarea.archivo, carpeta_salida)
+        if ctx.copiar_pdf and os.path.exists(ruta_pdf):
+            if exito and ctx.agrupador_pdf:
+                # La carpeta no termina hasta que su PDF llega al destino
+                tarea.carpeta.agregar()
+                self.escritor.enviar(ruta_pdf, self._aviso_destino(tarea, partial(self._pdf_en_destino, ctx)))
+            else:
+                self.escritor.enviar(ruta_pdf, self._aviso_destino(tarea))
+
+    def _aviso_destino(self, tarea, siguiente=None):
+        """Callback de la escritura diferida: un resultado que no llega al destino es un fallo"""
+        def al_terminar(exito):
+            if not exito:
+                self.resultados.registrar(tarea.ruta, FALLIDO, detalle="no se pudo escribir en el destino")
+            if siguiente:
+                siguiente(tarea, exito)
+        return al_terminar
+
+    @staticmethod
+    def _pdf_en_destino(ctx, tarea, exito):
+        """El PDF ya está en el destino: entra en el PDF único de su carpeta"""
+        try:
+            if exito:
+                ctx.agrupador_pdf.agregar_pdf(tarea.root, tarea.carpeta_destino, tarea.codigo, WordProcessor.ruta_pdf(tarea.archivo, tarea.carpeta_destino))
+        finally:
+            tarea.carpeta.terminar()
+
+    def _escaneo_terminado(self, ctx):
+        self.log(f"\nEscaneo terminado. Total archivos a procesar: {self.total_archivos}")
+        if ctx.auto_renombrar:
+            self.log(f"✓ Total renombrados: {ctx.renombrados}\n")
+        if self.historial:
+            self.log(f"Tiempo restante previsto: ~{formatear_duracion(self.eta.restante())}")
+        if ctx.etapa_validacion:
+            ctx.etapa_validacion.cerrar_entrada()
+        else:
+            self._entrada_word_terminada(ctx)
+
+    @staticmethod
+    def _entrada_word_terminada(ctx):
+        """Ya no llegarán más documentos a Word ni más archivos a la copia"""
+        if ctx.etapa_anticipo:
+            ctx.etapa_anticipo.cerrar_entrada()
+        else:
+            ctx.cola_word.put(FIN)
+        ctx.etapa_copia.cerrar_entrada()
+
+    def _consumir_documentos(self, ctx):
+        """Consume la cola de Word en este hilo: workers remotos, estampado sin Word o la sesión de Word"""
+        if ctx.servidor_trabajos:
+            tareas_remotas = {}
+
+            def trabajos_remotos():
+                for t in ctx.cola_word.elementos_hasta_fin():
+                    tareas_remotas[t.ruta] = t
+                    yield TrabajoEstampado(t.ruta, t.carpeta_destino, t.archivo, t.codigo)
+
+            ctx.servidor_trabajos.ejecutar(
+                trabajos_remotos(),
+                lambda resultado: self._resultado_remoto(ctx, tareas_remotas.pop(resultado.trabajo.ruta_origen, None), resultado)
+            )
+        elif ctx.estampado_paralelo:
+            self.log(f"Estampando sin Word ({ctx.estampado_paralelo.max_workers} procesos)...")
+            ctx.estampado_paralelo.ejecutar(
+                (TrabajoEstampado(t.ruta, self.escritor.ruta_local(t.carpeta_destino) if self.escritor else t.carpeta_destino, t.archivo, t.codigo)
+                 for t in ctx.cola_word.elementos_hasta_fin()),
+                self._resultado_sin_word
+            )
+        else:
+            ctx.etapa_word.consumir_en_este_hilo()
+
+    def _resultado_remoto(self, ctx, tarea, resultado):
+        """Resultado de un worker: mismo registro que un documento local"""
+        try:
+            self._resultado_sin_word(resultado)
+            if resultado.exito:
+                ctx.documento_terminado()
+            if resultado.exito and tarea and ctx.copiar_pdf:
+                ruta_pdf = WordProcessor.ruta_pdf(tarea.archivo, tarea.carpeta_destino)
+                ctx.estadisticas_pdf.registrar(ctx.perfil_pdf, ruta_pdf)
+                if ctx.agrupador_pdf:
+                    ctx.agrupador_pdf.agregar_pdf(tarea.root, tarea.carpeta_destino, tarea.codigo, ruta_pdf)
+        finally:
+            if tarea and tarea.carpeta:
+                tarea.carpeta.terminar()
+
+    def _guardar_historial(self, inicio_reloj, segundos):
+        if not self.historial:
+            return
+        try:
+            borradas = self.historial.guardar(inicio_reloj, self.archivos_procesados, segundos, self.eta.previsto_total)
+            if borradas:
+                self.log(f"Historial compactado: {borradas} entradas antiguas borradas")
+        except sqlite3.Error as e:
+            self.log(f"⚠ No se pudo guardar el historial: {e}")
+
+    def _resumen_trabajo(self, ctx, inicio, inicio_reloj, primer_documento):
+        """Cierra la unión de PDFs y escribe en el log el resumen del recorrido completo"""
+        if ctx.agrupador_pdf:
+            self.log("Esperando a que terminen las uniones de PDF...")
+            generados = ctx.agrupador_pdf.finalizar()
+            # Los lotes de la vigilancia ya no se unen
+            ctx.agrupador_pdf = None
+            self.log(f"📚 PDFs únicos generados: {len(generados)}")
+        if ctx.servidor_trabajos:
+            for linea in ctx.servidor_trabajos.resumen():
+                self.log(linea)
+        if ctx.estampado_paralelo:
+            for linea in ctx.estampado_paralelo.resumen():
+                self.log(linea)
+        if ctx.processor.documentos_omitidos:
+            self.log(f"Documentos ya estampados (solo exportados): {ctx.processor.documentos_omitidos}")
+        if self.rechazados:
+            self.log(f"Documentos rechazados sin abrir Word: {len(self.rechazados)}")
+            for ruta, motivo in self.rechazados:
+                self.log(f"  ⊘ {ruta}: {motivo}")
+        for linea in ctx.estadisticas_pdf.resumen():
+            self.log(linea)
+        for linea in ctx.rendimiento.resumen():
+            self.log(linea)
+        if self.escritor:
+            for linea in self.escritor.resumen():
+                self.log(linea)
+        if ctx.perfilador:
+            top_n = self.config_manager.get_int('PROFILING', 'com_top_n', COM_PROFILER_TOP_N)
+            for linea in ctx.perfilador.tabla_top(top_n):
+                self.log(linea)
+        if primer_documento is not None:
+            desde_empezar = ""
+            if self.segundos_primer_documento is None:
+                # Primer trabajo de la ejecución: también cuenta lo que tardó en arrancar Word
+                self.segundos_primer_documento = inicio - self._inicio_ejecucion + primer_documento
+                desde_empezar = f" ({self.segundos_primer_documento:.1f}s desde EMPEZAR)"
+            self.log(f"Primer documento terminado a los {primer_documento:.1f}s{desde_empezar}")
+        if self.historial:
+            segundos = time.perf_counter() - inicio
+            self.log(
+                f"Tiempo previsto {formatear_duracion(self.eta.previsto_total / self.eta.paralelismo)} · "
+                f"real {formatear_duracion(segundos)}"
+            )
+            self._guardar_historial(inicio_reloj, segundos)
+        for cola in ctx.colas():
+            self.log(cola.resumen())
+
+    def _lanzar_workers(self, servidor_trabajos, cantidad):
+        """
+        Arranca workers en este equipo como procesos aparte (cada uno con su propio Word)
+
+        Returns:
+            list: Procesos lanzados
+        """
+        raiz = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        backend = self.config_manager.get_str('DISTRIBUTED', 'local_backend', 'word')
+        entorno = dict(os.environ, AUTOHEADER_TOKEN=servidor_trabajos.token)
+        procesos = []
+        for i in range(max(0, cantidad)):
+            procesos.append(subprocess.Popen(
+                [sys.executable, '-m', 'src.job_worker', '--servidor', servidor_trabajos.url,
+                 '--nombre', f"local-{i + 1}", '--backend', backend],
+                cwd=raiz, env=entorno
+            ))
+        if procesos:
+            self.log(f"  {len(procesos)} workers locales ({backend})")
+        return procesos
+
+    @staticmethod
+    def _parar_workers(procesos):
+        """Los workers terminan solos al recibir 'fin'; si no, se fuerzan"""
+        for proceso in procesos:
+            try:
+                proceso.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proceso.terminate()
+
+    def _agrupar_cambios(self, rutas, carpetas):
+        """
+        Agrupa por directorio los archivos que ha detectado la vigilancia, descartando
+        los que no han cambiado desde que pasaron por el proceso (p. ej. los renombrados)
+
+        Returns:
+            list: DirectorioEscaneado con solo los archivos afectados
+        """
+        por_directorio = {}
+        for ruta in rutas:
+            firma = firma_archivo(ruta)
+            if firma is None or self._firmas_procesadas.get(ruta) == firma:
+                continue
+            ruta_norm = os.path.normcase(os.path.abspath(ruta))
+            for carpeta_origen in carpetas:
+                raiz = os.path.normcase(os.path.abspath(carpeta_origen))
+                if ruta_norm.startswith(raiz + os.sep):
+                    clave = (carpeta_origen, os.path.dirname(ruta))
+                    nombres = por_directorio.setdefault(clave, [])
+                    if os.path.basename(ruta) not in nombres:
+                        nombres.append(os.path.basename(ruta))
+                    break
+        return [DirectorioEscaneado(origen, root, archivos) for (origen, root), archivos in por_directorio.items()]
+
+    def _bucle_vigilancia(self, ctx, eventos):
+        """
+        Procesa los cambios que llegan de la vigilancia hasta que se pulsa DETENER.
+        Se ejecuta en el hilo del proceso, así que la sesión de Word sigue abierta entre lotes.
+        """
+        self.log(
+            f"\n=== 👁 VIGILANDO {len(ctx.carpetas)} CARPETA(S) ({ctx.vigilante.backend}) ===\n"
+            "Los documentos nuevos o modificados se procesarán automáticamente."
+        )
+        self.gui.mostrar_boton_detener(self.detener_vigilancia)
+        while not self._detener_vigilancia.is_set():
+            try:
+                rutas = eventos.get(timeout=0.5)
+            except queue.Empty:
+                continue
+            # Juntar lo que haya llegado mientras tanto
+            while True:
+                try:
+                    rutas = rutas + eventos.get_nowait()
+                except queue.Empty:
+                    break
+
+            directorios = self._agrupar_cambios(rutas, ctx.carpetas)
+            if not directorios:
+                continue
+            archivos = sum(len(d.archivos) for d in directorios)
+            self.log(f"\n👁 {archivos} archivo(s) nuevos o modificados")
+            inicio = time.perf_counter()
+            inicio_reloj = time.time()
+            self._ejecutar_etapas(ctx, directorios)
+            self._guardar_historial(inicio_reloj, time.perf_counter() - inicio)
+            self.log(f"👁 Lote terminado en {time.perf_counter() - inicio:.1f}s - vigilando...")
+        self.log("\n⏹ Vigilancia detenida")
+
+    def detener_vigilancia(self):
+        """Termina el modo vigilancia tras el lote en curso"""
+        self._detener_vigilancia.set()
+        self.gui.deshabilitar_boton_empezar()
\ No newline at end of file
@@ -0,0 +1,334 @@
+"""
+Estampado de encabezado y pie sin Word
+Escribe directamente en el paquete .docx/.docm un encabezado (logo + código)
+y un pie (autor + número de página) equivalentes a los de WordProcessor.
+word/document.xml se reescribe en streaming con src.docx_stream.
+"""
+
+import os
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from src.config import (
+    HEADER_FONT_NAME, HEADER_FONT_SIZE, HEADER_SPACE_AFTER, FOOTER_FONT_NAME, FOOTER_FONT_SIZE,
+    LOGO_HEIGHT_POINTS, LOGO_TOP_POSITION, LINE_WEIGHT, STAMP_PROPERTY_NAME
+)
+from src.docx_stream import PARTE_DOCUMENTO, parchear_docx
+
+NS_W = 'http://schemas.openxmlformats.org/wordprocessingml/2006/main'
+NS_R = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+NS_PKG_RELS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+
+REL_HEADER = NS_R + '/header'
+REL_FOOTER = NS_R + '/footer'
+REL_IMAGE = NS_R + '/image'
+REL_CUSTOM = NS_R + '/custom-properties'
+
+TIPO_HEADER = 'application/vnd.openxmlformats-officedocument.wordprocessingml.header+xml'
+TIPO_FOOTER = 'application/vnd.openxmlformats-officedocument.wordprocessingml.footer+xml'
+TIPO_CUSTOM = 'application/vnd.openxmlformats-officedocument.custom-properties+xml'
+TIPOS_IMAGEN = {'.png': 'image/png', '.jpg': 'image/jpeg', '.jpeg': 'image/jpeg'}
+
+RELS_DOCUMENTO = 'word/_rels/document.xml.rels'
+EMU_POR_PUNTO = 12700
+
+PATRON_ID = re.compile(r'\bId="([^"]+)"')
+PATRON_PARTE = re.compile(r'^word/(header|footer)(\d*)\.xml$')
+PATRON_PID = re.compile(r'\bpid="(\d+)"')
+
+RELS_VACIAS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    f'<Relationships xmlns="{NS_PKG_RELS}"></Relationships>'
+)
+CUSTOM_VACIO = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Properties xmlns="http://schemas.openxmlformats.org/officeDocument/2006/custom-properties"'
+    ' xmlns:vt="http://schemas.openxmlformats.org/officeDocument/2006/docPropsVTypes"></Properties>'
+)
+FMTID_CUSTOM = '{D5CDD505-2E9C-101B-9397-08002B2CF9AE}'
+
+
+def _medias_puntos(puntos):
+    """Tamaño de fuente de Word en medios puntos"""
+    return str(int(round(puntos * 2)))
+
+
+def _borde(lado):
+    """Borde de párrafo que sustituye a la línea separadora de WordProcessor"""
+    # w:sz va en octavos de punto
+    return f'<w:pBdr><w:{lado} w:val="single" w:sz="{int(LINE_WEIGHT * 8)}" w:space="1" w:color="000000"/></w:pBdr>'
+
+
+def _run(texto, fuente, tamano, negrita=False):
+    rpr = (
+        f'<w:rPr><w:rFonts w:ascii="{fuente}" w:hAnsi="{fuente}" w:cs="{fuente}"/>'
+        + ('<w:b/>' if negrita else '') + f'<w:sz w:val="{_medias_puntos(tamano)}"/></w:rPr>'
+    )
+    return f'<w:r>{rpr}<w:t xml:space="preserve">{escape(texto)}</w:t></w:r>'
+
+
+def _campo(instruccion, fuente, tamano):
+    """Campo simple (PAGE / NUMPAGES) en negrita, como los que formatea WordProcessor"""
+    rpr = (
+        f'<w:rPr><w:rFonts w:ascii="{fuente}" w:hAnsi="{fuente}" w:cs="{fuente}"/>'
+        f'<w:b/><w:sz w:val="{_medias_puntos(tamano)}"/></w:rPr>'
+    )
+    return f'<w:fldSimple w:instr=" {instruccion} "><w:r>{rpr}<w:t>1</w:t></w:r></w:fldSimple>'
+
+
+def _dibujo_logo(rid, ancho_px, alto_px, pid):
+    """Logo flotante detrás del texto, centrado en los márgenes (mismo tamaño que en Word)"""
+    alto = int(LOGO_HEIGHT_POINTS * EMU_POR_PUNTO)
+    ancho = int(alto * ancho_px / alto_px) if alto_px else alto
+    arriba = int(LOGO_TOP_POSITION * EMU_POR_PUNTO)
+    return (
+        '<w:r><w:drawing>'
+        '<wp:anchor distT="0" distB="0" distL="0" distR="0" simplePos="0" relativeHeight="0"'
+        ' behindDoc="1" locked="0" layoutInCell="1" allowOverlap="1">'
+        '<wp:simplePos x="0" y="0"/>'
+        '<wp:positionH relativeFrom="margin"><wp:align>center</wp:align></wp:positionH>'
+        f'<wp:positionV relativeFrom="paragraph"><wp:posOffset>{arriba}</wp:posOffset></wp:positionV>'
+        f'<wp:extent cx="{ancho}" cy="{alto}"/><wp:effectExtent l="0" t="0" r="0" b="0"/>'
+        f'<wp:wrapNone/><wp:docPr id="{pid}" name="Logo {pid}"/>'
+        '<wp:cNvGraphicFramePr><a:graphicFrameLocks noChangeAspect="1"/></wp:cNvGraphicFramePr>'
+        '<a:graphic><a:graphicData uri="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+        f'<pic:pic><pic:nvPicPr><pic:cNvPr id="{pid}" name="Logo {pid}"/><pic:cNvPicPr/></pic:nvPicPr>'
+        f'<pic:blipFill><a:blip r:embed="{rid}"/><a:stretch><a:fillRect/></a:stretch></pic:blipFill>'
+        f'<pic:spPr><a:xfrm><a:off x="0" y="0"/><a:ext cx="{ancho}" cy="{alto}"/></a:xfrm>'
+        '<a:prstGeom prst="rect"><a:avLst/></a:prstGeom></pic:spPr></pic:pic>'
+        '</a:graphicData></a:graphic></wp:anchor></w:drawing></w:r>'
+    )
+
+
+def _parte(raiz, contenido):
+    return (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        f'<w:{raiz} xmlns:w="{NS_W}" xmlns:r="{NS_R}"'
+        ' xmlns:wp="http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing"'
+        ' xmlns:a="http://schemas.openxmlformats.org/drawingml/2006/main"'
+        ' xmlns:pic="http://schemas.openxmlformats.org/drawingml/2006/picture">'
+        f'{contenido}</w:{raiz}>'
+    ).encode('utf-8')
+
+
+def construir_encabezado(codigo, opciones, logo=None):
+    """
+    XML del encabezado: párrafo de anclaje (con el logo) y código alineado a la derecha
+
+    Args:
+        codigo (str): Código de la carpeta
+        opciones (dict): Opciones de la GUI
+        logo (tuple): (rId, ancho_px, alto_px, id de dibujo) o None
+
+    Returns:
+        bytes: Contenido de word/headerN.xml
+    """
+    ancla = '<w:p><w:pPr><w:spacing w:after="0"/></w:pPr>'
+    if logo:
+        ancla += _dibujo_logo(*logo)
+    ancla += '</w:p>'
+
+    texto = codigo if opciones.get('add_folder_code', True) else " "
+    ppr = '<w:pPr>'
+    if opciones.get('add_header_line', True):
+        ppr += _borde('bottom')
+    ppr += f'<w:spacing w:after="{int(HEADER_SPACE_AFTER * 20)}"/><w:jc w:val="right"/></w:pPr>'
+    codigo_xml = f'<w:p>{ppr}{_run(texto, HEADER_FONT_NAME, HEADER_FONT_SIZE, negrita=True)}</w:p>'
+    return _parte('hdr', ancla + codigo_xml)
+
+
+def construir_pie(autor, opciones):
+    """
+    XML del pie: "<autor> — Página X de Y" alineado a la derecha
+
+    Args:
+        autor (str): Autor del documento
+        opciones (dict): Opciones de la GUI
+
+    Returns:
+        bytes: Contenido de word/footerN.xml
+    """
+    con_pagina = opciones.get('add_page_number', True)
+    runs = ''
+    if opciones.get('add_author', True) and autor:
+        runs += _run(autor + (" — " if con_pagina else ""), FOOTER_FONT_NAME, FOOTER_FONT_SIZE)
+    if con_pagina:
+        runs += _run("Página ", FOOTER_FONT_NAME, FOOTER_FONT_SIZE)
+        runs += _campo('PAGE', FOOTER_FONT_NAME, FOOTER_FONT_SIZE)
+        runs += _run(" de ", FOOTER_FONT_NAME, FOOTER_FONT_SIZE)
+        runs += _campo('NUMPAGES', FOOTER_FONT_NAME, FOOTER_FONT_SIZE)
+
+    ppr = '<w:pPr>'
+    if opciones.get('add_footer_line', True):
+        ppr += _borde('top')
+    ppr += '<w:spacing w:before="0" w:after="0"/><w:jc w:val="right"/></w:pPr>'
+    return _parte('ftr', f'<w:p>{ppr}{runs}</w:p>')
+
+
+def _siguiente_id(existentes, prefijo):
+    n = 1
+    while f"{prefijo}{n}" in existentes:
+        n += 1
+    existentes.add(f"{prefijo}{n}")
+    return f"{prefijo}{n}"
+
+
+def _relacion(rid, tipo, destino):
+    return f'<Relationship Id="{rid}" Type="{tipo}" Target="{destino}"/>'
+
+
+def _agregar_relaciones(rels_xml, relaciones):
+    return rels_xml.replace('</Relationships>', ''.join(relaciones) + '</Relationships>')
+
+
+def _agregar_tipos(tipos_xml, overrides, defaults):
+    nuevos = ''
+    for extension, tipo in defaults.items():
+        if f'Extension="{extension}"' not in tipos_xml and f"Extension='{extension}'" not in tipos_xml:
+            nuevos += f'<Default Extension="{extension}" ContentType="{tipo}"/>'
+    for parte, tipo in overrides.items():
+        nuevos += f'<Override PartName="/{parte}" ContentType="{tipo}"/>'
+    return tipos_xml.replace('</Types>', nuevos + '</Types>')
+
+
+def _propiedades_con_huella(custom_xml, huella):
+    """Añade o sustituye la propiedad de huella en docProps/custom.xml"""
+    # Quitar una huella anterior
+    custom_xml = re.sub(
+        r'<property\b[^>]*\bname="' + re.escape(STAMP_PROPERTY_NAME) + r'"[^>]*>.*?</property>',
+        '', custom_xml, flags=re.DOTALL
+    )
+    pids = [int(p) for p in PATRON_PID.findall(custom_xml)]
+    pid = max(pids + [1]) + 1   # Los pid de propiedades personalizadas empiezan en 2
+    prop = (
+        f'<property fmtid="{FMTID_CUSTOM}" pid="{pid}" name="{STAMP_PROPERTY_NAME}">'
+        f'<vt:lpwstr>{escape(huella)}</vt:lpwstr></property>'
+    )
+    if '</Properties>' in custom_xml:
+        return custom_xml.replace('</Properties>', prop + '</Properties>')
+    # <Properties .../> vacío
+    return re.sub(r'<Properties\b([^>]*?)\s*/>', r'<Properties\1>' + prop + '</Properties>', custom_xml)
+
+
+class DocxStamper:
+    """
+    Estampa documentos sin Word. Las instancias solo guardan datos simples
+    (rutas, textos, opciones) para poder enviarse a otros procesos.
+    """
+
+    def __init__(self, ruta_logo, autor, opciones):
+        """
+        Args:
+            ruta_logo (str): Ruta al archivo de imagen del logo
+            autor (str): Nombre del autor para el pie de página
+            opciones (dict): Opciones de la GUI
+        """
+        self.ruta_logo = ruta_logo
+        self.autor = autor
+        self.opciones = opciones
+        self._logo = None   # (bytes, extensión, ancho_px, alto_px), se lee una vez por proceso
+
+    def usa_logo(self):
+        return bool(self.opciones.get('add_logo', True) and self.ruta_logo and os.path.exists(self.ruta_logo))
+
+    def _datos_logo(self):
+        if self._logo is None:
+            from PIL import Image
+            with open(self.ruta_logo, 'rb') as f:
+                datos = f.read()
+            with Image.open(self.ruta_logo) as img:
+                ancho, alto = img.size
+            extension = os.path.splitext(self.ruta_logo)[1].lower()
+            if extension == '.jpg':
+                extension = '.jpeg'
+            self._logo = (datos, extension, ancho, alto)
+        return self._logo
+
+    def estampar(self, ruta_origen, ruta_destino, codigo, huella=None):
+        """
+        Escribe en ruta_destino una copia de ruta_origen con el encabezado y el pie aplicados
+
+        Args:
+            ruta_origen (str): Documento .docx/.docm de origen
+            ruta_destino (str): Documento a escribir
+            codigo (str): Código de la carpeta
+            huella (str): Huella a guardar en las propiedades personalizadas (None = no guardar)
+
+        Returns:
+            int: Número de secciones modificadas
+        """
+        with zipfile.ZipFile(ruta_origen) as zf:
+            nombres = set(zf.namelist())
+            tipos_xml = zf.read('[Content_Types].xml').decode('utf-8')
+            rels_doc = zf.read(RELS_DOCUMENTO).decode('utf-8') if RELS_DOCUMENTO in nombres else RELS_VACIAS
+            rels_raiz = zf.read('_rels/.rels').decode('utf-8')
+            custom_xml = zf.read('docProps/custom.xml').decode('utf-8') if 'docProps/custom.xml' in nombres else None
+
+        if PARTE_DOCUMENTO not in nombres:
+            raise ValueError("El paquete no contiene word/document.xml")
+
+        # Nombres de parte libres (word/headerN.xml) para no pisar los existentes
+        usados = {int(m.group(2) or 0) for m in map(PATRON_PARTE.match, nombres) if m}
+        n = max(usados | {0}) + 1
+        parte_header, parte_footer = f'word/header{n}.xml', f'word/footer{n}.xml'
+
+        ids = set(PATRON_ID.findall(rels_doc))
+        rid_header = _siguiente_id(ids, 'rIdPah')
+        rid_footer = _siguiente_id(ids, 'rIdPah')
+
+        partes_nuevas = {}
+        defaults = {}
+        logo = None
+        if self.usa_logo():
+            datos, extension, ancho, alto = self._datos_logo()
+            parte_logo = f'word/media/pah_logo{n}{extension}'
+            partes_nuevas[parte_logo] = datos
+            partes_nuevas[f'word/_rels/header{n}.xml.rels'] = _agregar_relaciones(
+                RELS_VACIAS, [_relacion('rId1', REL_IMAGE, f'media/{os.path.basename(parte_logo)}')]
+            ).encode('utf-8')
+            defaults[extension.lstrip('.')] = TIPOS_IMAGEN[extension]
+            logo = ('rId1', ancho, alto, 1000 + n)
+
+        partes_nuevas[parte_header] = construir_encabezado(codigo, self.opciones, logo)
+        partes_nuevas[parte_footer] = construir_pie(self.autor, self.opciones)
+
+        overrides = {parte_header: TIPO_HEADER, parte_footer: TIPO_FOOTER}
+        reemplazos = {}
+
+        rels_doc = _agregar_relaciones(rels_doc, [
+            _relacion(rid_header, REL_HEADER, f'header{n}.xml'),
+            _relacion(rid_footer, REL_FOOTER, f'footer{n}.xml'),
+        ])
+        if RELS_DOCUMENTO in nombres:
+            reemplazos[RELS_DOCUMENTO] = rels_doc.encode('utf-8')
+        else:
+            partes_nuevas[RELS_DOCUMENTO] = rels_doc.encode('utf-8')
+
+        if huella:
+            if custom_xml is None:
+                partes_nuevas['docProps/custom.xml'] = _propiedades_con_huella(CUSTOM_VACIO, huella).encode('utf-8')
+                overrides['docProps/custom.xml'] = TIPO_CUSTOM
+                ids_raiz = set(PATRON_ID.findall(rels_raiz))
+                reemplazos['_rels/.rels'] = _agregar_relaciones(
+                    rels_raiz, [_relacion(_siguiente_id(ids_raiz, 'rIdPah'), REL_CUSTOM, 'docProps/custom.xml')]
+                ).encode('utf-8')
+            else:
+                reemplazos['docProps/custom.xml'] = _propiedades_con_huella(custom_xml, huella).encode('utf-8')
+
+        reemplazos['[Content_Types].xml'] = _agregar_tipos(tipos_xml, overrides, defaults).encode('utf-8')
+
+        temporal = ruta_destino + ".tmp"
+        try:
+            secciones = parchear_docx(
+                ruta_origen, temporal, rid_header, rid_footer,
+                partes_reemplazadas=reemplazos, partes_nuevas=partes_nuevas
+            )
+            os.replace(temporal, ruta_destino)
+        except BaseException:
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+            raise
+        return secciones
@@ -0,0 +1,213 @@
+"""
+Reescritura en streaming de paquetes .docx
+Recorre word/document.xml por bloques y solo modifica las referencias
+w:headerReference / w:footerReference de cada w:sectPr; el resto de bytes
+se copia sin cambios. La memoria usada no depende del tamaño del documento.
+"""
+
+import re
+import shutil
+import zipfile
+
+from src.config import DOCX_STREAM_CHUNK_SIZE
+
+PARTE_DOCUMENTO = 'word/document.xml'
+NS_RELACIONES = b'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+
+APERTURA_SECTPR = b'<w:sectPr'
+# Caracteres que pueden seguir al nombre de la etiqueta (descarta w:sectPrChange)
+SIGUIENTES_VALIDOS = b' \t\r\n>/'
+
+PATRON_ETIQUETA_SECTPR = re.compile(rb'<(/?)w:sectPr(?=[\s>/])[^>]*?(/?)>')
+PATRON_REFERENCIA = re.compile(rb'<w:(header|footer)Reference\b[^>]*/>')
+PATRON_TIPO = re.compile(rb'w:type="(\w+)"')
+
+
+def _buscar_apertura(buffer, desde=0):
+    """
+    Posición de la próxima etiqueta <w:sectPr (no <w:sectPrChange).
+
+    Returns:
+        int: Posición, -1 si no hay, o -2 si aparece al final sin el carácter siguiente
+    """
+    while True:
+        idx = buffer.find(APERTURA_SECTPR, desde)
+        if idx < 0:
+            return -1
+        siguiente = idx + len(APERTURA_SECTPR)
+        if siguiente >= len(buffer):
+            return -2
+        if buffer[siguiente] in SIGUIENTES_VALIDOS:
+            return idx
+        desde = siguiente
+
+
+def _fin_sectpr(buffer):
+    """
+    Dado un buffer que empieza por <w:sectPr, devuelve la posición justo después
+    de su cierre (respetando w:sectPr anidados en w:sectPrChange), o -1 si falta texto.
+    """
+    profundidad = 0
+    for m in PATRON_ETIQUETA_SECTPR.finditer(buffer):
+        cierre, autocierre = m.group(1), m.group(2)
+        if cierre:
+            profundidad -= 1
+        elif not autocierre:
+            profundidad += 1
+        if profundidad == 0:
+            return m.end()
+    return -1
+
+
+def _referencia(tipo, rid):
+    return (
+        b'<w:' + tipo + b'Reference xmlns:r="' + NS_RELACIONES + b'" w:type="default" r:id="'
+        + rid.encode('ascii') + b'"/>'
+    )
+
+
+def parchear_sectpr(sectpr, header_rid=None, footer_rid=None):
+    """
+    Sustituye las referencias por defecto de encabezado/pie de un w:sectPr completo.
+    Las referencias de primera página y páginas pares se conservan.
+
+    Args:
+        sectpr (bytes): Elemento <w:sectPr>...</w:sectPr> completo
+        header_rid (str): Id de relación del nuevo encabezado (None = no tocar)
+        footer_rid (str): Id de relación del nuevo pie (None = no tocar)
+
+    Returns:
+        bytes: Elemento modificado
+    """
+    fin_apertura = sectpr.index(b'>') + 1
+    apertura = sectpr[:fin_apertura]
+    if apertura.endswith(b'/>'):
+        # <w:sectPr/> vacío: convertirlo en elemento con hijos
+        apertura = apertura[:-2].rstrip() + b'>'
+        cuerpo, cierre = b'', b'</w:sectPr>'
+    else:
+        cuerpo, cierre = sectpr[fin_apertura:-len(b'</w:sectPr>')], b'</w:sectPr>'
+
+    # Las referencias son los primeros hijos; nunca tocar lo que hay dentro de w:sectPrChange
+    corte = cuerpo.find(b'<w:sectPrChange')
+    propio, anidado = (cuerpo, b'') if corte < 0 else (cuerpo[:corte], cuerpo[corte:])
+
+    reemplazar = set()
+    if header_rid:
+        reemplazar.add(b'header')
+    if footer_rid:
+        reemplazar.add(b'footer')
+
+    def quitar(m):
+        tipo = PATRON_TIPO.search(m.group(0))
+        es_defecto = tipo is None or tipo.group(1) == b'default'
+        return b'' if m.group(1) in reemplazar and es_defecto else m.group(0)
+
+    propio = PATRON_REFERENCIA.sub(quitar, propio)
+
+    nuevas = b''
+    if header_rid:
+        nuevas += _referencia(b'header', header_rid)
+    if footer_rid:
+        nuevas += _referencia(b'footer', footer_rid)
+
+    return apertura + nuevas + propio + anidado + cierre
+
+
+def reescribir_referencias_sectpr(entrada, salida, header_rid=None, footer_rid=None,
+                                  tam_bloque=DOCX_STREAM_CHUNK_SIZE):
+    """
+    Copia `entrada` en `salida` modificando solo las referencias de cada w:sectPr.
+    El buffer nunca contiene más de un bloque más el w:sectPr en curso.
+
+    Args:
+        entrada: Objeto de archivo binario de lectura (p. ej. ZipFile.open)
+        salida: Objeto de archivo binario de escritura
+        header_rid (str): Id de relación del encabezado
+        footer_rid (str): Id de relación del pie
+        tam_bloque (int): Bytes leídos en cada lectura
+
+    Returns:
+        int: Número de w:sectPr modificados
+    """
+    buffer = b''
+    terminado = False
+    secciones = 0
+    conservar = len(APERTURA_SECTPR)
+
+    while True:
+        idx = _buscar_apertura(buffer)
+        if idx < 0:
+            if terminado:
+                salida.write(buffer)
+                return secciones
+            # Guardar la cola por si contiene una etiqueta cortada entre bloques
+            if len(buffer) > conservar:
+                salida.write(buffer[:-conservar])
+                buffer = buffer[-conservar:]
+            bloque = entrada.read(tam_bloque)
+            if bloque:
+                buffer += bloque
+            else:
+                terminado = True
+            continue
+
+        salida.write(buffer[:idx])
+        buffer = buffer[idx:]
+
+        fin = _fin_sectpr(buffer)
+        while fin < 0:
+            bloque = entrada.read(tam_bloque)
+            if not bloque:
+                raise ValueError("word/document.xml termina con un w:sectPr sin cerrar")
+            buffer += bloque
+            fin = _fin_sectpr(buffer)
+
+        salida.write(parchear_sectpr(buffer[:fin], header_rid, footer_rid))
+        secciones += 1
+        buffer = buffer[fin:]
+
+
+def parchear_docx(ruta_origen, ruta_destino, header_rid=None, footer_rid=None,
+                  partes_reemplazadas=None, partes_nuevas=None):
+    """
+    Escribe una copia del .docx con las referencias de w:sectPr repuntadas.
+    Todas las partes se copian en streaming; las partes pequeñas indicadas
+    (relaciones, tipos de contenido, encabezados...) se sustituyen o añaden.
+
+    Args:
+        ruta_origen (str): Paquete de origen
+        ruta_destino (str): Paquete a escribir
+        header_rid (str): Id de relación del encabezado por defecto
+        footer_rid (str): Id de relación del pie por defecto
+        partes_reemplazadas (dict): nombre de parte -> bytes que sustituyen a la original
+        partes_nuevas (dict): nombre de parte -> bytes de partes que no existían
+
+    Returns:
+        int: Número de w:sectPr modificados
+    """
+    partes_reemplazadas = partes_reemplazadas or {}
+    partes_nuevas = partes_nuevas or {}
+    secciones = 0
+
+    with zipfile.ZipFile(ruta_origen) as zin, \
+            zipfile.ZipFile(ruta_destino, 'w', zipfile.ZIP_DEFLATED) as zout:
+        for info in zin.infolist():
+            destino = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+            destino.compress_type = info.compress_type
+            destino.external_attr = info.external_attr
+
+            if info.filename in partes_reemplazadas:
+                zout.writestr(destino, partes_reemplazadas[info.filename])
+                continue
+
+            with zin.open(info) as origen, zout.open(destino, 'w', force_zip64=True) as copia:
+                if info.filename == PARTE_DOCUMENTO:
+                    secciones = reescribir_referencias_sectpr(origen, copia, header_rid, footer_rid)
+                else:
+                    shutil.copyfileobj(origen, copia, DOCX_STREAM_CHUNK_SIZE)
+
+        for nombre, contenido in partes_nuevas.items():
+            zout.writestr(nombre, contenido, compress_type=zipfile.ZIP_DEFLATED)
+
+    return secciones
@@ -55,15 +55,18 @@ class FileManager:
         return total
 
     @staticmethod
-    def copiar_archivo(ruta_origen, ruta_destino, log_callback=None):
+    def copiar_archivo(ruta_origen, ruta_destino, log_callback=None, directorios=None):
         """
         Copia un archivo individual de origen a destino.
         ruta_destino debe ser la ruta completa del archivo destino (incluyendo nombre).
+        Con `directorios` (DirectoryCache) cada carpeta de destino se crea una sola vez.
         """
         try:
             # Crear carpetas de destino si no existen
             dir_destino = os.path.dirname(ruta_destino)
-            if dir_destino:
+            if directorios is not None:
+                directorios.asegurar(dir_destino)
+            elif dir_destino:
                 os.makedirs(dir_destino, exist_ok=True)
             
             # Evitar copiar sobre sí mismo
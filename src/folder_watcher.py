@@ -0,0 +1,313 @@
+"""
+Vigilancia de carpetas
+Detecta archivos nuevos o modificados en las carpetas de origen. En Linux usa
+inotify; en el resto de sistemas (o si inotify falla) comprueba periódicamente
+la fecha de modificación de cada directorio y solo relee los que han cambiado.
+Los cambios se agrupan (debounce) y un archivo no se entrega hasta que deja
+de crecer y se puede abrir.
+"""
+
+import os
+import struct
+import sys
+import threading
+import time
+
+from src.config import WATCH_DEBOUNCE_SECONDS, WATCH_POLL_INTERVAL
+
+# Archivos temporales de Office, navegadores y copias a medio escribir
+PREFIJOS_TEMPORALES = ('~$', '~WRL', '.~lock')
+SUFIJOS_TEMPORALES = ('.tmp', '.temp', '.part', '.crdownload', '.partial', '.swp')
+
+# Constantes de inotify (linux/inotify.h)
+IN_MODIFY = 0x00000002
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+MASCARA_INOTIFY = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF
+CABECERA_EVENTO = struct.Struct('iIII')
+
+
+def firma_archivo(ruta):
+    """(tamaño, mtime) de un archivo, o None si ya no existe"""
+    try:
+        st = os.stat(ruta)
+    except OSError:
+        return None
+    return (st.st_size, st.st_mtime_ns)
+
+
+def es_temporal(nombre):
+    """True para archivos de bloqueo/temporales que nunca se deben procesar"""
+    minusculas = nombre.lower()
+    return nombre.startswith(PREFIJOS_TEMPORALES) or minusculas.endswith(SUFIJOS_TEMPORALES)
+
+
+class _Inotify:
+    """Envoltorio mínimo de inotify mediante ctypes (sin dependencias externas)"""
+
+    def __init__(self):
+        import ctypes
+        import ctypes.util
+        self._ctypes = ctypes
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 falló")
+        self.directorios = {}   # descriptor de vigilancia -> directorio
+
+    def vigilar(self, directorio):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directorio), MASCARA_INOTIFY)
+        if wd < 0:
+            raise OSError(self._ctypes.get_errno(), f"No se puede vigilar {directorio}")
+        self.directorios[wd] = directorio
+
+    def leer(self, espera):
+        """
+        Returns:
+            list: (directorio, nombre, máscara) de los eventos disponibles
+        """
+        import select
+        listos, _, _ = select.select([self.fd], [], [], espera)
+        if not listos:
+            return []
+        try:
+            datos = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        eventos = []
+        posicion = 0
+        while posicion < len(datos):
+            wd, mascara, _, longitud = CABECERA_EVENTO.unpack_from(datos, posicion)
+            posicion += CABECERA_EVENTO.size
+            nombre = os.fsdecode(datos[posicion:posicion + longitud].rstrip(b'\0'))
+            posicion += longitud
+            if mascara & IN_IGNORED:
+                self.directorios.pop(wd, None)
+                continue
+            eventos.append((self.directorios.get(wd), nombre, mascara))
+        return eventos
+
+    def cerrar(self):
+        os.close(self.fd)
+
+
+class FolderWatcher:
+    """
+    Vigila las carpetas en un hilo propio y llama a `al_cambiar` con la lista
+    de rutas de archivo listas para procesar
+    """
+
+    def __init__(self, carpetas, al_cambiar, exclusiones=(), ignorar=(), debounce=WATCH_DEBOUNCE_SECONDS,
+                 intervalo=WATCH_POLL_INTERVAL, usar_inotify=True, log_callback=None):
+        """
+        Args:
+            carpetas (list): Carpetas raíz a vigilar (recursivamente)
+            al_cambiar (callable): Recibe una lista de rutas de archivos nuevos o modificados
+            exclusiones (list): Subcadenas que excluyen carpetas (las de proceso)
+            ignorar (list): Carpetas cuyos cambios se ignoran (p. ej. el destino)
+            debounce (float): Segundos sin cambios antes de entregar un archivo
+            intervalo (float): Segundos entre comprobaciones en modo sondeo
+            usar_inotify (bool): Usar inotify si el sistema lo permite
+            log_callback (callable): Función para escribir en el log
+        """
+        self.carpetas = [os.path.abspath(c) for c in carpetas]
+        self.al_cambiar = al_cambiar
+        self.exclusiones = [e.lower() for e in exclusiones]
+        self.ignorar = [os.path.normcase(os.path.abspath(r)) for r in ignorar if r]
+        self.debounce = debounce
+        self.intervalo = intervalo
+        self.usar_inotify = usar_inotify
+        self.log_callback = log_callback
+        self.backend = None
+
+        self._detener = threading.Event()
+        self._hilo = None
+        self._inotify = None
+        self._mtimes_dir = {}      # directorio -> st_mtime_ns (sondeo)
+        self._firmas = {}          # directorio -> {nombre: (tamaño, mtime)} (sondeo)
+        self._pendientes = {}      # ruta -> (último cambio, firma observada)
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def iniciar(self):
+        if self.usar_inotify and sys.platform.startswith('linux'):
+            try:
+                self._inotify = _Inotify()
+                self.backend = 'inotify'
+            except (OSError, AttributeError) as e:
+                self._log(f"⚠ inotify no disponible ({e}) - se usa sondeo")
+                self._inotify = None
+        if self._inotify is None:
+            self.backend = 'sondeo'
+
+        for carpeta in self.carpetas:
+            self._registrar_arbol(carpeta, encolar=False)
+
+        self._hilo = threading.Thread(target=self._bucle, name="vigilancia", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        self._detener.set()
+        if self._hilo:
+            self._hilo.join()
+        if self._inotify:
+            self._inotify.cerrar()
+            self._inotify = None
+
+    # ------------------------------------------------------------------
+    # Registro de directorios
+    # ------------------------------------------------------------------
+
+    def _excluido(self, ruta):
+        ruta_norm = os.path.normcase(os.path.abspath(ruta))
+        return any(ruta_norm == r or ruta_norm.startswith(r + os.sep) for r in self.ignorar)
+
+    def _registrar_arbol(self, raiz, encolar):
+        """Vigila un directorio y sus subdirectorios; con encolar, sus archivos pasan a pendientes"""
+        if self._excluido(raiz):
+            return
+        for root, dirs, files in os.walk(raiz):
+            dirs[:] = [
+                d for d in dirs
+                if not any(exc in d.lower() for exc in self.exclusiones) and not self._excluido(os.path.join(root, d))
+            ]
+            try:
+                if self._inotify:
+                    self._inotify.vigilar(root)
+                else:
+                    self._mtimes_dir[root] = os.stat(root).st_mtime_ns
+                    self._firmas[root] = self._leer_firmas(root, files)
+            except OSError as e:
+                self._log(f"⚠ No se puede vigilar {root}: {e}")
+                continue
+            if encolar:
+                for f in files:
+                    self._marcar(os.path.join(root, f))
+
+    @staticmethod
+    def _leer_firmas(directorio, nombres):
+        firmas = {}
+        for nombre in nombres:
+            firma = firma_archivo(os.path.join(directorio, nombre))
+            if firma is not None:
+                firmas[nombre] = firma
+        return firmas
+
+    def _marcar(self, ruta):
+        if es_temporal(os.path.basename(ruta)) or self._excluido(ruta):
+            return
+        self._pendientes[ruta] = (time.monotonic(), None)
+
+    # ------------------------------------------------------------------
+    # Detección de cambios
+    # ------------------------------------------------------------------
+
+    def _bucle(self):
+        while not self._detener.is_set():
+            try:
+                if self._inotify:
+                    self._procesar_inotify(self._inotify.leer(min(0.5, self.debounce)))
+                else:
+                    self._sondear()
+                    self._detener.wait(min(self.intervalo, self.debounce))
+                listos = self._listos()
+                if listos:
+                    self.al_cambiar(listos)
+            except Exception as e:
+                self._log(f"⚠ Error vigilando carpetas: {e}")
+                self._detener.wait(self.intervalo)
+
+    def _procesar_inotify(self, eventos):
+        for directorio, nombre, mascara in eventos:
+            if mascara & IN_Q_OVERFLOW:
+                # Se han perdido eventos: releer todo el árbol
+                for carpeta in self.carpetas:
+                    self._registrar_arbol(carpeta, encolar=True)
+                continue
+            if directorio is None or not nombre:
+                continue
+            ruta = os.path.join(directorio, nombre)
+            if mascara & IN_ISDIR:
+                if mascara & (IN_CREATE | IN_MOVED_TO) and not any(exc in nombre.lower() for exc in self.exclusiones):
+                    # Los archivos creados antes de empezar a vigilarlo también cuentan
+                    self._registrar_arbol(ruta, encolar=True)
+            elif mascara & (IN_DELETE | IN_MOVED_FROM):
+                self._pendientes.pop(ruta, None)
+            else:
+                self._marcar(ruta)
+
+    def _sondear(self):
+        """Un stat por directorio; solo se listan los directorios cuya fecha ha cambiado"""
+        for directorio in list(self._mtimes_dir):
+            try:
+                mtime = os.stat(directorio).st_mtime_ns
+            except OSError:
+                self._mtimes_dir.pop(directorio, None)
+                self._firmas.pop(directorio, None)
+                continue
+            if mtime == self._mtimes_dir[directorio]:
+                continue
+            self._mtimes_dir[directorio] = mtime
+
+            try:
+                entradas = list(os.scandir(directorio))
+            except OSError:
+                continue
+            anteriores = self._firmas.get(directorio, {})
+            archivos = [e.name for e in entradas if e.is_file()]
+            actuales = self._leer_firmas(directorio, archivos)
+            for nombre, firma in actuales.items():
+                if anteriores.get(nombre) != firma:
+                    self._marcar(os.path.join(directorio, nombre))
+            self._firmas[directorio] = actuales
+
+            for entrada in entradas:
+                if entrada.is_dir() and entrada.path not in self._mtimes_dir \
+                        and not any(exc in entrada.name.lower() for exc in self.exclusiones):
+                    self._registrar_arbol(entrada.path, encolar=True)
+
+    def _listos(self):
+        """
+        Archivos sin cambios durante el debounce, con tamaño estable y que se pueden abrir
+
+        Returns:
+            list: Rutas listas para procesar
+        """
+        ahora = time.monotonic()
+        listos = []
+        for ruta, (ultimo, firma) in list(self._pendientes.items()):
+            if ahora - ultimo < self.debounce:
+                continue
+            actual = firma_archivo(ruta)
+            if actual is None:
+                self._pendientes.pop(ruta, None)
+                continue
+            if actual != firma:
+                # Sigue creciendo (o es la primera comprobación): esperar otro debounce
+                self._pendientes[ruta] = (ahora, actual)
+                continue
+            try:
+                # En Windows un archivo que se está copiando está bloqueado
+                with open(ruta, 'rb'):
+                    pass
+            except OSError:
+                self._pendientes[ruta] = (ahora, actual)
+                continue
+            del self._pendientes[ruta]
+            listos.append(ruta)
+        return listos
+
+    def _log(self, mensaje):
+        if self.log_callback:
+            self.log_callback(mensaje)
@@ -11,7 +11,8 @@ print("=" * 60)
 import tkinter as tk
 from tkinter import scrolledtext, ttk
 import os
-from PIL import Image, ImageTk
+import threading
+from PIL import ImageTk
 
 try:
     from tkinterdnd2 import DND_FILES
@@ -25,8 +26,10 @@ from src.config import (
     COLOR_SUCCESS, COLOR_ERROR, COLOR_INFO, 
     COLOR_NEUTRAL, COLOR_DISABLED,
     COLOR_LOGO_BG, COLOR_LOGO_SUCCESS,
-    PROGRESS_BAR_STYLE, PROGRESS_BAR_COLORS
+    PROGRESS_BAR_STYLE, PROGRESS_BAR_COLORS, LOG_MAX_LINES
 )
+from src.logo_preview import LogoPreviewCache
+from src.results_table import ResultsTable
 
 
 class GUI:
@@ -47,6 +50,8 @@ class GUI:
         self.logo_photo = None
         self.canvas_image_id = None
         self.canvas_logo_preview = None
+        self.logo_cache = LogoPreviewCache()
+        self._ruta_preview_pendiente = None
 
         # --- Variables para Checkboxes ---
         # Encabezado y Pie
@@ -63,6 +68,8 @@ class GUI:
         self.var_save_modified_dest = tk.BooleanVar(value=True)
         self.var_copy_as_pdf = tk.BooleanVar(value=True)
         self.var_auto_rename = tk.BooleanVar(value=False) 
+        self.var_bundle_pdfs = tk.BooleanVar(value=False)
+        self.var_watch_mode = tk.BooleanVar(value=False)
 
         # Extensiones
         self.var_process_docx = tk.BooleanVar(value=True)
@@ -89,6 +96,7 @@ class GUI:
         self._crear_seccion_logo(frame_izquierda)
         self._crear_seccion_autor(frame_izquierda)
         self._crear_seccion_opciones_detalladas(frame_izquierda)
+        self._crear_seccion_cola(frame_izquierda)
 
         # ====
         # COLUMNA DERECHA: Carpetas, Destino y Progreso
@@ -366,6 +374,50 @@ class GUI:
             fg="white"
         ).pack(side=tk.LEFT, padx=2)
 
+    def _crear_seccion_cola(self, parent):
+        """Crea la sección de la cola de trabajos (varias configuraciones seguidas con el mismo Word)"""
+        frame = tk.LabelFrame(
+            parent,
+            text="📋 Cola de Trabajos (doble clic para editar)",
+            font=("Arial", 9, "bold"),
+            padx=10,
+            pady=5
+        )
+        frame.pack(fill=tk.BOTH, expand=True, pady=5)
+
+        self.listbox_cola = tk.Listbox(frame, height=4, font=("Arial", 8))
+        self.listbox_cola.pack(fill=tk.BOTH, expand=True)
+        self.listbox_cola.bind('<Double-Button-1>', self.controller.editar_trabajo)
+
+        f_btns = tk.Frame(frame)
+        f_btns.pack(fill=tk.X, pady=(3, 0))
+
+        botones = [
+            ("➕ Añadir actual", self.controller.agregar_trabajo, COLOR_SUCCESS),
+            ("📂 Cargar", self.controller.cargar_trabajos, COLOR_INFO),
+            ("💾 Guardar", self.controller.guardar_trabajo, COLOR_INFO),
+            ("❌", self.controller.quitar_trabajo, COLOR_ERROR)
+        ]
+        for texto, comando, color in botones:
+            tk.Button(
+                f_btns,
+                text=texto,
+                command=comando,
+                bg=color,
+                fg="white",
+                font=("Arial", 8)
+            ).pack(side=tk.LEFT, padx=(0, 2))
+
+        self.btn_cola = tk.Button(
+            f_btns,
+            text="▶ EJECUTAR COLA",
+            command=self.controller.empezar_cola,
+            bg=COLOR_SUCCESS,
+            fg="white",
+            font=("Arial", 8, "bold")
+        )
+        self.btn_cola.pack(side=tk.RIGHT)
+
     def _crear_seccion_excepciones(self, parent):
         """Crea la sección de excepciones (no procesar / no copiar)"""
         f_exc = tk.Frame(parent)
@@ -460,13 +512,22 @@ class GUI:
         self.progress_bar.pack(fill=tk.X)
 
     def _crear_seccion_log(self, parent):
-        """Crea la sección de log de progreso"""
+        """Crea las pestañas de resultados por archivo y de log de progreso"""
+        self.notebook_log = ttk.Notebook(parent)
+        self.notebook_log.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+
+        tab_resultados = tk.Frame(self.notebook_log)
+        self.notebook_log.add(tab_resultados, text="Resultados")
+        self.tabla_resultados = ResultsTable(tab_resultados, self.controller.resultados)
+
+        tab_log = tk.Frame(self.notebook_log)
+        self.notebook_log.add(tab_log, text="Log")
         self.log_text = scrolledtext.ScrolledText(
-            parent, 
+            tab_log, 
             height=8, 
             font=("Consolas", 8)
         )
-        self.log_text.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
+        self.log_text.pack(fill=tk.BOTH, expand=True)
 
     def _cargar_autor_desde_archivo(self):
         """Carga el contenido de autor.txt como valor por defecto"""
@@ -489,6 +550,10 @@ class GUI:
     def log(self, mensaje):
         """Agrega un mensaje al log"""
         self.log_text.insert(tk.END, mensaje + "\n")
+        # El log solo conserva las últimas líneas; el detalle por archivo está en Resultados
+        lineas = int(self.log_text.index('end-1c').split('.')[0])
+        if lineas > LOG_MAX_LINES:
+            self.log_text.delete('1.0', f"{lineas - LOG_MAX_LINES + 1}.0")
         self.log_text.see(tk.END)
         self.root.update_idletasks()
 
@@ -508,72 +573,90 @@ class GUI:
         pass  # El label ya no existe, se usa solo el canvas preview
 
     def mostrar_preview_logo(self, ruta_logo):
-        """Muestra una previsualización del logo en el Canvas - CENTRADO"""
+        """
+        Muestra una previsualización del logo en el Canvas - CENTRADO.
+        La imagen se decodifica en un hilo secundario; si ya está en caché se pinta al momento.
+        """
         if self.canvas_logo_preview is None:
             return
-            
+
+        # Dimensiones reales del canvas (sin forzar un update del layout)
+        canvas_w = self.canvas_logo_preview.winfo_width()
+        canvas_h = self.canvas_logo_preview.winfo_height()
+        if canvas_w <= 1:
+            canvas_w = self.canvas_preview_width
+        if canvas_h <= 1:
+            canvas_h = self.canvas_preview_height
+
+        # Recuadro disponible con padding mínimo
+        max_w = canvas_w - 10
+        max_h = canvas_h - 10
+        self._ruta_preview_pendiente = ruta_logo
+
+        miniatura = self.logo_cache.obtener_en_memoria(ruta_logo, max_w, max_h)
+        if miniatura is not None:
+            self._pintar_preview_logo(ruta_logo, miniatura, None, canvas_w, canvas_h)
+            return
+
+        self.canvas_logo_preview.delete("all")
+        self.canvas_logo_preview.config(bg=COLOR_LOGO_BG)
+        self.canvas_logo_preview.create_text(
+            canvas_w / 2.0, canvas_h / 2.0,
+            text="⏳ Cargando logo...",
+            fill="#999999",
+            font=("Arial", 10)
+        )
+
+        def generar():
+            try:
+                imagen, error = self.logo_cache.obtener(ruta_logo, max_w, max_h), None
+            except Exception as e:
+                imagen, error = None, e
+            self.root.after(0, self._pintar_preview_logo, ruta_logo, imagen, error, canvas_w, canvas_h)
+
+        threading.Thread(target=generar, daemon=True).start()
+
+    def _pintar_preview_logo(self, ruta_logo, miniatura, error, canvas_w, canvas_h):
+        """Pinta la miniatura ya generada (se ejecuta en el hilo de Tk)"""
+        # Ignorar resultados de un logo que ya no es el seleccionado
+        if ruta_logo != self._ruta_preview_pendiente or self.canvas_logo_preview is None:
+            return
+
         try:
-            img = Image.open(ruta_logo)
-            
-            # Forzar actualización del canvas para obtener dimensiones reales
-            self.canvas_logo_preview.update()
-            
-            # Obtener dimensiones reales del canvas
-            canvas_w = self.canvas_logo_preview.winfo_width()
-            canvas_h = self.canvas_logo_preview.winfo_height()
-            
-            # Si no tiene dimensiones, usar las configuradas
-            if canvas_w <= 1:
-                canvas_w = self.canvas_preview_width
-            if canvas_h <= 1:
-                canvas_h = self.canvas_preview_height
-            
-            # Calcular dimensiones con padding mínimo
-            max_w = canvas_w - 10
-            max_h = canvas_h - 10
-            
-            # Calcular ratio manteniendo aspecto - maximizar el tamaño
-            ratio = min(max_w / img.width, max_h / img.height)
-            new_w = int(img.width * ratio)
-            new_h = int(img.height * ratio)
-            
-            # Redimensionar imagen
-            img_resized = img.resize((new_w, new_h), Image.Resampling.LANCZOS)
-            self.logo_photo = ImageTk.PhotoImage(img_resized)
-            
+            if error is not None:
+                raise error
+
+            self.logo_photo = ImageTk.PhotoImage(miniatura)
+
             # Limpiar canvas
             self.canvas_logo_preview.delete("all")
             self.canvas_logo_preview.config(bg="white")
-            
-            # Calcular centro REAL del canvas
-            center_x = canvas_w / 2.0
-            center_y = canvas_h / 2.0
-            
+
             # Crear imagen CENTRADA con coordenadas flotantes
             self.canvas_image_id = self.canvas_logo_preview.create_image(
-                center_x, center_y,
+                canvas_w / 2.0, canvas_h / 2.0,
                 image=self.logo_photo,
                 anchor=tk.CENTER
             )
-            
+
         except Exception as e:
-            if self.canvas_logo_preview:
-                self.canvas_logo_preview.delete("all")
-                self.canvas_logo_preview.config(bg=COLOR_LOGO_BG)
-                center_x = self.canvas_preview_width / 2.0
-                center_y = self.canvas_preview_height / 2.0
-                self.canvas_logo_preview.create_text(
-                    center_x, center_y,
-                    text=f"❌ Error al cargar\n{str(e)[:30]}",
-                    fill="#ff0000",
-                    font=("Arial", 9)
-                )
+            self.canvas_logo_preview.delete("all")
+            self.canvas_logo_preview.config(bg=COLOR_LOGO_BG)
+            center_x = self.canvas_preview_width / 2.0
+            center_y = self.canvas_preview_height / 2.0
+            self.canvas_logo_preview.create_text(
+                center_x, center_y,
+                text=f"❌ Error al cargar\n{str(e)[:30]}",
+                fill="#ff0000",
+                font=("Arial", 9)
+            )
 
     def limpiar_preview_logo(self):
         """Limpia la previsualización del logo"""
         if self.canvas_logo_preview is None:
             return
             
+        self._ruta_preview_pendiente = None
         self.logo_photo = None
         self.canvas_image_id = None
         self.canvas_logo_preview.delete("all")
@@ -588,12 +671,20 @@ class GUI:
         )
 
     def deshabilitar_boton_empezar(self):
-        """Deshabilita el botón de empezar"""
+        """Deshabilita el botón de empezar (y el de la cola)"""
         self.btn_empezar.config(state=tk.DISABLED, bg=COLOR_DISABLED)
+        self.btn_cola.config(state=tk.DISABLED, bg=COLOR_DISABLED)
 
     def habilitar_boton_empezar(self):
-        """Habilita el botón de empezar"""
-        self.btn_empezar.config(state=tk.NORMAL, bg=COLOR_SUCCESS)
+        """Habilita el botón de empezar (y el de la cola)"""
+        self.btn_empezar.config(
+            state=tk.NORMAL, bg=COLOR_SUCCESS, text="🚀 EMPEZAR CONVERSIÓN", command=self.controller.empezar_proceso
+        )
+        self.btn_cola.config(state=tk.NORMAL, bg=COLOR_SUCCESS)
+
+    def mostrar_boton_detener(self, comando):
+        """Convierte el botón de empezar en el de detener la vigilancia"""
+        self.btn_empezar.config(state=tk.NORMAL, bg=COLOR_ERROR, text="⏹ DETENER VIGILANCIA", command=comando)
 
     # ====
     # MÉTODOS PARA OBTENER DATOS DE LA INTERFAZ
@@ -641,6 +732,9 @@ class GUI:
             'copy_attachments': self.var_copy_attachments.get(),
             'save_modified_dest': self.var_save_modified_dest.get(),
             'copy_as_pdf': self.var_copy_as_pdf.get(),
+            'bundle_pdfs': self.var_bundle_pdfs.get(),
+            'auto_rename': self.var_auto_rename.get(),
+            'watch_mode': self.var_watch_mode.get(),
 
             # Extensiones
             'process_docx': self.var_process_docx.get(),
@@ -679,6 +773,57 @@ class GUI:
         """Limpia toda la lista de carpetas"""
         self.listbox_carpetas.delete(0, tk.END)
 
+    # ====
+    # MÉTODOS PARA GESTIONAR LA COLA DE TRABAJOS
+    # ====
+
+    def agregar_trabajo_a_lista(self, texto):
+        """Agrega un trabajo a la lista de la cola"""
+        self.listbox_cola.insert(tk.END, texto)
+
+    def quitar_trabajo_de_lista(self, index):
+        """Quita un trabajo de la lista de la cola por índice"""
+        self.listbox_cola.delete(index)
+
+    def obtener_seleccion_trabajo(self):
+        """Obtiene el índice del trabajo seleccionado"""
+        seleccion = self.listbox_cola.curselection()
+        return seleccion[0] if seleccion else None
+
+    def aplicar_ajustes(self, ajustes):
+        """Vuelca en la interfaz unos ajustes de obtener_opciones_completas() (editar un trabajo)"""
+        variables = {
+            'add_logo': self.var_add_logo,
+            'add_folder_code': self.var_add_folder_code,
+            'add_header_line': self.var_add_header_line,
+            'add_footer_line': self.var_add_footer_line,
+            'add_author': self.var_add_author,
+            'add_page_number': self.var_add_page_number,
+            'respect_structure': self.var_respect_structure,
+            'copy_attachments': self.var_copy_attachments,
+            'save_modified_dest': self.var_save_modified_dest,
+            'copy_as_pdf': self.var_copy_as_pdf,
+            'bundle_pdfs': self.var_bundle_pdfs,
+            'auto_rename': self.var_auto_rename,
+            'watch_mode': self.var_watch_mode,
+            'process_docx': self.var_process_docx,
+            'process_docm': self.var_process_docm
+        }
+        for clave, variable in variables.items():
+            if clave in ajustes:
+                variable.set(ajustes[clave])
+
+        self.entry_autor.delete(0, tk.END)
+        self.entry_autor.insert(0, ajustes.get('autor_nombre', ''))
+        self.establecer_carpeta_destino(ajustes.get('destino', ''))
+        self.text_no_process.delete('1.0', tk.END)
+        self.text_no_process.insert('1.0', ajustes.get('excepciones_procesar', ''))
+        self.text_no_copy.delete('1.0', tk.END)
+        self.text_no_copy.insert('1.0', ajustes.get('excepciones_copiar', ''))
+        self.limpiar_lista_carpetas()
+        for carpeta in ajustes.get('carpetas', []):
+            self.agregar_carpeta_a_lista(carpeta)
+
     # ====
     # DIÁLOGOS
     # ====
@@ -752,7 +897,9 @@ class GUI:
             ("Copiar anexos", self.var_copy_attachments),
             ("Guardar modificado en destino", self.var_save_modified_dest),
             ("Copiar como PDF", self.var_copy_as_pdf),
-            ("Renombrar con código carpeta", self.var_auto_rename)
+            ("Renombrar con código carpeta", self.var_auto_rename),
+            ("PDF único por carpeta", self.var_bundle_pdfs),
+            ("Vigilar carpetas al terminar", self.var_watch_mode)
         ]
         for i, (txt, var) in enumerate(opts_cp):
             tk.Checkbutton(
@@ -0,0 +1,177 @@
+"""
+Cola de trabajos
+Un trabajo es una configuración completa de la GUI (carpetas, destino, logo,
+autor y opciones) que se guarda para ejecutarla más tarde. Los trabajos de la
+cola se ejecutan uno tras otro en el mismo hilo, con la misma sesión de Word
+y las mismas cachés, así que cambiar de trabajo no vuelve a arrancar Word.
+
+Los archivos de trabajo usan las mismas secciones y claves que config.ini,
+más una sección [JOB] con el nombre y las carpetas de origen. Lo que no
+aparece en el archivo se toma de la configuración actual de la GUI.
+"""
+
+import configparser
+import os
+from collections import namedtuple
+
+# nombre: texto para la lista y el resumen · ruta_logo: logo del encabezado ·
+# ajustes: diccionario de GUI.obtener_opciones_completas()
+TrabajoCola = namedtuple('TrabajoCola', 'nombre ruta_logo ajustes')
+
+# (sección, clave de config.ini, clave de los ajustes) de las opciones booleanas
+OPCIONES_TRABAJO = (
+    ('HEADER_FOOTER', 'add_logo', 'add_logo'),
+    ('HEADER_FOOTER', 'add_folder_code', 'add_folder_code'),
+    ('HEADER_FOOTER', 'add_header_line', 'add_header_line'),
+    ('HEADER_FOOTER', 'add_footer_line', 'add_footer_line'),
+    ('HEADER_FOOTER', 'add_author', 'add_author'),
+    ('HEADER_FOOTER', 'add_page_number', 'add_page_number'),
+    ('COPY_OPTIONS', 'respect_structure', 'respect_structure'),
+    ('COPY_OPTIONS', 'copy_attachments', 'copy_attachments'),
+    ('COPY_OPTIONS', 'save_modified_in_dest', 'save_modified_dest'),
+    ('COPY_OPTIONS', 'copy_as_pdf', 'copy_as_pdf'),
+    ('COPY_OPTIONS', 'bundle_pdfs', 'bundle_pdfs'),
+    ('COPY_OPTIONS', 'auto_rename', 'auto_rename'),
+    ('COPY_OPTIONS', 'watch_mode', 'watch_mode'),
+    ('PROCESS_EXTENSIONS', 'process_docx', 'process_docx'),
+    ('PROCESS_EXTENSIONS', 'process_docm', 'process_docm'),
+)
+
+# (sección, clave de config.ini, clave de los ajustes) de los textos
+TEXTOS_TRABAJO = (
+    ('USER', 'author', 'autor_nombre'),
+    ('USER', 'last_destination', 'destino'),
+    ('EXCLUSIONS', 'no_process_names', 'excepciones_procesar'),
+    ('EXCLUSIONS', 'no_copy_names', 'excepciones_copiar'),
+)
+
+
+def nombre_por_defecto(ajustes):
+    """Nombre de un trabajo sin nombre: la carpeta de destino"""
+    destino = ajustes.get('destino', '').strip()
+    return os.path.basename(os.path.normpath(destino)) if destino else "trabajo"
+
+
+def describir_trabajo(trabajo):
+    """Línea de la lista de la cola"""
+    ajustes = trabajo.ajustes
+    carpetas = len(ajustes.get('carpetas', []))
+    autor = f" · {ajustes['autor_nombre']}" if ajustes.get('autor_nombre') else ""
+    return f"{trabajo.nombre}{autor} · {carpetas} carpeta(s) → {ajustes.get('destino', '')}"
+
+
+def validar_trabajo(trabajo):
+    """
+    Comprueba que un trabajo se puede ejecutar
+
+    Args:
+        trabajo (TrabajoCola): Trabajo a comprobar
+
+    Returns:
+        tuple: (título, mensaje) del error, o None si es válido
+    """
+    ajustes = trabajo.ajustes
+
+    if ajustes.get('add_logo') and not trabajo.ruta_logo:
+        return "Error", "Debes seleccionar un logo si la opción está activa"
+    if ajustes.get('add_logo') and not os.path.isfile(trabajo.ruta_logo):
+        return "Error", f"No se encuentra el logo: {trabajo.ruta_logo}"
+
+    if not ajustes.get('carpetas'):
+        return "Error", "Agrega carpetas a procesar"
+    for carpeta in ajustes['carpetas']:
+        if not os.path.isdir(carpeta):
+            return "Error", f"No se encuentra la carpeta de origen: {carpeta}"
+
+    destino = ajustes.get('destino', '').strip()
+    if not destino or not os.path.isdir(os.path.normpath(destino)):
+        return "Error", "Carpeta destino no válida"
+
+    if not (ajustes.get('copy_attachments') or ajustes.get('save_modified_dest') or ajustes.get('copy_as_pdf')):
+        return (
+            "Sin acciones configuradas",
+            "Debes activar al menos una opción:\n\n" +
+            "• Copiar anexos\n" +
+            "• Guardar modificado en destino\n" +
+            "• Copiar como PDF\n\n" +
+            "De lo contrario, el programa no hará nada."
+        )
+
+    if ajustes.get('add_author') and not ajustes.get('autor_nombre', '').strip():
+        return (
+            "Campo Autor vacío",
+            "Has activado 'Añadir Autor' pero el campo está vacío.\n\n" +
+            "Debes escribir un nombre de autor o desactivar la opción."
+        )
+    return None
+
+
+def cargar_trabajo(ruta, base, ruta_logo_base=''):
+    """
+    Lee un archivo de trabajo
+
+    Args:
+        ruta (str): Archivo .ini del trabajo
+        base (dict): Ajustes para lo que no aparezca en el archivo (la GUI actual)
+        ruta_logo_base (str): Logo si el archivo no indica ninguno
+
+    Returns:
+        TrabajoCola: Trabajo con las rutas relativas resueltas desde la carpeta del archivo
+
+    Raises:
+        ValueError: Si el archivo no existe o no se puede interpretar
+    """
+    parser = configparser.ConfigParser(interpolation=None)
+    try:
+        if not parser.read(ruta, encoding='utf-8'):
+            raise ValueError(f"No se puede leer {ruta}")
+    except configparser.Error as e:
+        raise ValueError(f"{os.path.basename(ruta)}: {e}") from e
+    carpeta_archivo = os.path.dirname(os.path.abspath(ruta))
+
+    def resolver(valor):
+        valor = os.path.expanduser(valor.strip())
+        return os.path.normpath(os.path.join(carpeta_archivo, valor)) if valor else ''
+
+    ajustes = dict(base)
+    try:
+        for seccion, clave, nombre in OPCIONES_TRABAJO:
+            if parser.has_option(seccion, clave):
+                ajustes[nombre] = parser.getboolean(seccion, clave)
+    except ValueError as e:
+        raise ValueError(f"{os.path.basename(ruta)}: {e}") from e
+    for seccion, clave, nombre in TEXTOS_TRABAJO:
+        if parser.has_option(seccion, clave):
+            ajustes[nombre] = parser.get(seccion, clave).strip()
+    if ajustes.get('destino'):
+        ajustes['destino'] = resolver(ajustes['destino'])
+
+    if parser.has_option('JOB', 'folders'):
+        ajustes['carpetas'] = [
+            resolver(linea) for linea in parser.get('JOB', 'folders').splitlines() if linea.strip()
+        ]
+
+    ruta_logo = ruta_logo_base
+    if parser.has_option('USER', 'last_logo'):
+        ruta_logo = resolver(parser.get('USER', 'last_logo'))
+
+    nombre = parser.get('JOB', 'name', fallback='').strip() or os.path.splitext(os.path.basename(ruta))[0]
+    return TrabajoCola(nombre, ruta_logo, ajustes)
+
+
+def guardar_trabajo(trabajo, ruta):
+    """Escribe un trabajo en un archivo .ini que luego se puede cargar con cargar_trabajo()"""
+    parser = configparser.ConfigParser(interpolation=None)
+    ajustes = trabajo.ajustes
+    parser['JOB'] = {
+        'name': trabajo.nombre,
+        'folders': '\n' + '\n'.join(ajustes.get('carpetas', [])),
+    }
+    parser['USER'] = {'last_logo': trabajo.ruta_logo or ''}
+    for seccion, clave, nombre in TEXTOS_TRABAJO + OPCIONES_TRABAJO:
+        if nombre in ajustes:
+            if not parser.has_section(seccion):
+                parser.add_section(seccion)
+            parser.set(seccion, clave, str(ajustes[nombre]))
+    with open(ruta, 'w', encoding='utf-8') as f:
+        parser.write(f)
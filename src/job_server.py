@@ -0,0 +1,315 @@
+"""
+Servidor de trabajos para procesar en varios equipos
+Publica los documentos de la ejecución en un pequeño servidor HTTP local.
+Los workers (src/job_worker.py, en este equipo o en otros) reclaman
+trabajos, leen y escriben por la unidad compartida y devuelven el resultado.
+Cada trabajo reclamado tiene un plazo (lease): si el worker deja de
+renovarlo (o lleva más de max_segundos con él), el trabajo vuelve a la cola.
+"""
+
+import json
+import queue
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.config import JOB_SERVER_HOST, JOB_SERVER_PORT, JOB_LEASE_SECONDS, JOB_MAX_SECONDS, JOB_MAX_ATTEMPTS
+from src.parallel_stamper import ResultadoEstampado
+
+# Segundos que un worker espera antes de volver a pedir trabajo si la cola está vacía
+ESPERA_SIN_TRABAJO = 1.0
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    """Peticiones JSON de los workers: /claim, /renew, /complete y /status"""
+
+    def do_GET(self):
+        if not self._autorizado():
+            return
+        if self.path == '/status':
+            self._responder(self.server.servidor_trabajos.estado())
+        else:
+            self._responder({'error': 'ruta desconocida'}, 404)
+
+    def do_POST(self):
+        if not self._autorizado():
+            return
+        try:
+            longitud = int(self.headers.get('Content-Length', 0))
+            datos = json.loads(self.rfile.read(longitud) or b'{}')
+        except (ValueError, json.JSONDecodeError):
+            self._responder({'error': 'JSON no válido'}, 400)
+            return
+        servidor = self.server.servidor_trabajos
+        worker = str(datos.get('worker', '?'))
+        if self.path == '/claim':
+            self._responder(servidor.reclamar(worker))
+        elif self.path == '/renew':
+            self._responder({'ok': servidor.renovar(worker, datos.get('id'))})
+        elif self.path == '/complete':
+            self._responder({'ok': servidor.completar(worker, datos.get('id'), datos)})
+        else:
+            self._responder({'error': 'ruta desconocida'}, 404)
+
+    def _autorizado(self):
+        token = self.server.servidor_trabajos.token
+        if token and self.headers.get('X-Token') != token:
+            self._responder({'error': 'token no válido'}, 403)
+            return False
+        return True
+
+    def _responder(self, datos, codigo=200):
+        cuerpo = json.dumps(datos).encode('utf-8')
+        self.send_response(codigo)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        # Sin una línea en consola por cada petición
+        pass
+
+
+class JobServer:
+    """
+    Cola de trabajos compartida con los workers. `ejecutar()` tiene la misma
+    forma que ParallelStampRunner.ejecutar: publica los trabajos de un iterable
+    y llama a `al_terminar` en el hilo que llama con cada resultado.
+    """
+
+    def __init__(self, contexto, host=JOB_SERVER_HOST, puerto=JOB_SERVER_PORT, token='',
+                 lease=JOB_LEASE_SECONDS, max_segundos=JOB_MAX_SECONDS, max_intentos=JOB_MAX_ATTEMPTS,
+                 log_callback=None):
+        """
+        Args:
+            contexto (dict): Ajustes comunes a todos los trabajos (motor, logo, autor, opciones...)
+            host (str): Interfaz de escucha ('127.0.0.1' solo este equipo, '0.0.0.0' la red)
+            puerto (int): Puerto TCP (0 = uno libre)
+            token (str): Secreto compartido que deben enviar los workers (vacío = sin comprobar)
+            lease (float): Segundos que un worker tiene un trabajo sin renovarlo
+            max_segundos (float): Segundos tras los que el worker deja de renovar un trabajo
+            max_intentos (int): Veces que se reparte un trabajo antes de darlo por fallido
+            log_callback (callable): Función para escribir en el log
+        """
+        self.contexto = contexto
+        self.host = host
+        self.puerto = puerto
+        self.token = token
+        self.lease = lease
+        self.max_segundos = max_segundos
+        self.max_intentos = max(1, max_intentos)
+        self.log_callback = log_callback
+
+        self._lock = threading.Lock()
+        self._pendientes = deque()   # ids en espera
+        self._trabajos = {}          # id -> {'trabajo', 'intentos', 'worker', 'vence'}
+        self._resultados = queue.Queue()
+        self._siguiente_id = 0
+        self._cerrado = False
+        self.workers = {}            # nombre -> {'visto', 'hechos', 'errores'}
+        self.reencolados = 0
+        self._http = None
+        self._hilo = None
+
+    @property
+    def url(self):
+        host = '127.0.0.1' if self.host in ('', '0.0.0.0') else self.host
+        return f"http://{host}:{self.puerto}"
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def iniciar(self):
+        self._http = ThreadingHTTPServer((self.host, self.puerto), _Manejador)
+        self._http.daemon_threads = True
+        self._http.servidor_trabajos = self
+        self.puerto = self._http.server_address[1]
+        self._hilo = threading.Thread(target=self._http.serve_forever, name="servidor-trabajos", daemon=True)
+        self._hilo.start()
+
+    def detener(self):
+        """Los workers que pidan trabajo reciben 'fin'; después se cierra el servidor"""
+        with self._lock:
+            self._cerrado = True
+        if self._http:
+            # Margen para que los workers en espera reciban 'fin' y terminen limpiamente
+            time.sleep(min(2 * ESPERA_SIN_TRABAJO, 3))
+            self._http.shutdown()
+            self._http.server_close()
+            self._http = None
+
+    # ------------------------------------------------------------------
+    # Lado del controlador
+    # ------------------------------------------------------------------
+
+    def publicar(self, trabajo):
+        """Añade un TrabajoEstampado a la cola"""
+        with self._lock:
+            self._siguiente_id += 1
+            id_trabajo = self._siguiente_id
+            self._trabajos[id_trabajo] = {'trabajo': trabajo, 'intentos': 0, 'worker': None, 'vence': 0.0}
+            self._pendientes.append(id_trabajo)
+        return id_trabajo
+
+    def ejecutar(self, trabajos, al_terminar=None):
+        """
+        Publica los trabajos según llegan y espera a todos sus resultados
+
+        Args:
+            trabajos (iterable): TrabajoEstampado a procesar
+            al_terminar (callable): Se llama en este hilo con cada ResultadoEstampado
+
+        Returns:
+            int: Documentos procesados correctamente
+        """
+        publicados = [0]
+        publicacion_terminada = threading.Event()
+
+        def publicar_todos():
+            try:
+                for trabajo in trabajos:
+                    self.publicar(trabajo)
+                    publicados[0] += 1
+            finally:
+                publicacion_terminada.set()
+
+        hilo = threading.Thread(target=publicar_todos, name="publicacion", daemon=True)
+        hilo.start()
+
+        entregados = correctos = 0
+        while not (publicacion_terminada.is_set() and entregados >= publicados[0]):
+            try:
+                resultado = self._resultados.get(timeout=0.2)
+            except queue.Empty:
+                self._recuperar_vencidos()
+                continue
+            entregados += 1
+            if resultado.exito:
+                correctos += 1
+            if al_terminar:
+                al_terminar(resultado)
+        hilo.join()
+        return correctos
+
+    # ------------------------------------------------------------------
+    # Lado de los workers (llamado desde los hilos HTTP)
+    # ------------------------------------------------------------------
+
+    def _visto(self, worker):
+        datos = self.workers.setdefault(worker, {'visto': 0.0, 'hechos': 0, 'errores': 0})
+        datos['visto'] = time.time()
+        return datos
+
+    def reclamar(self, worker):
+        self._recuperar_vencidos()
+        with self._lock:
+            self._visto(worker)
+            if self._cerrado:
+                return {'fin': True}
+            # Un trabajo vencido que su worker entregó tarde ya no está en _trabajos
+            estado = None
+            while self._pendientes and estado is None:
+                id_trabajo = self._pendientes.popleft()
+                estado = self._trabajos.get(id_trabajo)
+            if estado is None:
+                return {'esperar': ESPERA_SIN_TRABAJO}
+            estado['intentos'] += 1
+            estado['worker'] = worker
+            estado['vence'] = time.monotonic() + self.lease
+            return {
+                'id': id_trabajo,
+                'trabajo': estado['trabajo']._asdict(),
+                'contexto': self.contexto,
+                'lease': self.lease,
+                'max_segundos': self.max_segundos,
+            }
+
+    def renovar(self, worker, id_trabajo):
+        with self._lock:
+            self._visto(worker)
+            estado = self._trabajos.get(id_trabajo)
+            if not estado or estado['worker'] != worker:
+                # El trabajo venció y ya lo tiene otro worker
+                return False
+            estado['vence'] = time.monotonic() + self.lease
+            return True
+
+    def completar(self, worker, id_trabajo, datos):
+        with self._lock:
+            registro = self._visto(worker)
+            estado = self._trabajos.pop(id_trabajo, None)
+            if estado is None:
+                # Resultado duplicado de un trabajo que ya entregó otro worker
+                return False
+            if estado['worker'] is None:
+                # Entrega tardía de un trabajo que venció y volvió a la cola: se acepta y sale de la cola
+                try:
+                    self._pendientes.remove(id_trabajo)
+                except ValueError:
+                    pass
+            exito = bool(datos.get('exito'))
+            registro['hechos' if exito else 'errores'] += 1
+        mensajes = list(datos.get('mensajes', []))
+        if worker:
+            mensajes.append(f"    · worker {worker}")
+        self._resultados.put(ResultadoEstampado(
+            estado['trabajo'], exito, bool(datos.get('omitido')), mensajes, float(datos.get('duracion', 0.0))
+        ))
+        return True
+
+    def _recuperar_vencidos(self):
+        """Los trabajos cuyo worker no ha renovado el plazo vuelven a la cola (o fallan)"""
+        ahora = time.monotonic()
+        fallidos = []
+        with self._lock:
+            for id_trabajo, estado in list(self._trabajos.items()):
+                if estado['worker'] is None or estado['vence'] > ahora:
+                    continue
+                perdido = estado['worker']
+                estado['worker'] = None
+                if estado['intentos'] >= self.max_intentos:
+                    del self._trabajos[id_trabajo]
+                    fallidos.append((estado, perdido))
+                else:
+                    self.reencolados += 1
+                    self._pendientes.appendleft(id_trabajo)
+                    self._log(f"⚠ Worker {perdido} sin respuesta: {estado['trabajo'].archivo} vuelve a la cola")
+        for estado, perdido in fallidos:
+            self._resultados.put(ResultadoEstampado(
+                estado['trabajo'], False, False,
+                [f"\n>>> {estado['trabajo'].archivo}",
+                 f"  ✗ ERROR: sin respuesta tras {estado['intentos']} intentos (último worker: {perdido})"],
+                0.0, agotado=True
+            ))
+
+    # ------------------------------------------------------------------
+    # Estado
+    # ------------------------------------------------------------------
+
+    def estado(self):
+        """Resumen en JSON para /status"""
+        with self._lock:
+            en_curso = sum(1 for e in self._trabajos.values() if e['worker'] is not None)
+            return {
+                'pendientes': len(self._pendientes),
+                'en_curso': en_curso,
+                'reencolados': self.reencolados,
+                'workers': {nombre: dict(datos) for nombre, datos in self.workers.items()},
+            }
+
+    def resumen(self):
+        """
+        Returns:
+            list: Líneas de texto para el log
+        """
+        lineas = [f"Servidor de trabajos: {len(self.workers)} workers, {self.reencolados} trabajos reencolados"]
+        for nombre, datos in sorted(self.workers.items()):
+            lineas.append(f"  {nombre}: {datos['hechos']} correctos, {datos['errores']} errores")
+        return lineas
+
+    def _log(self, mensaje):
+        if self.log_callback:
+            self.log_callback(mensaje)
@@ -0,0 +1,253 @@
+"""
+Worker de conversión para el servidor de trabajos
+Pide documentos al servidor, los procesa con Word (o sin Word, según el
+motor de la ejecución) y devuelve el resultado. Mientras procesa renueva
+el plazo del trabajo para que el servidor sepa que sigue vivo, hasta el
+tiempo máximo por documento: un Word colgado no retiene el trabajo.
+
+Uso (desde la raíz del repositorio):
+    python -m src.job_worker --servidor http://equipo:8765 --token secreto
+    python -m src.job_worker --servidor http://127.0.0.1:8765 --backend fake
+    python -m src.job_worker --servidor ... --mapear "F:\\Cursos=/mnt/cursos"
+
+Con --backend fake se usa el Word falso de benchmarks/ (pruebas en Linux).
+"""
+
+import argparse
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import traceback
+import urllib.error
+import urllib.request
+
+from src.config import JOB_MAX_SECONDS
+from src.parallel_stamper import TrabajoEstampado
+
+
+class JobWorker:
+    """Bucle de un worker: reclamar, procesar, renovar el plazo y completar"""
+
+    def __init__(self, servidor, token='', nombre=None, backend='word', mapeos=(), espera_max=30.0):
+        """
+        Args:
+            servidor (str): URL del servidor de trabajos
+            token (str): Secreto compartido con el servidor
+            nombre (str): Nombre del worker en el resumen (por defecto equipo-pid)
+            backend (str): 'word' o 'fake'
+            mapeos (list): Pares (prefijo en el servidor, prefijo en este equipo)
+            espera_max (float): Segundos reintentando si el servidor no responde
+        """
+        self.servidor = servidor.rstrip('/')
+        self.token = token
+        self.nombre = nombre or f"{socket.gethostname()}-{os.getpid()}"
+        self.backend = backend
+        self.mapeos = list(mapeos)
+        self.espera_max = espera_max
+        self.documentos = 0
+
+        self._contexto = None
+        self._procesador = None
+        self._sesion = None
+
+    def _log(self, mensaje):
+        """Mensajes de la sesión de Word (reciclados, perfil) con el nombre del worker"""
+        print(f"[{self.nombre}] {mensaje}")
+
+    # ------------------------------------------------------------------
+    # Comunicación con el servidor
+    # ------------------------------------------------------------------
+
+    def _peticion(self, ruta, datos):
+        cuerpo = json.dumps(dict(datos, worker=self.nombre)).encode('utf-8')
+        peticion = urllib.request.Request(
+            self.servidor + ruta, data=cuerpo,
+            headers={'Content-Type': 'application/json', 'X-Token': self.token}
+        )
+        with urllib.request.urlopen(peticion, timeout=30) as respuesta:
+            return json.loads(respuesta.read())
+
+    def _peticion_con_reintentos(self, ruta, datos):
+        """None si el servidor no responde durante espera_max segundos"""
+        limite = time.monotonic() + self.espera_max
+        espera = 0.5
+        while True:
+            try:
+                return self._peticion(ruta, datos)
+            except (urllib.error.URLError, ConnectionError, socket.timeout) as e:
+                if time.monotonic() >= limite:
+                    print(f"[{self.nombre}] Servidor no disponible: {e}", file=sys.stderr)
+                    return None
+                time.sleep(espera)
+                espera = min(espera * 2, 5.0)
+
+    def _mapear(self, ruta):
+        """Traduce una ruta del servidor a la del mismo recurso compartido en este equipo"""
+        if not ruta:
+            return ruta
+        for origen, local in self.mapeos:
+            if ruta.lower().startswith(origen.lower()):
+                resto = ruta[len(origen):].lstrip('\\/')
+                return os.path.join(local, *resto.replace('\\', '/').split('/')) if resto else local
+        return ruta
+
+    # ------------------------------------------------------------------
+    # Bucle principal
+    # ------------------------------------------------------------------
+
+    def ejecutar(self):
+        """
+        Returns:
+            int: Documentos procesados
+        """
+        try:
+            while True:
+                respuesta = self._peticion_con_reintentos('/claim', {})
+                if respuesta is None or respuesta.get('fin'):
+                    return self.documentos
+                if 'id' not in respuesta:
+                    time.sleep(respuesta.get('esperar', 1.0))
+                    continue
+                self._procesar(respuesta)
+        finally:
+            if self._sesion:
+                import pythoncom
+                self._sesion.cerrar()
+                pythoncom.CoUninitialize()
+
+    def _procesar(self, respuesta):
+        id_trabajo = respuesta['id']
+        detener_renovacion = threading.Event()
+        max_segundos = respuesta.get('max_segundos', JOB_MAX_SECONDS)
+        limite = time.monotonic() + max_segundos
+
+        def renovar():
+            # Se renueva a un tercio del plazo: una renovación perdida no basta para perder el trabajo
+            while not detener_renovacion.wait(respuesta['lease'] / 3):
+                if time.monotonic() >= limite:
+                    # Demasiado tiempo con un documento: sin renovar, el plazo vence y lo recoge otro worker
+                    print(f"[{self.nombre}] Trabajo {id_trabajo} sin terminar tras {max_segundos}s; "
+                          "se deja de renovar", file=sys.stderr)
+                    return
+                try:
+                    if not self._peticion('/renew', {'id': id_trabajo}).get('ok'):
+                        return
+                except (urllib.error.URLError, ConnectionError, socket.timeout):
+                    pass
+
+        hilo = threading.Thread(target=renovar, name="renovacion", daemon=True)
+        hilo.start()
+        try:
+            resultado = self._procesar_trabajo(TrabajoEstampado(**respuesta['trabajo']), respuesta['contexto'])
+        finally:
+            detener_renovacion.set()
+            hilo.join()
+        self.documentos += 1
+        self._peticion_con_reintentos('/complete', dict(resultado, id=id_trabajo))
+
+    def _procesar_trabajo(self, trabajo, contexto):
+        """
+        Returns:
+            dict: exito, omitido, mensajes y duracion
+        """
+        trabajo = trabajo._replace(
+            ruta_origen=self._mapear(trabajo.ruta_origen),
+            carpeta_destino=self._mapear(trabajo.carpeta_destino)
+        )
+        if contexto != self._contexto:
+            self._preparar(contexto)
+
+        if contexto['motor'] == 'package':
+            from src.parallel_stamper import _estampar_uno
+            resultado = _estampar_uno(trabajo)
+            return {
+                'exito': resultado.exito, 'omitido': resultado.omitido,
+                'mensajes': resultado.mensajes, 'duracion': resultado.duracion
+            }
+
+        mensajes = []
+        inicio = time.perf_counter()
+        omitidos_antes = self._procesador.documentos_omitidos
+        try:
+            self._sesion.preparar_documento()
+            exito = self._procesador.procesar_docx(
+                self._sesion.word, trabajo.ruta_origen, trabajo.archivo, trabajo.codigo,
+                trabajo.carpeta_destino, mensajes.append, contexto['opciones']
+            )
+            self._sesion.documento_procesado()
+        except Exception as e:
+            exito = False
+            mensajes.append(f"  ✗ ERROR: {e}")
+            mensajes.append(traceback.format_exc())
+        return {
+            'exito': exito,
+            'omitido': self._procesador.documentos_omitidos > omitidos_antes,
+            'mensajes': mensajes,
+            'duracion': time.perf_counter() - inicio,
+        }
+
+    def _preparar(self, contexto):
+        """Crea el procesador (y abre Word) para los ajustes de la ejecución"""
+        ruta_logo = self._mapear(contexto['ruta_logo'])
+        if contexto['motor'] == 'package':
+            from src.parallel_stamper import _iniciar_proceso
+            from src.stamp_check import hash_archivo
+            usa_logo = contexto['opciones'].get('add_logo', True) and ruta_logo and os.path.exists(ruta_logo)
+            _iniciar_proceso(
+                ruta_logo, contexto['autor'], contexto['opciones'],
+                hash_archivo(ruta_logo) if usa_logo else '', contexto['omitir_estampados']
+            )
+        else:
+            if self.backend == 'fake':
+                from benchmarks.fake_word import ComRecorder, instalar_win32com_falso
+                instalar_win32com_falso(ComRecorder())
+            import pythoncom
+            import src.word_processor as word_processor
+            from src.config_manager import ConfigManager
+            from src.word_session import WordSession
+            if self.backend == 'fake':
+                word_processor.WORD_PAUSE_AFTER_EDIT = 0
+                word_processor.WORD_PAUSE_AFTER_CLOSE = 0
+            if self._sesion is None:
+                pythoncom.CoInitialize()
+                # Reciclado, perfil y vinculación COM del config.ini de este equipo, como en la aplicación
+                self._sesion = WordSession.desde_config(ConfigManager(), self._log)
+                self._sesion.iniciar()
+            self._procesador = word_processor.WordProcessor(
+                ruta_logo, contexto['autor'], contexto['perfil_pdf'], contexto['linealizar'],
+                omitir_estampados=contexto['omitir_estampados'],
+                argumentos_apertura=self._sesion.argumentos_apertura
+            )
+        self._contexto = contexto
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Worker de conversión de Pink Autoheader")
+    parser.add_argument('--servidor', required=True, help="URL del servidor de trabajos")
+    parser.add_argument('--token', default=os.environ.get('AUTOHEADER_TOKEN', ''))
+    parser.add_argument('--nombre', default=None)
+    parser.add_argument('--backend', choices=['word', 'fake'], default='word')
+    parser.add_argument('--mapear', action='append', default=[], metavar='SERVIDOR=LOCAL',
+                        help="Prefijo de ruta del servidor y su equivalente en este equipo")
+    parser.add_argument('--espera-max', type=float, default=30.0,
+                        help="Segundos reintentando si el servidor no responde")
+    args = parser.parse_args(argv)
+
+    mapeos = []
+    for mapeo in args.mapear:
+        origen, _, local = mapeo.partition('=')
+        if not local:
+            parser.error(f"--mapear necesita SERVIDOR=LOCAL: {mapeo}")
+        mapeos.append((origen, local))
+
+    worker = JobWorker(args.servidor, args.token, args.nombre, args.backend, mapeos, args.espera_max)
+    documentos = worker.ejecutar()
+    print(f"[{worker.nombre}] {documentos} documentos procesados")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
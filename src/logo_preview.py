@@ -0,0 +1,130 @@
+"""
+Caché de miniaturas para la previsualización del logo
+Decodifica y reduce las imágenes fuera del hilo de Tk y guarda el resultado
+en memoria y en disco, indexado por (ruta, fecha de modificación, tamaño del canvas)
+"""
+
+import hashlib
+import os
+import threading
+from PIL import Image
+
+from src.config import LOGO_PREVIEW_CACHE_DIR, LOGO_PREVIEW_CACHE_MAX_FILES
+
+
+class LogoPreviewCache:
+    """Genera y recuerda miniaturas de logos"""
+
+    def __init__(self, carpeta_cache=LOGO_PREVIEW_CACHE_DIR, max_archivos=LOGO_PREVIEW_CACHE_MAX_FILES):
+        """
+        Args:
+            carpeta_cache (str): Carpeta donde guardar las miniaturas en disco
+            max_archivos (int): Miniaturas máximas en disco (se borran las más antiguas)
+        """
+        self.carpeta_cache = carpeta_cache
+        self.max_archivos = max_archivos
+        self._memoria = {}
+        self._lock = threading.Lock()
+
+    def clave(self, ruta, ancho, alto):
+        """Clave de caché; cambia si el archivo se modifica o el canvas cambia de tamaño"""
+        try:
+            mtime = os.stat(ruta).st_mtime_ns
+        except OSError:
+            return None
+        return (os.path.normcase(os.path.abspath(ruta)), mtime, ancho, alto)
+
+    def obtener_en_memoria(self, ruta, ancho, alto):
+        """Devuelve la miniatura si ya está en memoria (instantáneo, apto para el hilo de Tk)"""
+        clave = self.clave(ruta, ancho, alto)
+        with self._lock:
+            return self._memoria.get(clave)
+
+    def obtener(self, ruta, ancho, alto):
+        """
+        Devuelve la miniatura del logo, generándola si hace falta.
+        Puede tardar: llamar desde un hilo secundario.
+
+        Args:
+            ruta (str): Ruta de la imagen
+            ancho (int): Ancho máximo de la miniatura
+            alto (int): Alto máximo de la miniatura
+
+        Returns:
+            PIL.Image.Image: Miniatura ya cargada en memoria
+        """
+        clave = self.clave(ruta, ancho, alto)
+        if clave is None:
+            raise FileNotFoundError(ruta)
+
+        with self._lock:
+            if clave in self._memoria:
+                return self._memoria[clave]
+
+        ruta_disco = self._ruta_en_disco(clave)
+        miniatura = self._leer_de_disco(ruta_disco)
+        if miniatura is None:
+            miniatura = self._generar(ruta, ancho, alto)
+            self._guardar_en_disco(miniatura, ruta_disco)
+
+        with self._lock:
+            self._memoria[clave] = miniatura
+        return miniatura
+
+    def _generar(self, ruta, ancho, alto):
+        """Decodifica la imagen a la resolución mínima necesaria y la ajusta al recuadro"""
+        with Image.open(ruta) as img:
+            # En JPEG, el modo draft decodifica directamente a escala reducida
+            if img.format == 'JPEG':
+                img.draft('RGB', (ancho, alto))
+
+            ratio = min(ancho / img.width, alto / img.height)
+            if ratio < 1:
+                img.thumbnail((ancho, alto), Image.Resampling.LANCZOS)
+                miniatura = img.copy()
+            else:
+                # Logos pequeños: ampliar para aprovechar el canvas
+                nuevo = (max(1, int(img.width * ratio)), max(1, int(img.height * ratio)))
+                miniatura = img.resize(nuevo, Image.Resampling.LANCZOS)
+
+        if miniatura.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+            miniatura = miniatura.convert('RGBA')
+        return miniatura
+
+    def _ruta_en_disco(self, clave):
+        resumen = hashlib.sha1(repr(clave).encode('utf-8')).hexdigest()
+        return os.path.join(self.carpeta_cache, f"{resumen}.png")
+
+    def _leer_de_disco(self, ruta_disco):
+        try:
+            with Image.open(ruta_disco) as img:
+                img.load()
+                return img.copy()
+        except (OSError, ValueError):
+            return None
+
+    def _guardar_en_disco(self, miniatura, ruta_disco):
+        try:
+            os.makedirs(self.carpeta_cache, exist_ok=True)
+            temporal = ruta_disco + ".tmp"
+            miniatura.save(temporal, format='PNG')
+            os.replace(temporal, ruta_disco)
+            self._podar_disco()
+        except OSError:
+            # La caché en disco es opcional: si falla, solo se pierde el ahorro
+            pass
+
+    def _podar_disco(self):
+        """Borra las miniaturas más antiguas si se supera el máximo"""
+        archivos = [
+            os.path.join(self.carpeta_cache, f)
+            for f in os.listdir(self.carpeta_cache) if f.endswith('.png')
+        ]
+        if len(archivos) <= self.max_archivos:
+            return
+        archivos.sort(key=os.path.getmtime)
+        for ruta in archivos[:len(archivos) - self.max_archivos]:
+            try:
+                os.remove(ruta)
+            except OSError:
+                pass
@@ -0,0 +1,297 @@
+"""
+Métricas de la ejecución para seguirla desde fuera de la GUI
+Contadores, indicadores e histogramas de latencia en el formato de texto de
+Prometheus, servidos en un endpoint HTTP local (solo 127.0.0.1) y/o escritos
+en un archivo que se reescribe periódicamente (válido para el textfile
+collector de node_exporter). Los indicadores se calculan al exportar a partir
+del estado que ya existe, así que en el bucle de trabajo solo se suman
+contadores y se anotan duraciones.
+"""
+
+import bisect
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.config import METRICS_PORT, METRICS_INTERVAL_SECONDS, METRICS_BUCKETS
+
+PREFIJO = 'pink_autoheader_'
+TIPO_CONTENIDO = 'text/plain; version=0.0.4; charset=utf-8'
+
+# Métricas conocidas: nombre -> (tipo, ayuda). Se exportan en este orden.
+METRICAS = {
+    'files_scanned_total': ('counter', "Archivos encontrados al escanear las carpetas de origen"),
+    'files': ('gauge', "Archivos de la tabla de resultados por estado"),
+    'documents_total': ('gauge', "Documentos Word a procesar en la ejecución"),
+    'documents_processed': ('gauge', "Documentos Word procesados correctamente"),
+    'bytes_copied_total': ('counter', "Bytes copiados al destino por la etapa de copia"),
+    'queue_depth': ('gauge', "Elementos en espera en cada cola entre etapas"),
+    'queue_items_total': ('counter', "Elementos que han pasado por cada cola"),
+    'queue_wait_seconds_total': ('counter', "Segundos bloqueados en cada cola (productor: cola llena, consumidor: vacía)"),
+    'stage_seconds': ('histogram', "Duración del trabajo de cada elemento en cada etapa"),
+    'document_seconds': ('histogram', "Duración de cada documento (Word o sin Word)"),
+    'word_restarts_total': ('counter', "Reinicios de la sesión de Word"),
+    'time_to_first_document_seconds': ('gauge', "Segundos desde EMPEZAR hasta el primer documento terminado"),
+    'current_document_seconds': ('gauge', "Segundos que lleva el documento en curso"),
+    'eta_seconds': ('gauge', "Tiempo restante previsto"),
+    'run_start_time_seconds': ('gauge', "Inicio de la ejecución (epoch)"),
+    'last_progress_time_seconds': ('gauge', "Último elemento terminado en cualquier etapa (epoch)"),
+}
+
+
+def _escapar(valor):
+    return str(valor).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _serie(nombre, etiquetas, valor):
+    """Línea de una serie: nombre{etiquetas} valor"""
+    if etiquetas:
+        nombre += '{' + ','.join(f'{k}="{_escapar(v)}"' for k, v in etiquetas) + '}'
+    if isinstance(valor, float):
+        valor = '+Inf' if valor == float('inf') else repr(valor)
+    return f"{nombre} {valor}"
+
+
+class LatencyHistogram:
+    """Histograma acumulativo de duraciones con límites fijos (en segundos)"""
+
+    def __init__(self, limites=METRICS_BUCKETS):
+        self.limites = tuple(sorted(limites))
+        self.cuentas = [0] * (len(self.limites) + 1)
+        self.suma = 0.0
+
+    def observar(self, segundos):
+        self.cuentas[bisect.bisect_left(self.limites, segundos)] += 1
+        self.suma += segundos
+
+    def series(self, nombre, etiquetas):
+        acumulado = 0
+        for limite, cuenta in zip(self.limites + (float('inf'),), self.cuentas):
+            acumulado += cuenta
+            le = '+Inf' if limite == float('inf') else repr(float(limite))
+            yield _serie(f"{nombre}_bucket", etiquetas + (('le', le),), acumulado)
+        yield _serie(f"{nombre}_sum", etiquetas, self.suma)
+        yield _serie(f"{nombre}_count", etiquetas, acumulado)
+
+
+class RunMetrics:
+    """
+    Métricas de una ejecución. Seguro entre hilos: las etapas suman contadores
+    y anotan duraciones; el exportador lee todo con texto().
+    """
+
+    def __init__(self, limites=METRICS_BUCKETS):
+        """
+        Args:
+            limites (tuple): Límites de los histogramas en segundos
+        """
+        self.limites = limites
+        self._lock = threading.Lock()
+        self._contadores = {}      # (nombre, etiquetas) -> valor
+        self._histogramas = {}     # (nombre, etiquetas) -> LatencyHistogram
+        self._indicadores = {}     # nombre -> función
+        self._documentos = {}      # ruta -> inicio (perf_counter)
+        self.colas = []            # ColaMedida de las etapas en marcha
+        self.inicio = time.time()
+        self.ultimo_progreso = self.inicio
+
+    # ------------------------------------------------------------------
+    # Registro (bucle de trabajo)
+    # ------------------------------------------------------------------
+
+    def incrementar(self, nombre, cantidad=1, etiquetas=()):
+        """
+        Args:
+            nombre (str): Métrica de METRICAS (sin prefijo)
+            cantidad (int | float): Cantidad a sumar
+            etiquetas (tuple): Pares (etiqueta, valor)
+        """
+        clave = (nombre, etiquetas)
+        with self._lock:
+            self._contadores[clave] = self._contadores.get(clave, 0) + cantidad
+
+    def observar(self, nombre, segundos, etiquetas=()):
+        """Anota una duración en el histograma de la métrica"""
+        clave = (nombre, etiquetas)
+        with self._lock:
+            histograma = self._histogramas.get(clave)
+            if histograma is None:
+                histograma = self._histogramas[clave] = LatencyHistogram(self.limites)
+            histograma.observar(segundos)
+            self.ultimo_progreso = time.time()
+
+    def empezar_documento(self, ruta):
+        with self._lock:
+            self._documentos[ruta] = time.perf_counter()
+
+    def terminar_documento(self, ruta):
+        with self._lock:
+            self._documentos.pop(ruta, None)
+
+    def indicador(self, nombre, funcion):
+        """
+        Métrica calculada al exportar
+
+        Args:
+            nombre (str): Métrica de METRICAS (sin prefijo)
+            funcion (callable): Devuelve un número o una lista de (etiquetas, valor)
+        """
+        self._indicadores[nombre] = funcion
+
+    # ------------------------------------------------------------------
+    # Exportación
+    # ------------------------------------------------------------------
+
+    def _valores_colas(self, nombre):
+        for cola in self.colas:
+            etiquetas = (('cola', cola.nombre),)
+            if nombre == 'queue_depth':
+                yield etiquetas, cola.profundidad()
+            elif nombre == 'queue_items_total':
+                yield etiquetas, cola.elementos
+            else:
+                yield etiquetas + (('lado', 'productor'),), cola.espera_productor
+                yield etiquetas + (('lado', 'consumidor'),), cola.espera_consumidor
+
+    def texto(self):
+        """Todas las métricas en el formato de texto de Prometheus"""
+        ahora = time.perf_counter()
+        with self._lock:
+            contadores = dict(self._contadores)
+            histogramas = {clave: list(h.series(PREFIJO + clave[0], clave[1])) for clave, h in self._histogramas.items()}
+            documentos = [((('documento', ruta),), ahora - inicio) for ruta, inicio in self._documentos.items()]
+            ultimo_progreso = self.ultimo_progreso
+
+        lineas = []
+        for nombre, (tipo, ayuda) in METRICAS.items():
+            if tipo == 'histogram':
+                series = [linea for clave, ls in sorted(histogramas.items()) if clave[0] == nombre for linea in ls]
+            else:
+                valores = [(clave[1], valor) for clave, valor in sorted(contadores.items()) if clave[0] == nombre]
+                if nombre in self._indicadores:
+                    try:
+                        valor = self._indicadores[nombre]()
+                    except Exception:
+                        # Un indicador que falla no debe romper la exportación del resto
+                        valor = None
+                    if isinstance(valor, list):
+                        valores += valor
+                    elif valor is not None:
+                        valores.append(((), valor))
+                elif nombre.startswith('queue_'):
+                    valores += self._valores_colas(nombre)
+                elif nombre == 'current_document_seconds':
+                    valores += documentos
+                elif nombre == 'run_start_time_seconds':
+                    valores.append(((), self.inicio))
+                elif nombre == 'last_progress_time_seconds':
+                    valores.append(((), ultimo_progreso))
+                series = [_serie(PREFIJO + nombre, etiquetas, valor) for etiquetas, valor in valores]
+            if series:
+                lineas.append(f"# HELP {PREFIJO}{nombre} {ayuda}")
+                lineas.append(f"# TYPE {PREFIJO}{nombre} {tipo}")
+                lineas.extend(series)
+        return "\n".join(lineas) + "\n"
+
+
+class _Manejador(BaseHTTPRequestHandler):
+    """GET /metrics con las métricas de la ejecución"""
+
+    def do_GET(self):
+        if self.path.split('?')[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        cuerpo = self.server.metricas.texto().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', TIPO_CONTENIDO)
+        self.send_header('Content-Length', str(len(cuerpo)))
+        self.end_headers()
+        self.wfile.write(cuerpo)
+
+    def log_message(self, formato, *args):
+        pass
+
+
+class MetricsExporter:
+    """Publica un RunMetrics en un endpoint HTTP local y/o en un archivo"""
+
+    def __init__(self, metricas, puerto=METRICS_PORT, ruta_archivo='',
+                 intervalo=METRICS_INTERVAL_SECONDS, log_callback=None):
+        """
+        Args:
+            metricas (RunMetrics): Métricas a publicar
+            puerto (int): Puerto del endpoint en 127.0.0.1 (0 = sin endpoint)
+            ruta_archivo (str): Archivo que se reescribe cada `intervalo` (vacío = sin archivo)
+            intervalo (float): Segundos entre escrituras del archivo
+            log_callback (callable): Función para escribir en el log
+        """
+        self.metricas = metricas
+        self.puerto = puerto
+        self.ruta_archivo = ruta_archivo
+        self.intervalo = max(1.0, intervalo)
+        self.log_callback = log_callback
+        self._http = None
+        self._parar = threading.Event()
+        self._hilo_archivo = None
+        self._error_archivo = False
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.puerto}/metrics"
+
+    def iniciar(self):
+        if self.puerto:
+            try:
+                # Solo este equipo: las rutas de los documentos no salen de él
+                self._http = ThreadingHTTPServer(('127.0.0.1', self.puerto), _Manejador)
+            except OSError as e:
+                self._avisar(f"⚠ No se pudo abrir el endpoint de métricas en el puerto {self.puerto}: {e}")
+            else:
+                self._http.daemon_threads = True
+                self._http.metricas = self.metricas
+                threading.Thread(target=self._http.serve_forever, name="metricas-http", daemon=True).start()
+                self._avisar(f"Métricas en {self.url}")
+        if self.ruta_archivo:
+            self._hilo_archivo = threading.Thread(target=self._escribir_periodicamente, name="metricas-archivo", daemon=True)
+            self._hilo_archivo.start()
+            self._avisar(f"Métricas en {os.path.abspath(self.ruta_archivo)} (cada {self.intervalo:.0f}s)")
+
+    def detener(self):
+        """Cierra el endpoint y deja el archivo con los valores finales"""
+        self._parar.set()
+        if self._hilo_archivo:
+            self._hilo_archivo.join()
+            self._hilo_archivo = None
+        if self._http:
+            self._http.shutdown()
+            self._http.server_close()
+            self._http = None
+
+    def _escribir_periodicamente(self):
+        while True:
+            self.escribir_archivo()
+            if self._parar.wait(self.intervalo):
+                self.escribir_archivo()
+                return
+
+    def escribir_archivo(self):
+        """Reescribe el archivo de forma atómica: quien lo lea nunca ve uno a medias"""
+        temporal = f"{self.ruta_archivo}.{os.getpid()}.tmp"
+        try:
+            carpeta = os.path.dirname(self.ruta_archivo)
+            if carpeta:
+                os.makedirs(carpeta, exist_ok=True)
+            with open(temporal, 'w', encoding='utf-8', newline='\n') as f:
+                f.write(self.metricas.texto())
+            os.replace(temporal, self.ruta_archivo)
+            self._error_archivo = False
+        except OSError as e:
+            # Un aviso por racha de errores, no uno cada intervalo
+            if not self._error_archivo:
+                self._avisar(f"⚠ No se pudo escribir el archivo de métricas: {e}")
+            self._error_archivo = True
+
+    def _avisar(self, mensaje):
+        if self.log_callback:
+            self.log_callback(mensaje)
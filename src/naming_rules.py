@@ -0,0 +1,238 @@
+"""
+Reglas de nombres para extraer el código y la raíz y para renombrar
+Cada convención de nombres es una expresión regular con los grupos
+`codigo` y (para archivos) `raiz`, y una plantilla para construir el
+nombre nuevo. Las reglas se compilan una sola vez en un único patrón por
+modo (carpetas y archivos) que prueba todas las reglas en orden, y un
+directorio completo se analiza de una vez.
+"""
+
+import re
+from collections import namedtuple
+
+from src.config import NAMING_RULES_DEFAULT, NAMING_DEFAULT_TEMPLATE
+
+# Resultado del análisis de un nombre. raiz es None si el nombre no tiene raíz
+# reconocible (un archivo así necesita que el usuario la indique).
+AnalisisNombre = namedtuple('AnalisisNombre', 'codigo raiz separador regla')
+
+_GRUPO = re.compile(r'\(\?P<(\w+)>')
+_REFERENCIA = re.compile(r'\(\?P=(\w+)\)')
+_CONDICION = re.compile(r'\(\?\(([^\W\d]\w*)\)')
+# Opciones globales al principio de una regla, p. ej. "(?i)": en la alternancia
+# solo pueden ir al principio de todo, así que se aplican a la regla en un grupo "(?i:...)"
+_OPCIONES = re.compile(r'(?:\(\?([aiLmsux]+)\))+')
+
+
+# Nombre sin extensión, como os.path.splitext en un nombre sin carpeta: la extensión
+# empieza en el último punto si antes hay algún carácter que no sea un punto
+_SIN_EXTENSION = re.compile(r'(\.*[^.].*?)(?:\.[^.]*)?', re.DOTALL).fullmatch
+
+
+class NamingRule(namedtuple('NamingRule', 'nombre patron plantilla')):
+    """Una convención de nombres: expresión regular y plantilla del nombre nuevo"""
+
+    __slots__ = ()
+
+    @property
+    def separador(self):
+        """Texto entre el código y la raíz en la plantilla ('-' en "{codigo}-{raiz}")"""
+        inicio = self.plantilla.find('{codigo}')
+        fin = self.plantilla.find('{raiz}')
+        if inicio < 0 or fin < inicio:
+            return ''
+        return self.plantilla[inicio + len('{codigo}'):fin]
+
+    def construir(self, codigo, raiz, extension=''):
+        return self.plantilla.format(codigo=codigo, raiz=raiz) + extension
+
+
+class NamingRules:
+    """Conjunto ordenado de reglas compilado en un patrón por modo"""
+
+    def __init__(self, reglas=NAMING_RULES_DEFAULT, plantilla_defecto=NAMING_DEFAULT_TEMPLATE):
+        """
+        Args:
+            reglas (iterable): (nombre, expresión regular, plantilla) en orden de prioridad
+            plantilla_defecto (str): Plantilla cuando el código no encaja en ninguna regla
+
+        Raises:
+            ValueError: Si una regla no compila, no tiene el grupo 'codigo' o su plantilla no es válida
+        """
+        self.reglas = []
+        for nombre, patron, plantilla in reglas:
+            try:
+                compilado = re.compile(patron)
+            except re.error as e:
+                raise ValueError(f"Regla de nombres '{nombre}': expresión no válida ({e})")
+            if 'codigo' not in compilado.groupindex:
+                raise ValueError(f"Regla de nombres '{nombre}': falta el grupo (?P<codigo>...)")
+            if '{codigo}' not in plantilla or '{raiz}' not in plantilla:
+                raise ValueError(f"Regla de nombres '{nombre}': la plantilla necesita {{codigo}} y {{raiz}}")
+            self.reglas.append((NamingRule(nombre, patron, plantilla), compilado))
+        self.plantilla_defecto = NamingRule('', '', plantilla_defecto)
+
+        # Carpetas: la primera regla que encaje da el código
+        self._carpetas, self._tabla_carpetas = self._combinar(False)
+        # Archivos: además tiene que haber raíz; si no, se prueba la regla siguiente
+        self._archivos, self._tabla_archivos = self._combinar(True)
+        self._codigos = {}
+
+    def _combinar(self, exigir_raiz):
+        """
+        Une las reglas en una alternancia: cada regla va en un grupo 'regla_N' con sus
+        grupos renombrados a 'codigo_N' y 'raiz_N'. En modo archivo, una regla cuya
+        raíz no ha participado falla y el motor pasa a la siguiente.
+
+        Returns:
+            tuple: (fullmatch del patrón combinado o None, tabla lastindex -> (grupo código,
+                    grupo raíz, separador, regla))
+        """
+        alternativas = []
+        usadas = []
+        for i, (regla, compilado) in enumerate(self.reglas):
+            if exigir_raiz and 'raiz' not in compilado.groupindex:
+                continue
+            patron = _GRUPO.sub(lambda m: f"(?P<{m.group(1)}_{i}>", regla.patron)
+            patron = _REFERENCIA.sub(lambda m: f"(?P={m.group(1)}_{i})", patron)
+            patron = _CONDICION.sub(lambda m: f"(?({m.group(1)}_{i})", patron)
+            opciones = _OPCIONES.match(patron)
+            if opciones:
+                letras = ''.join(dict.fromkeys(re.findall(r'[aiLmsux]', opciones.group(0))))
+                patron = f"(?{letras}:{patron[opciones.end():]})"
+            if exigir_raiz:
+                patron = f"(?:{patron})(?(raiz_{i})|(?!))"
+            alternativas.append(f"(?P<regla_{i}>{patron})")
+            usadas.append((i, regla))
+        if not alternativas:
+            return None, {}
+        try:
+            combinado = re.compile('|'.join(alternativas), re.DOTALL)
+        except re.error as e:
+            nombres = ", ".join(regla.nombre for _, regla in usadas)
+            raise ValueError(f"Reglas de nombres ({nombres}): no se pueden combinar ({e})")
+        grupos = combinado.groupindex
+        # El grupo 'regla_N' es el último en cerrarse, así que es el lastindex de la coincidencia
+        tabla = {
+            grupos[f"regla_{i}"]: (grupos[f"codigo_{i}"], grupos.get(f"raiz_{i}", 0) if exigir_raiz else 0,
+                                   regla.separador, regla)
+            for i, regla in usadas
+        }
+        return combinado.fullmatch, tabla
+
+    @staticmethod
+    def _analizar(coincidencias, tabla):
+        """AnalisisNombre de cada coincidencia del patrón combinado (None si no hay)"""
+        nuevo = tuple.__new__
+        resultados = []
+        agregar = resultados.append
+        for coincidencia in coincidencias:
+            if coincidencia is None:
+                agregar(None)
+                continue
+            grupo_codigo, grupo_raiz, separador, regla = tabla[coincidencia.lastindex]
+            if grupo_raiz:
+                codigo, raiz = coincidencia.group(grupo_codigo, grupo_raiz)
+            else:
+                codigo, raiz = coincidencia.group(grupo_codigo), None
+            agregar(nuevo(AnalisisNombre, (codigo, raiz, separador, regla)))
+        return resultados
+
+    # ------------------------------------------------------------------
+    # Análisis
+    # ------------------------------------------------------------------
+
+    def analizar_carpetas(self, nombres):
+        """
+        Código de cada nombre de carpeta. Sin regla que encaje, el código es el nombre completo.
+
+        Returns:
+            list: AnalisisNombre (raiz siempre None) en el mismo orden
+        """
+        separador = self.plantilla_defecto.separador
+        if self._carpetas is None:
+            return [AnalisisNombre(n, None, separador, None) for n in nombres]
+        resultados = self._analizar(map(self._carpetas, nombres), self._tabla_carpetas)
+        return [r or AnalisisNombre(n, None, separador, None) for n, r in zip(nombres, resultados)]
+
+    def analizar_carpeta(self, nombre):
+        return self.analizar_carpetas((nombre,))[0]
+
+    def analizar_archivos(self, nombres):
+        """
+        Código y raíz de cada nombre de archivo (la extensión no forma parte de la raíz)
+
+        Returns:
+            list: AnalisisNombre en el mismo orden; codigo y raiz son None si ninguna regla encaja
+        """
+        vacio = AnalisisNombre(None, None, '', None)
+        if self._archivos is None:
+            return [vacio] * len(nombres)
+        sin_extension = [m.group(1) if m else n for n, m in zip(nombres, map(_SIN_EXTENSION, nombres))]
+        resultados = self._analizar(map(self._archivos, sin_extension), self._tabla_archivos)
+        return [r or vacio for r in resultados]
+
+    def analizar_archivo(self, nombre):
+        return self.analizar_archivos((nombre,))[0]
+
+    # ------------------------------------------------------------------
+    # Construcción de nombres
+    # ------------------------------------------------------------------
+
+    def regla_de_codigo(self, codigo):
+        """
+        Regla a la que pertenece un código ya extraído: la primera en la que el
+        código, como nombre de carpeta, es su propio código
+        """
+        regla = self._codigos.get(codigo, False)
+        if regla is False:
+            analisis = self.analizar_carpeta(codigo)
+            regla = analisis.regla if analisis.codigo == codigo else None
+            self._codigos[codigo] = regla
+        return regla
+
+    def construir_nombre(self, codigo, raiz, extension, regla=None):
+        """
+        Args:
+            codigo (str): Código de la carpeta
+            raiz (str): Raíz del nombre del archivo
+            extension (str): Extensión (con el punto)
+            regla (NamingRule): Regla de la carpeta (si no, se deduce del código)
+
+        Returns:
+            str: Nombre nuevo del archivo
+        """
+        regla = regla or self.regla_de_codigo(codigo) or self.plantilla_defecto
+        return regla.construir(codigo, raiz, extension)
+
+    # ------------------------------------------------------------------
+    # Configuración
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def desde_config(cls, config_manager, log_callback=None):
+        """
+        Lee las reglas de [NAMING_RULES]: 'order' con los nombres en orden de prioridad,
+        y por cada nombre su expresión regular y '<nombre>_template' con su plantilla.
+        Si alguna regla no es válida se avisa y se usan las reglas por defecto.
+        """
+        orden = [n.strip().lower() for n in config_manager.get_str('NAMING_RULES', 'order', '').split(',') if n.strip()]
+        if not orden:
+            return cls()
+        reglas = []
+        try:
+            for nombre in orden:
+                patron = config_manager.get_str('NAMING_RULES', nombre, '')
+                if not patron:
+                    raise ValueError(f"Regla de nombres '{nombre}' sin expresión regular")
+                plantilla = config_manager.get_str('NAMING_RULES', f"{nombre}_template", NAMING_DEFAULT_TEMPLATE)
+                reglas.append((nombre, patron, plantilla))
+            return cls(reglas, config_manager.get_str('NAMING_RULES', 'default_template', NAMING_DEFAULT_TEMPLATE))
+        except ValueError as e:
+            if log_callback:
+                log_callback(f"⚠ {e} - se usan las reglas de nombres por defecto")
+            return cls()
+
+
+# Reglas por defecto (las dos convenciones de siempre), compiladas una vez
+REGLAS_POR_DEFECTO = NamingRules()
@@ -0,0 +1,121 @@
+"""
+Prevalidación de paquetes Word
+Antes de que un documento llegue a Word se comprueba, sin leer su contenido,
+que es un paquete OOXML válido: la firma del archivo, el directorio central
+del zip y el tipo de contenido de word/document.xml. Un documento dañado,
+truncado, protegido con contraseña o con la extensión equivocada se rechaza
+aquí en vez de dejar Word esperando en un diálogo.
+"""
+
+import os
+import struct
+import zipfile
+import zlib
+import xml.etree.ElementTree as ET
+
+NS_TIPOS = '{http://schemas.openxmlformats.org/package/2006/content-types}'
+
+FIRMA_ZIP = b'PK\x03\x04'
+FIRMA_ZIP_VACIO = b'PK\x05\x06'
+FIRMA_OLE = b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1'
+# Flujo que Office añade al contenedor OLE de un documento cifrado (nombre en UTF-16)
+MARCA_CIFRADO = 'EncryptionInfo'.encode('utf-16-le')
+
+PARTE_PRINCIPAL = 'word/document.xml'
+TIPOS_CONTENIDO = {
+    '.docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml',
+    '.docm': 'application/vnd.ms-word.document.macroEnabled.main+xml',
+}
+# Tipo de contenido -> extensión que le corresponde (para explicar el rechazo)
+EXTENSION_DE_TIPO = {tipo: ext for ext, tipo in TIPOS_CONTENIDO.items()}
+EXTENSION_DE_TIPO.update({
+    'application/vnd.openxmlformats-officedocument.wordprocessingml.template.main+xml': '.dotx',
+    'application/vnd.ms-word.template.macroEnabledTemplate.main+xml': '.dotm',
+})
+
+
+def _cifrado_ole(f):
+    """True si el primer sector del directorio de un contenedor OLE tiene el flujo EncryptionInfo"""
+    f.seek(0x1E)
+    tamano_sector = 1 << struct.unpack('<H', f.read(2))[0]
+    f.seek(0x30)
+    primer_sector = struct.unpack('<I', f.read(4))[0]
+    f.seek((primer_sector + 1) * tamano_sector)
+    return MARCA_CIFRADO in f.read(tamano_sector)
+
+
+def _tipo_documento(datos):
+    """Tipo de contenido de /word/document.xml según [Content_Types].xml"""
+    raiz = ET.fromstring(datos)
+    for override in raiz.iter(f'{NS_TIPOS}Override'):
+        if override.get('PartName', '').lower() == '/' + PARTE_PRINCIPAL:
+            return override.get('ContentType')
+    for default in raiz.iter(f'{NS_TIPOS}Default'):
+        if default.get('Extension', '').lower() == 'xml':
+            return default.get('ContentType')
+    return None
+
+
+def validar_paquete(ruta):
+    """
+    Comprueba que un .docx/.docm se puede abrir con Word sin riesgo de diálogos
+
+    Args:
+        ruta (str): Documento de origen
+
+    Returns:
+        str: Motivo del rechazo, o None si el paquete es válido
+    """
+    extension = os.path.splitext(ruta)[1].lower()
+    try:
+        with open(ruta, 'rb') as f:
+            tamano = os.fstat(f.fileno()).st_size
+            if tamano == 0:
+                return "archivo vacío"
+            firma = f.read(8)
+            if firma == FIRMA_OLE:
+                if _cifrado_ole(f):
+                    return "protegido con contraseña"
+                return f"formato .doc (Word 97-2003) con extensión {extension}"
+            if firma.startswith(FIRMA_ZIP_VACIO):
+                return "zip vacío"
+            if not firma.startswith(FIRMA_ZIP):
+                if firma.lstrip().startswith(b'{\\rtf'):
+                    return f"RTF con extensión {extension}"
+                if firma.lstrip().startswith(b'<'):
+                    return f"HTML/XML con extensión {extension}"
+                return "no es un paquete Word (firma desconocida)"
+
+            f.seek(0)
+            # ZipFile solo lee el final del archivo y el directorio central
+            with zipfile.ZipFile(f) as zf:
+                inicio_directorio = getattr(zf, 'start_dir', tamano)
+                for info in zf.infolist():
+                    if info.header_offset + info.compress_size > inicio_directorio:
+                        return f"zip dañado ({info.filename} fuera del archivo)"
+                try:
+                    principal = zf.getinfo(PARTE_PRINCIPAL)
+                except KeyError:
+                    return f"falta {PARTE_PRINCIPAL}"
+                if principal.flag_bits & 0x1:
+                    return "zip cifrado"
+                if principal.compress_type not in (zipfile.ZIP_STORED, zipfile.ZIP_DEFLATED):
+                    return "compresión no soportada"
+                try:
+                    tipo = _tipo_documento(zf.read('[Content_Types].xml'))
+                except KeyError:
+                    return "falta [Content_Types].xml"
+
+            esperado = TIPOS_CONTENIDO.get(extension)
+            if esperado and tipo != esperado:
+                otra = EXTENSION_DE_TIPO.get(tipo)
+                if otra:
+                    return f"es un {otra} con extensión {extension}"
+                return f"tipo de contenido no válido ({tipo})"
+            return None
+    except (zipfile.BadZipFile, zipfile.LargeZipFile, zlib.error, EOFError):
+        return "zip dañado o truncado"
+    except ET.ParseError:
+        return "[Content_Types].xml dañado"
+    except (OSError, struct.error, RuntimeError, NotImplementedError) as e:
+        return f"no se puede leer ({e})"
@@ -0,0 +1,181 @@
+"""
+Estampado sin Word en varios procesos
+Reparte los documentos entre procesos (ProcessPoolExecutor) para que la
+compresión zip y el XML no queden limitados por el GIL. Los trabajos solo
+contienen datos simples y los resultados se entregan en el orden de envío.
+"""
+
+import os
+import shutil
+import time
+import traceback
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from src.config import PARALLEL_STAMP_WORKERS, PARALLEL_STAMP_CHUNK_BYTES, PARALLEL_STAMP_CHUNK_DOCS
+from src.docx_stamper import DocxStamper
+from src.stamp_check import calcular_huella, documento_ya_estampado, hash_archivo
+from src.staging import DirectoryCache
+from src.word_processor import WordProcessor
+
+# Un documento a estampar: se envía tal cual a otro proceso
+TrabajoEstampado = namedtuple('TrabajoEstampado', 'ruta_origen carpeta_destino archivo codigo')
+
+# Resultado de un documento, con las líneas de log que escribiría WordProcessor
+# (agotado: ningún worker lo terminó dentro de su plazo)
+ResultadoEstampado = namedtuple('ResultadoEstampado', 'trabajo exito omitido mensajes duracion agotado', defaults=(False,))
+
+# Estado de cada proceso hijo (se crea una vez en _iniciar_proceso)
+_estampador = None
+_contexto = None
+_directorios = None
+
+
+def _iniciar_proceso(ruta_logo, autor, opciones, hash_logo, omitir_estampados):
+    global _estampador, _contexto, _directorios
+    _estampador = DocxStamper(ruta_logo, autor, opciones)
+    _contexto = (autor, opciones, hash_logo, omitir_estampados)
+    _directorios = DirectoryCache()
+
+
+def _estampar_uno(trabajo):
+    autor, opciones, hash_logo, omitir_estampados = _contexto
+    inicio = time.perf_counter()
+    mensajes = [f"\n>>> {trabajo.archivo}"]
+    try:
+        _directorios.asegurar(trabajo.carpeta_destino)
+        ruta_copia = WordProcessor.ruta_copia(trabajo.archivo, trabajo.carpeta_destino)
+        huella = calcular_huella(trabajo.codigo, autor, hash_logo, opciones)
+
+        if omitir_estampados and documento_ya_estampado(trabajo.ruta_origen, huella, trabajo.codigo, autor, opciones):
+            shutil.copy2(trabajo.ruta_origen, ruta_copia)
+            mensajes.append("    ↷ Encabezado y pie ya aplicados: se copia sin cambios")
+            return ResultadoEstampado(trabajo, True, True, mensajes, time.perf_counter() - inicio)
+
+        secciones = _estampador.estampar(trabajo.ruta_origen, ruta_copia, trabajo.codigo, huella)
+        if not secciones:
+            mensajes.append("    ⚠ El documento no tiene secciones: encabezado y pie sin aplicar")
+        mensajes.append("    ✓ Copia Word guardada")
+        return ResultadoEstampado(trabajo, True, False, mensajes, time.perf_counter() - inicio)
+
+    except Exception as e:
+        mensajes.append(f"  ✗ ERROR: {e}")
+        mensajes.append(traceback.format_exc())
+        return ResultadoEstampado(trabajo, False, False, mensajes, time.perf_counter() - inicio)
+
+
+def _estampar_lote(lote):
+    return [_estampar_uno(trabajo) for trabajo in lote]
+
+
+class ParallelStampRunner:
+    """Ejecuta el estampado sin Word de una lista de documentos en un pool de procesos"""
+
+    def __init__(self, ruta_logo, autor, opciones, max_workers=PARALLEL_STAMP_WORKERS,
+                 omitir_estampados=True, lote_bytes=PARALLEL_STAMP_CHUNK_BYTES,
+                 lote_documentos=PARALLEL_STAMP_CHUNK_DOCS):
+        """
+        Args:
+            ruta_logo (str): Ruta al archivo de imagen del logo
+            autor (str): Nombre del autor para el pie de página
+            opciones (dict): Opciones de la GUI (solo valores simples)
+            max_workers (int): Procesos (0 = uno por núcleo)
+            omitir_estampados (bool): Copiar sin cambios los documentos ya estampados
+            lote_bytes (int): Los documentos pequeños se agrupan hasta sumar este tamaño
+            lote_documentos (int): Máximo de documentos por lote
+        """
+        self.ruta_logo = ruta_logo
+        self.autor = autor
+        self.opciones = dict(opciones)
+        self.max_workers = max_workers if max_workers > 0 else (os.cpu_count() or 1)
+        self.omitir_estampados = omitir_estampados
+        self.lote_bytes = lote_bytes
+        self.lote_documentos = max(1, lote_documentos)
+
+        self.documentos_estampados = 0
+        self.documentos_omitidos = 0
+        self.errores = 0
+        self.segundos = 0.0
+        self.segundos_documentos = 0.0
+
+    def _lotes(self, trabajos):
+        """Agrupa trabajos consecutivos para que los documentos pequeños no paguen un envío cada uno"""
+        lote, tamano = [], 0
+        for trabajo in trabajos:
+            try:
+                peso = os.path.getsize(trabajo.ruta_origen)
+            except OSError:
+                peso = 0
+            if lote and (tamano + peso > self.lote_bytes or len(lote) >= self.lote_documentos):
+                yield lote
+                lote, tamano = [], 0
+            lote.append(trabajo)
+            tamano += peso
+        if lote:
+            yield lote
+
+    def ejecutar(self, trabajos, al_terminar=None):
+        """
+        Estampa todos los trabajos. `al_terminar` recibe cada ResultadoEstampado
+        en el mismo orden en que se pasaron los trabajos.
+
+        Args:
+            trabajos (iterable): TrabajoEstampado a procesar
+            al_terminar (callable): Se llama en este hilo con cada resultado
+
+        Returns:
+            int: Documentos estampados o copiados correctamente
+        """
+        usa_logo = self.opciones.get('add_logo', True) and self.ruta_logo and os.path.exists(self.ruta_logo)
+        hash_logo = hash_archivo(self.ruta_logo) if usa_logo else ''
+        # Pocos lotes en vuelo: mantiene la memoria acotada y el orden de entrega fluido
+        en_vuelo = self.max_workers * 2
+        inicio = time.perf_counter()
+        correctos = 0
+
+        def entregar(futuro):
+            nonlocal correctos
+            for resultado in futuro.result():
+                if resultado.exito:
+                    correctos += 1
+                    if resultado.omitido:
+                        self.documentos_omitidos += 1
+                    else:
+                        self.documentos_estampados += 1
+                else:
+                    self.errores += 1
+                self.segundos_documentos += resultado.duracion
+                if al_terminar:
+                    al_terminar(resultado)
+
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_iniciar_proceso,
+            initargs=(self.ruta_logo, self.autor, self.opciones, hash_logo, self.omitir_estampados)
+        ) as pool:
+            pendientes = deque()
+            for lote in self._lotes(trabajos):
+                pendientes.append(pool.submit(_estampar_lote, lote))
+                while len(pendientes) >= en_vuelo or (pendientes and pendientes[0].done()):
+                    entregar(pendientes.popleft())
+            while pendientes:
+                entregar(pendientes.popleft())
+
+        self.segundos += time.perf_counter() - inicio
+        return correctos
+
+    def resumen(self):
+        """
+        Returns:
+            list: Líneas de texto para el log
+        """
+        total = self.documentos_estampados + self.documentos_omitidos + self.errores
+        if not total:
+            return []
+        por_segundo = total / self.segundos if self.segundos else 0
+        return [
+            f"Estampado sin Word: {total} documentos en {self.segundos:.1f}s "
+            f"({por_segundo:.1f} docs/s, {self.max_workers} procesos)",
+            f"  Estampados: {self.documentos_estampados} · Ya estampados: {self.documentos_omitidos} · "
+            f"Errores: {self.errores}",
+        ]
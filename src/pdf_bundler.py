@@ -0,0 +1,215 @@
+"""
+Unión de PDFs por carpeta
+Combina los PDFs generados de cada carpeta (y opcionalmente los anexos PDF)
+en un único PDF con un marcador por archivo de origen.
+
+Con pikepdf las páginas se copian sin leer su contenido: qpdf lo lee de los
+archivos de entrada al escribir la salida, así que la memoria no crece con el
+tamaño de la carpeta. Sin pikepdf se usa pypdf, que mantiene en memoria todas
+las páginas de la carpeta hasta escribir el PDF único.
+"""
+
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+try:
+    from pypdf import PdfReader, PdfWriter
+    PYPDF_DISPONIBLE = True
+except ImportError:
+    PYPDF_DISPONIBLE = False
+
+from src.config import PDF_BUNDLE_SUFFIX, PDF_BUNDLE_WORKERS, PDF_BUNDLE_BATCH_FILES
+from src.pdf_export import PIKEPDF_DISPONIBLE, linealizar_pdf
+
+if PIKEPDF_DISPONIBLE:
+    import pikepdf
+
+UNION_DISPONIBLE = PIKEPDF_DISPONIBLE or PYPDF_DISPONIBLE
+
+
+class PdfBundler:
+    """
+    Recibe los PDFs a medida que se generan y, cuando una carpeta de origen
+    termina, lanza su unión en segundo plano mientras continúa el proceso.
+    """
+
+    def __init__(self, max_workers=PDF_BUNDLE_WORKERS, log_callback=None, linealizar=False,
+                 archivos_por_lote=PDF_BUNDLE_BATCH_FILES):
+        """
+        Args:
+            max_workers (int): Carpetas que se unen en paralelo
+            log_callback (callable): Función para escribir en el log
+            linealizar (bool): Linealizar cada PDF único tras escribirlo
+            archivos_por_lote (int): PDFs de entrada en memoria a la vez (solo con pikepdf)
+        """
+        self.log_callback = log_callback
+        self.linealizar = linealizar
+        self.archivos_por_lote = max(1, archivos_por_lote)
+        self._pendientes = {}        # carpeta origen -> (carpeta destino, código, [rutas PDF])
+        self._nombres_usados = set()
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="pdf_bundle")
+        self._futuros = []
+
+    def agregar_pdf(self, carpeta_origen, carpeta_destino, codigo, ruta_pdf):
+        """
+        Registra un PDF que debe formar parte del PDF único de su carpeta
+
+        Args:
+            carpeta_origen (str): Carpeta de origen (identifica el grupo)
+            carpeta_destino (str): Carpeta donde se escribe el PDF único
+            codigo (str): Código de la carpeta (da nombre al PDF único)
+            ruta_pdf (str): PDF ya escrito en disco
+        """
+        with self._lock:
+            grupo = self._pendientes.setdefault(carpeta_origen, (carpeta_destino, codigo, []))
+            grupo[2].append(ruta_pdf)
+
+    def carpeta_terminada(self, carpeta_origen):
+        """Lanza la unión de la carpeta si tiene PDFs; no bloquea"""
+        with self._lock:
+            grupo = self._pendientes.pop(carpeta_origen, None)
+            if not grupo or not grupo[2]:
+                return
+            carpeta_destino, codigo, rutas = grupo
+            ruta_salida = self._nombre_salida(carpeta_destino, codigo)
+        self._futuros.append(self._executor.submit(self._unir, rutas, ruta_salida))
+
+    def finalizar(self):
+        """
+        Une las carpetas que queden y espera a que terminen todas las uniones
+
+        Returns:
+            list: Rutas de los PDFs únicos generados correctamente
+        """
+        for carpeta_origen in list(self._pendientes):
+            self.carpeta_terminada(carpeta_origen)
+        generados = [f.result() for f in self._futuros]
+        self._executor.shutdown(wait=True)
+        return [r for r in generados if r]
+
+    def _nombre_salida(self, carpeta_destino, codigo):
+        """Evita que dos carpetas con el mismo código se sobrescriban en el mismo destino"""
+        base = os.path.join(carpeta_destino, f"{codigo}{PDF_BUNDLE_SUFFIX}")
+        ruta = f"{base}.pdf"
+        n = 2
+        while os.path.normcase(ruta) in self._nombres_usados:
+            ruta = f"{base} ({n}).pdf"
+            n += 1
+        self._nombres_usados.add(os.path.normcase(ruta))
+        return ruta
+
+    def _unir(self, rutas, ruta_salida):
+        """Une los PDFs en ruta_salida (se escribe en un temporal y se renombra al final)"""
+        temporal = ruta_salida + ".tmp"
+        rutas = sorted(rutas, key=lambda r: os.path.basename(r).lower())
+        try:
+            if PIKEPDF_DISPONIBLE:
+                escrito = self._unir_pikepdf(rutas, temporal)
+            else:
+                escrito = self._unir_pypdf(rutas, temporal)
+            if not escrito:
+                return None
+
+            os.replace(temporal, ruta_salida)
+            if self.linealizar:
+                linealizar_pdf(ruta_salida)
+            self._log(f"  📚 PDF único: {os.path.basename(ruta_salida)} ({len(rutas)} archivos)")
+            return ruta_salida
+
+        except Exception as e:
+            self._log(f"  ✗ ERROR uniendo {os.path.basename(ruta_salida)}: {e}")
+            try:
+                os.remove(temporal)
+            except OSError:
+                pass
+            return None
+
+    def _unir_pikepdf(self, rutas, temporal):
+        """
+        Une por lotes de archivos_por_lote entradas. pikepdf copia a memoria las
+        páginas que llegan de otro PDF, pero las que ya están en el archivo abierto
+        las vuelve a escribir leyéndolas del disco: cada lote se añade al resultado
+        parcial del anterior (abierto desde disco) y se guarda en un archivo nuevo.
+        En memoria solo está el lote actual, a cambio de reescribir el parcial en
+        cada lote. Los marcadores se añaden con el último lote.
+
+        Returns:
+            bool: True si se escribió `temporal`
+        """
+        lotes = [rutas[i:i + self.archivos_por_lote] for i in range(0, len(rutas), self.archivos_por_lote)]
+        marcadores = []    # (título, primera página)
+        parcial = None
+        try:
+            for indice, lote in enumerate(lotes):
+                destino = f"{temporal}.{indice + 1}"
+                with (pikepdf.open(parcial) if parcial else pikepdf.new()) as pdf:
+                    abiertos = []
+                    try:
+                        for ruta in lote:
+                            try:
+                                origen = pikepdf.open(ruta)
+                            except Exception as e:
+                                self._log(f"  ⚠ PDF omitido en la unión ({os.path.basename(ruta)}): {e}")
+                                continue
+                            abiertos.append(origen)
+                            marcadores.append((self._titulo(ruta), len(pdf.pages)))
+                            pdf.pages.extend(origen.pages)
+                        if not pdf.pages:
+                            continue
+                        if indice == len(lotes) - 1:
+                            with pdf.open_outline() as esquema:
+                                esquema.root.extend(pikepdf.OutlineItem(t, pagina) for t, pagina in marcadores)
+                        pdf.save(destino)
+                    finally:
+                        for origen in abiertos:
+                            origen.close()
+                if parcial:
+                    os.remove(parcial)
+                parcial = destino
+
+            if parcial is None:
+                return False
+            os.replace(parcial, temporal)
+            parcial = None
+            return True
+        finally:
+            if parcial:
+                try:
+                    os.remove(parcial)
+                except OSError:
+                    pass
+
+    def _unir_pypdf(self, rutas, temporal):
+        """
+        Sin pikepdf: cada entrada se abre de una en una, pero PdfWriter guarda
+        en memoria todas las páginas copiadas hasta escribir la salida
+
+        Returns:
+            bool: True si se escribió `temporal`
+        """
+        writer = PdfWriter()
+        try:
+            for ruta in rutas:
+                try:
+                    with open(ruta, 'rb') as f:
+                        writer.append(PdfReader(f), outline_item=self._titulo(ruta))
+                except Exception as e:
+                    self._log(f"  ⚠ PDF omitido en la unión ({os.path.basename(ruta)}): {e}")
+
+            if not writer.pages:
+                return False
+            with open(temporal, 'wb') as f:
+                writer.write(f)
+            return True
+        finally:
+            writer.close()
+
+    @staticmethod
+    def _titulo(ruta):
+        return os.path.splitext(os.path.basename(ruta))[0]
+
+    def _log(self, mensaje):
+        if self.log_callback:
+            self.log_callback(mensaje)
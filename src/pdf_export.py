@@ -0,0 +1,89 @@
+"""
+Utilidades de exportación a PDF
+Linealización opcional ("vista web rápida") y estadísticas de tamaño por perfil
+"""
+
+import os
+import shutil
+import subprocess
+from collections import defaultdict
+
+try:
+    import pikepdf
+    PIKEPDF_DISPONIBLE = True
+except ImportError:
+    PIKEPDF_DISPONIBLE = False
+
+
+def linealizacion_disponible():
+    """True si hay pikepdf o el ejecutable qpdf para linealizar"""
+    return PIKEPDF_DISPONIBLE or shutil.which('qpdf') is not None
+
+
+def linealizar_pdf(ruta_pdf):
+    """
+    Reescribe el PDF linealizado para que el visor muestre la primera página
+    antes de descargar el archivo completo. Usa pikepdf si está instalado y,
+    si no, el ejecutable qpdf.
+
+    Args:
+        ruta_pdf (str): PDF a linealizar (se reemplaza en el sitio)
+
+    Returns:
+        bool: True si se linealizó correctamente
+    """
+    temporal = ruta_pdf + ".lin.tmp"
+    try:
+        if PIKEPDF_DISPONIBLE:
+            with pikepdf.open(ruta_pdf) as pdf:
+                pdf.save(temporal, linearize=True)
+        else:
+            qpdf = shutil.which('qpdf')
+            if qpdf is None:
+                return False
+            resultado = subprocess.run(
+                [qpdf, '--linearize', ruta_pdf, temporal],
+                capture_output=True
+            )
+            # qpdf devuelve 3 cuando termina con avisos pero genera el archivo
+            if resultado.returncode not in (0, 3):
+                raise RuntimeError(resultado.stderr.decode(errors='replace').strip())
+        os.replace(temporal, ruta_pdf)
+        return True
+    except Exception:
+        try:
+            os.remove(temporal)
+        except OSError:
+            pass
+        return False
+
+
+class PdfOutputStats:
+    """Acumula el tamaño de los PDFs generados por perfil de exportación"""
+
+    def __init__(self):
+        # perfil -> [archivos, bytes]
+        self.por_perfil = defaultdict(lambda: [0, 0])
+
+    def registrar(self, perfil, ruta_pdf):
+        try:
+            tamano = os.path.getsize(ruta_pdf)
+        except OSError:
+            return
+        entrada = self.por_perfil[perfil]
+        entrada[0] += 1
+        entrada[1] += tamano
+
+    def resumen(self):
+        """
+        Returns:
+            list: Líneas de texto para el log
+        """
+        lineas = []
+        for perfil, (archivos, total) in sorted(self.por_perfil.items()):
+            media = total / archivos if archivos else 0
+            lineas.append(
+                f"PDF (perfil {perfil}): {archivos} archivos, {total / (1024 * 1024):.1f} MB, "
+                f"media {media / 1024:.0f} KB"
+            )
+        return lineas
@@ -0,0 +1,358 @@
+"""
+Piezas del proceso en etapas
+Colas acotadas con métricas de profundidad y espera, etapas con su propio
+número de hilos, un contador para saber cuándo una carpeta ha terminado y el
+contexto de un trabajo que reciben todas sus etapas
+"""
+
+import itertools
+import os
+import queue
+import threading
+import time
+import traceback
+
+from src.config import TRACE_MIN_WAIT_SECONDS
+from src.trace_recorder import TRAZA_NULA
+
+# Marca de fin de cola: cada hilo consumidor termina al recibir una
+FIN = object()
+
+
+class ColaMedida:
+    """
+    Cola acotada entre dos etapas. Si la etapa siguiente va más lenta, put()
+    bloquea (contrapresión) y el tiempo bloqueado queda registrado.
+    Con prioridad, get() devuelve primero el elemento de menor prioridad
+    de los que están en espera (FIN siempre sale el último).
+    """
+
+    def __init__(self, nombre, capacidad, prioridad=False, traza=TRAZA_NULA):
+        """
+        Args:
+            nombre (str): Nombre para el resumen
+            capacidad (int): Elementos máximos en espera (0 = sin límite)
+            prioridad (bool): Ordenar los elementos en espera por prioridad
+            traza (TraceRecorder): Registra las esperas de productores y consumidores
+        """
+        self.nombre = nombre
+        self.prioridad = prioridad
+        self.traza = traza
+        self._cola = (queue.PriorityQueue if prioridad else queue.Queue)(maxsize=max(0, capacidad))
+        self._secuencia = itertools.count()
+        self._lock = threading.Lock()
+        self.elementos = 0
+        self.profundidad_max = 0
+        self._suma_profundidad = 0
+        self.espera_productor = 0.0   # Segundos bloqueados por cola llena
+        self.espera_consumidor = 0.0  # Segundos esperando con la cola vacía
+        self._fin_recibido = False
+
+    def put(self, elemento, prioridad=0):
+        inicio = time.perf_counter()
+        if self.prioridad:
+            # La secuencia desempata y evita comparar los elementos
+            clave = float('inf') if elemento is FIN else prioridad
+            self._cola.put((clave, next(self._secuencia), elemento))
+        else:
+            self._cola.put(elemento)
+        espera = time.perf_counter() - inicio
+        if espera >= TRACE_MIN_WAIT_SECONDS:
+            self.traza.completo(f"cola {self.nombre} llena", 'espera', inicio, espera)
+        if elemento is FIN:
+            return
+        profundidad = self._cola.qsize()
+        with self._lock:
+            self.elementos += 1
+            self.espera_productor += espera
+            self._suma_profundidad += profundidad
+            if profundidad > self.profundidad_max:
+                self.profundidad_max = profundidad
+
+    def get(self):
+        inicio = time.perf_counter()
+        elemento = self._cola.get()
+        if self.prioridad:
+            elemento = elemento[2]
+        espera = time.perf_counter() - inicio
+        if espera >= TRACE_MIN_WAIT_SECONDS:
+            self.traza.completo(f"cola {self.nombre} vacía", 'espera', inicio, espera)
+        with self._lock:
+            self.espera_consumidor += espera
+        return elemento
+
+    def profundidad(self):
+        """Elementos en espera ahora mismo"""
+        return self._cola.qsize()
+
+    def elementos_hasta_fin(self):
+        """Itera sobre los elementos hasta recibir FIN (para consumidores de un solo hilo)"""
+        while True:
+            elemento = self.get()
+            if elemento is FIN:
+                self._fin_recibido = True
+                return
+            yield elemento
+
+    def descartar_hasta_fin(self):
+        """
+        Consume y descarta lo que quede hasta FIN. Si el consumidor ha fallado, así
+        los productores bloqueados en put() pueden terminar en lugar de quedarse esperando.
+
+        Returns:
+            int: Elementos descartados
+        """
+        if self._fin_recibido:
+            return 0
+        return sum(1 for _ in self.elementos_hasta_fin())
+
+    def resumen(self):
+        media = self._suma_profundidad / self.elementos if self.elementos else 0
+        return (
+            f"Cola {self.nombre}: {self.elementos} elementos, profundidad máx. {self.profundidad_max} "
+            f"(media {media:.1f}), espera productor {self.espera_productor:.1f}s, "
+            f"espera consumidor {self.espera_consumidor:.1f}s"
+        )
+
+
+class Etapa:
+    """
+    Varios hilos que consumen una ColaMedida y llaman a `funcion` con cada elemento.
+    Un error en un elemento se registra y la etapa sigue consumiendo, para que
+    las etapas anteriores nunca queden bloqueadas.
+    """
+
+    def __init__(self, nombre, entrada, funcion, hilos=1, al_terminar=None, log_callback=None, metricas=None):
+        """
+        Args:
+            nombre (str): Nombre de la etapa (prefijo de los hilos)
+            entrada (ColaMedida): Cola de la que se consumen elementos
+            funcion (callable): Se llama con cada elemento
+            hilos (int): Hilos consumidores
+            al_terminar (callable): Se llama una vez cuando terminan todos los hilos
+            log_callback (callable): Función para escribir en el log
+            metricas (RunMetrics): Anota la duración de cada elemento (opcional)
+        """
+        self.nombre = nombre
+        self.entrada = entrada
+        self.funcion = funcion
+        self.hilos = max(1, hilos)
+        self.al_terminar = al_terminar
+        self.log_callback = log_callback
+        self.metricas = metricas
+        self._etiquetas = (('etapa', nombre),)
+        self._activos = self.hilos
+        self._lock = threading.Lock()
+        self._hilos = []
+
+    def iniciar(self):
+        for i in range(self.hilos):
+            hilo = threading.Thread(target=self._consumir, name=f"{self.nombre}-{i + 1}", daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+
+    def consumir_en_este_hilo(self):
+        """Consume en el hilo actual (objetos COM que no pueden cambiar de hilo); requiere hilos=1"""
+        self._consumir()
+
+    def cerrar_entrada(self):
+        """Envía una marca de fin por cada hilo consumidor"""
+        for _ in range(self.hilos):
+            self.entrada.put(FIN)
+
+    def unir(self):
+        for hilo in self._hilos:
+            hilo.join()
+
+    def _consumir(self):
+        try:
+            for elemento in self.entrada.elementos_hasta_fin():
+                inicio = time.perf_counter()
+                try:
+                    self.funcion(elemento)
+                except Exception as e:
+                    if self.log_callback:
+                        self.log_callback(f"❌ ERROR en etapa {self.nombre}: {e}")
+                        self.log_callback(traceback.format_exc())
+                if self.metricas:
+                    self.metricas.observar('stage_seconds', time.perf_counter() - inicio, self._etiquetas)
+        finally:
+            with self._lock:
+                self._activos -= 1
+                ultimo = self._activos == 0
+            if ultimo and self.al_terminar:
+                self.al_terminar()
+
+
+class ContadorPendientes:
+    """
+    Cuenta las tareas pendientes de una carpeta y llama a `al_completar` cuando
+    ya se han repartido todas (cerrar) y la última ha terminado.
+    """
+
+    def __init__(self, al_completar):
+        self._al_completar = al_completar
+        self._pendientes = 0
+        self._cerrado = False
+        self._lock = threading.Lock()
+
+    def agregar(self):
+        with self._lock:
+            self._pendientes += 1
+
+    def terminar(self):
+        with self._lock:
+            self._pendientes -= 1
+            completo = self._cerrado and self._pendientes == 0
+        if completo:
+            self._al_completar()
+
+    def cerrar(self):
+        with self._lock:
+            self._cerrado = True
+            completo = self._pendientes == 0
+        if completo:
+            self._al_completar()
+
+
+def trazado(traza, funcion, nombre, categoria, describir, muestrear=True):
+    """
+    Función de una etapa con un intervalo de la traza por elemento (sin coste si no hay traza)
+
+    Args:
+        traza (TraceRecorder): Traza de la ejecución
+        funcion (callable): Función de la etapa
+        nombre (str): Nombre del intervalo
+        categoria (str): Categoría del intervalo
+        describir (callable): Texto que identifica al elemento en la traza
+        muestrear (bool): Si False, todos los elementos quedan en la traza
+    """
+    if not traza.activa:
+        return funcion
+
+    def con_traza(elemento):
+        descripcion = describir(elemento)
+        with traza.span(nombre, categoria, descripcion if muestrear else None, archivo=descripcion):
+            funcion(elemento)
+    return con_traza
+
+
+class ContextoTrabajo:
+    """
+    Ajustes y recursos de un trabajo que comparten sus etapas. Cada etapa lo
+    recibe como argumento; lo que cambia en cada pasada por las etapas (colas,
+    etapas y contadores) lo reinicia nueva_pasada().
+    """
+
+    def __init__(self, carpetas, carpeta_destino, traza=TRAZA_NULA, metricas=None):
+        """
+        Args:
+            carpetas (list): Carpetas de origen
+            carpeta_destino (str): Carpeta de destino
+            traza (TraceRecorder): Traza de la ejecución
+            metricas (RunMetrics): Métricas de la ejecución (opcional)
+        """
+        self.carpetas = carpetas
+        self.carpeta_destino = carpeta_destino
+        self.traza = traza
+        self.metricas = metricas
+
+        # Ajustes del trabajo, leídos una sola vez: las etapas corren en otros hilos
+        self.opciones = {}
+        self.exts = []
+        self.exc_process = []
+        self.exc_copy = []
+        self.respetar_estructura = False
+        self.copiar_anexos = False
+        self.copiar_pdf = False
+        self.guardar_modificado = False
+        self.auto_renombrar = False
+        self.unir_anexos_pdf = False
+        self.vigilar = False
+        self.prevalidar = False
+        self.copiar_rechazados = False
+        self.mayor_primero = False
+        self.capacidad = 0
+        self.profundidad_anticipo = 0
+        self.perfil_pdf = None
+
+        # Recursos del trabajo (None si no se usan)
+        self.sesion_word = None
+        self.processor = None
+        self.anticipador = None
+        self.estampado_paralelo = None
+        self.servidor_trabajos = None
+        self.workers_locales = []
+        self.agrupador_pdf = None
+        self.perfilador = None
+        self.rendimiento = None
+        self.estadisticas_pdf = None
+        self.vigilante = None
+
+        # Sin respetar la estructura, anexos con el mismo nombre van al mismo archivo de
+        # destino: esas copias se hacen una tras otra (gana la última, como antes)
+        self._candados_destino = {}
+        self._lock_candados = threading.Lock()
+        self.lock_contadores = threading.Lock()
+
+        # Colas, etapas y contadores de la pasada en curso
+        self.cola_directorios = None
+        self.cola_word = None
+        self.cola_copia = None
+        self.cola_validacion = None
+        self.cola_abrir = None
+        self.etapa_renombrado = None
+        self.etapa_validacion = None
+        self.etapa_anticipo = None
+        self.etapa_word = None
+        self.etapa_copia = None
+        self.renombrados = 0
+        self.inicio = None
+        self.primer_documento = None
+
+    def nueva_pasada(self):
+        """Colas y contadores nuevos para el recorrido completo o un lote de la vigilancia"""
+        self.cola_directorios = ColaMedida("directorios", self.capacidad, traza=self.traza)
+        # Con historial, de los documentos en espera se procesa antes el más largo
+        self.cola_word = ColaMedida("Word", self.capacidad, prioridad=self.mayor_primero, traza=self.traza)
+        self.cola_copia = ColaMedida("copia", self.capacidad, traza=self.traza)
+        # Documentos pendientes de prevalidar antes de pasar a Word
+        self.cola_validacion = ColaMedida("validación", self.capacidad, traza=self.traza) if self.prevalidar else None
+        # Documentos ya copiados a local, en el orden en que Word los abrirá
+        self.cola_abrir = (
+            ColaMedida("copia anticipada", self.profundidad_anticipo, traza=self.traza) if self.anticipador else None
+        )
+        self.etapa_renombrado = None
+        self.etapa_validacion = None
+        self.etapa_anticipo = None
+        self.etapa_word = None
+        self.etapa_copia = None
+        self.renombrados = 0
+        self.inicio = time.perf_counter()
+        self.primer_documento = None
+        if self.metricas:
+            self.metricas.colas = self.colas()
+
+    def colas(self):
+        """Colas de la pasada actual, para el resumen"""
+        return [c for c in (self.cola_directorios, self.cola_validacion, self.cola_word, self.cola_abrir, self.cola_copia) if c]
+
+    def documento_terminado(self):
+        """Anota cuánto tardó en terminar el primer documento de la pasada"""
+        with self.lock_contadores:
+            if self.primer_documento is None:
+                self.primer_documento = time.perf_counter() - self.inicio
+
+    def candado_destino(self, ruta):
+        with self._lock_candados:
+            return self._candados_destino.setdefault(os.path.normcase(ruta), threading.Lock())
+
+    def destino_de(self, carpeta_origen, root, f):
+        """Determinar ruta de destino"""
+        if self.respetar_estructura:
+            # Incluir el nombre de la carpeta raíz + estructura interna
+            rel_path = os.path.relpath(root, carpeta_origen)
+            if rel_path == '.':
+                return os.path.join(self.carpeta_destino, os.path.basename(carpeta_origen), f)
+            return os.path.join(self.carpeta_destino, os.path.basename(carpeta_origen), rel_path, f)
+        return os.path.join(self.carpeta_destino, f)
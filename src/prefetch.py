@@ -0,0 +1,135 @@
+"""
+Copia anticipada de documentos de origen
+Mientras Word procesa un documento, los siguientes se copian a disco local
+para que Documents.Open no pague la latencia de la unidad de red.
+Cada copia se borra en cuanto Word termina con ella.
+"""
+
+import os
+import shutil
+import threading
+import time
+
+from src.config import PREFETCH_DIR, PREFETCH_MAX_MB
+
+
+class SourcePrefetcher:
+    """
+    Caché local de documentos de origen con un límite de tamaño. traer() espera
+    si la caché está llena hasta que liberar() deja sitio (un documento mayor que
+    el límite se copia igualmente cuando la caché está vacía).
+    """
+
+    def __init__(self, carpeta_local=PREFETCH_DIR, max_mb=PREFETCH_MAX_MB, log_callback=None):
+        """
+        Args:
+            carpeta_local (str): Carpeta local donde se crea la caché de la ejecución
+            max_mb (int): Tamaño máximo de la caché
+            log_callback (callable): Función para escribir en el log
+        """
+        self.carpeta_local = os.path.abspath(
+            os.path.join(carpeta_local, f"run-{os.getpid()}-{int(time.time() * 1000)}")
+        )
+        self.max_bytes = max(1, max_mb) * 1024 * 1024
+        self.log_callback = log_callback
+
+        self._condicion = threading.Condition()
+        self._en_uso = {}       # ruta local -> bytes
+        self._bytes_en_uso = 0
+        self._secuencia = 0
+        self.documentos = 0
+        self.bytes = 0
+        self.segundos = 0.0
+        self.espera_cache_llena = 0.0
+        self.fallos = 0
+
+    def iniciar(self):
+        os.makedirs(self.carpeta_local, exist_ok=True)
+
+    def traer(self, ruta):
+        """
+        Copia un documento a la caché
+
+        Args:
+            ruta (str): Documento de origen (ya con su nombre definitivo tras el renombrado)
+
+        Returns:
+            str: Ruta de la copia local, o None si no se pudo copiar (se abre el original)
+        """
+        try:
+            tamano = os.path.getsize(ruta)
+        except OSError:
+            return None
+
+        inicio = time.perf_counter()
+        with self._condicion:
+            while self._bytes_en_uso and self._bytes_en_uso + tamano > self.max_bytes:
+                self._condicion.wait()
+            self._bytes_en_uso += tamano
+            self._secuencia += 1
+            secuencia = self._secuencia
+        espera = time.perf_counter() - inicio
+
+        # Una subcarpeta por documento: la copia conserva el nombre exacto (campos FILENAME, título)
+        ruta_local = os.path.join(self.carpeta_local, str(secuencia), os.path.basename(ruta))
+        inicio = time.perf_counter()
+        try:
+            os.makedirs(os.path.dirname(ruta_local))
+            shutil.copy2(ruta, ruta_local)
+        except OSError as e:
+            self._log(f"⚠ No se pudo copiar a local {os.path.basename(ruta)}: {e} - se abre el original")
+            self._borrar(ruta_local)
+            with self._condicion:
+                self._bytes_en_uso -= tamano
+                self.fallos += 1
+                self._condicion.notify_all()
+            return None
+
+        with self._condicion:
+            self._en_uso[ruta_local] = tamano
+            self.documentos += 1
+            self.bytes += tamano
+            self.segundos += time.perf_counter() - inicio
+            self.espera_cache_llena += espera
+        return ruta_local
+
+    def liberar(self, ruta_local):
+        """Borra la copia local de un documento ya procesado"""
+        if not ruta_local:
+            return
+        self._borrar(ruta_local)
+        with self._condicion:
+            self._bytes_en_uso -= self._en_uso.pop(ruta_local, 0)
+            self._condicion.notify_all()
+
+    def cerrar(self):
+        shutil.rmtree(self.carpeta_local, ignore_errors=True)
+
+    @staticmethod
+    def _borrar(ruta_local):
+        try:
+            os.remove(ruta_local)
+        except OSError:
+            pass
+        try:
+            os.rmdir(os.path.dirname(ruta_local))
+        except OSError:
+            pass
+
+    def resumen(self):
+        """
+        Returns:
+            list: Líneas de texto para el log
+        """
+        if not self.documentos and not self.fallos:
+            return []
+        mb = self.bytes / (1024 * 1024)
+        velocidad = mb / self.segundos if self.segundos else 0
+        return [
+            f"Copia anticipada: {self.documentos} documentos, {mb:.1f} MB en {self.segundos:.1f}s "
+            f"({velocidad:.1f} MB/s), espera por caché llena {self.espera_cache_llena:.1f}s, fallos {self.fallos}"
+        ]
+
+    def _log(self, mensaje):
+        if self.log_callback:
+            self.log_callback(mensaje)
@@ -0,0 +1,141 @@
+"""
+Modelo de resultados por archivo
+Una fila por archivo de origen con su estado, rutas de salida y duración.
+Los datos se guardan en columnas compactas (arrays y listas) para que
+la memoria por fila no dependa del tamaño de la ejecución. Los hilos de
+trabajo escriben con registrar(); la tabla de la GUI solo lee las filas
+visibles.
+"""
+
+import threading
+from array import array
+
+# Estados de una fila (el índice se guarda en un array de bytes)
+PROCESADO = 0
+EXCLUIDO = 1
+COPIADO = 2
+RENOMBRADO = 3
+FALLIDO = 4
+AGOTADO = 5
+RECHAZADO = 6
+
+NOMBRES_ESTADO = ('procesado', 'excluido', 'copiado', 'renombrado', 'fallido', 'tiempo agotado', 'rechazado')
+
+# Duración de las filas que no tienen (excluidos, renombrados sin procesar...)
+SIN_DURACION = -1.0
+
+
+class ResultsModel:
+    """Filas de la ejecución en columnas. Seguro entre hilos."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        # Cambia con cada modificación: la vista solo se recalcula si ha cambiado
+        self.version = 0
+        self.limpiar()
+
+    def limpiar(self):
+        with self._lock:
+            self._rutas = []
+            self._salidas = []
+            self._detalles = []
+            self._estados = array('B')
+            self._duraciones = array('f')
+            self._indice = {}            # ruta -> fila
+            self.conteos = [0] * len(NOMBRES_ESTADO)
+            self.version += 1
+
+    def nuevo_trabajo(self):
+        """
+        A partir de aquí un archivo que ya tiene fila recibe otra nueva: en la cola
+        de trabajos, varios trabajos pueden procesar las mismas carpetas de origen
+        """
+        with self._lock:
+            self._indice = {}
+
+    def __len__(self):
+        return len(self._rutas)
+
+    def registrar(self, ruta, estado, salida='', duracion=None, detalle=''):
+        """
+        Añade la fila de un archivo o actualiza la que ya tenga (p. ej. un
+        archivo renombrado que después se procesa)
+
+        Args:
+            ruta (str): Archivo de origen (con su nombre definitivo)
+            estado (int): PROCESADO, EXCLUIDO, COPIADO, RENOMBRADO, FALLIDO, AGOTADO o RECHAZADO
+            salida (str): Rutas de salida separadas por ' · '
+            duracion (float): Segundos, o None si no aplica
+            detalle (str): Texto adicional (se conserva si no se indica otro)
+        """
+        duracion = SIN_DURACION if duracion is None else duracion
+        with self._lock:
+            fila = self._indice.get(ruta)
+            if fila is None:
+                self._indice[ruta] = len(self._rutas)
+                self._rutas.append(ruta)
+                self._salidas.append(salida)
+                self._detalles.append(detalle)
+                self._estados.append(estado)
+                self._duraciones.append(duracion)
+            else:
+                self.conteos[self._estados[fila]] -= 1
+                self._estados[fila] = estado
+                if salida:
+                    self._salidas[fila] = salida
+                if detalle:
+                    self._detalles[fila] = detalle
+                if duracion != SIN_DURACION:
+                    self._duraciones[fila] = duracion
+            self.conteos[estado] += 1
+            self.version += 1
+
+    def fila(self, indice):
+        """
+        Returns:
+            tuple: (ruta, estado, salida, duracion o None, detalle)
+        """
+        with self._lock:
+            duracion = self._duraciones[indice]
+            return (
+                self._rutas[indice], self._estados[indice], self._salidas[indice],
+                None if duracion == SIN_DURACION else duracion, self._detalles[indice]
+            )
+
+    def vista(self, estado=None, orden=None, descendente=False):
+        """
+        Índices de las filas a mostrar
+
+        Args:
+            estado (int): Solo las filas con este estado (None = todas)
+            orden (str): None (orden de llegada), 'ruta', 'estado' o 'duracion'
+            descendente (bool): Invertir el orden
+
+        Returns:
+            list: Índices de fila (un range sin filtro ni orden: no crece con la ejecución)
+        """
+        with self._lock:
+            total = len(self._rutas)
+            estados = self._estados
+            if estado is None and orden is None:
+                return range(total - 1, -1, -1) if descendente else range(total)
+            if estado is None:
+                indices = list(range(total))
+            else:
+                indices = [i for i in range(total) if estados[i] == estado]
+            if orden == 'duracion':
+                indices.sort(key=self._duraciones.__getitem__, reverse=descendente)
+            elif orden == 'estado':
+                indices.sort(key=estados.__getitem__, reverse=descendente)
+            elif orden == 'ruta':
+                rutas = self._rutas
+                indices.sort(key=lambda i: rutas[i].lower(), reverse=descendente)
+            elif descendente:
+                indices.reverse()
+            return indices
+
+    def resumen(self):
+        """Texto con el número de filas de cada estado"""
+        return " · ".join(
+            f"{nombre}: {cantidad}" for nombre, cantidad in zip(NOMBRES_ESTADO, self.conteos) if cantidad
+        )
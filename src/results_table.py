@@ -0,0 +1,188 @@
+"""
+Tabla de resultados virtualizada
+Un ttk.Treeview con solo RESULTS_TABLE_ROWS filas reales que se rellenan
+con la parte visible del modelo. La barra de desplazamiento recorre el
+modelo completo, así que la tabla cuesta lo mismo con 100 archivos que
+con 100.000. Los cambios del proceso se acumulan en el modelo y la tabla
+los recoge cada RESULTS_REFRESH_MS.
+"""
+
+import os
+import time
+import tkinter as tk
+from tkinter import ttk
+
+from src.config import (
+    RESULTS_TABLE_ROWS, RESULTS_REFRESH_MS, RESULTS_WHEEL_ROWS,
+    COLOR_SUCCESS, COLOR_ERROR, COLOR_INFO, COLOR_NEUTRAL
+)
+from src.results_model import (
+    NOMBRES_ESTADO, PROCESADO, EXCLUIDO, COPIADO, RENOMBRADO, FALLIDO, AGOTADO, RECHAZADO
+)
+
+# Columnas: (id, título, ancho, criterio de orden del modelo o None)
+COLUMNAS = (
+    ('estado', "Estado", 90, 'estado'),
+    ('archivo', "Archivo", 220, 'ruta'),
+    ('duracion', "Duración", 70, 'duracion'),
+    ('salida', "Salida", 260, None),
+)
+
+COLORES_ESTADO = {
+    PROCESADO: COLOR_SUCCESS,
+    COPIADO: COLOR_INFO,
+    RENOMBRADO: COLOR_INFO,
+    EXCLUIDO: COLOR_NEUTRAL,
+    FALLIDO: COLOR_ERROR,
+    AGOTADO: COLOR_ERROR,
+    RECHAZADO: COLOR_ERROR,
+}
+
+TODOS = "Todos"
+
+
+class ResultsTable:
+    """Vista de un ResultsModel con filtro por estado y orden por columna"""
+
+    def __init__(self, parent, modelo, filas=RESULTS_TABLE_ROWS):
+        """
+        Args:
+            parent: Contenedor Tkinter
+            modelo (ResultsModel): Datos de la ejecución
+            filas (int): Filas visibles
+        """
+        self.modelo = modelo
+        self.filas = filas
+        self._indices = []       # Filas del modelo tras filtrar y ordenar
+        self._inicio = 0         # Primera fila visible
+        self._version = None
+        self._estado = None
+        self._orden = None
+        self._descendente = False
+        self._seguir_final = True
+
+        barra = tk.Frame(parent)
+        barra.pack(fill=tk.X, pady=(2, 2))
+        tk.Label(barra, text="Mostrar:", font=("Arial", 8)).pack(side=tk.LEFT)
+        self.combo_estado = ttk.Combobox(
+            barra, values=(TODOS,) + NOMBRES_ESTADO, state='readonly', width=14
+        )
+        self.combo_estado.set(TODOS)
+        self.combo_estado.bind('<<ComboboxSelected>>', self._cambiar_filtro)
+        self.combo_estado.pack(side=tk.LEFT, padx=(4, 10))
+        self.label_resumen = tk.Label(barra, text="", font=("Arial", 8), anchor=tk.W)
+        self.label_resumen.pack(side=tk.LEFT, fill=tk.X, expand=True)
+
+        marco = tk.Frame(parent)
+        marco.pack(fill=tk.BOTH, expand=True)
+        self.tree = ttk.Treeview(
+            marco, columns=[c[0] for c in COLUMNAS], show='headings',
+            height=filas, selectmode='browse'
+        )
+        for columna, titulo, ancho, criterio in COLUMNAS:
+            if criterio:
+                self.tree.heading(columna, text=titulo, command=lambda c=criterio: self._ordenar(c))
+            else:
+                self.tree.heading(columna, text=titulo)
+            self.tree.column(columna, width=ancho, stretch=(columna == 'salida'),
+                             anchor=tk.E if columna == 'duracion' else tk.W)
+        for estado, color in COLORES_ESTADO.items():
+            self.tree.tag_configure(f"estado{estado}", foreground=color)
+
+        self.scrollbar = ttk.Scrollbar(marco, orient=tk.VERTICAL, command=self._desplazar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.tree.bind('<MouseWheel>', lambda e: self._mover(-RESULTS_WHEEL_ROWS if e.delta > 0 else RESULTS_WHEEL_ROWS))
+        self.tree.bind('<Button-4>', lambda e: self._mover(-RESULTS_WHEEL_ROWS))
+        self.tree.bind('<Button-5>', lambda e: self._mover(RESULTS_WHEEL_ROWS))
+        self.tree.bind('<Prior>', lambda e: self._mover(-self.filas))
+        self.tree.bind('<Next>', lambda e: self._mover(self.filas))
+
+        self._refrescar()
+
+    # ------------------------------------------------------------------
+    # Refresco
+    # ------------------------------------------------------------------
+
+    def _refrescar(self):
+        """Recoge los cambios acumulados en el modelo y vuelve a programarse"""
+        espera = RESULTS_REFRESH_MS
+        if self.modelo.version != self._version:
+            inicio = time.perf_counter()
+            self._recalcular()
+            # Con filtro u orden sobre muchas filas el recálculo cuesta: no más del 10% del tiempo
+            espera = max(espera, int((time.perf_counter() - inicio) * 10000))
+        self.tree.after(espera, self._refrescar)
+
+    def _recalcular(self):
+        self._version = self.modelo.version
+        self._indices = self.modelo.vista(self._estado, self._orden, self._descendente)
+        if self._seguir_final and self._orden is None:
+            # Mientras se está al final de la lista, lo nuevo queda a la vista
+            self._inicio = max(0, len(self._indices) - self.filas)
+        self.label_resumen.config(text=self.modelo.resumen())
+        self._pintar()
+
+    def _pintar(self):
+        """Rellena las filas reales del Treeview con la ventana visible del modelo"""
+        total = len(self._indices)
+        self._inicio = max(0, min(self._inicio, total - self.filas))
+        visibles = self._indices[self._inicio:self._inicio + self.filas]
+
+        items = self.tree.get_children()
+        for item in items[len(visibles):]:
+            self.tree.delete(item)
+        for posicion, indice in enumerate(visibles):
+            ruta, estado, salida, duracion, detalle = self.modelo.fila(indice)
+            valores = (
+                NOMBRES_ESTADO[estado],
+                os.path.basename(ruta),
+                f"{duracion:.1f}s" if duracion is not None else "",
+                f"{salida} ({detalle})" if detalle and estado in (FALLIDO, AGOTADO, RECHAZADO) else (salida or detalle),
+            )
+            if posicion < len(items):
+                self.tree.item(items[posicion], values=valores, tags=(f"estado{estado}",))
+            else:
+                self.tree.insert('', tk.END, values=valores, tags=(f"estado{estado}",))
+
+        if total:
+            self.scrollbar.set(self._inicio / total, min(1.0, (self._inicio + self.filas) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    # ------------------------------------------------------------------
+    # Desplazamiento, filtro y orden
+    # ------------------------------------------------------------------
+
+    def _mover(self, filas):
+        self._inicio += filas
+        self._seguir_final = self._inicio + self.filas >= len(self._indices)
+        self._pintar()
+        return 'break'
+
+    def _desplazar(self, accion, cantidad, unidad=None):
+        """Comando de la barra de desplazamiento ('moveto' o 'scroll')"""
+        if accion == 'moveto':
+            self._inicio = int(float(cantidad) * len(self._indices))
+            self._mover(0)
+        elif accion == 'scroll':
+            self._mover(int(cantidad) * (self.filas if unidad == 'pages' else 1))
+
+    def _cambiar_filtro(self, event=None):
+        texto = self.combo_estado.get()
+        self._estado = None if texto == TODOS else NOMBRES_ESTADO.index(texto)
+        self._inicio = 0
+        self._recalcular()
+
+    def _ordenar(self, criterio):
+        """Un clic ordena por la columna; otro invierte el orden"""
+        if self._orden == criterio:
+            self._descendente = not self._descendente
+        else:
+            self._orden = criterio
+            # La duración interesa de mayor a menor
+            self._descendente = criterio == 'duracion'
+        self._inicio = 0
+        self._seguir_final = False
+        self._recalcular()
@@ -0,0 +1,282 @@
+"""
+Historial de ejecuciones
+Base de datos SQLite local con la duración de cada documento procesado.
+Sirve para prever el coste de los documentos de una nueva ejecución,
+procesar primero los más largos y mostrar un tiempo restante realista.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+from src.config import (
+    HISTORY_DB_PATH, HISTORY_RETENTION_DAYS, HISTORY_MAX_ENTRIES, HISTORY_MAX_RUNS,
+    HISTORY_DEFAULT_DOC_SECONDS, HISTORY_MIN_SAMPLES, HISTORY_EWMA_ALPHA
+)
+
+# Bytes del principio del archivo que identifican un documento renombrado o movido
+BYTES_HUELLA_RAPIDA = 64 * 1024
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS documentos (
+    ruta TEXT NOT NULL,
+    motor TEXT NOT NULL,
+    tamano INTEGER NOT NULL,
+    huella_rapida TEXT NOT NULL,
+    duracion REAL NOT NULL,
+    ejecuciones INTEGER NOT NULL,
+    ultima_vez REAL NOT NULL,
+    PRIMARY KEY (ruta, motor)
+);
+CREATE INDEX IF NOT EXISTS idx_documentos_huella ON documentos (motor, tamano, huella_rapida);
+CREATE INDEX IF NOT EXISTS idx_documentos_ultima_vez ON documentos (ultima_vez);
+CREATE TABLE IF NOT EXISTS ejecuciones (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    inicio REAL NOT NULL,
+    motor TEXT NOT NULL,
+    documentos INTEGER NOT NULL,
+    segundos REAL NOT NULL,
+    previstos REAL NOT NULL
+);
+"""
+
+
+def huella_rapida(ruta, tamano=None):
+    """SHA-1 del tamaño y del primer bloque del archivo (identifica renombrados sin leerlo entero)"""
+    h = hashlib.sha1(str(tamano if tamano is not None else os.path.getsize(ruta)).encode('ascii'))
+    with open(ruta, 'rb') as f:
+        h.update(f.read(BYTES_HUELLA_RAPIDA))
+    return h.hexdigest()
+
+
+def formatear_duracion(segundos):
+    """'1h 05m', '12m 30s' o '45s'"""
+    segundos = int(round(max(0, segundos)))
+    horas, resto = divmod(segundos, 3600)
+    minutos, segundos = divmod(resto, 60)
+    if horas:
+        return f"{horas}h {minutos:02d}m"
+    if minutos:
+        return f"{minutos}m {segundos:02d}s"
+    return f"{segundos}s"
+
+
+class RunHistory:
+    """
+    Historial de duraciones por documento. Al empezar se carga en memoria
+    (las consultas durante el proceso no tocan el disco) y al terminar se
+    guardan las nuevas duraciones y se compacta la base de datos.
+    """
+
+    def __init__(self, ruta_db=HISTORY_DB_PATH, motor='word', retencion_dias=HISTORY_RETENTION_DAYS,
+                 max_entradas=HISTORY_MAX_ENTRIES):
+        """
+        Args:
+            ruta_db (str): Archivo SQLite
+            motor (str): 'word' o 'package' (las duraciones no son comparables entre motores)
+            retencion_dias (int): Entradas no vistas en este tiempo se borran (0 = nunca)
+            max_entradas (int): Máximo de documentos guardados (se borran los más antiguos)
+        """
+        self.ruta_db = ruta_db
+        self.motor = motor
+        self.retencion_dias = retencion_dias
+        self.max_entradas = max_entradas
+        self._por_ruta = {}      # ruta normalizada -> (tamaño, huella rápida, duración, ejecuciones)
+        self._por_huella = {}    # (tamaño, huella rápida) -> duración
+        self._modelo = (HISTORY_DEFAULT_DOC_SECONDS, 0.0)   # segundos fijos, segundos por MB
+        self._nuevos = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _clave(ruta):
+        return os.path.normcase(os.path.abspath(ruta))
+
+    def _conectar(self):
+        carpeta = os.path.dirname(self.ruta_db)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        conexion = sqlite3.connect(self.ruta_db)
+        conexion.executescript(ESQUEMA)
+        return conexion
+
+    def cargar(self):
+        """
+        Lee el historial del motor actual y ajusta el modelo de coste
+
+        Returns:
+            int: Documentos conocidos
+        """
+        conexion = self._conectar()
+        try:
+            filas = conexion.execute(
+                "SELECT ruta, tamano, huella_rapida, duracion, ejecuciones FROM documentos WHERE motor = ?",
+                (self.motor,)
+            ).fetchall()
+        finally:
+            conexion.close()
+
+        for ruta, tamano, huella, duracion, ejecuciones in filas:
+            self._por_ruta[ruta] = (tamano, huella, duracion, ejecuciones)
+            self._por_huella[(tamano, huella)] = duracion
+        self._modelo = self._ajustar_modelo([(t / (1024 * 1024), d) for _, t, _, d, _ in filas])
+        return len(filas)
+
+    @staticmethod
+    def _ajustar_modelo(muestras):
+        """Recta duración = a + b·MB por mínimos cuadrados (media si hay pocas muestras)"""
+        if not muestras:
+            return (HISTORY_DEFAULT_DOC_SECONDS, 0.0)
+        n = len(muestras)
+        media_x = sum(x for x, _ in muestras) / n
+        media_y = sum(y for _, y in muestras) / n
+        if n < HISTORY_MIN_SAMPLES:
+            return (media_y, 0.0)
+        varianza = sum((x - media_x) ** 2 for x, _ in muestras)
+        if varianza <= 0:
+            return (media_y, 0.0)
+        pendiente = sum((x - media_x) * (y - media_y) for x, y in muestras) / varianza
+        pendiente = max(0.0, pendiente)
+        return (max(0.0, media_y - pendiente * media_x), pendiente)
+
+    def predecir(self, ruta, tamano=None):
+        """
+        Duración prevista de un documento: la registrada para esa ruta y tamaño,
+        la de un documento idéntico con otro nombre o, si no, la del modelo por tamaño.
+
+        Returns:
+            float: Segundos previstos
+        """
+        try:
+            tamano = os.path.getsize(ruta) if tamano is None else tamano
+        except OSError:
+            return self._modelo[0]
+
+        conocido = self._por_ruta.get(self._clave(ruta))
+        if conocido and conocido[0] == tamano:
+            return conocido[2]
+
+        if self._por_huella:
+            try:
+                duracion = self._por_huella.get((tamano, huella_rapida(ruta, tamano)))
+            except OSError:
+                duracion = None
+            if duracion is not None:
+                return duracion
+
+        fijo, por_mb = self._modelo
+        return fijo + por_mb * tamano / (1024 * 1024)
+
+    def registrar(self, ruta, duracion):
+        """Anota la duración real de un documento (se guarda al llamar a guardar)"""
+        try:
+            tamano = os.path.getsize(ruta)
+            huella = huella_rapida(ruta, tamano)
+        except OSError:
+            return
+        clave = self._clave(ruta)
+        with self._lock:
+            anterior = self._por_ruta.get(clave)
+            if anterior and anterior[0] == tamano:
+                # Media móvil: un documento lento una vez no domina las previsiones siguientes
+                duracion = HISTORY_EWMA_ALPHA * duracion + (1 - HISTORY_EWMA_ALPHA) * anterior[2]
+                ejecuciones = anterior[3] + 1
+            else:
+                ejecuciones = 1
+            self._por_ruta[clave] = (tamano, huella, duracion, ejecuciones)
+            self._por_huella[(tamano, huella)] = duracion
+            self._nuevos[clave] = (tamano, huella, duracion, ejecuciones)
+
+    def guardar(self, inicio, documentos, segundos, previstos):
+        """
+        Escribe las duraciones nuevas y la ejecución, y compacta el historial
+
+        Returns:
+            int: Entradas borradas por la retención
+        """
+        ahora = time.time()
+        with self._lock:
+            nuevos = [
+                (ruta, self.motor, tamano, huella, duracion, ejecuciones, ahora)
+                for ruta, (tamano, huella, duracion, ejecuciones) in self._nuevos.items()
+            ]
+            self._nuevos = {}
+
+        conexion = self._conectar()
+        try:
+            with conexion:
+                conexion.executemany(
+                    "INSERT OR REPLACE INTO documentos "
+                    "(ruta, motor, tamano, huella_rapida, duracion, ejecuciones, ultima_vez) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    nuevos
+                )
+                conexion.execute(
+                    "INSERT INTO ejecuciones (inicio, motor, documentos, segundos, previstos) VALUES (?, ?, ?, ?, ?)",
+                    (inicio, self.motor, documentos, segundos, previstos)
+                )
+            return self._compactar(conexion, ahora)
+        finally:
+            conexion.close()
+
+    def _compactar(self, conexion, ahora):
+        """Aplica la retención y el máximo de entradas; VACUUM si se ha borrado algo"""
+        borradas = 0
+        with conexion:
+            if self.retencion_dias > 0:
+                limite = ahora - self.retencion_dias * 86400
+                borradas += conexion.execute("DELETE FROM documentos WHERE ultima_vez < ?", (limite,)).rowcount
+            if self.max_entradas > 0:
+                borradas += conexion.execute(
+                    "DELETE FROM documentos WHERE rowid IN ("
+                    "SELECT rowid FROM documentos ORDER BY ultima_vez DESC LIMIT -1 OFFSET ?)",
+                    (self.max_entradas,)
+                ).rowcount
+            conexion.execute(
+                "DELETE FROM ejecuciones WHERE id NOT IN ("
+                "SELECT id FROM ejecuciones ORDER BY id DESC LIMIT ?)",
+                (HISTORY_MAX_RUNS,)
+            )
+        if borradas:
+            conexion.execute("VACUUM")
+        return borradas
+
+
+class EtaEstimator:
+    """
+    Tiempo restante a partir de los costes previstos. Corrige la previsión con
+    la relación real/previsto de los documentos ya terminados en esta ejecución.
+    """
+
+    def __init__(self, paralelismo=1):
+        """
+        Args:
+            paralelismo (int): Documentos que se procesan a la vez
+        """
+        self.paralelismo = max(1, paralelismo)
+        self.previsto_total = 0.0
+        self._previsto_hecho = 0.0
+        self._real_hecho = 0.0
+        self._lock = threading.Lock()
+
+    def agregar(self, coste):
+        with self._lock:
+            self.previsto_total += coste
+
+    def descartar(self, coste):
+        """Quita un documento que ya no se va a procesar"""
+        with self._lock:
+            self.previsto_total -= coste
+
+    def completar(self, coste, duracion):
+        with self._lock:
+            self._previsto_hecho += coste
+            self._real_hecho += duracion
+
+    def restante(self):
+        """Segundos restantes estimados"""
+        with self._lock:
+            pendiente = self.previsto_total - self._previsto_hecho
+            factor = self._real_hecho / self._previsto_hecho if self._previsto_hecho > 0 else 1.0
+        return max(0.0, pendiente * factor / self.paralelismo)
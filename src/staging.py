@@ -0,0 +1,297 @@
+"""
+Escritura diferida al destino
+Los resultados se escriben primero en un directorio local y uno o varios
+hilos los mueven por lotes al destino (normalmente una unidad de red lenta),
+creando cada carpeta de destino una sola vez y reintentando los fallos.
+"""
+
+import os
+import queue
+import shutil
+import threading
+import time
+
+from src.config import (
+    STAGING_DIR, STAGING_WORKERS, STAGING_QUEUE_SIZE, STAGING_BATCH_SIZE, STAGING_RETRIES,
+    STAGING_RETRY_DELAY
+)
+
+# Sufijo del archivo a medio copiar en el destino (se renombra al terminar)
+SUFIJO_PARCIAL = '.part'
+# GetDriveTypeW: unidad de red asignada
+DRIVE_REMOTE = 4
+# Sistemas de archivos de red en /proc/mounts
+SISTEMAS_RED = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', 'afs', '9p', 'ceph', 'glusterfs', 'fuse.sshfs'}
+
+
+def es_ruta_de_red(ruta):
+    """
+    True si la ruta está en una unidad de red: ruta UNC, unidad asignada de
+    Windows o, en Linux, un punto de montaje NFS/SMB. En la duda, False.
+    """
+    ruta = os.path.abspath(ruta)
+    if ruta.startswith(('\\\\', '//')):
+        return True
+    try:
+        if os.name == 'nt':
+            import ctypes
+            unidad = os.path.splitdrive(ruta)[0]
+            return bool(unidad) and ctypes.windll.kernel32.GetDriveTypeW(unidad + '\\') == DRIVE_REMOTE
+        ruta = os.path.realpath(ruta)
+        montaje, tipo = '', ''
+        with open('/proc/mounts', encoding='utf-8', errors='replace') as f:
+            for linea in f:
+                campos = linea.split()
+                if len(campos) < 3:
+                    continue
+                punto = campos[1].replace('\\040', ' ')
+                dentro = ruta == punto or ruta.startswith(punto.rstrip('/') + '/')
+                if dentro and len(punto) >= len(montaje):
+                    montaje, tipo = punto, campos[2]
+        return tipo in SISTEMAS_RED
+    except (OSError, AttributeError):
+        return False
+
+
+class DirectoryCache:
+    """
+    Carpetas que ya existen en el destino. En una unidad de red cada
+    os.makedirs es una ida y vuelta al servidor aunque la carpeta exista.
+    """
+
+    def __init__(self):
+        self._creadas = set()
+        self._lock = threading.Lock()
+        self.creadas = 0
+        self.aciertos = 0
+
+    def asegurar(self, carpeta):
+        """Crea la carpeta (y sus padres) si no consta como creada"""
+        if not carpeta:
+            return
+        clave = os.path.normcase(os.path.abspath(carpeta))
+        with self._lock:
+            if clave in self._creadas:
+                self.aciertos += 1
+                return
+        os.makedirs(carpeta, exist_ok=True)
+        with self._lock:
+            self._creadas.add(clave)
+            self.creadas += 1
+
+    def olvidar(self, carpeta):
+        """La carpeta ha desaparecido (p. ej. borrada a mano): se volverá a crear"""
+        with self._lock:
+            self._creadas.discard(os.path.normcase(os.path.abspath(carpeta)))
+
+
+class WriteBehindWriter:
+    """
+    Mueve al destino los archivos escritos en local. `esperar()` bloquea hasta
+    que todo lo enviado está en el destino (o ha fallado tras los reintentos).
+    """
+
+    def __init__(self, carpeta_destino, carpeta_local=STAGING_DIR, hilos=STAGING_WORKERS,
+                 capacidad=STAGING_QUEUE_SIZE, lote=STAGING_BATCH_SIZE, reintentos=STAGING_RETRIES,
+                 espera_reintento=STAGING_RETRY_DELAY, directorios=None, log_callback=None):
+        """
+        Args:
+            carpeta_destino (str): Carpeta de destino final
+            carpeta_local (str): Carpeta local donde se crea el área de la ejecución
+            hilos (int): Hilos que mueven archivos al destino
+            capacidad (int): Archivos en espera antes de que enviar() bloquee
+            lote (int): Archivos que un hilo toma de la cola de una vez
+            reintentos (int): Reintentos de cada archivo antes de darlo por fallido
+            espera_reintento (float): Segundos antes del primer reintento (se duplica en cada uno)
+            directorios (DirectoryCache): Caché de carpetas de destino (compartida con la copia de anexos)
+            log_callback (callable): Función para escribir en el log
+        """
+        self.carpeta_destino = os.path.abspath(carpeta_destino)
+        # Un área por ejecución: dos instancias del programa no se pisan
+        self.carpeta_local = os.path.abspath(
+            os.path.join(carpeta_local, f"run-{os.getpid()}-{int(time.time() * 1000)}")
+        )
+        self.hilos = max(1, hilos)
+        self.lote = max(1, lote)
+        self.reintentos = max(0, reintentos)
+        self.espera_reintento = espera_reintento
+        self.directorios = directorios or DirectoryCache()
+        self.log_callback = log_callback
+
+        self._cola = queue.Queue(maxsize=max(0, capacidad))
+        self._lock = threading.Lock()
+        self._hilos = []
+        self.archivos = 0
+        self.bytes = 0
+        self.reintentos_hechos = 0
+        self.fallidos = []
+        self.segundos = 0.0
+
+    # ------------------------------------------------------------------
+    # Rutas
+    # ------------------------------------------------------------------
+
+    def ruta_local(self, ruta_destino):
+        """Ruta en el área local equivalente a una ruta del destino"""
+        relativa = os.path.relpath(os.path.abspath(ruta_destino), self.carpeta_destino)
+        if relativa == '.':
+            return self.carpeta_local
+        return os.path.join(self.carpeta_local, relativa)
+
+    def ruta_destino(self, ruta_local):
+        """Inversa de ruta_local"""
+        relativa = os.path.relpath(os.path.abspath(ruta_local), self.carpeta_local)
+        if relativa == '.':
+            return self.carpeta_destino
+        return os.path.join(self.carpeta_destino, relativa)
+
+    # ------------------------------------------------------------------
+    # Ciclo de vida
+    # ------------------------------------------------------------------
+
+    def iniciar(self):
+        os.makedirs(self.carpeta_local, exist_ok=True)
+        for i in range(self.hilos):
+            hilo = threading.Thread(target=self._bucle, name=f"escritura-{i + 1}", daemon=True)
+            hilo.start()
+            self._hilos.append(hilo)
+
+    def enviar(self, ruta_local, al_terminar=None):
+        """
+        Encola un archivo del área local para moverlo al destino
+
+        Args:
+            ruta_local (str): Archivo ya escrito (obtenido con ruta_local)
+            al_terminar (callable): Se llama con True/False cuando el archivo llega (o falla)
+        """
+        self._cola.put((ruta_local, self.ruta_destino(ruta_local), al_terminar))
+
+    def esperar(self):
+        """Bloquea hasta que todos los archivos enviados se han movido o han fallado"""
+        self._cola.join()
+
+    def cerrar(self):
+        """
+        Espera a que se vacíe la cola, detiene los hilos y borra el área local.
+        Los archivos que no se pudieron mover se conservan en ella.
+        """
+        self.esperar()
+        for _ in self._hilos:
+            self._cola.put(None)
+        for hilo in self._hilos:
+            hilo.join()
+        self._hilos = []
+        if self.fallidos:
+            self._log(f"⚠ {len(self.fallidos)} archivos no llegaron al destino; siguen en {self.carpeta_local}")
+            return
+        shutil.rmtree(self.carpeta_local, ignore_errors=True)
+
+    # ------------------------------------------------------------------
+    # Hilos de escritura
+    # ------------------------------------------------------------------
+
+    def _bucle(self):
+        while True:
+            primero = self._cola.get()
+            if primero is None:
+                self._cola.task_done()
+                return
+            lote = [primero]
+            fin = False
+            while len(lote) < self.lote:
+                try:
+                    elemento = self._cola.get_nowait()
+                except queue.Empty:
+                    break
+                if elemento is None:
+                    fin = True
+                    break
+                lote.append(elemento)
+
+            # Agrupados por carpeta: cada carpeta de destino se comprueba una vez por lote
+            lote.sort(key=lambda e: os.path.dirname(e[1]))
+            for ruta_local, ruta_destino, al_terminar in lote:
+                exito = self._mover_con_reintentos(ruta_local, ruta_destino)
+                if al_terminar:
+                    try:
+                        al_terminar(exito)
+                    except Exception as e:
+                        self._log(f"⚠ Error tras escribir {os.path.basename(ruta_destino)}: {e}")
+                self._cola.task_done()
+
+            if fin:
+                self._cola.task_done()
+                return
+
+    def _mover_con_reintentos(self, ruta_local, ruta_destino):
+        espera = self.espera_reintento
+        for intento in range(self.reintentos + 1):
+            inicio = time.perf_counter()
+            try:
+                tamano = self._mover(ruta_local, ruta_destino)
+                with self._lock:
+                    self.archivos += 1
+                    self.bytes += tamano
+                    self.segundos += time.perf_counter() - inicio
+                return True
+            except OSError as e:
+                with self._lock:
+                    self.segundos += time.perf_counter() - inicio
+                if isinstance(e, FileNotFoundError):
+                    # La carpeta de destino pudo borrarse después de crearla
+                    self.directorios.olvidar(os.path.dirname(ruta_destino))
+                if intento == self.reintentos:
+                    self._log(f"  ✗ ERROR escribiendo {os.path.basename(ruta_destino)} en destino: {e}")
+                    with self._lock:
+                        self.fallidos.append(ruta_local)
+                    return False
+                with self._lock:
+                    self.reintentos_hechos += 1
+                time.sleep(espera)
+                espera *= 2
+
+    def _mover(self, ruta_local, ruta_destino):
+        """
+        Mueve un archivo al destino sin dejar nunca uno a medio escribir con su nombre final
+
+        Returns:
+            int: Bytes escritos
+        """
+        tamano = os.path.getsize(ruta_local)
+        self.directorios.asegurar(os.path.dirname(ruta_destino))
+        try:
+            # Mismo volumen: basta con renombrar
+            os.replace(ruta_local, ruta_destino)
+            return tamano
+        except OSError:
+            pass
+        parcial = ruta_destino + SUFIJO_PARCIAL
+        try:
+            shutil.copy2(ruta_local, parcial)
+            os.replace(parcial, ruta_destino)
+        except OSError:
+            try:
+                os.remove(parcial)
+            except OSError:
+                pass
+            raise
+        os.remove(ruta_local)
+        return tamano
+
+    def resumen(self):
+        """
+        Returns:
+            list: Líneas de texto para el log
+        """
+        mb = self.bytes / (1024 * 1024)
+        velocidad = mb / self.segundos if self.segundos else 0
+        return [
+            f"Escritura al destino: {self.archivos} archivos, {mb:.1f} MB en {self.segundos:.1f}s "
+            f"({velocidad:.1f} MB/s, {self.hilos} hilos)",
+            f"  Reintentos: {self.reintentos_hechos} · Fallidos: {len(self.fallidos)} · "
+            f"Carpetas creadas: {self.directorios.creadas} (evitadas {self.directorios.aciertos})",
+        ]
+
+    def _log(self, mensaje):
+        if self.log_callback:
+            self.log_callback(mensaje)
@@ -0,0 +1,113 @@
+"""
+Comprobación rápida de documentos ya estampados
+Lee directamente del paquete .docx (sin abrir Word) la huella que deja
+WordProcessor en una propiedad personalizada y el contenido de encabezados y pies
+"""
+
+import hashlib
+import re
+import zipfile
+import xml.etree.ElementTree as ET
+
+from src.config import STAMP_PROPERTY_NAME, STAMP_FORMAT_VERSION
+
+NS_CUSTOM = '{http://schemas.openxmlformats.org/officeDocument/2006/custom-properties}'
+NS_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+
+# Opciones que cambian el aspecto del encabezado o del pie
+OPCIONES_HUELLA = (
+    'add_logo', 'add_folder_code', 'add_header_line',
+    'add_footer_line', 'add_author', 'add_page_number'
+)
+
+PATRON_HEADER = re.compile(r'^word/header\d*\.xml$')
+PATRON_FOOTER = re.compile(r'^word/footer\d*\.xml$')
+MARCAS_IMAGEN = (b'<w:drawing', b'<v:imagedata', b'<pic:pic')
+
+
+def hash_archivo(ruta):
+    """SHA-1 del contenido de un archivo (para detectar cambios de logo)"""
+    h = hashlib.sha1()
+    with open(ruta, 'rb') as f:
+        for bloque in iter(lambda: f.read(1024 * 1024), b''):
+            h.update(bloque)
+    return h.hexdigest()
+
+
+def calcular_huella(codigo, autor, hash_logo, opciones):
+    """
+    Huella de lo que WordProcessor escribiría en el encabezado y el pie
+
+    Args:
+        codigo (str): Código de carpeta
+        autor (str): Autor del pie de página
+        hash_logo (str): Hash del logo o '' si no hay logo
+        opciones (dict): Opciones de la GUI
+
+    Returns:
+        str: Huella hexadecimal
+    """
+    partes = [f"v{STAMP_FORMAT_VERSION}", codigo, autor or '', hash_logo or '']
+    partes += [f"{k}={bool(opciones.get(k, True))}" for k in OPCIONES_HUELLA]
+    return hashlib.sha1("\x1f".join(partes).encode('utf-8')).hexdigest()
+
+
+def leer_huella(zf):
+    """Devuelve el valor de la propiedad de huella o None si no existe"""
+    try:
+        datos = zf.read('docProps/custom.xml')
+    except KeyError:
+        return None
+    raiz = ET.fromstring(datos)
+    for prop in raiz.iter(f'{NS_CUSTOM}property'):
+        if prop.get('name') == STAMP_PROPERTY_NAME:
+            for valor in prop:
+                return (valor.text or '').strip()
+    return None
+
+
+def _texto_partes(zf, patron):
+    """Concatena el texto y el XML crudo de las partes que cumplen el patrón"""
+    textos = []
+    crudos = []
+    for nombre in zf.namelist():
+        if patron.match(nombre):
+            datos = zf.read(nombre)
+            crudos.append(datos)
+            raiz = ET.fromstring(datos)
+            textos.append("".join(t.text or '' for t in raiz.iter(f'{NS_W}t')))
+    return "\n".join(textos), b"".join(crudos)
+
+
+def documento_ya_estampado(ruta, huella, codigo, autor, opciones):
+    """
+    Comprueba si un .docx/.docm ya tiene exactamente el encabezado y el pie esperados
+
+    Args:
+        ruta (str): Documento de origen
+        huella (str): Huella esperada (calcular_huella)
+        codigo (str): Código que debe aparecer en el encabezado
+        autor (str): Autor que debe aparecer en el pie
+        opciones (dict): Opciones de la GUI
+
+    Returns:
+        bool: True si se puede omitir el estampado
+    """
+    try:
+        with zipfile.ZipFile(ruta) as zf:
+            if leer_huella(zf) != huella:
+                return False
+
+            # La huella podría haber sobrevivido a una edición manual: validar el contenido
+            texto_header, xml_header = _texto_partes(zf, PATRON_HEADER)
+            if opciones.get('add_folder_code', True) and codigo not in texto_header:
+                return False
+            if opciones.get('add_logo', True) and not any(m in xml_header for m in MARCAS_IMAGEN):
+                return False
+
+            texto_footer, _ = _texto_partes(zf, PATRON_FOOTER)
+            if opciones.get('add_author', True) and autor and autor not in texto_footer:
+                return False
+            return True
+    except (zipfile.BadZipFile, ET.ParseError, OSError, KeyError):
+        return False
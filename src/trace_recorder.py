@@ -0,0 +1,168 @@
+"""
+Traza de la ejecución en formato Chrome trace events
+Registra un intervalo por fase, archivo y paso (escaneo, renombrado, apertura,
+encabezado, pie, guardado, exportación, cierre, copia, esperas en las colas...)
+con el proceso y el hilo que lo ejecutó. El JSON resultante se abre en
+https://ui.perfetto.dev o en chrome://tracing para ver cómo se solapan las
+etapas y dónde se queda esperando cada una.
+"""
+
+import json
+import os
+import threading
+import time
+import zlib
+from contextlib import nullcontext
+
+from src.config import TRACE_MAX_EVENTS, TRACE_SAMPLE_EVERY
+
+# Categoría de los intervalos que se registran siempre (pocos y necesarios para leer la traza)
+FASE = 'fase'
+
+# Contexto vacío compartido: con la traza desactivada, span() no crea nada
+_NADA = nullcontext()
+
+
+class _Intervalo:
+    """Context manager de un intervalo: lo registra al salir"""
+
+    __slots__ = ('traza', 'nombre', 'categoria', 'args', 'inicio')
+
+    def __init__(self, traza, nombre, categoria, args):
+        self.traza = traza
+        self.nombre = nombre
+        self.categoria = categoria
+        self.args = args
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.traza.completo(self.nombre, self.categoria, self.inicio, time.perf_counter() - self.inicio, self.args)
+        return False
+
+
+class TraceRecorder:
+    """
+    Acumula eventos de traza en memoria y los escribe al terminar. Seguro entre hilos.
+    En ejecuciones enormes se limita con `muestreo` (el detalle de 1 de cada N
+    archivos) y `max_eventos` (a partir de ahí solo se registran las fases).
+    """
+
+    activa = True
+
+    def __init__(self, ruta, max_eventos=TRACE_MAX_EVENTS, muestreo=TRACE_SAMPLE_EVERY):
+        """
+        Args:
+            ruta (str): Archivo JSON de la traza
+            max_eventos (int): Eventos máximos de archivos y pasos (las fases no cuentan)
+            muestreo (int): Registrar el detalle de 1 de cada N archivos (1 = todos)
+        """
+        self.ruta = ruta
+        self.max_eventos = max_eventos
+        self.muestreo = max(1, muestreo)
+        self.descartados = 0
+        self._eventos = []
+        self._detalle = 0
+        self._hilos = {}             # tid -> nombre del hilo
+        self._pistas = {}            # nombre de una pista sin hilo propio -> tid
+        self._pid = os.getpid()
+        self._origen = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def incluye(self, clave):
+        """True si el archivo `clave` entra en la muestra (la misma decisión para todos sus pasos)"""
+        return self.muestreo == 1 or zlib.crc32(clave.encode('utf-8')) % self.muestreo == 0
+
+    def span(self, nombre, categoria, clave=None, **args):
+        """
+        Intervalo que dura lo que el bloque `with`
+
+        Args:
+            nombre (str): Nombre del intervalo
+            categoria (str): Categoría (FASE se registra siempre)
+            clave (str): Archivo al que pertenece, para el muestreo
+            **args: Datos que se muestran al seleccionar el intervalo
+        """
+        if clave is not None and not self.incluye(clave):
+            return _NADA
+        return _Intervalo(self, nombre, categoria, args)
+
+    def completo(self, nombre, categoria, inicio, duracion, args=None, hilo=None):
+        """
+        Registra un intervalo ya medido
+
+        Args:
+            inicio (float): time.perf_counter() al empezar
+            duracion (float): Segundos
+            hilo (str): Pista en la que se muestra (por defecto, el hilo actual)
+        """
+        if categoria != FASE:
+            with self._lock:
+                if self._detalle >= self.max_eventos:
+                    self.descartados += 1
+                    return
+                self._detalle += 1
+        if hilo is None:
+            tid = threading.get_ident()
+            if tid not in self._hilos:
+                self._hilos[tid] = threading.current_thread().name
+        else:
+            with self._lock:
+                tid = self._pistas.get(hilo)
+                if tid is None:
+                    # tid sintético que no coincide con ningún hilo real
+                    tid = self._pistas[hilo] = len(self._pistas) + 1
+                    self._hilos[tid] = hilo
+        evento = {
+            'name': nombre, 'cat': categoria, 'ph': 'X', 'pid': self._pid, 'tid': tid,
+            'ts': round((inicio - self._origen) * 1e6, 1), 'dur': round(duracion * 1e6, 1),
+        }
+        if args:
+            evento['args'] = args
+        self._eventos.append(evento)
+
+    def guardar(self):
+        """
+        Escribe la traza en `ruta`
+
+        Returns:
+            int: Eventos escritos
+        """
+        with self._lock:
+            eventos = list(self._eventos)
+            hilos = dict(self._hilos)
+        metadatos = [{'name': 'process_name', 'ph': 'M', 'pid': self._pid, 'args': {'name': 'Pink Autoheader'}}]
+        metadatos += [
+            {'name': 'thread_name', 'ph': 'M', 'pid': self._pid, 'tid': tid, 'args': {'name': nombre}}
+            for tid, nombre in hilos.items()
+        ]
+        carpeta = os.path.dirname(self.ruta)
+        if carpeta:
+            os.makedirs(carpeta, exist_ok=True)
+        with open(self.ruta, 'w', encoding='utf-8') as f:
+            json.dump({
+                'traceEvents': metadatos + eventos,
+                'displayTimeUnit': 'ms',
+                'otherData': {'muestreo': self.muestreo, 'eventos_descartados': self.descartados},
+            }, f, ensure_ascii=False, separators=(',', ':'))
+        return len(eventos)
+
+
+class _TrazaNula:
+    """Traza desactivada: mismas llamadas, sin coste"""
+
+    activa = False
+
+    def incluye(self, clave):
+        return False
+
+    def span(self, nombre, categoria, clave=None, **args):
+        return _NADA
+
+    def completo(self, nombre, categoria, inicio, duracion, args=None, hilo=None):
+        pass
+
+
+TRAZA_NULA = _TrazaNula()
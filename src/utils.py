@@ -5,41 +5,31 @@ Funciones utilitarias generales
 import os
 import re
 
+from src.naming_rules import REGLAS_POR_DEFECTO
 
-def extraer_codigo(nombre_carpeta):
+
+def extraer_codigo(nombre_carpeta, reglas=None):
     """
-    Extrae código del nombre de carpeta
-    Soporta dos formatos:
+    Extrae código del nombre de carpeta según las reglas de nombres.
+    Con las reglas por defecto soporta dos formatos:
     - "01 - Introducción - Parte 1" -> "01 - Introducción"
     - "CAL-05-Patata" -> "CAL-05"
     
     Args:
         nombre_carpeta (str): Nombre de la carpeta
+        reglas (NamingRules): Reglas de nombres (por defecto las de src/config.py)
     
     Returns:
         str: Código extraído o nombre completo si no tiene formato reconocido
     """
-    # Caso 1: Formato con espacios " - " (ej: "01 - Introducción - Parte 1")
-    if " - " in nombre_carpeta:
-        partes = nombre_carpeta.split(" - ")
-        if len(partes) >= 2:
-            return f"{partes[0]} - {partes[1]}"
-    
-    # Caso 2: Formato con guiones sin espacios (ej: "CAL-05-Patata")
-    elif "-" in nombre_carpeta:
-        partes = nombre_carpeta.split("-")
-        if len(partes) >= 2:
-            return f"{partes[0]}-{partes[1]}"
-    
-    # Si no coincide con ningún formato, devolver el nombre completo
-    return nombre_carpeta
+    return (reglas or REGLAS_POR_DEFECTO).analizar_carpeta(nombre_carpeta).codigo
 
 
-def extraer_raiz_archivo(nombre_archivo):
+def extraer_raiz_archivo(nombre_archivo, reglas=None):
     """
-    Extrae la raíz del nombre de archivo detectando automáticamente el patrón.
-    El patrón se identifica por la presencia de DOS GUIONES (con o sin espacios).
-    Todo lo que viene DESPUÉS del segundo guión es la raíz.
+    Extrae la raíz del nombre de archivo con la primera regla de nombres que encaje.
+    Con las reglas por defecto el patrón se identifica por la presencia de DOS
+    GUIONES (con o sin espacios) y todo lo que viene DESPUÉS del segundo es la raíz.
     
     Ejemplos:
     - "DOC-13-Mi vida salvaje.docx" -> "Mi vida salvaje"
@@ -49,63 +39,37 @@ def extraer_raiz_archivo(nombre_archivo):
     
     Args:
         nombre_archivo (str): Nombre completo del archivo con extensión
+        reglas (NamingRules): Reglas de nombres (por defecto las de src/config.py)
     
     Returns:
         tuple: (raiz_detectada, patron_encontrado)
                raiz_detectada (str): Nombre raíz extraído o None si no se detectó
                patron_encontrado (bool): True si se encontró patrón automático
     """
-    # Separar nombre y extensión
-    nombre_sin_ext, extension = os.path.splitext(nombre_archivo)
-    
-    # Caso 1: Formato con espacios " - " (ej: "01 - Intro - Mi vida salvaje")
-    if " - " in nombre_sin_ext:
-        partes = nombre_sin_ext.split(" - ")
-        if len(partes) >= 3:
-            # Tomar todo después del segundo " - "
-            raiz = " - ".join(partes[2:])
-            return (raiz, True)
-    
-    # Caso 2: Formato con guiones sin espacios
-    # Buscar el SEGUNDO guión y tomar todo después de él
-    guiones_encontrados = 0
-    for i, char in enumerate(nombre_sin_ext):
-        if char == '-':
-            guiones_encontrados += 1
-            if guiones_encontrados == 2:
-                # Encontramos el segundo guión, la raíz es todo lo que viene después
-                raiz = nombre_sin_ext[i+1:]
-                if raiz:  # Asegurar que hay algo después del segundo guión
-                    return (raiz, True)
-                break
-    
-    # No se encontró patrón reconocido (menos de 2 guiones o vacío después del segundo)
-    return (None, False)
+    raiz = (reglas or REGLAS_POR_DEFECTO).analizar_archivo(nombre_archivo).raiz
+    return (raiz, raiz is not None)
 
 
-def construir_nombre_con_codigo(codigo, raiz, extension):
+def construir_nombre_con_codigo(codigo, raiz, extension, reglas=None, regla=None):
     """
-    Construye el nuevo nombre de archivo combinando código + raíz + extensión.
-    Adapta el formato según el tipo de código detectado.
+    Construye el nuevo nombre de archivo combinando código + raíz + extensión
+    con la plantilla de la regla de la carpeta (p. ej. "{codigo} - {raiz}" para
+    "01 - Introducción" y "{codigo}-{raiz}" para "CAL-05").
     
     Args:
         codigo (str): Código de la carpeta (ej: "CAL-05" o "01 - Introducción")
         raiz (str): Raíz del nombre del archivo
         extension (str): Extensión del archivo (incluye el punto)
+        reglas (NamingRules): Reglas de nombres (por defecto las de src/config.py)
+        regla (NamingRule): Regla de la carpeta, si ya se conoce
     
     Returns:
         str: Nuevo nombre completo del archivo
     """
-    # Detectar formato del código para usar el separador adecuado
-    if " - " in codigo:
-        # Formato con espacios: "01 - Introducción"
-        return f"{codigo} - {raiz}{extension}"
-    else:
-        # Formato con guiones: "CAL-05"
-        return f"{codigo}-{raiz}{extension}"
+    return (reglas or REGLAS_POR_DEFECTO).construir_nombre(codigo, raiz, extension, regla)
 
 
-def renombrar_archivo_con_codigo(ruta_archivo, codigo):
+def renombrar_archivo_con_codigo(ruta_archivo, codigo, reglas=None, analisis=None, regla=None):
     """
     Renombra un archivo añadiendo el código de carpeta al principio.
     
@@ -120,6 +84,9 @@ def renombrar_archivo_con_codigo(ruta_archivo, codigo):
     Args:
         ruta_archivo (str): Ruta completa del archivo original
         codigo (str): Código de la carpeta a añadir
+        reglas (NamingRules): Reglas de nombres (por defecto las de src/config.py)
+        analisis (AnalisisNombre): Análisis del nombre ya hecho (p. ej. en lote por directorio)
+        regla (NamingRule): Regla de la carpeta, si ya se conoce
     
     Returns:
         tuple: (exito, nueva_ruta, mensaje, necesita_input)
@@ -134,11 +101,14 @@ def renombrar_archivo_con_codigo(ruta_archivo, codigo):
         nombre_sin_ext, extension = os.path.splitext(nombre_completo)
         
         # Paso 1: Intentar detección automática
-        raiz, patron_encontrado = extraer_raiz_archivo(nombre_completo)
+        reglas = reglas or REGLAS_POR_DEFECTO
+        if analisis is None:
+            analisis = reglas.analizar_archivo(nombre_completo)
+        raiz = analisis.raiz
         
-        if patron_encontrado:
+        if raiz is not None:
             # ✅ Patrón detectado automáticamente
-            nuevo_nombre = construir_nombre_con_codigo(codigo, raiz, extension)
+            nuevo_nombre = reglas.construir_nombre(codigo, raiz, extension, regla)
             nueva_ruta = os.path.join(directorio, nuevo_nombre)
             
             # Verificar que no exista ya (o que sea el mismo archivo)
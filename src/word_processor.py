@@ -6,22 +6,60 @@ Maneja la apertura, modificación y conversión de archivos DOCX
 import os
 import time
 import traceback
+from collections import namedtuple
 from src.config import *
+from src.pdf_export import linealizar_pdf
+from src.stamp_check import calcular_huella, documento_ya_estampado, hash_archivo
+from src.staging import DirectoryCache
+from src.trace_recorder import TRAZA_NULA
+
+
+class GeometriaPagina(namedtuple('GeometriaPagina', 'ancho alto margen_izq margen_der')):
+    """
+    Geometría de página de una sección, leída una sola vez de su PageSetup.
+    Cada lectura de PageSetup es una llamada COM entre procesos, y la sección
+    (no el documento) es la que sabe si la página está en horizontal.
+    """
+    __slots__ = ()
+
+    @classmethod
+    def leer(cls, section):
+        page_setup = section.PageSetup
+        return cls(page_setup.PageWidth, page_setup.PageHeight, page_setup.LeftMargin, page_setup.RightMargin)
+
+    @property
+    def ancho_util(self):
+        return self.ancho - self.margen_izq - self.margen_der
 
 
 class WordProcessor:
     """Procesa documentos Word añadiendo encabezados, pies de página y convirtiéndolos a PDF"""
     
-    def __init__(self, ruta_logo, autor):
+    def __init__(self, ruta_logo, autor, perfil_pdf=PDF_EXPORT_DEFAULT_PROFILE, linealizar=False,
+                 omitir_estampados=True, argumentos_apertura=None):
         """
         Inicializa el procesador de Word
         
         Args:
             ruta_logo (str): Ruta al archivo de imagen del logo
             autor (str): Nombre del autor para el pie de página
+            perfil_pdf (str): Perfil de exportación de PDF_EXPORT_PROFILES ('print' o 'screen')
+            linealizar (bool): Linealizar cada PDF tras exportarlo (vista web rápida)
+            omitir_estampados (bool): No volver a estampar documentos que ya tienen
+                exactamente el encabezado y pie esperados (solo se exportan)
+            argumentos_apertura (dict): Argumentos extra de Documents.Open (perfil de la sesión)
         """
         self.ruta_logo = ruta_logo
         self.autor = autor
+        self.perfil_pdf = perfil_pdf
+        self.linealizar = linealizar
+        self.omitir_estampados = omitir_estampados
+        self.argumentos_apertura = dict(argumentos_apertura or {})
+        self.documentos_omitidos = 0
+        self._hash_logo = None
+        self.directorios = DirectoryCache()
+        # Traza de la ejecución (TraceRecorder); desactivada por defecto
+        self.traza = TRAZA_NULA
     
     def procesar_docx(self, word, ruta_completa, archivo, codigo_ejercicio, carpeta_destino, log_callback, opciones):
         """
@@ -41,45 +79,73 @@ class WordProcessor:
         """
         doc = None
         try:
-            # Crear carpeta destino si no existe
-            os.makedirs(carpeta_destino, exist_ok=True)
+            # Crear carpeta destino si no existe (una sola vez por carpeta)
+            self.directorios.asegurar(carpeta_destino)
             
             ruta_normalizada = os.path.normpath(os.path.abspath(ruta_completa))
             log_callback(f"\n>>> {archivo}")
             
+            # Comprobar en el propio .docx (sin Word) si ya lleva este encabezado y pie
+            traza = self.traza
+            with traza.span("comprobar huella", 'word', archivo):
+                huella = self.calcular_huella(codigo_ejercicio, opciones)
+                ya_estampado = self.omitir_estampados and documento_ya_estampado(
+                    ruta_normalizada, huella, codigo_ejercicio, self.autor, opciones
+                )
+
             # Abrir documento
-            doc = word.Documents.Open(ruta_normalizada)
-            
-            # Insertar encabezado y pie de página con opciones
-            self.insertar_encabezado(doc, codigo_ejercicio, log_callback, opciones)
-            self.insertar_pie_pagina(doc, log_callback, opciones)
+            with traza.span("abrir", 'word', archivo):
+                doc = word.Documents.Open(ruta_normalizada, **self.argumentos_apertura)
             
-            time.sleep(1)
+            if ya_estampado:
+                self.documentos_omitidos += 1
+                log_callback(f"    ↷ Encabezado y pie ya aplicados: solo se exporta")
+            else:
+                # Insertar encabezado y pie de página con opciones
+                # (la geometría de cada sección se lee una vez y la comparten encabezado y pie)
+                geometrias = {}
+                with traza.span("encabezado", 'word', archivo):
+                    self.insertar_encabezado(doc, codigo_ejercicio, log_callback, opciones, geometrias)
+                with traza.span("pie", 'word', archivo):
+                    self.insertar_pie_pagina(doc, log_callback, opciones, geometrias)
+                with traza.span("guardar huella", 'word', archivo):
+                    self._guardar_huella(doc, huella, log_callback)
+                
+                with traza.span("pausa tras editar", 'pausa', archivo):
+                    time.sleep(WORD_PAUSE_AFTER_EDIT)
             
             # --- GUARDADO ---
             # Guardar copia del DOCX modificado (si está activado)
             if opciones.get('save_modified_dest', True):
                 # Detectar extensión original
                 ext = '.docm' if archivo.lower().endswith('.docm') else '.docx'
-                docx_copia_nombre = archivo.replace(ext, f' - COPIA{ext}')
-                docx_copia_ruta = os.path.normpath(os.path.join(carpeta_destino, docx_copia_nombre))
+                docx_copia_ruta = self.ruta_copia(archivo, carpeta_destino)
                 
                 # Determinar formato de guardado
                 file_format = WD_FORMAT_XML_DOCUMENT_MACRO if ext == '.docm' else WD_FORMAT_XML_DOCUMENT
                 
-                doc.SaveAs(docx_copia_ruta, FileFormat=file_format)
+                with traza.span("SaveAs DOCX", 'word', archivo):
+                    doc.SaveAs(docx_copia_ruta, FileFormat=file_format)
                 log_callback(f"    ✓ Copia Word guardada")
             
             # Guardar como PDF (si está activado)
             if opciones.get('copy_as_pdf', True):
-                pdf_nombre = (archivo.rsplit('.', 1)[0]) + ".pdf"
-                pdf_ruta = os.path.normpath(os.path.join(carpeta_destino, pdf_nombre))
-                doc.SaveAs(pdf_ruta, FileFormat=WD_FORMAT_PDF)
+                pdf_ruta = self.ruta_pdf(archivo, carpeta_destino)
+                with traza.span("SaveAs PDF", 'word', archivo, perfil=self.perfil_pdf):
+                    self.exportar_pdf(doc, pdf_ruta)
                 log_callback(f"  ✓ PDF generado")
+                if self.linealizar:
+                    with traza.span("linealizar", 'pdf', archivo):
+                        linealizado = linealizar_pdf(pdf_ruta)
+                    if not linealizado:
+                        log_callback(f"    ⚠ No se pudo linealizar el PDF")
             
             # Cerrar sin guardar cambios en el original
-            doc.Close(SaveChanges=False)
-            time.sleep(0.5)
+            with traza.span("cerrar", 'word', archivo):
+                doc.Close(SaveChanges=False)
+            doc = None
+            with traza.span("pausa tras cerrar", 'pausa', archivo):
+                time.sleep(WORD_PAUSE_AFTER_CLOSE)
             return True
             
         except Exception as e:
@@ -91,8 +157,103 @@ class WordProcessor:
             except:
                 pass
             return False
+        finally:
+            # Soltar la referencia COM al documento cuanto antes
+            doc = None
     
-    def insertar_encabezado(self, doc, codigo_ejercicio, log_callback, opciones):
+    def calcular_huella(self, codigo_ejercicio, opciones):
+        """
+        Huella del encabezado y pie que se aplicaría con estas opciones
+
+        Args:
+            codigo_ejercicio (str): Código del ejercicio
+            opciones (dict): Opciones de configuración
+
+        Returns:
+            str: Huella hexadecimal
+        """
+        usa_logo = opciones.get('add_logo', True) and self.ruta_logo and os.path.exists(self.ruta_logo)
+        if usa_logo and self._hash_logo is None:
+            self._hash_logo = hash_archivo(self.ruta_logo)
+        return calcular_huella(codigo_ejercicio, self.autor, self._hash_logo if usa_logo else '', opciones)
+
+    def _guardar_huella(self, doc, huella, log_callback):
+        """Guarda la huella en una propiedad personalizada del documento"""
+        try:
+            propiedades = doc.CustomDocumentProperties
+            try:
+                propiedades(STAMP_PROPERTY_NAME).Delete()
+            except Exception:
+                pass
+            propiedades.Add(
+                Name=STAMP_PROPERTY_NAME,
+                LinkToContent=False,
+                Type=MSO_PROPERTY_TYPE_STRING,
+                Value=huella
+            )
+            propiedades = None
+        except Exception as e:
+            log_callback(f"    ⚠ No se pudo guardar la huella: {e}")
+
+    def exportar_pdf(self, doc, pdf_ruta):
+        """
+        Exporta el documento a PDF con las opciones del perfil configurado
+
+        Args:
+            doc: Documento de Word
+            pdf_ruta (str): Ruta del PDF a generar
+        """
+        perfil = PDF_EXPORT_PROFILES.get(self.perfil_pdf, PDF_EXPORT_PROFILES[PDF_EXPORT_DEFAULT_PROFILE])
+        doc.ExportAsFixedFormat(
+            OutputFileName=pdf_ruta,
+            ExportFormat=WD_EXPORT_FORMAT_PDF,
+            OpenAfterExport=False,
+            Range=WD_EXPORT_ALL_DOCUMENT,
+            Item=WD_EXPORT_DOCUMENT_CONTENT,
+            KeepIRM=True,
+            **perfil
+        )
+
+    @staticmethod
+    def ruta_copia(archivo, carpeta_destino):
+        """
+        Ruta de la copia modificada ("<nombre> - COPIA.docx") de un archivo
+
+        Args:
+            archivo (str): Nombre del archivo Word
+            carpeta_destino (str): Carpeta donde se guardan los resultados
+
+        Returns:
+            str: Ruta normalizada de la copia
+        """
+        ext = '.docm' if archivo.lower().endswith('.docm') else '.docx'
+        docx_copia_nombre = archivo.replace(ext, f' - COPIA{ext}')
+        return os.path.normpath(os.path.join(carpeta_destino, docx_copia_nombre))
+
+    @staticmethod
+    def ruta_pdf(archivo, carpeta_destino):
+        """
+        Ruta del PDF que genera procesar_docx para un archivo
+
+        Args:
+            archivo (str): Nombre del archivo Word
+            carpeta_destino (str): Carpeta donde se guardan los resultados
+
+        Returns:
+            str: Ruta normalizada del PDF
+        """
+        pdf_nombre = (archivo.rsplit('.', 1)[0]) + ".pdf"
+        return os.path.normpath(os.path.join(carpeta_destino, pdf_nombre))
+
+    @staticmethod
+    def _geometria(geometrias, indice, section):
+        """Geometría de la sección `indice`, leyéndola solo la primera vez"""
+        geometria = geometrias.get(indice)
+        if geometria is None:
+            geometria = geometrias[indice] = GeometriaPagina.leer(section)
+        return geometria
+
+    def insertar_encabezado(self, doc, codigo_ejercicio, log_callback, opciones, geometrias=None):
         """
         Inserta logo, código y línea en el encabezado del documento
         
@@ -101,9 +262,11 @@ class WordProcessor:
             codigo_ejercicio (str): Código del ejercicio
             log_callback (callable): Función para escribir en el log
             opciones (dict): Opciones de configuración
+            geometrias (dict): Caché índice de sección -> GeometriaPagina (compartida con el pie)
         """
+        geometrias = {} if geometrias is None else geometrias
         try:
-            for section in doc.Sections:
+            for indice, section in enumerate(doc.Sections):
                 header = section.Headers(WD_HEADER_FOOTER_PRIMARY)
                 header_range = header.Range
                 
@@ -130,16 +293,20 @@ class WordProcessor:
                 
                 # 3. Insertar línea separadora (si está activado)
                 if opciones.get('add_header_line', True):
-                    self._insertar_linea_horizontal(header, doc, LINE_POSITION_Y_HEADER)
+                    geometria = self._geometria(geometrias, indice, section)
+                    self._insertar_linea_horizontal(header, geometria, LINE_POSITION_Y_HEADER)
                 
                 # 4. Insertar logo flotante (si está activado y existe)
                 if opciones.get('add_logo', True) and self.ruta_logo and os.path.exists(self.ruta_logo):
-                    self._insertar_logo(header, doc)
+                    self._insertar_logo(header, self._geometria(geometrias, indice, section))
+
+                # Liberar referencias COM de esta sección antes de pasar a la siguiente
+                codigo_para = header_range = header = section = None
                 
         except Exception as e:
             log_callback(f"    ⚠ Error encabezado: {e}")
     
-    def insertar_pie_pagina(self, doc, log_callback, opciones):
+    def insertar_pie_pagina(self, doc, log_callback, opciones, geometrias=None):
         """
         Inserta línea separadora, autor y número de página en el pie de página
         
@@ -147,9 +314,11 @@ class WordProcessor:
             doc: Documento de Word
             log_callback (callable): Función para escribir en el log
             opciones (dict): Opciones de configuración
+            geometrias (dict): Caché índice de sección -> GeometriaPagina (compartida con el encabezado)
         """
+        geometrias = {} if geometrias is None else geometrias
         try:
-            for section in doc.Sections:
+            for indice, section in enumerate(doc.Sections):
                 footer = section.Footers(WD_HEADER_FOOTER_PRIMARY)
                 footer_range = footer.Range
                 
@@ -201,33 +370,32 @@ class WordProcessor:
                     for field in footer.Range.Fields:
                         if field.Type in [WD_FIELD_PAGE, WD_FIELD_NUM_PAGES]:
                             field.Result.Font.Bold = True
+                    field = None
                 
                 # 3. Insertar línea separadora (si está activado)
                 if opciones.get('add_footer_line', True):
-                    page_setup = doc.PageSetup
-                    altura_pagina = page_setup.PageHeight
-                    posicion_y = altura_pagina - LINE_POSITION_Y_FOOTER_OFFSET
-                    self._insertar_linea_horizontal(footer, doc, posicion_y)
+                    geometria = self._geometria(geometrias, indice, section)
+                    posicion_y = geometria.alto - LINE_POSITION_Y_FOOTER_OFFSET
+                    self._insertar_linea_horizontal(footer, geometria, posicion_y)
+
+                # Liberar referencias COM de esta sección antes de pasar a la siguiente
+                temp_range1 = temp_range2 = numpages_field = page_field = None
+                footer_range = footer = section = None
                 
         except Exception as e:
             log_callback(f"    ⚠ Error pie: {e}")
     
-    def _insertar_linea_horizontal(self, container, doc, posicion_y):
+    def _insertar_linea_horizontal(self, container, geometria, posicion_y):
         """
         Inserta una línea horizontal con bolas en los extremos
         
         Args:
             container: Contenedor (header o footer)
-            doc: Documento de Word
+            geometria (GeometriaPagina): Geometría de la sección del contenedor
             posicion_y (float): Posición vertical de la línea
         """
-        page_setup = doc.PageSetup
-        margen_izq = page_setup.LeftMargin
-        margen_der = page_setup.RightMargin
-        ancho_pagina = page_setup.PageWidth
-        
-        inicio_x = margen_izq
-        fin_x = ancho_pagina - margen_der
+        inicio_x = geometria.margen_izq
+        fin_x = geometria.ancho - geometria.margen_der
         
         # Crear la línea
         linea_shape = container.Shapes.AddLine(
@@ -249,14 +417,16 @@ class WordProcessor:
         linea_shape.Line.EndArrowheadStyle = LINE_ARROWHEAD_STYLE
         linea_shape.Line.EndArrowheadWidth = LINE_ARROWHEAD_WIDTH
         linea_shape.Line.EndArrowheadLength = LINE_ARROWHEAD_LENGTH
+
+        linea_shape = None
     
-    def _insertar_logo(self, header, doc):
+    def _insertar_logo(self, header, geometria):
         """
         Inserta el logo flotante centrado en el encabezado
         
         Args:
             header: Encabezado del documento
-            doc: Documento de Word
+            geometria (GeometriaPagina): Geometría de la sección del encabezado
         """
         # Anclar al primer párrafo
         parrafo_ancla = header.Range.Paragraphs(1)
@@ -278,10 +448,10 @@ class WordProcessor:
         
         # Centrar horizontalmente
         logo_shape.RelativeHorizontalPosition = WD_RELATIVE_HORIZONTAL_POSITION_MARGIN
-        page_setup = doc.PageSetup
-        ancho_disponible = page_setup.PageWidth - page_setup.LeftMargin - page_setup.RightMargin
-        logo_shape.Left = (ancho_disponible - logo_shape.Width) / 2
+        logo_shape.Left = (geometria.ancho_util - logo_shape.Width) / 2
         
         # Posicionar verticalmente
         logo_shape.RelativeVerticalPosition = WD_RELATIVE_VERTICAL_POSITION_PARAGRAPH
         logo_shape.Top = LOGO_TOP_POSITION
+
+        logo_shape = parrafo_ancla = None
@@ -0,0 +1,430 @@
+"""
+Gestión de la sesión de Word (win32com)
+Mantiene una única instancia de Word.Application y la recicla periódicamente
+(antes de abrir el siguiente documento, nunca tras el último) para evitar la
+degradación de memoria y velocidad en lotes largos. Puede
+arrancarse de antemano (WordPrewarmer) mientras se configura la ejecución.
+"""
+
+import queue
+import threading
+import time
+import psutil
+
+from src.com_binding import despachar, avisar_constantes
+from src.config import (
+    WORD_RECYCLE_EVERY_DOCS,
+    WORD_RECYCLE_MAX_RSS_MB,
+    THROUGHPUT_WINDOW_DOCS,
+    WORD_SESSION_PROFILE,
+    WORD_BATCH_APPLICATION,
+    WORD_BATCH_OPTIONS,
+    WORD_BATCH_OPEN_ARGS,
+    WORD_BATCH_DISABLE_ADDINS,
+    WORD_PREWARM_STOP_TIMEOUT,
+    COM_BINDING_DEFAULT,
+    COM_GENCACHE_DIR
+)
+
+
+class WordSession:
+    """Encapsula Word.Application y lo reinicia tras N documentos o al superar un límite de memoria"""
+
+    def __init__(self, max_documentos=WORD_RECYCLE_EVERY_DOCS, max_rss_mb=WORD_RECYCLE_MAX_RSS_MB, log_callback=None,
+                 perfil=WORD_SESSION_PROFILE, sin_complementos=WORD_BATCH_DISABLE_ADDINS,
+                 vinculacion=COM_BINDING_DEFAULT, ruta_cache_com=COM_GENCACHE_DIR):
+        """
+        Inicializa la sesión (sin arrancar Word todavía)
+
+        Args:
+            max_documentos (int): Documentos procesados antes de reciclar Word (0 = nunca)
+            max_rss_mb (int): Memoria residente máxima de WINWORD.EXE en MB (0 = sin límite)
+            log_callback (callable): Función para escribir en el log
+            perfil (str): 'batch' (invisible, sin alertas ni trabajo en segundo plano) o 'interactive'
+            sin_complementos (bool): Desconectar los complementos en el perfil batch
+            vinculacion (str): 'early' (clases generadas de la biblioteca de tipos) o 'late'
+            ruta_cache_com (str): Carpeta de las clases generadas
+        """
+        self.max_documentos = max_documentos
+        self.max_rss_mb = max_rss_mb
+        self.log_callback = log_callback
+        self.perfil = perfil
+        self.sin_complementos = sin_complementos
+        self.vinculacion = vinculacion
+        self.vinculacion_usada = None
+        self.ruta_cache_com = ruta_cache_com
+        self._opciones_originales = {}
+        self._complementos_desconectados = []
+        self.word = None
+        self.proceso = None
+        self.documentos_sesion = 0
+        self.reinicios = 0
+        self._reciclado_pendiente = None
+
+    @staticmethod
+    def perfil_desde_config(config_manager, log_callback=None):
+        """Perfil de [WORD_SESSION] ('batch' o 'interactive'); si no es válido, avisa y usa el de por defecto"""
+        perfil = config_manager.get_str('WORD_SESSION', 'profile', WORD_SESSION_PROFILE).strip().lower()
+        if perfil not in ('batch', 'interactive'):
+            if log_callback:
+                log_callback(f"⚠ Perfil de Word desconocido '{perfil}', se usa '{WORD_SESSION_PROFILE}'")
+            perfil = WORD_SESSION_PROFILE
+        return perfil
+
+    @classmethod
+    def desde_config(cls, config_manager, log_callback=None):
+        """Sesión sin arrancar con el reciclado, el perfil y la vinculación COM de [WORD_SESSION]"""
+        return cls(
+            max_documentos=config_manager.get_int('WORD_SESSION', 'recycle_every_docs', WORD_RECYCLE_EVERY_DOCS),
+            max_rss_mb=config_manager.get_int('WORD_SESSION', 'recycle_max_rss_mb', WORD_RECYCLE_MAX_RSS_MB),
+            log_callback=log_callback,
+            perfil=cls.perfil_desde_config(config_manager, log_callback),
+            sin_complementos=config_manager.get_bool('WORD_SESSION', 'disable_addins', WORD_BATCH_DISABLE_ADDINS),
+            vinculacion=config_manager.get_str('WORD_SESSION', 'binding', COM_BINDING_DEFAULT).strip().lower(),
+            ruta_cache_com=config_manager.get_str('WORD_SESSION', 'type_cache', COM_GENCACHE_DIR).strip() or COM_GENCACHE_DIR
+        )
+
+    def iniciar(self):
+        """Arranca Word y localiza su proceso para poder medir la memoria"""
+        pids_previos = self._pids_word()
+        if self.perfil == 'batch':
+            # Instancia propia: Dispatch se engancharía al Word que el usuario tenga abierto
+            self.word, self.vinculacion_usada = despachar(
+                'Word.Application', nueva_instancia=True, vinculacion=self.vinculacion,
+                ruta_cache=self.ruta_cache_com, log_callback=self.log_callback
+            )
+            self._aplicar_perfil_batch()
+        else:
+            self.word, self.vinculacion_usada = despachar(
+                'Word.Application', vinculacion=self.vinculacion,
+                ruta_cache=self.ruta_cache_com, log_callback=self.log_callback
+            )
+            self.word.Visible = True
+        if self.vinculacion_usada == 'early':
+            avisar_constantes(self.log_callback)
+        self.documentos_sesion = 0
+        self._reciclado_pendiente = None
+
+        # El proceso nuevo es el que no existía antes del Dispatch
+        nuevos = self._pids_word() - pids_previos
+        self.proceso = psutil.Process(nuevos.pop()) if nuevos else None
+        return self.word
+
+    @property
+    def argumentos_apertura(self):
+        """Argumentos para Documents.Open según el perfil"""
+        return dict(WORD_BATCH_OPEN_ARGS) if self.perfil == 'batch' else {}
+
+    def _aplicar_perfil_batch(self):
+        """
+        Desactiva lo que no aporta nada en un proceso desatendido. Las opciones
+        persistentes se anotan antes de cambiarlas para restaurarlas al cerrar.
+        """
+        for nombre, valor in WORD_BATCH_APPLICATION.items():
+            try:
+                setattr(self.word, nombre, valor)
+            except Exception as e:
+                self._log(f"⚠ Perfil batch: no se pudo fijar {nombre} ({e})")
+
+        opciones = self.word.Options
+        self._opciones_originales = {}
+        for nombre, valor in WORD_BATCH_OPTIONS.items():
+            try:
+                self._opciones_originales[nombre] = getattr(opciones, nombre)
+                setattr(opciones, nombre, valor)
+            except Exception as e:
+                self._opciones_originales.pop(nombre, None)
+                self._log(f"⚠ Perfil batch: no se pudo fijar Options.{nombre} ({e})")
+        opciones = None
+
+        if self.sin_complementos:
+            self._desconectar_complementos()
+
+    def _desconectar_complementos(self):
+        """
+        Desconecta los complementos COM y las plantillas globales de esta instancia.
+        Automation no deja arrancar Word con /a, así que se hace después de arrancar;
+        los complementos COM recuerdan el cambio, por eso se reconectan al cerrar.
+        """
+        self._complementos_desconectados = []
+        for complemento in self.word.COMAddIns:
+            try:
+                if complemento.Connect:
+                    complemento.Connect = False
+                    self._complementos_desconectados.append((complemento, 'Connect'))
+            except Exception as e:
+                self._log(f"⚠ Perfil batch: no se pudo desconectar el complemento {complemento.Description} ({e})")
+        for plantilla in self.word.AddIns:
+            try:
+                if plantilla.Installed:
+                    plantilla.Installed = False
+                    self._complementos_desconectados.append((plantilla, 'Installed'))
+            except Exception as e:
+                self._log(f"⚠ Perfil batch: no se pudo descargar la plantilla {plantilla.Name} ({e})")
+        if self._complementos_desconectados:
+            self._log(f"Complementos de Word desconectados: {len(self._complementos_desconectados)}")
+
+    def _reconectar_complementos(self):
+        """Vuelve a conectar lo que desconectó _desconectar_complementos()"""
+        for complemento, propiedad in self._complementos_desconectados:
+            try:
+                setattr(complemento, propiedad, True)
+            except Exception as e:
+                self._log(f"⚠ No se pudo reconectar un complemento de Word ({e})")
+        self._complementos_desconectados = []
+
+    def _restaurar_opciones(self):
+        """Devuelve a Word.Options los valores que tenía el usuario"""
+        if not self._opciones_originales:
+            return
+        opciones = self.word.Options
+        for nombre, valor in self._opciones_originales.items():
+            try:
+                setattr(opciones, nombre, valor)
+            except Exception as e:
+                self._log(f"⚠ No se pudo restaurar Options.{nombre} ({e})")
+        self._opciones_originales = {}
+        opciones = None
+
+    def cerrar(self):
+        """Cierra Word (restaurando las opciones del usuario) y libera la referencia COM"""
+        if self.word is None:
+            return
+        try:
+            self._restaurar_opciones()
+        except Exception:
+            pass
+        self._reconectar_complementos()
+        try:
+            self.word.Quit()
+        except Exception:
+            pass
+        self.word = None
+        self.proceso = None
+
+        import pythoncom
+        pythoncom.CoFreeUnusedLibraries()
+
+    def reciclar(self, motivo):
+        """Cierra la instancia actual y arranca una nueva"""
+        self._log(f"♻ Reiniciando Word ({motivo})")
+        self.cerrar()
+        self.iniciar()
+        self.reinicios += 1
+
+    def reciclar_antes_del_siguiente(self, motivo):
+        """Recicla Word cuando vaya a abrirse el próximo documento, si llega a haberlo"""
+        self._reciclado_pendiente = motivo
+
+    def documento_procesado(self):
+        """Debe llamarse tras cada documento. Solo cuenta: el reciclado lo decide preparar_documento()"""
+        self.documentos_sesion += 1
+
+    def preparar_documento(self):
+        """
+        Debe llamarse antes de abrir cada documento. Recicla Word si se ha alcanzado
+        el número máximo de documentos o el límite de memoria: tras el último documento
+        no se arranca un Word que nadie va a usar.
+
+        Returns:
+            bool: True si se ha reciclado
+        """
+        if self.word is None:
+            return False
+
+        motivo = self._reciclado_pendiente
+        if motivo is None and self.max_documentos and self.documentos_sesion >= self.max_documentos:
+            motivo = f"{self.documentos_sesion} documentos"
+        if motivo is None and self.max_rss_mb:
+            rss_mb = self.memoria_mb()
+            if rss_mb is not None and rss_mb >= self.max_rss_mb:
+                motivo = f"{rss_mb:.0f} MB en memoria"
+        if motivo is None:
+            return False
+        self.reciclar(motivo)
+        return True
+
+    def memoria_mb(self):
+        """Devuelve la memoria residente de WINWORD.EXE en MB, o None si no se conoce"""
+        if self.proceso is None:
+            return None
+        try:
+            return self.proceso.memory_info().rss / (1024 * 1024)
+        except psutil.Error:
+            return None
+
+    @staticmethod
+    def _pids_word():
+        """PIDs de todos los procesos WINWORD.EXE en ejecución"""
+        pids = set()
+        try:
+            for proceso in psutil.process_iter(['name']):
+                if proceso.info['name'] and proceso.info['name'].lower() == 'winword.exe':
+                    pids.add(proceso.pid)
+        except Exception:
+            pass
+        return pids
+
+    def _log(self, mensaje):
+        if self.log_callback:
+            self.log_callback(mensaje)
+
+
+class WordPrewarmer:
+    """
+    Arranca Word en un hilo propio mientras el usuario todavía configura la ejecución.
+    Los objetos COM solo sirven en el hilo que los creó, así que la sesión no se pasa
+    a otro hilo: la ejecución se lanza en este mismo (ejecutar) y la recoge con
+    tomar_sesion(). Después de cada ejecución se deja otra sesión preparada.
+    """
+
+    def __init__(self, crear_sesion, log_callback=None, espera_cierre=WORD_PREWARM_STOP_TIMEOUT):
+        """
+        Args:
+            crear_sesion (callable): Devuelve una WordSession sin arrancar
+            log_callback (callable): Función para escribir en el log
+            espera_cierre (float): Segundos que detener() espera a que el hilo cierre Word
+        """
+        self.crear_sesion = crear_sesion
+        self.log_callback = log_callback
+        self.espera_cierre = espera_cierre
+        self.sesion = None
+        self.segundos_arranque = None
+        self._tareas = queue.Queue()
+        self._listo = threading.Event()
+        self._detener = threading.Event()
+        self._fallido = False
+        self._pids_previos = set()
+        self._hilo = None
+
+    @property
+    def activo(self):
+        """True si acepta ejecuciones (el hilo sigue en marcha)"""
+        return self._hilo is not None and self._hilo.is_alive() and not self._detener.is_set()
+
+    def iniciar(self):
+        self._pids_previos = WordSession._pids_word()
+        self._hilo = threading.Thread(target=self._bucle, name="word-precalentado", daemon=True)
+        self._hilo.start()
+
+    def ejecutar(self, funcion, *args):
+        """Ejecuta funcion(*args) en el hilo de la sesión precalentada"""
+        self._tareas.put((funcion, args))
+
+    def tomar_sesion(self):
+        """
+        Entrega la sesión precalentada, que desde ese momento cierra quien la recibe.
+        Devuelve None fuera del hilo del precalentado o si Word ya no está en marcha.
+        """
+        if threading.current_thread() is not self._hilo or self.sesion is None:
+            return None
+        sesion, self.sesion = self.sesion, None
+        if sesion.proceso is not None and not sesion.proceso.is_running():
+            # Lo cerró el usuario (o se cayó) mientras esperaba
+            sesion.word = None
+            sesion.proceso = None
+            return None
+        return sesion
+
+    def pids_propios(self):
+        """PIDs de WINWORD.EXE del precalentado (mientras arranca, los que no existían antes)"""
+        if not self._listo.is_set():
+            return WordSession._pids_word() - self._pids_previos
+        sesion = self.sesion
+        return {sesion.proceso.pid} if sesion and sesion.proceso else set()
+
+    def detener(self):
+        """Cierra la sesión que no se llegó a usar. Una ejecución en curso no se espera más de `espera_cierre`."""
+        self._detener.set()
+        self._tareas.put(None)
+        if self._hilo:
+            self._hilo.join(self.espera_cierre)
+
+    def _bucle(self):
+        import pythoncom
+        pythoncom.CoInitialize()
+        try:
+            while True:
+                if self.sesion is None and not self._fallido and not self._detener.is_set():
+                    self._precalentar()
+                tarea = self._tareas.get()
+                if tarea is None:
+                    break
+                funcion, args = tarea
+                try:
+                    funcion(*args)
+                except Exception as e:
+                    self._log(f"❌ ERROR: {e}")
+        finally:
+            if self.sesion:
+                self.sesion.cerrar()
+                self.sesion = None
+            pythoncom.CoUninitialize()
+
+    def _precalentar(self):
+        self._pids_previos = WordSession._pids_word()
+        self._listo.clear()
+        inicio = time.perf_counter()
+        sesion = self.crear_sesion()
+        try:
+            sesion.iniciar()
+        except Exception as e:
+            # Sin reintentos: la ejecución arrancará Word como siempre y mostrará el error
+            self._fallido = True
+            self._log(f"⚠ No se pudo precalentar Word: {e}")
+        else:
+            self.segundos_arranque = time.perf_counter() - inicio
+            self.sesion = sesion
+            self._log(f"♨ Word precalentado en {self.segundos_arranque:.1f}s")
+        finally:
+            self._listo.set()
+
+    def _log(self, mensaje):
+        if self.log_callback:
+            self.log_callback(mensaje)
+
+
+class ThroughputTracker:
+    """Registra la duración de cada documento para comprobar que el ritmo se mantiene estable"""
+
+    def __init__(self, ventana=THROUGHPUT_WINDOW_DOCS):
+        """
+        Args:
+            ventana (int): Número de documentos por bloque en el resumen
+        """
+        self.ventana = ventana
+        self.duraciones = []
+        self._inicio = None
+
+    def empezar_documento(self):
+        self._inicio = time.perf_counter()
+
+    def terminar_documento(self):
+        """Cierra la medición del documento actual y devuelve su duración en segundos"""
+        if self._inicio is None:
+            return 0.0
+        duracion = time.perf_counter() - self._inicio
+        self.duraciones.append(duracion)
+        self._inicio = None
+        return duracion
+
+    def resumen(self):
+        """
+        Genera líneas de resumen con el ritmo (documentos/minuto) por bloques
+
+        Returns:
+            list: Líneas de texto listas para el log
+        """
+        if not self.duraciones:
+            return []
+
+        lineas = ["Rendimiento por bloques:"]
+        for i in range(0, len(self.duraciones), self.ventana):
+            bloque = self.duraciones[i:i + self.ventana]
+            total = sum(bloque)
+            ritmo = (len(bloque) / total * 60) if total > 0 else 0.0
+            lineas.append(
+                f"  Docs {i + 1}-{i + len(bloque)}: {ritmo:.1f} docs/min "
+                f"(media {total / len(bloque):.2f}s)"
+            )
+        return lineas